@@ -8,10 +8,31 @@ from elyria.game_object import GameObject
 from elyria.game import Game
 from elyria.particle import Particle, ParticleGenerator
 from elyria.post_processor import PostProcessor
-from elyria.resource_manager import ResourceManager
+from elyria.resource_manager import ResourceManager, ResourceHandle
 from elyria.shader import Shader
 from elyria.sprite_renderer import SpriteRenderer
 from elyria.text_renderer import Character, TextRenderer
-from elyria.texture2d import Texture2D
+from elyria.glyph_atlas import GlyphAtlas
+from elyria.texture2d import Texture2D, TextureArray
 from elyria.animation import Animation
 from elyria.input import Key, Input
+from elyria.replay import Recorder, Replayer, FrameTimeReport, state_checksum
+from elyria.stream_buffer import StreamBuffer, StreamingBuffers
+from elyria.simulation import SimulationJob, SimulationResult, SimulationRunner
+from elyria.snapshot import Snapshot, SnapshotRing, SnapshotWriter, save_snapshot, load_snapshot
+from elyria.pathfinding import NavGrid, PathRequest, PathfindingService, DIRECTIONS, step_direction
+from elyria.crowd import Crowd
+from elyria.layer_cache import Layer, LayerStack
+from elyria.gpu_particles import GPUParticleGenerator
+from elyria.physics import PhysicsWorld, Contact
+from elyria.pool import ObjectPool, AllocationTracker
+from elyria.gc_policy import GCPolicy, HitchDetector, Hitch
+from elyria.frame_pacer import FramePacer
+from elyria.render_pipeline import DrawList, RenderPipeline
+from elyria.render_stats import RenderStats
+from elyria.world_map import WorldMap, WorldStreamer, Chunk, write_world_map, convert_tiled
+from elyria.sprite_batch import SpriteBatch
+from elyria.palette import PaletteTexture
+from elyria.scheduler import Scheduler, Script, wait, until, next_frame, wait_signal
+from elyria.netcode import GameServer, NetClient, NetStats
+from elyria.font_cache import FontCache
@@ -0,0 +1,206 @@
+import io
+import os
+import time
+from pygame import mixer
+from typing import Optional
+
+
+# A music track streamed from disk by pygame.mixer.music. Only the encoded
+# file is ever kept in memory (and only once preloaded), never the decoded PCM.
+class MusicTrack:
+    def __init__(self, file: str):
+        self.file = file
+        # encoded file content, read ahead of time to avoid a disk stall on switch
+        self.data: Optional[bytes] = None
+
+    def preload(self) -> None:
+        if self.data is None:
+            with open(self.file, "rb") as f:
+                self.data = f.read()
+
+    # makes this track the one mixer.music streams
+    def load(self) -> None:
+        if self.data is not None:
+            # the extension helps SDL_mixer detect formats such as MP3 or MOD
+            mixer.music.load(io.BytesIO(self.data), os.path.splitext(self.file)[1])
+        else:
+            mixer.music.load(self.file)
+
+    # queues this track after the one mixer.music is streaming
+    def queue(self) -> None:
+        if self.data is not None:
+            mixer.music.queue(io.BytesIO(self.data), os.path.splitext(self.file)[1])
+        else:
+            mixer.music.queue(self.file)
+
+    @property
+    def memory(self) -> int:
+        return len(self.data) if self.data is not None else 0
+
+
+# A sound effect fully decoded in memory, but only once it is first played
+# (unless loaded eagerly), so rarely used effects cost nothing until needed.
+class SoundEffect:
+    def __init__(self, file: str, max_voices: int = 4, priority: int = 0, lazy: bool = True):
+        self.file = file
+        self.max_voices = max_voices  # maximum number of simultaneous voices of this effect
+        self.priority = priority  # higher priority effects may steal channels of lower ones
+        self.sound: Optional[mixer.Sound] = None
+        if not lazy:
+            self.get()
+
+    # returns the decoded sound, decoding it on first use
+    def get(self) -> mixer.Sound:
+        if self.sound is None:
+            self.sound = mixer.Sound(self.file)
+        return self.sound
+
+    def unload(self) -> None:
+        self.sound = None
+
+    # size of the decoded sample buffer in bytes
+    @property
+    def memory(self) -> int:
+        if self.sound is None:
+            return 0
+        init = mixer.get_init()
+        if init is None:
+            return 0
+        frequency, size, channels = init
+        return int(self.sound.get_length() * frequency) * channels * (abs(size) // 8)
+
+
+# Plays music tracks through mixer.music, fading the current track out and the
+# next one in when switching. mixer.music is a single stream, so the crossfade
+# is a fade-out followed by a fade-in of the new track, driven by update().
+class MusicPlayer:
+    def __init__(self, volume: float = 1.0):
+        self.volume = volume
+        self.current: Optional[MusicTrack] = None
+        self.pending: Optional[MusicTrack] = None
+        self.pending_loops = -1
+        # track queued after the current one, and the last playing position,
+        # which drops back when the queued track starts
+        self.queued: Optional[MusicTrack] = None
+        self.position = 0
+        # fade state: remaining time and duration of each half of a crossfade
+        self.fade_out = 0.0
+        self.fade_in = 0.0
+        self.fade_duration = 0.0
+
+    def play(self, track: MusicTrack, fade_ms: int = 0, loops: int = -1) -> None:
+        track.preload()
+        if self.current is None or not mixer.music.get_busy() or fade_ms <= 0:
+            self.start(track, fade_ms / 1000.0, loops)
+            return
+
+        # fade out what is playing first; the new track starts in update()
+        self.pending = track
+        self.pending_loops = loops
+        self.fade_duration = fade_ms / 2000.0
+        self.fade_out = self.fade_duration
+        self.fade_in = 0.0
+
+    # preloads a track and queues it to start right after the current one ends
+    def queue(self, track: MusicTrack) -> None:
+        track.preload()
+        track.queue()
+        self.queued = track
+
+    def stop(self, fade_ms: int = 0) -> None:
+        self.pending = None
+        self.queued = None
+        if fade_ms > 0 and mixer.music.get_busy():
+            self.fade_duration = fade_ms / 1000.0
+            self.fade_out = self.fade_duration
+            self.fade_in = 0.0
+        else:
+            mixer.music.stop()
+            self.current = None
+
+    def start(self, track: MusicTrack, fade: float, loops: int) -> None:
+        track.load()
+        mixer.music.play(loops)
+        self.current = track
+        self.queued = None
+        self.position = 0
+        self.fade_duration = fade
+        self.fade_in = fade
+        self.fade_out = 0.0
+        mixer.music.set_volume(0.0 if fade > 0.0 else self.volume)
+
+    def update(self, dt: float) -> None:
+        if self.queued is not None:
+            position = mixer.music.get_pos()
+            if position < self.position:
+                # the queued track took over
+                self.current, self.queued = self.queued, None
+            self.position = position
+
+        if self.fade_out > 0.0:
+            self.fade_out = max(self.fade_out - dt, 0.0)
+            mixer.music.set_volume(self.volume * self.fade_out / self.fade_duration)
+            if self.fade_out == 0.0:
+                if self.pending is not None:
+                    track, self.pending = self.pending, None
+                    self.start(track, self.fade_duration, self.pending_loops)
+                else:
+                    mixer.music.stop()
+                    self.current = None
+        elif self.fade_in > 0.0:
+            self.fade_in = max(self.fade_in - dt, 0.0)
+            mixer.music.set_volume(self.volume * (1.0 - self.fade_in / self.fade_duration))
+
+
+# Plays sound effects on a fixed set of mixer channels. Each effect is limited
+# to its own number of voices (its oldest voice is restarted past that) and,
+# when every channel is busy, a new sound steals the channel of the oldest
+# playing sound with the lowest priority not above its own.
+class SoundPool:
+    def __init__(self, channels: int = 16):
+        mixer.set_num_channels(channels)
+        self.channels = [mixer.Channel(i) for i in range(channels)]
+        # what each channel is playing: (effect, priority, start time)
+        self.voices: list[Optional[tuple[SoundEffect, int, float]]] = [None] * channels
+
+    def play(self, effect: SoundEffect, priority: Optional[int] = None, volume: float = 1.0) -> Optional[mixer.Channel]:
+        priority = effect.priority if priority is None else priority
+
+        index = self.find_channel(effect, priority)
+        if index is None:
+            return None
+
+        channel = self.channels[index]
+        channel.set_volume(volume)
+        channel.play(effect.get())
+        self.voices[index] = (effect, priority, time.perf_counter())
+        return channel
+
+    def find_channel(self, effect: SoundEffect, priority: int) -> Optional[int]:
+        busy = []
+        for i, voice in enumerate(self.voices):
+            if voice is not None and not self.channels[i].get_busy():
+                self.voices[i] = voice = None
+            if voice is not None:
+                busy.append(i)
+
+        # voice limit: restart the oldest voice of the same effect
+        same = [i for i in busy if self.voices[i][0] is effect]
+        if len(same) >= effect.max_voices:
+            return min(same, key=lambda i: self.voices[i][2])
+
+        # then any idle channel
+        for i, voice in enumerate(self.voices):
+            if voice is None:
+                return i
+
+        # finally steal the oldest of the least important voices
+        candidates = [i for i in busy if self.voices[i][1] <= priority]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda i: (self.voices[i][1], self.voices[i][2]))
+
+    def stop(self) -> None:
+        for i, channel in enumerate(self.channels):
+            channel.stop()
+            self.voices[i] = None
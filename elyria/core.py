@@ -5,21 +5,34 @@ from pygame import mixer
 from elyria.game import Game as GameClass
 from elyria.resource_manager import ResourceManager
 from elyria.input import Input, Key
+from elyria.stream_buffer import StreamingBuffers
+from elyria.text_renderer import TextRenderer
+from elyria.replay import Recorder, Replayer, FrameTimeReport, seed_rng, state_checksum
+from elyria.pool import AllocationTracker
+from elyria.gc_policy import GCPolicy, HitchDetector
+from elyria.frame_pacer import FramePacer
+from elyria.render_pipeline import RenderPipeline
+from elyria.render_stats import RenderStats
 from typing import Optional
 
+import json
 import platform
+import time
 
 SCREEN_WIDTH: int = 800
 SCREEN_HEIGHT: int = 600
 
 game: Optional[GameClass] = None
 
-def key_callback(window: GLFWwindow, key: int, scancode: int, action: int, mode: int) -> None:
-    # when a user presses the escape key, we set the WindowShouldClose property
-    # to true, closing the application
-    if key == GLFW_KEY_ESCAPE and action == GLFW_PRESS:
-        glfwSetWindowShouldClose(window, True)
+# session recorder/replayer of the running main loop (if any)
+recorder: Optional[Recorder] = None
+replayer: Optional[Replayer] = None
+
+# frame pacing of the running main loop
+pacer: Optional[FramePacer] = None
+
 
+def process_key(key: int, action: int) -> None:
     if key >= 0 and key < 1024:
         if action == GLFW_PRESS:
             Input.set_pressed(Key(key), True)
@@ -28,15 +41,44 @@ def key_callback(window: GLFWwindow, key: int, scancode: int, action: int, mode:
             Input.set_processed(Key(key), False)
 
 
+def key_callback(window: GLFWwindow, key: int, scancode: int, action: int, mode: int) -> None:
+    # when a user presses the escape key, we set the WindowShouldClose property
+    # to true, closing the application
+    if key == GLFW_KEY_ESCAPE and action == GLFW_PRESS:
+        glfwSetWindowShouldClose(window, True)
+
+    # while replaying, input only comes from the recorded session
+    if replayer is not None:
+        return
+
+    if recorder is not None and key >= 0 and key < 1024:
+        recorder.record_event(key, action)
+
+    process_key(key, action)
+
+
 def framebuffer_size_callback(window: GLFWwindow, width: int, height: int) -> None:
     # make sure the viewport matches the new window dimensions; note that
     # width and height will be significantly larger than specified on
     # retina displays.
     glViewport(0, 0, width, height)
 
-def main(_game: GameClass) -> None:
-    global game
-    game = _game
+
+# an unfocused or iconified window runs at the pacer's background rate
+def window_focus_callback(window: GLFWwindow, focused: int) -> None:
+    if pacer is not None:
+        pacer.focused = bool(focused)
+
+
+def window_iconify_callback(window: GLFWwindow, iconified: int) -> None:
+    if pacer is not None:
+        pacer.iconified = bool(iconified)
+
+
+# creates the game window and its OpenGL context; a headless window
+# is never shown and does not wait for vsync when swapping buffers.
+# A debug context reports errors and warnings through glDebugMessageCallback
+def create_window(width: int, height: int, title: str, headless: bool = False, debug: bool = False) -> Optional[GLFWwindow]:
     glfwInit()
     glfwWindowHint(GLFW_CONTEXT_VERSION_MAJOR, 3)
     glfwWindowHint(GLFW_CONTEXT_VERSION_MINOR, 3)
@@ -46,17 +88,74 @@ def main(_game: GameClass) -> None:
         glfwWindowHint(GLFW_OPENGL_FORWARD_COMPAT, GL_TRUE)
 
     glfwWindowHint(GLFW_RESIZABLE, False)
+    if debug:
+        glfwWindowHint(GLFW_OPENGL_DEBUG_CONTEXT, True)
+    if headless:
+        glfwWindowHint(GLFW_VISIBLE, False)
 
     # glfw window creation
-    window = glfwCreateWindow(game.width, game.height, game.title, None, None)
+    window = glfwCreateWindow(width, height, title, None, None)
     if window == None:
         print("Failed to create GLFW window")
         glfwTerminate()
-        return -1
-    
+        return None
+
     glfwMakeContextCurrent(window)
+    if headless:
+        glfwSwapInterval(0)
+
+    return window
+
+
+# runs the game until its window is closed.
+# record: path of a file the played session is written to
+# replay: path of a recorded session to play back instead of live input;
+#         a frame-time report is printed (and returned) once it ends
+# headless: run in an invisible window, without vsync
+# checksum: also compute a state checksum after every replayed frame
+# report: path of a JSON file the replay report is written to
+# track_allocations: trace the allocations of every frame (slow, for
+#                    debugging), reported with their top sites at the end
+# gc_policy: when the garbage collector runs during gameplay (see GCPolicy),
+#            the garbage collector is left alone if None
+# detect_hitches: log the frames over the pacer's frame budget, with the
+#                 collections that ran during them
+# frame_pacer: vsync and frame rate cap, vsync only (none when headless) if
+#              None; its frame-time report is printed once the game ends
+# pipelined: simulate each frame on a worker thread while the previous one
+#            renders, from the draw list the game recorded (see Game.record)
+# render_stats: GL counters per frame and subsystem (and debug messages,
+#               trace), installed once the game is initialized
+def main(
+    _game: GameClass,
+    record: Optional[str] = None,
+    replay: Optional[str] = None,
+    headless: bool = False,
+    checksum: bool = False,
+    report: Optional[str] = None,
+    track_allocations: bool = False,
+    gc_policy: Optional[GCPolicy] = None,
+    detect_hitches: bool = False,
+    frame_pacer: Optional[FramePacer] = None,
+    pipelined: bool = False,
+    render_stats: Optional[RenderStats] = None
+) -> Optional[FrameTimeReport]:
+    global game, recorder, replayer, pacer
+    game = _game
+
+    debug = render_stats is not None and render_stats.debug_output
+    window = create_window(game.width, game.height, game.title, headless, debug)
+    if window is None:
+        return None
+
+    pacer = frame_pacer if frame_pacer is not None else FramePacer(vsync=not headless)
+    pacer.apply()
+
     glfwSetKeyCallback(window, key_callback)
     glfwSetFramebufferSizeCallback(window, framebuffer_size_callback)
+    if not headless:
+        glfwSetWindowFocusCallback(window, window_focus_callback)
+        glfwSetWindowIconifyCallback(window, window_iconify_callback)
 
     # OpenGL configuration
     glViewport(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
@@ -66,32 +165,148 @@ def main(_game: GameClass) -> None:
     # initialize audio mixer
     mixer.init()
 
+    # seed randomness and start from a clean input state before the game
+    # initializes, so that a replayed session starts from the exact same
+    # state it was recorded from
+    Input.reset()
+    if replay:
+        replayer = Replayer.load(replay)
+        seed_rng(replayer.seed)
+    elif record:
+        recorder = Recorder()
+        seed_rng(recorder.seed)
+    # a recorded session must run the same scripts in the same frames when replayed
+    if replayer is not None or recorder is not None:
+        game.scripts.budget = None
+
     # initialize game
     game.init()
 
+    # the game's assets are loaded: leave them out of collections from now on
+    if gc_policy is not None:
+        gc_policy.start()
+    hitch_detector = None
+    if detect_hitches:
+        hitch_detector = HitchDetector(pacer.frame_budget)
+        hitch_detector.start()
+
     # deltatime variables
     delta_time = 0.0
     last_frame = 0.0
 
+    # replay measurements
+    frame_times: list[float] = []
+    checksums: list[int] = []
+
+    allocation_tracker = None
+    if track_allocations:
+        allocation_tracker = AllocationTracker()
+        allocation_tracker.start()
+
+    pipeline = RenderPipeline(game) if pipelined else None
+    if render_stats is not None:
+        render_stats.install()
+
+    pacer.start()
     while not glfwWindowShouldClose(window):
+        frame_start = time.perf_counter()
+
         # calculate delta time
         current_frame = glfwGetTime()
         delta_time = current_frame - last_frame
         last_frame = current_frame
         glfwPollEvents()
 
-        # manage user input
-        game.process_input(delta_time)
+        if replayer is not None:
+            if replayer.finished:
+                break
+            delta_time, events = replayer.next_frame()
+            for key, action in events:
+                process_key(key, action)
+        elif recorder is not None:
+            delta_time = recorder.end_frame(delta_time)
+
+        if pipeline is None:
+            # manage user input
+            game.process_input(delta_time)
+
+            # update game state
+            game.update(delta_time)
+            game.scripts.update(delta_time)
+        else:
+            # input and update of this frame run on the worker while the last one renders
+            pipeline.submit(delta_time)
+        ResourceManager.update_audio(delta_time)
+
+        # render, unless the window is iconified
+        if pacer.should_render:
+            glClearColor(0.0, 0.0, 0.0, 1.0)
+            glClear(GL_COLOR_BUFFER_BIT)
+            game.full_render(pipeline.draw_list if pipeline is not None else None)
+        if pipeline is not None:
+            pipeline.wait()
+        work_time = time.perf_counter() - frame_start
+
+        if pacer.should_render:
+            glfwSwapBuffers(window)
+            StreamingBuffers.end_frame()
+            if render_stats is not None:
+                render_stats.end_frame()
+
+        # collect in the time left by the frame
+        if gc_policy is not None:
+            gc_policy.end_frame(work_time)
+
+        if replayer is not None:
+            # make sure the GPU work of this frame is part of its timing
+            glFinish()
+            frame_times.append(time.perf_counter() - frame_start)
+            if checksum:
+                checksums.append(state_checksum(game.game_objects()))
+
+        if allocation_tracker is not None:
+            allocation_tracker.end_frame()
+        if hitch_detector is not None:
+            hitch_detector.end_frame(time.perf_counter() - frame_start)
+
+        # wait for the next frame, if capped
+        pacer.wait()
+
+    if pipeline is not None:
+        pipeline.close()
+    if render_stats is not None:
+        render_stats.uninstall()
+        print(render_stats.summary())
+    if gc_policy is not None:
+        gc_policy.stop()
+    if hitch_detector is not None:
+        hitch_detector.stop()
+        print(hitch_detector.summary())
+    if allocation_tracker is not None:
+        allocation_tracker.stop()
+        print(allocation_tracker.summary())
 
-        # update game state
-        game.update(delta_time)
+    if pacer.intervals:
+        cap = f"{pacer.target_fps:g} fps cap" if pacer.target_fps else "no cap"
+        print(f"frame pacing ({'vsync' if pacer.vsync else 'no vsync'}, {cap}):")
+        print(pacer.report().summary())
 
-        # render
-        glClearColor(0.0, 0.0, 0.0, 1.0)
-        glClear(GL_COLOR_BUFFER_BIT)
-        game.full_render()
+    frame_report = None
+    if recorder is not None:
+        recorder.save(record)
+    if replayer is not None:
+        frame_report = FrameTimeReport(frame_times, checksums)
+        print(frame_report.summary())
+        if report:
+            with open(report, "w") as file:
+                json.dump(frame_report.to_dict(), file, indent=4)
 
-        glfwSwapBuffers(window)
+    recorder = None
+    replayer = None
+    pacer = None
 
     ResourceManager.clear()
+    TextRenderer.clear()
+    StreamingBuffers.clear()
     glfwTerminate()
+    return frame_report
@@ -0,0 +1,245 @@
+import math
+import glm
+import numpy as np
+from typing import Optional
+from elyria.animation import Animation
+from elyria.sprite_renderer import SpriteRenderer
+
+# facings follow the order of elyria.pathfinding.DIRECTIONS (and of
+# small_rpg's Direction): UP first, then clockwise, y pointing down
+FACINGS = 8
+UP, UP_RIGHT, RIGHT, DOWN_RIGHT, DOWN, DOWN_LEFT, LEFT, UP_LEFT = range(FACINGS)
+
+# stride between two columns of separation cells in the cell keys
+CELL_COLUMN = 1 << 32
+
+
+# 8-way facing of each (dx, dy) vector: atan2 cut in 45 degree buckets
+# centred on the eight directions
+def facing_of(dx: np.ndarray, dy: np.ndarray) -> np.ndarray:
+    angle = np.arctan2(dy, dx)  # 0 facing right, pi / 2 facing down
+    return (np.rint(angle / (np.pi / 4.0)).astype(np.int64) + 2) % FACINGS
+
+
+# same as facing_of, for a single vector
+def facing(dx: float, dy: float) -> int:
+    return (round(math.atan2(dy, dx) / (math.pi / 4.0)) + 2) % FACINGS
+
+
+# A crowd of NPCs whose state lives in arrays, one row per agent, so the
+# whole crowd is steered and animated with a handful of NumPy operations:
+#   - seek: move towards the agent's target, slowing down on arrival
+#   - separation: push away from neighbours closer than the agent radius,
+#     found through a uniform grid of cells one radius wide
+#   - obstacle avoidance: push away from circular obstacles
+# Facings and animation clips are derived from the velocities in bulk;
+# clips are indices in the animations list.
+class Crowd:
+    def __init__(
+        self,
+        capacity: int,
+        animations: Optional[list[Animation]] = None,
+        facing_clips: Optional[list[int]] = None,
+        max_speed: float = 60.0,
+        max_force: float = 240.0,
+        radius: float = 12.0
+    ):
+        self.capacity = capacity
+        self.count = 0
+
+        self.max_speed = max_speed
+        self.max_force = max_force
+        self.radius = radius  # personal space, neighbours closer than this push away
+        self.slowing_radius = 4.0 * radius  # agents slow down this close to their target
+        self.idle_speed = 1.0  # under this speed an agent keeps its facing and stands still
+        # weight of each steering behaviour
+        self.seek_weight = 1.0
+        self.separation_weight = 1.5
+        self.avoidance_weight = 2.0
+
+        # agents
+        self.positions = np.zeros((capacity, 2), dtype=np.float32)
+        self.velocities = np.zeros((capacity, 2), dtype=np.float32)
+        self.targets = np.zeros((capacity, 2), dtype=np.float32)
+        self.seeking = np.zeros(capacity, dtype=bool)
+        self.facings = np.full(capacity, DOWN, dtype=np.int8)
+        self.clips = np.zeros(capacity, dtype=np.int16)
+        self.frames = np.zeros(capacity, dtype=np.float32)
+
+        # circular obstacles
+        self.obstacle_centers = np.zeros((0, 2), dtype=np.float32)
+        self.obstacle_radii = np.zeros(0, dtype=np.float32)
+
+        # clips to play per facing, e.g. the walk cycle of each direction
+        self.animations = animations or []
+        self.facing_clips = np.array(facing_clips if facing_clips is not None else range(FACINGS), dtype=np.int16)
+        # frame count and speed per clip; clips without animation stand still
+        clip_count = max(len(self.animations), int(self.facing_clips.max()) + 1)
+        self.clip_frames = np.ones(clip_count, dtype=np.float32)
+        self.clip_speeds = np.zeros(clip_count, dtype=np.float32)
+        for clip, animation in enumerate(self.animations):
+            self.clip_frames[clip] = animation.frames
+            self.clip_speeds[clip] = animation.animation_speed
+
+    # adds an agent and returns its index
+    def add(self, position: tuple[float, float], target: Optional[tuple[float, float]] = None) -> int:
+        if self.count == self.capacity:
+            raise ValueError(f"crowd is full ({self.capacity} agents)")
+        index = self.count
+        self.count += 1
+        self.positions[index] = position
+        self.velocities[index] = 0.0
+        self.seeking[index] = target is not None
+        self.targets[index] = target if target is not None else position
+        self.facings[index] = DOWN
+        self.clips[index] = self.facing_clips[DOWN]
+        self.frames[index] = 0.0
+        return index
+
+    # removes an agent; the last agent takes its index
+    def remove(self, index: int) -> None:
+        last = self.count - 1
+        for array in (self.positions, self.velocities, self.targets, self.seeking, self.facings, self.clips, self.frames):
+            array[index] = array[last]
+        self.count = last
+
+    def set_target(self, index: int, target: Optional[tuple[float, float]]) -> None:
+        self.seeking[index] = target is not None
+        if target is not None:
+            self.targets[index] = target
+
+    def set_obstacles(self, centers: np.ndarray, radii: np.ndarray) -> None:
+        self.obstacle_centers = np.asarray(centers, dtype=np.float32).reshape(-1, 2)
+        self.obstacle_radii = np.asarray(radii, dtype=np.float32).reshape(-1)
+
+    def update(self, dt: float) -> None:
+        n = self.count
+        if n == 0:
+            return
+        positions = self.positions[:n]
+        velocities = self.velocities[:n]
+
+        force = self.seek_weight * self.seek(positions, velocities)
+        force += self.separation_weight * self.separation(positions)
+        if len(self.obstacle_radii):
+            force += self.avoidance_weight * self.avoidance(positions)
+
+        velocities += clamp_length(force, self.max_force) * dt
+        velocities[:] = clamp_length(velocities, self.max_speed)
+        positions += velocities * dt
+
+        self.animate(velocities, dt)
+
+    # steering towards the targets, arriving smoothly
+    def seek(self, positions: np.ndarray, velocities: np.ndarray) -> np.ndarray:
+        n = len(positions)
+        offset = self.targets[:n] - positions
+        distance = np.sqrt((offset * offset).sum(axis=1))
+        speed = self.max_speed * np.minimum(distance / self.slowing_radius, 1.0)
+        desired = offset * (speed / np.maximum(distance, 1e-6))[:, None]
+        # agents without a target brake
+        desired[~self.seeking[:n]] = 0.0
+        return desired - velocities
+
+    # pushes agents apart, stronger the closer they are
+    def separation(self, positions: np.ndarray) -> np.ndarray:
+        n = len(positions)
+        radius = self.radius
+        cells = np.floor(positions / radius).astype(np.int64)
+        # a key per cell, sorted by column then row: the three cells of a
+        # column around an agent are one contiguous run of the sorted keys
+        keys = cells[:, 0] * CELL_COLUMN + cells[:, 1]
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+
+        force = np.zeros((n, 2), dtype=np.float32)
+        for column in (-1, 0, 1):
+            start = np.searchsorted(sorted_keys, keys + column * CELL_COLUMN - 1, "left")
+            end = np.searchsorted(sorted_keys, keys + column * CELL_COLUMN + 1, "right")
+            counts = end - start
+            total = int(counts.sum())
+            if total == 0:
+                continue
+            # every (agent, candidate neighbour) pair of those cells
+            agents = np.repeat(np.arange(n), counts)
+            ranks = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+            others = order[np.repeat(start, counts) + ranks]
+
+            dx = positions[agents, 0] - positions[others, 0]
+            dy = positions[agents, 1] - positions[others, 1]
+            distance2 = dx * dx + dy * dy
+            close = np.flatnonzero((distance2 > 0.0) & (distance2 < radius * radius))
+            if len(close) == 0:
+                continue
+            # offset / distance scaled by radius / distance: 1 at the edge, growing inside
+            strength = radius / distance2[close]
+            force[:, 0] += np.bincount(agents[close], dx[close] * strength, n)
+            force[:, 1] += np.bincount(agents[close], dy[close] * strength, n)
+        return force * self.max_speed
+
+    # pushes agents out of the obstacles and the margin around them
+    def avoidance(self, positions: np.ndarray) -> np.ndarray:
+        n = len(positions)
+        margin = self.radius * 2.0
+        # agents sorted along x: each obstacle only looks at the run of
+        # agents within its reach on that axis
+        order = np.argsort(positions[:, 0])
+        xs = positions[order, 0]
+        reaches = self.obstacle_radii + margin
+        starts = np.searchsorted(xs, self.obstacle_centers[:, 0] - reaches, "left").tolist()
+        ends = np.searchsorted(xs, self.obstacle_centers[:, 0] + reaches, "right").tolist()
+
+        force = np.zeros((n, 2), dtype=np.float32)
+        for obstacle, (start, end) in enumerate(zip(starts, ends)):
+            if start == end:
+                continue
+            agents = order[start:end]
+            dx = positions[agents, 0] - self.obstacle_centers[obstacle, 0]
+            dy = positions[agents, 1] - self.obstacle_centers[obstacle, 1]
+            distance = np.sqrt(dx * dx + dy * dy)
+            # 0 once margin away from the obstacle, growing without bound towards its edge
+            gap = np.maximum(distance - self.obstacle_radii[obstacle], 1e-3)
+            strength = np.maximum(margin / gap - 1.0, 0.0) / np.maximum(distance, 1e-6)
+            force[agents, 0] += dx * strength
+            force[agents, 1] += dy * strength
+        return force * self.max_speed
+
+    # updates facings, clips and animation frames from the velocities
+    def animate(self, velocities: np.ndarray, dt: float) -> None:
+        n = len(velocities)
+        speed2 = (velocities * velocities).sum(axis=1)
+        moving = speed2 > self.idle_speed * self.idle_speed
+
+        facings = self.facings[:n]
+        facings[moving] = facing_of(velocities[moving, 0], velocities[moving, 1])
+        clips = self.clips[:n]
+        clips[:] = self.facing_clips[facings]
+
+        # walk cycles play while moving, standing agents show their first frame
+        frames = self.frames[:n]
+        frames += self.clip_speeds[clips] * dt
+        frames %= self.clip_frames[clips]
+        frames[~moving] = 0.0
+
+    # draws each agent horizontally centred on its position, feet on it
+    def draw(self, renderer: SpriteRenderer, scale: float = 1.0) -> None:
+        n = self.count
+        frames = self.frames[:n].astype(np.int64).tolist()
+        clips = self.clips[:n].tolist()
+        positions = self.positions[:n].tolist()
+        for i in range(n):
+            animation = self.animations[clips[i]]
+            width, height = animation.width * scale, animation.height * scale
+            renderer.draw_subsprite(
+                animation.texture,
+                glm.vec2(positions[i][0] - width / 2.0, positions[i][1] - height),
+                glm.vec2(width, height),
+                tex_coords=[animation.width * frames[i], (animation.row - 1) * animation.height, animation.width, animation.height]
+            )
+
+
+# scales down the rows of vectors longer than limit
+def clamp_length(vectors: np.ndarray, limit: float) -> np.ndarray:
+    length = np.sqrt((vectors * vectors).sum(axis=1))
+    scale = np.minimum(1.0, limit / np.maximum(length, 1e-6))
+    return vectors * scale[:, None]
@@ -0,0 +1,133 @@
+import os
+import json
+import struct
+import hashlib
+import numpy as np
+from typing import Optional
+from elyria.glyph_atlas import GlyphAtlas
+
+# file layout: a header, the glyph table, then the glyph bitmaps one after
+# the other (rows * width bytes each, at the table's offsets)
+FONT_CACHE_MAGIC = b"ELFC"
+FONT_CACHE_VERSION = 1
+HEADER = struct.Struct("<4sHHHHHBI")  # magic, version, size, spread, cell width, cell height, sdf, glyph count
+GLYPH_DTYPE = np.dtype([
+    ("code", "<u4"),
+    ("width", "<u2"),
+    ("rows", "<u2"),
+    ("left", "<i2"),
+    ("top", "<i2"),
+    ("advance", "<i4"),
+    ("offset", "<u4")
+])
+
+
+# The glyphs of a font at one size and charset, as GlyphAtlas.rasterize
+# returns them (bitmap, left and top bearings, advance), with the cell size
+# of the atlas they go into
+class BakedFont:
+    def __init__(self, size: int, sdf: bool, spread: int, cell: tuple[int, int], glyphs: dict[str, tuple[np.ndarray, int, int, int]]):
+        self.size = size
+        self.sdf = sdf
+        self.spread = spread
+        self.cell = cell
+        self.glyphs = glyphs
+
+
+# rasterizes the characters of charset through FreeType
+def bake_font(font: str, size: int, charset: str, sdf: bool = False, spread: int = 6) -> BakedFont:
+    atlas = GlyphAtlas(font, size, sdf, spread)
+    glyphs = {c: atlas.rasterize(c) for c in sorted(set(charset))}
+    return BakedFont(size, sdf, atlas.spread, atlas.cell, glyphs)
+
+
+def write_baked_font(path: str, baked: BakedFont) -> None:
+    table = np.zeros(len(baked.glyphs), dtype=GLYPH_DTYPE)
+    offset = 0
+    for i, (c, (bitmap, left, top, advance)) in enumerate(baked.glyphs.items()):
+        table[i] = (ord(c), bitmap.shape[1], bitmap.shape[0], left, top, advance, offset)
+        offset += bitmap.size
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(FONT_CACHE_MAGIC, FONT_CACHE_VERSION, baked.size, baked.spread, *baked.cell, baked.sdf, len(table)))
+        file.write(table.tobytes())
+        for bitmap, _, _, _ in baked.glyphs.values():
+            file.write(np.ascontiguousarray(bitmap, dtype=np.uint8).tobytes())
+
+
+# reads a baked font in one go; None if the file is missing, from another
+# version or truncated
+def read_baked_font(path: str) -> Optional[BakedFont]:
+    try:
+        with open(path, "rb") as file:
+            data = file.read()
+    except OSError:
+        return None
+    if len(data) < HEADER.size:
+        return None
+    magic, version, size, spread, cell_width, cell_height, sdf, count = HEADER.unpack_from(data)
+    if magic != FONT_CACHE_MAGIC or version != FONT_CACHE_VERSION:
+        return None
+    start = HEADER.size + count * GLYPH_DTYPE.itemsize
+    if len(data) < start:
+        return None
+    table = np.frombuffer(data, dtype=GLYPH_DTYPE, count=count, offset=HEADER.size)
+    pixels = np.frombuffer(data, dtype=np.uint8, offset=start)
+    if count and len(pixels) < int((table["offset"] + table["width"].astype(np.int64) * table["rows"]).max()):
+        return None
+
+    glyphs = {}
+    for code, width, rows, left, top, advance, offset in table.tolist():
+        glyphs[chr(code)] = (pixels[offset:offset + width * rows].reshape(rows, width), left, top, advance)
+    return BakedFont(size, bool(sdf), spread, (cell_width, cell_height), glyphs)
+
+
+# Baked fonts on disk, one file per font file, size, distance field
+# settings and charset, named after a hash of all of them (the font's
+# content included): a changed font or charset is baked again, and a
+# cached one loads without FreeType (see TextRenderer.load).
+class FontCache:
+    def __init__(self, directory: str):
+        self.directory = directory
+        # statistics
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, font: str, size: int, charset: str, sdf: bool = False, spread: int = 6) -> str:
+        digest = hashlib.sha1()
+        with open(font, "rb") as file:
+            digest.update(file.read())
+        digest.update(json.dumps([FONT_CACHE_VERSION, size, sdf, spread if sdf else 0, "".join(sorted(set(charset)))]).encode("utf-8"))
+        name = os.path.splitext(os.path.basename(font))[0]
+        settings = f"{size}-sdf{spread}" if sdf else f"{size}"
+        return os.path.join(self.directory, f"{name}-{settings}-{digest.hexdigest()[:16]}.glyphs")
+
+    # the baked font, baked and written first if it is not cached
+    def get(self, font: str, size: int, charset: str, sdf: bool = False, spread: int = 6) -> BakedFont:
+        path = self.path(font, size, charset, sdf, spread)
+        baked = read_baked_font(path)
+        if baked is not None:
+            self.hits += 1
+            return baked
+        self.misses += 1
+        baked = bake_font(font, size, charset, sdf, spread)
+        self.write(path, baked)
+        return baked
+
+    # bakes whatever is not cached yet; returns whether it had to
+    def bake(self, font: str, size: int, charset: str, sdf: bool = False, spread: int = 6) -> bool:
+        path = self.path(font, size, charset, sdf, spread)
+        if read_baked_font(path) is not None:
+            return False
+        self.write(path, bake_font(font, size, charset, sdf, spread))
+        return True
+
+    # written aside then moved in place, so a reader never sees half a file;
+    # a read-only cache only costs the baking
+    def write(self, path: str, baked: BakedFont) -> None:
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            temporary = f"{path}.{os.getpid()}.tmp"
+            write_baked_font(temporary, baked)
+            os.replace(temporary, path)
+        except OSError as error:
+            print(f"ERROR::FONT_CACHE: Failed to write {path}: {error}")
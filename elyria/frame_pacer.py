@@ -0,0 +1,122 @@
+import time
+from collections import deque
+from typing import Optional
+from glfw.GLFW import glfwSwapInterval, glfwGetPrimaryMonitor, glfwGetVideoMode
+from elyria.replay import FrameTimeReport
+
+# bounds of the final spin-wait, in seconds
+MIN_SPIN = 0.0002
+MAX_SPIN = 0.002
+
+
+# Paces the main loop: vsync on or off, and an optional frame rate cap.
+#
+# The cap sleeps until shortly before the next frame is due, then
+# spin-waits the rest: OS timers wake up late by a fraction of a
+# millisecond (more on some systems), so the spin covers the largest
+# oversleep seen recently. Frames follow a fixed cadence; a frame that
+# starts late doesn't make the next ones rush to catch up beyond one period.
+#
+# While the window is unfocused the loop is capped at background_fps, and
+# while it is iconified nothing is rendered at all (see should_render).
+# The interval between frames is recorded for the last history frames, and
+# report gives its statistics (mean, percentiles, deviation, jitter).
+class FramePacer:
+    def __init__(
+        self,
+        vsync: bool = True,
+        target_fps: Optional[float] = None,
+        background_fps: Optional[float] = 10.0,
+        history: int = 600
+    ):
+        self.vsync = vsync
+        self.target_fps = target_fps
+        self.background_fps = background_fps
+        self.focused = True
+        self.iconified = False
+
+        # time the next frame is due, and the start of the current one
+        self.deadline = 0.0
+        self.frame_start = 0.0
+        self.spin = 0.001
+        # refresh rate of the monitor vsync waits for, read by apply
+        self.refresh_rate = 60.0
+
+        self.intervals: deque[float] = deque(maxlen=history)
+        # time spent waiting, sleeping and spinning, over all frames
+        self.slept = 0.0
+        self.spun = 0.0
+
+    # applies the vsync setting to the current context
+    def apply(self) -> None:
+        glfwSwapInterval(1 if self.vsync else 0)
+        monitor = glfwGetPrimaryMonitor()
+        mode = glfwGetVideoMode(monitor) if monitor else None
+        if mode and mode.refresh_rate > 0:
+            self.refresh_rate = float(mode.refresh_rate)
+
+    def set_vsync(self, vsync: bool) -> None:
+        self.vsync = vsync
+        self.apply()
+
+    def start(self) -> None:
+        self.frame_start = self.deadline = time.perf_counter()
+
+    @property
+    def should_render(self) -> bool:
+        return not self.iconified
+
+    # the frame rate the loop is capped at right now, None if not capped
+    @property
+    def fps(self) -> Optional[float]:
+        rates = [self.target_fps]
+        if not self.focused or self.iconified:
+            rates.append(self.background_fps)
+        rates = [rate for rate in rates if rate]
+        return min(rates) if rates else None
+
+    # the time a frame is expected to take when focused: the cap, or the
+    # refresh period with vsync (the cap if lower)
+    @property
+    def frame_budget(self) -> float:
+        rates = [self.target_fps]
+        if self.vsync:
+            rates.append(self.refresh_rate)
+        rates = [rate for rate in rates if rate]
+        return 1.0 / min(rates) if rates else 1.0 / self.refresh_rate
+
+    # to call at the end of every frame: waits until the next one is due,
+    # then records the frame interval
+    def wait(self) -> None:
+        now = time.perf_counter()
+        fps = self.fps
+        if fps:
+            period = 1.0 / fps
+            self.deadline += period
+            if self.deadline < now - period:
+                self.deadline = now
+            self.sleep_until(self.deadline)
+            now = time.perf_counter()
+        else:
+            self.deadline = now
+
+        self.intervals.append(now - self.frame_start)
+        self.frame_start = now
+
+    def sleep_until(self, deadline: float) -> None:
+        now = time.perf_counter()
+        if deadline - now > self.spin:
+            wake = deadline - self.spin
+            time.sleep(wake - now)
+            woke = time.perf_counter()
+            self.slept += woke - now
+            # keep the spin above the oversleep, and let it shrink slowly
+            self.spin = min(max(self.spin * 0.9 + (woke - wake) * 0.2, woke - wake, MIN_SPIN), MAX_SPIN)
+            now = woke
+        spin_start = now
+        while now < deadline:
+            now = time.perf_counter()
+        self.spun += now - spin_start
+
+    def report(self) -> FrameTimeReport:
+        return FrameTimeReport(list(self.intervals))
@@ -7,6 +7,7 @@ from enum import StrEnum
 from typing import Optional
 from elyria import base_dir
 from elyria.sprite_renderer import SpriteRenderer
+from elyria.sprite_batch import SpriteBatch
 from elyria.resource_manager import ResourceManager
 from elyria.game_object import GameObject
 from elyria.ball_object import BallObject
@@ -14,6 +15,9 @@ from elyria.collision import check_ball_collision, Direction, check_collision
 from elyria.particle import ParticleGenerator
 from elyria.post_processor import PostProcessor
 from elyria.text_renderer import TextRenderer
+from elyria.layer_cache import LayerStack
+from elyria.render_pipeline import DrawList
+from elyria.scheduler import Scheduler
 
 
 class Game:
@@ -25,17 +29,28 @@ class Game:
         self.title = title
 
         self.renderer: Optional[SpriteRenderer] = None
+        # draw sprites with a SpriteBatch rather than one draw call each
+        self.batch_sprites = False
         self.player: Optional[GameObject] = None
         self.ball: Optional[BallObject] = None
         self.particles: Optional[ParticleGenerator] = None
         self.effects: Optional[PostProcessor] = None
         self.text: Optional[TextRenderer] = None
+        # scene layers, static ones are cached offscreen (see Layer)
+        self.layers = LayerStack(width, height)
+        # game scripts (cutscenes, NPC routines...), run after update
+        self.scripts = Scheduler()
 
     def init(self) -> None:
         # initialize game state (load all shaders/textures/levels)
+
+        # without a GL context there is nothing to render with (see ResourceManager.headless)
+        if ResourceManager.headless:
+            return
         
         # load shaders
         ResourceManager.load_shader("sprite", os.path.join(base_dir, "shaders", "sprite.vs"), os.path.join(base_dir, "shaders", "sprite.fs"))
+        ResourceManager.load_shader("sprite_batch", os.path.join(base_dir, "shaders", "sprite_batch.vs"), os.path.join(base_dir, "shaders", "sprite_batch.fs"))
         ResourceManager.load_shader("particle", os.path.join(base_dir, "shaders", "particle.vs"), os.path.join(base_dir, "shaders", "particle.fs"))
         ResourceManager.load_shader("postprocessing", os.path.join(base_dir, "shaders", "post_processing.vs"), os.path.join(base_dir, "shaders", "post_processing.fs"))
 
@@ -43,17 +58,54 @@ class Game:
         projection = glm.ortho(0.0, float(self.width), float(self.height), 0.0, -1.0, 1.0)
         ResourceManager.get_shader("sprite").use()
         ResourceManager.get_shader("sprite").set_int("image", 0)
+        ResourceManager.get_shader("sprite").set_int("palette", 1)
         ResourceManager.get_shader("sprite").set_mat4("projection", projection)
+        ResourceManager.get_shader("sprite_batch").use()
+        ResourceManager.get_shader("sprite_batch").set_int("image", 0)
+        ResourceManager.get_shader("sprite_batch").set_int("images", 1)
+        ResourceManager.get_shader("sprite_batch").set_int("palette", 2)
+        ResourceManager.get_shader("sprite_batch").set_mat4("projection", projection)
         ResourceManager.get_shader("particle").use()
         ResourceManager.get_shader("particle").set_int("sprite", 0)
         ResourceManager.get_shader("particle").set_mat4("projection", projection)
 
         # set render-specific controls
-        self.renderer = SpriteRenderer(ResourceManager.get_shader("sprite"))
+        if self.batch_sprites:
+            self.renderer = SpriteBatch(ResourceManager.get_shader("sprite_batch"))
+        else:
+            self.renderer = SpriteRenderer(ResourceManager.get_shader("sprite"))
         self.effects = PostProcessor(ResourceManager.get_shader("postprocessing"), self.width, self.height)
         self.text = TextRenderer(self.width, self.height)
         self.text.load(os.path.join(base_dir, "fonts", "ocraext.ttf"), 24)
 
+    # returns every game object held by the game, either directly as an
+    # attribute or inside a list/tuple/dict attribute (in attribute order)
+    def game_objects(self) -> list[GameObject]:
+        objects = []
+        for value in vars(self).values():
+            if isinstance(value, GameObject):
+                objects.append(value)
+            elif isinstance(value, (list, tuple)):
+                objects.extend(v for v in value if isinstance(v, GameObject))
+            elif isinstance(value, dict):
+                objects.extend(v for v in value.values() if isinstance(v, GameObject))
+        return objects
+
+    # values worth reporting at the end of a simulation run (see SimulationRunner)
+    def metrics(self) -> dict:
+        return {}
+
+    # networked games (see GameServer): a client joined, returns the object it plays (if any)
+    def add_client(self, client: int) -> Optional[GameObject]:
+        return None
+
+    def remove_client(self, client: int) -> None:
+        pass
+
+    # the keys (Key values) a client holds, before every server tick
+    def client_input(self, client: int, keys: frozenset[int]) -> None:
+        pass
+
     def process_input(self, dt: float) -> None:
         pass
 
@@ -67,11 +119,23 @@ class Game:
     def gui_render(self) -> None:
         pass
 
-    def full_render(self) -> None:
+    # pipelined mode (see RenderPipeline): records the scene into draw_list
+    # right after update, on the simulation thread, so no GL call here;
+    # the game objects draw themselves by default
+    def record(self, draw_list: DrawList) -> None:
+        for go in self.game_objects():
+            go.draw(draw_list)
+
+    # draw_list: recorded scene to replay instead of calling render
+    def full_render(self, draw_list: Optional[DrawList] = None) -> None:
         # begin rendering to postprocessing framebuffer
         self.effects.begin_render()
-        
-        self.render()
+
+        if draw_list is None:
+            self.render()
+        else:
+            draw_list.replay(self.renderer)
+        self.renderer.flush()
 
         # end postprocessing quad
         self.effects.end_render()
@@ -81,4 +145,5 @@ class Game:
 
         # render gui (don't include postprocessing)
         self.gui_render()
+        self.renderer.flush()
         
\ No newline at end of file
@@ -19,7 +19,8 @@ class GameObject:
         color: glm.vec3 = glm.vec3(1.0),
         velocity: glm.vec2 = glm.vec2(0.0, 0.0),
         is_solid: bool = False,
-        destroyed: bool = False
+        destroyed: bool = False,
+        palette: Optional[int] = None
     ):
         self.position = position
         self.rotation = rotation
@@ -30,6 +31,36 @@ class GameObject:
         self.velocity = velocity
         self.is_solid = is_solid
         self.destroyed = destroyed
+        # palette row of an indexed texture (a recolor, see ResourceManager.load_palette)
+        self.palette = palette
+
+    # puts the object back to a fresh state at position, for reuse (see
+    # ObjectPool): values are copied into the object's own vectors, so
+    # nothing is allocated
+    def reset(
+        self,
+        position: glm.vec2,
+        velocity: Optional[glm.vec2] = None,
+        rotation: float = 0.0,
+        color: Optional[glm.vec3] = None
+    ) -> None:
+        self.position.x = position[0]
+        self.position.y = position[1]
+        if velocity is None:
+            self.velocity.x = self.velocity.y = 0.0
+        else:
+            self.velocity.x = velocity[0]
+            self.velocity.y = velocity[1]
+        self.rotation = rotation
+        if color is None:
+            self.color.x = self.color.y = self.color.z = 1.0
+        else:
+            self.color.x = color[0]
+            self.color.y = color[1]
+            self.color.z = color[2]
+        if self.animation:
+            self.animation.frame = 0.0
+        self.destroyed = False
 
     def update(self, dt):
         if self.animation:
@@ -43,7 +74,8 @@ class GameObject:
                 self.size,
                 self.rotation,
                 self.color,
-                tex_coords=[self.animation.width * int(self.animation.frame), (self.animation.row - 1) * self.animation.height, self.animation.width, self.animation.height]
+                tex_coords=[self.animation.width * int(self.animation.frame), (self.animation.row - 1) * self.animation.height, self.animation.width, self.animation.height],
+                palette=self.palette
             )
         elif self.texture:
             renderer.draw_sprite(
@@ -51,6 +83,7 @@ class GameObject:
                 self.position,
                 self.size,
                 self.rotation,
-                self.color
+                self.color,
+                palette=self.palette
             )
 
@@ -0,0 +1,213 @@
+import gc
+import time
+from typing import Optional
+
+
+# Controls when the cyclic garbage collector runs during gameplay.
+#
+# Everything loaded by game.init (textures, shaders, levels...) lives for
+# the whole game: once it is initialized, start collects what init left
+# behind and freezes the rest, so that collections never walk it again.
+#
+# Automatic collections are triggered by allocations, in the middle of any
+# frame. With thresholds set to None they are disabled and the policy
+# collects in the frames that finish early instead: after each frame,
+# end_frame runs the oldest generation that is due (its count reached its
+# threshold, as the GC itself would decide) if its estimated cost fits in
+# the time left in the frame budget. A generation whose count grows past
+# limit times its threshold is collected anyway, so that memory held by
+# cycles stays bounded when frames never finish early.
+# With thresholds set, automatic collections run with those thresholds,
+# and frames with time left still collect ahead of them (incremental).
+class GCPolicy:
+    def __init__(
+        self,
+        frame_budget: float = 1.0 / 60.0,
+        thresholds: Optional[tuple[int, int, int]] = None,
+        incremental: bool = True,
+        freeze: bool = True,
+        margin: float = 0.001,
+        limit: int = 4
+    ):
+        self.frame_budget = frame_budget
+        self.thresholds = thresholds
+        self.incremental = incremental
+        self.freeze = freeze
+        # time kept free at the end of a frame, in seconds
+        self.margin = margin
+        self.limit = limit
+
+        # thresholds deciding when a generation is due in end_frame
+        self.idle_thresholds = gc.get_threshold()
+        # estimated duration of a collection of each generation, in seconds
+        self.costs = [0.0, 0.0, 0.0]
+        # collections run by the policy, per generation, and forced ones
+        self.collections = [0, 0, 0]
+        self.forced = 0
+
+        # GC state to restore on stop
+        self.saved_thresholds = gc.get_threshold()
+        self.saved_enabled = gc.isenabled()
+        self.started = False
+
+    # to call once the game is initialized
+    def start(self) -> None:
+        self.saved_thresholds = gc.get_threshold()
+        self.saved_enabled = gc.isenabled()
+        if self.thresholds is not None and self.thresholds[0] > 0:
+            self.idle_thresholds = self.thresholds
+        else:
+            self.idle_thresholds = self.saved_thresholds
+        if self.freeze:
+            gc.collect()
+            gc.freeze()
+        # measure each generation once, now that only the game's own objects are tracked
+        for generation in range(3):
+            self.collect(generation)
+        self.collections = [0, 0, 0]
+        self.set_thresholds(self.thresholds)
+        self.started = True
+
+    # automatic collections with the given thresholds, or none at all with
+    # None (or a zero first threshold); can be changed at any time
+    def set_thresholds(self, thresholds: Optional[tuple[int, int, int]]) -> None:
+        self.thresholds = thresholds
+        if thresholds is None or thresholds[0] <= 0:
+            gc.disable()
+        else:
+            gc.set_threshold(*thresholds)
+            gc.enable()
+
+    @property
+    def automatic(self) -> bool:
+        return gc.isenabled()
+
+    def collect(self, generation: int) -> float:
+        start = time.perf_counter()
+        gc.collect(generation)
+        duration = time.perf_counter() - start
+        self.collections[generation] += 1
+        # the estimate follows slowly when collections get cheaper, at once when they get longer
+        self.costs[generation] = max(duration, 0.75 * self.costs[generation] + 0.25 * duration)
+        return duration
+
+    # the oldest generation whose count reached scale times its threshold
+    def due(self, scale: float = 1.0) -> Optional[int]:
+        counts = gc.get_count()
+        for generation in (2, 1, 0):
+            if counts[generation] >= self.idle_thresholds[generation] * scale:
+                return generation
+        return None
+
+    # to call after every frame with the time its work took: collects if
+    # a generation is due and fits in what is left of the budget; returns
+    # the time spent collecting
+    def end_frame(self, work_time: float) -> float:
+        if not self.started:
+            return 0.0
+        if not self.automatic:
+            generation = self.due(self.limit)
+            if generation is not None:
+                self.forced += 1
+                return self.collect(generation)
+        if not self.incremental:
+            return 0.0
+
+        remaining = self.frame_budget - work_time - self.margin
+        oldest = self.due()
+        if oldest is None:
+            return 0.0
+        # an older generation that doesn't fit may leave time for a younger one
+        for generation in range(oldest, -1, -1):
+            if self.costs[generation] <= remaining:
+                return self.collect(generation)
+        return 0.0
+
+    def stop(self) -> None:
+        if not self.started:
+            return
+        gc.set_threshold(*self.saved_thresholds)
+        if self.saved_enabled:
+            gc.enable()
+        else:
+            gc.disable()
+        if self.freeze:
+            gc.unfreeze()
+        self.started = False
+
+
+# A frame over budget, with the collections that ran during it:
+# (generation, duration in seconds, objects collected)
+class Hitch:
+    def __init__(self, frame: int, frame_time: float, collections: list[tuple[int, float, int]]):
+        self.frame = frame
+        self.frame_time = frame_time
+        self.collections = collections
+
+    @property
+    def gc_time(self) -> float:
+        return sum(duration for _, duration, _ in self.collections)
+
+    def __str__(self) -> str:
+        text = f"frame {self.frame} took {self.frame_time * 1000.0:.1f} ms"
+        if self.collections:
+            generations = ", ".join(f"gen {generation} {duration * 1000.0:.1f} ms" for generation, duration, _ in self.collections)
+            text += f", {self.gc_time * 1000.0:.1f} ms in GC ({generations})"
+        else:
+            text += ", no GC"
+        return text
+
+
+# Finds the frames that took longer than the budget (plus a tolerance)
+# and tells which of them were lost to garbage collection: every
+# collection is timed through gc.callbacks and attached to its frame.
+class HitchDetector:
+    def __init__(self, frame_budget: float = 1.0 / 60.0, tolerance: float = 0.25, log: bool = True):
+        self.frame_budget = frame_budget
+        self.tolerance = tolerance
+        self.log = log
+
+        self.frame = 0
+        self.hitches: list[Hitch] = []
+        # collections of the current frame
+        self.pending: list[tuple[int, float, int]] = []
+        self.gc_start = 0.0
+        # over all frames
+        self.gc_time = 0.0
+        self.gc_collections = 0
+
+    def start(self) -> None:
+        if self.on_gc not in gc.callbacks:
+            gc.callbacks.append(self.on_gc)
+
+    def on_gc(self, phase: str, info: dict) -> None:
+        if phase == "start":
+            self.gc_start = time.perf_counter()
+        else:
+            duration = time.perf_counter() - self.gc_start
+            self.pending.append((info["generation"], duration, info["collected"]))
+            self.gc_time += duration
+            self.gc_collections += 1
+
+    # to call once per frame with the time it took; returns the hitch if the frame was one
+    def end_frame(self, frame_time: float) -> Optional[Hitch]:
+        hitch = None
+        if frame_time > self.frame_budget * (1.0 + self.tolerance):
+            hitch = Hitch(self.frame, frame_time, self.pending)
+            self.hitches.append(hitch)
+            if self.log:
+                print(f"WARNING::HITCH: {hitch} (budget {self.frame_budget * 1000.0:.1f} ms)")
+        self.pending = []
+        self.frame += 1
+        return hitch
+
+    def stop(self) -> None:
+        if self.on_gc in gc.callbacks:
+            gc.callbacks.remove(self.on_gc)
+
+    def summary(self) -> str:
+        lost_to_gc = sum(1 for hitch in self.hitches if hitch.collections)
+        return (
+            f"{self.frame} frames: {len(self.hitches)} over budget, {lost_to_gc} of them with collections; "
+            f"{self.gc_collections} collections, {self.gc_time * 1000.0:.1f} ms in GC"
+        )
@@ -0,0 +1,274 @@
+import math
+import glm
+import freetype
+import numpy as np
+from OpenGL.GL import *
+from collections import OrderedDict
+from typing import Iterable, Optional
+from elyria.texture2d import Texture2D
+
+
+# Holds all state information relevant to a character as loaded using FreeType
+class Character:
+    def __init__(
+        self,
+        texture_id: int,
+        size: glm.ivec2,
+        bearing: glm.ivec2,
+        advance: int,
+        tex_coords: glm.vec4 = glm.vec4(0.0, 0.0, 1.0, 1.0)
+    ):
+        # ID handle of the glyph texture
+        self.texture_id = texture_id
+        # u0, v0, u1, v1 of the glyph in its texture (a whole texture per glyph, or an atlas)
+        self.tex_coords = tex_coords
+        # size of glyph
+        self.size = size
+        # offset from baseline to left/top of glyph
+        self.bearing = bearing
+        # horizontal offset to advance to next glyph
+        self.advance = advance
+
+
+# signed distance of every pixel to the outline of a glyph bitmap, as bytes:
+# 128 on the outline, 255 (inside) down to 0 (outside) spread pixels away
+def signed_distance_field(bitmap: np.ndarray, spread: int) -> np.ndarray:
+    inside = bitmap >= 128
+    distance = np.sqrt(squared_distance(inside)) - np.sqrt(squared_distance(~inside))
+    # pixel centres lie half a pixel from the outline on either side
+    distance -= np.where(inside, -0.5, 0.5)
+    # antialiased pixels straddle the outline: their coverage places it finer
+    edge = (bitmap > 0) & (bitmap < 255)
+    distance[edge] = 0.5 - bitmap[edge] / 255.0
+    return np.clip(128.0 - distance * (127.0 / spread), 0.0, 255.0).astype(np.uint8)
+
+
+# squared distance of every pixel to the nearest pixel of mask, computed
+# exactly one axis after the other (separable Euclidean distance transform)
+def squared_distance(mask: np.ndarray) -> np.ndarray:
+    infinity = float(mask.shape[0] ** 2 + mask.shape[1] ** 2)
+    distance = np.where(mask, 0.0, infinity)
+    for axis in (0, 1):
+        distance = np.moveaxis(distance, axis, 0)
+        n = distance.shape[0]
+        offsets = np.arange(n, dtype=np.float64)
+        # d(i) = min over j of (i - j)^2 + d(j)
+        distance = (((offsets[:, None] - offsets[None, :]) ** 2)[:, :, None] + distance[None, :, :]).min(axis=1)
+        distance = np.moveaxis(distance, 0, axis)
+    return distance
+
+
+# A texture of the atlas, cut in cells of one glyph each; pixels, when
+# given, are its first content (glyphs laid out in memory, see add_baked)
+class AtlasPage:
+    def __init__(self, size: int, cell: tuple[int, int], pixels: Optional[np.ndarray] = None):
+        self.texture = Texture2D(size, size, GL_RED, GL_RED, GL_CLAMP_TO_EDGE, GL_CLAMP_TO_EDGE)
+        # cleared, so linear filtering reads nothing but zeros around the glyphs
+        self.texture.generate(pixels if pixels is not None else np.zeros((size, size), dtype=np.uint8))
+        self.cells = AtlasPage.layout(size, cell)
+
+    # top-left corners of the cells of a page, row by row
+    @staticmethod
+    def layout(size: int, cell: tuple[int, int]) -> list[tuple[int, int]]:
+        columns, rows = size // cell[0], size // cell[1]
+        return [(column * cell[0], row * cell[1]) for row in range(rows) for column in range(columns)]
+
+
+# cell size of the glyphs of a face: its largest glyph plus rounding and the
+# sdf padding, one pixel apart so glyphs don't bleed into each other when filtered
+def glyph_cell(face: freetype.Face, size: int, spread: int) -> tuple[int, int]:
+    scale = size / face.units_per_EM
+    bbox = face.bbox
+    return (
+        math.ceil((bbox.xMax - bbox.xMin) * scale) + 2 * spread + 3,
+        math.ceil((bbox.yMax - bbox.yMin) * scale) + 2 * spread + 3
+    )
+
+
+# The glyphs of a face at one pixel size, rasterized through FreeType on
+# first use (so any Unicode character can be drawn) into the cells of
+# atlas pages, allocated as needed. Cells are sized after the bounding box
+# of the face, so any glyph fits any cell and freed cells are reused as is.
+# Once max_pages pages are full, the least recently used glyphs are evicted.
+#
+# With sdf, glyphs are stored as signed distance fields (see
+# signed_distance_field) padded by spread pixels.
+#
+# Glyphs baked ahead of time (see FontCache) come with their cell size:
+# the face is then only opened for the characters they miss.
+class GlyphAtlas:
+    def __init__(
+        self,
+        font: str,
+        size: int,
+        sdf: bool = False,
+        spread: int = 6,
+        page_size: int = 512,
+        max_pages: int = 4,
+        cell: Optional[tuple[int, int]] = None
+    ):
+        self.font = font
+        self._face: Optional[freetype.Face] = None
+        self.size = size
+        self.sdf = sdf
+        self.spread = spread if sdf else 0
+        self.page_size = page_size
+        self.max_pages = max_pages
+
+        self.cell = tuple(cell) if cell is not None else glyph_cell(self.face, size, self.spread)
+        if self.cell[0] > page_size or self.cell[1] > page_size:
+            raise ValueError(f"glyphs of {size} pixels do not fit {page_size} pixel pages")
+
+        self.pages: list[AtlasPage] = []
+        self.free_cells: list[tuple[AtlasPage, tuple[int, int]]] = []
+        # cached glyphs and their cells, least recently used first
+        self.glyphs: OrderedDict[str, Character] = OrderedDict()
+        self.cells: dict[str, tuple[AtlasPage, tuple[int, int]]] = {}
+        # glyphs of the text being laid out, never evicted for one another
+        self.pinned: set[str] = set()
+
+        # statistics
+        self.rasterized = 0
+        self.baked = 0
+        self.evicted = 0
+
+    # the FreeType face, opened on first use
+    @property
+    def face(self) -> freetype.Face:
+        if self._face is None:
+            self._face = freetype.Face(self.font)
+            self._face.set_pixel_sizes(self.size, self.size)
+        return self._face
+
+    # the glyph of a character, rasterized if it is not cached
+    def get(self, c: str) -> Character:
+        character = self.glyphs.get(c)
+        if character is None:
+            character = self.load(c)
+        else:
+            self.glyphs.move_to_end(c)
+        return character
+
+    # the glyphs of every character of text, none of them evicting another
+    def get_all(self, text: str) -> list[Character]:
+        self.pinned = set(text)
+        try:
+            return [self.get(c) for c in text]
+        finally:
+            self.pinned = set()
+
+    # rasterizes the glyphs of every string ahead of time, e.g. the lines
+    # of a dialogue during a loading screen; returns how many were new
+    def warm_up(self, strings: Iterable[str]) -> int:
+        if isinstance(strings, str):
+            strings = [strings]
+        before = self.rasterized
+        for text in strings:
+            for c in set(text):
+                self.get(c)
+        return self.rasterized - before
+
+    def load(self, c: str) -> Character:
+        character = self.store(c, *self.rasterize(c))
+        self.rasterized += 1
+        return character
+
+    # the bitmap of the glyph of c as stored in a cell, with its left and
+    # top bearings and advance (in 1/64 pixels)
+    def rasterize(self, c: str) -> tuple[np.ndarray, int, int, int]:
+        if self.face.load_char(c, freetype.FT_LOAD_RENDER):
+            # cached empty, so the error is reported once
+            print(f"ERROR::FREETYPE: Failed to load {c!r} Glyph")
+            bitmap = np.zeros((0, 0), dtype=np.uint8)
+            left = top = advance = 0
+        else:
+            glyph = self.face.glyph.bitmap
+            bitmap = np.array(glyph.buffer, dtype=np.uint8).reshape(glyph.rows, glyph.width)
+            left, top, advance = self.face.glyph.bitmap_left, self.face.glyph.bitmap_top, self.face.glyph.advance.x
+        if self.sdf:
+            bitmap = signed_distance_field(np.pad(bitmap, self.spread), self.spread)
+        rows, width = bitmap.shape
+        # never happens with a sane bounding box, but a glyph must not spill into its neighbours
+        if width >= self.cell[0] or rows >= self.cell[1]:
+            print(f"ERROR::FREETYPE: Glyph {c!r} is larger than its atlas cell")
+            bitmap = bitmap[:self.cell[1] - 1, :self.cell[0] - 1]
+        return bitmap, left, top, advance
+
+    # uploads a glyph bitmap into a free cell
+    def store(self, c: str, bitmap: np.ndarray, left: int, top: int, advance: int) -> Character:
+        rows, width = bitmap.shape
+        page, (x, y) = self.allocate(c)
+        # the whole cell is written, clearing whatever glyph it held before
+        cell = np.zeros((self.cell[1], self.cell[0]), dtype=np.uint8)
+        cell[:rows, :width] = bitmap
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        glBindTexture(GL_TEXTURE_2D, page.texture.id)
+        glTexSubImage2D(GL_TEXTURE_2D, 0, x, y, self.cell[0], self.cell[1], GL_RED, GL_UNSIGNED_BYTE, cell)
+        glBindTexture(GL_TEXTURE_2D, 0)
+        return self.register(c, page, (x, y), width, rows, left, top, advance)
+
+    def register(self, c: str, page: AtlasPage, cell: tuple[int, int], width: int, rows: int, left: int, top: int, advance: int) -> Character:
+        x, y = cell
+        character = Character(
+            texture_id=page.texture.id,
+            size=glm.ivec2(width, rows),
+            bearing=glm.ivec2(left - self.spread, top + self.spread),
+            advance=advance,
+            tex_coords=glm.vec4(x, y, x + width, y + rows) / self.page_size
+        )
+        self.glyphs[c] = character
+        self.cells[c] = (page, (x, y))
+        return character
+
+    # adds glyphs baked ahead of time (character -> rasterize's result),
+    # without FreeType. New pages are laid out in memory and uploaded once
+    # each; free cells of the pages there are, and glyphs past max_pages,
+    # are filled one by one (evicting others). Returns how many were added
+    def add_baked(self, glyphs: dict[str, tuple[np.ndarray, int, int, int]]) -> int:
+        pending = [(c, glyph) for c, glyph in glyphs.items() if c not in self.glyphs]
+        added = len(pending)
+        while pending and not self.free_cells and len(self.pages) < self.max_pages:
+            cells = AtlasPage.layout(self.page_size, self.cell)
+            chunk, pending = pending[:len(cells)], pending[len(cells):]
+            pixels = np.zeros((self.page_size, self.page_size), dtype=np.uint8)
+            for (c, (bitmap, left, top, advance)), (x, y) in zip(chunk, cells):
+                rows, width = bitmap.shape
+                pixels[y:y + rows, x:x + width] = bitmap
+            page = AtlasPage(self.page_size, self.cell, pixels)
+            self.pages.append(page)
+            # the rest of the page is free, first cells first (see allocate)
+            self.free_cells.extend((page, cell) for cell in reversed(cells[len(chunk):]))
+            for (c, (bitmap, left, top, advance)), cell in zip(chunk, cells):
+                self.register(c, page, cell, bitmap.shape[1], bitmap.shape[0], left, top, advance)
+        for c, glyph in pending:
+            self.store(c, *glyph)
+        self.baked += added
+        return added
+
+    # a free cell for the glyph of c: from a new page while under budget,
+    # otherwise taken from the least recently used glyph
+    def allocate(self, c: str) -> tuple[AtlasPage, tuple[int, int]]:
+        if not self.free_cells:
+            victim = next((g for g in self.glyphs if g not in self.pinned), None)
+            if len(self.pages) < self.max_pages or victim is None:
+                # over budget only when a single text needs more glyphs than the pages hold
+                page = AtlasPage(self.page_size, self.cell)
+                self.pages.append(page)
+                self.free_cells.extend((page, cell) for cell in reversed(page.cells))
+            else:
+                del self.glyphs[victim]
+                self.free_cells.append(self.cells.pop(victim))
+                self.evicted += 1
+        return self.free_cells.pop()
+
+    # glyphs a single page holds
+    def capacity(self) -> int:
+        return (self.page_size // self.cell[0]) * (self.page_size // self.cell[1])
+
+    def delete(self) -> None:
+        for page in self.pages:
+            glDeleteTextures(1, [page.texture.id])
+        self.pages.clear()
+        self.free_cells.clear()
+        self.glyphs.clear()
+        self.cells.clear()
@@ -0,0 +1,170 @@
+import os
+import glm
+import numpy as np
+from OpenGL.GL import *
+from elyria import base_dir
+from elyria.shader import Shader
+from elyria.texture2d import Texture2D
+from elyria.game_object import GameObject
+from elyria.resource_manager import ResourceManager
+from elyria.stream_buffer import StreamingBuffers
+from elyria.particle import Particle, ParticleGenerator
+
+
+# per-particle state: vec2 position, vec2 velocity, vec4 color, float life
+PARTICLE_STATE_SIZE = 9 * 4
+# outputs of particle_update.vs, in the order of the state layout
+PARTICLE_VARYINGS = ["outPosition", "outVelocity", "outColor", "outLife"]
+
+
+# A ParticleGenerator whose particles live on the GPU. Their state is held
+# by two buffer objects: every update, a vertex shader reads one of them and
+# writes the integrated particles (life, position, color fade) into the
+# other through transform feedback, and the two swap roles. The draw then
+# reads the instance offsets and colors straight from the current buffer.
+#
+# New particles are spawned on the CPU (through respawn_particle, so they
+# match the CPU generator), streamed in a small per-frame emit buffer and
+# copied into the state on the GPU. They take slots in a ring instead of
+# the first dead particle, the CPU never reading the state back; a ring
+# only reuses the oldest particles, dead by then unless amount is too small.
+class GPUParticleGenerator(ParticleGenerator):
+    def __init__(self, texture: Texture2D, amount: int, shader: Shader = None):
+        self.shader = shader if shader else ResourceManager.get_shader("particle")
+        self.update_shader = ResourceManager.load_shader(
+            "particle_update",
+            os.path.join(base_dir, "shaders", "particle_update.vs"),
+            os.path.join(base_dir, "shaders", "particle_update.fs"),
+            varyings=PARTICLE_VARYINGS
+        )
+        self.texture = texture
+        self.amount = amount
+        # the particles live in the state buffers, not in CPU objects
+        self.particles: list[Particle] = []
+        self.last_used_particle = 0
+
+        # slot of the next spawned particle
+        self.emit_cursor = 0
+        # index of the state buffer holding the current particles
+        self.current = 0
+
+        self.init_render_data()
+        self.init_state_buffers()
+
+    def init_state_buffers(self) -> None:
+        # all particles start dead: zero life, transparent
+        state = np.zeros(self.amount * PARTICLE_STATE_SIZE, dtype=np.uint8)
+        self.state_buffers = list(glGenBuffers(2))
+        # one vao per state buffer for the update pass, one for the draw
+        self.update_vaos = list(glGenVertexArrays(2))
+        self.draw_vaos = list(glGenVertexArrays(2))
+        for buffer, update_vao, draw_vao in zip(self.state_buffers, self.update_vaos, self.draw_vaos):
+            glBindBuffer(GL_ARRAY_BUFFER, buffer)
+            glBufferData(GL_ARRAY_BUFFER, state.nbytes, state, GL_DYNAMIC_COPY)
+
+            glBindVertexArray(update_vao)
+            for location, (size, offset) in enumerate(((2, 0), (2, 2), (4, 4), (1, 8))):
+                glEnableVertexAttribArray(location)
+                glVertexAttribPointer(location, size, GL_FLOAT, GL_FALSE, PARTICLE_STATE_SIZE, ctypes.c_void_p(offset * 4))
+
+            # same mesh as the CPU generator, instance offset and color from the state
+            glBindVertexArray(draw_vao)
+            glBindBuffer(GL_ARRAY_BUFFER, self.quad_vbo)
+            glEnableVertexAttribArray(0)
+            glVertexAttribPointer(0, 4, GL_FLOAT, GL_FALSE, 4 * 4, ctypes.c_void_p(0))
+            glBindBuffer(GL_ARRAY_BUFFER, buffer)
+            glEnableVertexAttribArray(1)
+            glVertexAttribPointer(1, 2, GL_FLOAT, GL_FALSE, PARTICLE_STATE_SIZE, ctypes.c_void_p(0))
+            glVertexAttribDivisor(1, 1)
+            glEnableVertexAttribArray(2)
+            glVertexAttribPointer(2, 4, GL_FLOAT, GL_FALSE, PARTICLE_STATE_SIZE, ctypes.c_void_p(4 * 4))
+            glVertexAttribDivisor(2, 1)
+        glBindVertexArray(0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    # update all particles
+    def update(self, dt: float, go: GameObject, new_particles: int, offset: glm.vec2 = glm.vec2(0.0, 0.0)) -> None:
+        # add new particles
+        if new_particles > 0:
+            self.emit(self.spawn(go, new_particles, offset))
+
+        # update all particles: from the current state buffer into the other one
+        source, destination = self.current, 1 - self.current
+        self.update_shader.use()
+        self.update_shader.set_float("dt", float(dt))
+        glEnable(GL_RASTERIZER_DISCARD)
+        glBindVertexArray(self.update_vaos[source])
+        glBindBufferBase(GL_TRANSFORM_FEEDBACK_BUFFER, 0, self.state_buffers[destination])
+        glBeginTransformFeedback(GL_POINTS)
+        glDrawArrays(GL_POINTS, 0, self.amount)
+        glEndTransformFeedback()
+        glBindBufferBase(GL_TRANSFORM_FEEDBACK_BUFFER, 0, 0)
+        glBindVertexArray(0)
+        glDisable(GL_RASTERIZER_DISCARD)
+        self.current = destination
+
+    # state records of count new particles; beyond amount, the older ones
+    # would be overwritten in the same frame anyway
+    def spawn(self, go: GameObject, count: int, offset: glm.vec2 = glm.vec2(0.0, 0.0)) -> np.ndarray:
+        records = np.empty((count, 9), dtype=np.float32)
+        particle = Particle()
+        for i in range(count):
+            self.respawn_particle(particle, go, offset)
+            records[i, 0:2] = particle.position
+            records[i, 2:4] = particle.velocity
+            records[i, 4:8] = particle.color
+            records[i, 8] = particle.life
+        return records[-self.amount:]
+
+    # copies the records into the current state, at the ring cursor
+    def emit(self, records: np.ndarray) -> None:
+        stream = StreamingBuffers.vertex_buffer()
+        stream_offset = stream.allocate(records, PARTICLE_STATE_SIZE)
+        glBindBuffer(GL_COPY_READ_BUFFER, stream.id)
+        glBindBuffer(GL_COPY_WRITE_BUFFER, self.state_buffers[self.current])
+        for first, slot, count in self.emit_ranges(len(records)):
+            glCopyBufferSubData(
+                GL_COPY_READ_BUFFER, GL_COPY_WRITE_BUFFER,
+                stream_offset + first * PARTICLE_STATE_SIZE, slot * PARTICLE_STATE_SIZE, count * PARTICLE_STATE_SIZE
+            )
+        glBindBuffer(GL_COPY_READ_BUFFER, 0)
+        glBindBuffer(GL_COPY_WRITE_BUFFER, 0)
+
+    # (first record, first slot, count) of the copies placing count records
+    # at the ring cursor, split where the ring wraps; advances the cursor
+    def emit_ranges(self, count: int) -> list[tuple[int, int, int]]:
+        ranges = []
+        first = 0
+        while first < count:
+            length = min(count - first, self.amount - self.emit_cursor)
+            ranges.append((first, self.emit_cursor, length))
+            first += length
+            self.emit_cursor = (self.emit_cursor + length) % self.amount
+        return ranges
+
+    # render all particles
+    def draw(self) -> None:
+        # use additive blending to give it a 'glow' effect
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE)
+        self.shader.use()
+        self.texture.bind()
+        # every instance is drawn, dead particles are transparent (see particle_update.vs)
+        glBindVertexArray(self.draw_vaos[self.current])
+        glDrawArraysInstanced(GL_TRIANGLES, 0, 6, self.amount)
+        glBindVertexArray(0)
+
+        # don't forget to reset to default blending mode
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+
+    # the particle state, (amount, 9) floats: position, velocity, color, life;
+    # reads back from the GPU, for debugging and tests
+    def read_state(self) -> np.ndarray:
+        glBindBuffer(GL_COPY_READ_BUFFER, self.state_buffers[self.current])
+        data = glGetBufferSubData(GL_COPY_READ_BUFFER, 0, self.amount * PARTICLE_STATE_SIZE)
+        glBindBuffer(GL_COPY_READ_BUFFER, 0)
+        return np.frombuffer(bytes(data), dtype=np.float32).reshape(self.amount, 9).copy()
+
+    def delete(self) -> None:
+        glDeleteVertexArrays(2, self.update_vaos)
+        glDeleteVertexArrays(2, self.draw_vaos)
+        glDeleteBuffers(2, self.state_buffers)
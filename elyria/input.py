@@ -158,3 +158,8 @@ class Input:
 
     def set_processed(key: Key, value: bool) -> None:
         Input._keys_processed[key] = value
+
+    # forgets every pressed/processed key
+    def reset() -> None:
+        Input._keys.clear()
+        Input._keys_processed.clear()
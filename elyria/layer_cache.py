@@ -0,0 +1,169 @@
+import glm
+from OpenGL.GL import *
+from typing import Callable, Optional
+from elyria.texture2d import Texture2D
+from elyria.sprite_renderer import SpriteRenderer
+
+
+# A layer of the scene (background, terrain, decoration...) drawn by a
+# callback through the SpriteRenderer, in world coordinates. The camera is
+# the world position shown at the top-left corner of the screen.
+#
+# A static layer is rendered once into an offscreen texture, the way the
+# PostProcessor renders the scene into its FBO, covering the screen plus a
+# margin on every side. Each frame it is then composited with a single quad,
+# and only rendered again once invalidated or once the camera moved beyond
+# the margin. Other layers are drawn directly every frame.
+class Layer:
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        draw: Callable[[SpriteRenderer], None],
+        static: bool = False,
+        margin: int = 128
+    ):
+        # screen size
+        self.width = width
+        self.height = height
+        self.draw = draw
+        self.static = static
+        self.margin = margin
+
+        # offscreen target of static layers, created on first render
+        self.fbo = 0
+        self.texture: Optional[Texture2D] = None
+        # world position of the top-left corner of the cached texture
+        self.origin = glm.vec2(0.0, 0.0)
+        self.dirty = True
+        # how many times the layer was drawn into its texture
+        self.redraws = 0
+
+    # the layer content changed, it is rendered again on the next frame
+    def invalidate(self) -> None:
+        self.dirty = True
+
+    # whether the cached texture is missing, stale or does not cover the view
+    def needs_redraw(self, camera: glm.vec2) -> bool:
+        if self.dirty or self.texture is None:
+            return True
+        offset = camera - self.origin
+        return not (0.0 <= offset.x <= 2 * self.margin and 0.0 <= offset.y <= 2 * self.margin)
+
+    def render(self, renderer: SpriteRenderer, camera: glm.vec2 = glm.vec2(0.0, 0.0)) -> None:
+        if not self.static:
+            self.draw_with_camera(renderer, camera, self.width, self.height)
+            return
+
+        if self.needs_redraw(camera):
+            self.redraw(renderer, camera)
+
+        # the texture holds premultiplied colors; sprites batched before (and
+        # the composited layer itself) are drawn with their own blending
+        renderer.flush()
+        glBlendFunc(GL_ONE, GL_ONE_MINUS_SRC_ALPHA)
+        renderer.draw_sprite(self.texture, self.origin - camera, glm.vec2(self.texture.width, self.texture.height))
+        renderer.flush()
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+
+    # renders the layer around the camera into the offscreen texture
+    def redraw(self, renderer: SpriteRenderer, camera: glm.vec2) -> None:
+        # the layer is drawn while another target (e.g. the PostProcessor's) is
+        # bound, which gets the sprites batched so far
+        renderer.flush()
+        previous_fbo = glGetIntegerv(GL_DRAW_FRAMEBUFFER_BINDING)
+        viewport = glGetIntegerv(GL_VIEWPORT)
+
+        if self.texture is None:
+            self.init_framebuffer()
+
+        self.origin = glm.vec2(camera.x - self.margin, camera.y - self.margin)
+        glBindFramebuffer(GL_FRAMEBUFFER, self.fbo)
+        glViewport(0, 0, self.texture.width, self.texture.height)
+        glClearColor(0.0, 0.0, 0.0, 0.0)
+        glClear(GL_COLOR_BUFFER_BIT)
+        # accumulate premultiplied colors, so that transparent parts of the
+        # layer keep showing what is drawn below it once composited
+        glBlendFuncSeparate(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA, GL_ONE, GL_ONE_MINUS_SRC_ALPHA)
+        self.draw_with_camera(renderer, self.origin, self.texture.width, self.texture.height, flip=True)
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+
+        glBindFramebuffer(GL_FRAMEBUFFER, int(previous_fbo))
+        glViewport(*(int(v) for v in viewport))
+        self.dirty = False
+        self.redraws += 1
+
+    # calls the draw callback with the sprite projection looking at the world
+    # from the given top-left position, restoring the screen projection after
+    def draw_with_camera(self, renderer: SpriteRenderer, position: glm.vec2, width: int, height: int, flip: bool = False) -> None:
+        left, right = position.x, position.x + width
+        top, bottom = position.y, position.y + height
+        # rendered upside down into textures, so the first texture row holds
+        # the top of the view like any other image
+        if flip:
+            projection = glm.ortho(left, right, top, bottom, -1.0, 1.0)
+        else:
+            projection = glm.ortho(left, right, bottom, top, -1.0, 1.0)
+        # batched sprites are drawn with the projection they were drawn under
+        renderer.flush()
+        renderer.shader.use()
+        renderer.shader.set_mat4("projection", projection)
+        self.draw(renderer)
+        renderer.flush()
+        renderer.shader.use()
+        renderer.shader.set_mat4("projection", glm.ortho(0.0, float(self.width), float(self.height), 0.0, -1.0, 1.0))
+
+    def init_framebuffer(self) -> None:
+        # pixels are composited one to one, keep them sharp
+        self.texture = Texture2D(
+            self.width + 2 * self.margin,
+            self.height + 2 * self.margin,
+            internal_format=GL_RGBA,
+            image_format=GL_RGBA,
+            wrap_s=GL_CLAMP_TO_EDGE,
+            wrap_t=GL_CLAMP_TO_EDGE,
+            filter_min=GL_NEAREST,
+            filter_max=GL_NEAREST
+        )
+        self.fbo = glGenFramebuffers(1)
+        glBindFramebuffer(GL_FRAMEBUFFER, self.fbo)
+        self.texture.generate(None)
+        glFramebufferTexture2D(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_TEXTURE_2D, self.texture.id, 0)
+        if glCheckFramebufferStatus(GL_FRAMEBUFFER) != GL_FRAMEBUFFER_COMPLETE:
+            print("ERROR::LAYER: Failed to initialize FBO")
+        glBindFramebuffer(GL_FRAMEBUFFER, 0)
+
+    def delete(self) -> None:
+        if self.fbo:
+            glDeleteFramebuffers(1, [self.fbo])
+            glDeleteTextures(1, [self.texture.id])
+            self.fbo = 0
+            self.texture = None
+
+
+# The layers of a scene, rendered in order (the first one at the back)
+class LayerStack:
+    def __init__(self, width: int, height: int, margin: int = 128):
+        self.width = width
+        self.height = height
+        self.margin = margin
+        self.layers: dict[str, Layer] = {}
+
+    def add(self, name: str, draw: Callable[[SpriteRenderer], None], static: bool = False) -> Layer:
+        layer = Layer(self.width, self.height, draw, static, self.margin)
+        self.layers[name] = layer
+        return layer
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        for layer_name, layer in self.layers.items():
+            if name is None or layer_name == name:
+                layer.invalidate()
+
+    def render(self, renderer: SpriteRenderer, camera: glm.vec2 = glm.vec2(0.0, 0.0)) -> None:
+        for layer in self.layers.values():
+            layer.render(renderer, camera)
+
+    def clear(self) -> None:
+        for layer in self.layers.values():
+            layer.delete()
+        self.layers.clear()
@@ -0,0 +1,529 @@
+import asyncio
+import copy
+import socket
+import struct
+import time
+import zlib
+import glm
+import numpy as np
+from collections import deque
+from typing import Iterable, Optional
+from elyria.game import Game
+from elyria.game_object import GameObject
+from elyria.animation import Animation
+from elyria.input import Key
+from elyria.resource_manager import ResourceManager
+from elyria.snapshot import SOLID, DESTROYED
+
+
+# packet types, the first byte of every datagram
+CONNECT = 1     # client -> server: join (any input does as well)
+INPUT = 2       # client -> server: held keys and the last snapshot received
+DISCONNECT = 3  # client -> server: leave
+SNAPSHOT = 4    # server -> client: the entities around the client's object
+
+INPUT_HEADER = struct.Struct("<BIIB")        # type, input sequence, acknowledged snapshot, key count (then u16 keys)
+SNAPSHOT_HEADER = struct.Struct("<BIIHHH")   # type, sequence, baseline, client's entity, changed count, removed count
+NO_BASELINE = 0xFFFFFFFF
+NO_ENTITY = 0xFFFF
+
+# quantization: positions and sizes to 1/8 pixel, rotations to 1/65536 turn,
+# colors to 8 bits; an object that does not move sends the exact same record
+POSITION_SCALE = 8.0
+ROTATION_SCALE = 65536.0 / 360.0
+
+# one record per replicated object. sprite is resource_hash of its
+# animation or texture name (0 for none), so both sides agree on it
+# without exchanging a name table
+NET_ENTITY_DTYPE = np.dtype([
+    ("id", "<u2"),
+    ("sprite", "<u4"),
+    ("position", "<i4", 2),
+    ("size", "<u2", 2),
+    ("rotation", "<u2"),
+    ("frame", "<u1"),
+    ("flags", "<u1"),
+    ("palette", "<i2"),
+    ("color", "<u1", 3)
+])
+
+# snapshots a server keeps per client to delta against, and a client keeps to decode
+SERVER_HISTORY = 32
+CLIENT_HISTORY = 64
+
+
+def resource_hash(name: str) -> int:
+    return zlib.crc32(name.encode("utf-8"))
+
+
+# hash -> resource of every loaded texture and animation
+def resources_by_hash() -> dict[int, object]:
+    resources = {}
+    for category in ("textures", "animations"):
+        for name, resource in getattr(ResourceManager, category).items():
+            resources[resource_hash(f"{category}/{name}")] = resource
+    return resources
+
+
+# the quantized records of objects, ids[i] being the network id of objects[i]
+def capture_entities(objects: list[GameObject], ids: list[int]) -> np.ndarray:
+    hashes = {id(resource): sprite for sprite, resource in resources_by_hash().items()}
+    entities = np.empty(len(objects), dtype=NET_ENTITY_DTYPE)
+
+    def sprite(o: GameObject) -> int:
+        resource = o.animation if o.animation is not None else o.texture
+        return hashes.get(id(resource), 0) if resource is not None else 0
+
+    # column by column, as Snapshot.capture
+    entities["id"] = ids
+    entities["sprite"] = [sprite(o) for o in objects]
+    entities["position"] = np.round(np.array([o.position.to_tuple() for o in objects], dtype=np.float64).reshape(-1, 2) * POSITION_SCALE)
+    entities["size"] = np.clip(np.round(np.array([o.size.to_tuple() for o in objects], dtype=np.float64).reshape(-1, 2) * POSITION_SCALE), 0, 0xFFFF)
+    entities["rotation"] = np.round(np.array([o.rotation % 360.0 for o in objects]) * ROTATION_SCALE).astype(np.int64) % 65536
+    entities["frame"] = [min(int(o.animation.frame), 255) if o.animation else 0 for o in objects]
+    entities["flags"] = [o.is_solid * SOLID | o.destroyed * DESTROYED for o in objects]
+    entities["palette"] = [o.palette if o.palette is not None else -1 for o in objects]
+    entities["color"] = np.clip(np.round(np.array([o.color.to_tuple() for o in objects], dtype=np.float64).reshape(-1, 3) * 255.0), 0, 255)
+    return entities[np.argsort(entities["id"], kind="stable")]
+
+
+# compares current to baseline (both sorted by id): the mask of the current
+# records that are new or differ, and the ids gone since the baseline
+def delta(current: np.ndarray, baseline: Optional[np.ndarray]) -> tuple[np.ndarray, np.ndarray]:
+    if baseline is None or len(baseline) == 0:
+        return np.ones(len(current), dtype=bool), np.zeros(0, dtype=np.uint16)
+    index = np.minimum(np.searchsorted(baseline["id"], current["id"]), len(baseline) - 1)
+    found = baseline["id"][index] == current["id"]
+    size = NET_ENTITY_DTYPE.itemsize
+    same = np.zeros(len(current), dtype=bool)
+    same[found] = (
+        np.ascontiguousarray(current[found]).view(np.uint8).reshape(-1, size)
+        == np.ascontiguousarray(baseline[index[found]]).view(np.uint8).reshape(-1, size)
+    ).all(axis=1)
+    removed = np.setdiff1d(baseline["id"], current["id"]).astype(np.uint16)
+    return ~same, removed
+
+
+# the state a delta leads to: baseline without the removed ids, with the changed records
+def apply_delta(baseline: Optional[np.ndarray], changed: np.ndarray, removed: np.ndarray) -> np.ndarray:
+    if baseline is None:
+        baseline = np.zeros(0, dtype=NET_ENTITY_DTYPE)
+    kept = baseline[~np.isin(baseline["id"], removed) & ~np.isin(baseline["id"], changed["id"])]
+    merged = np.concatenate((kept, changed))
+    return merged[np.argsort(merged["id"], kind="stable")]
+
+
+# Bandwidth and tick time of a server, over its whole life (bytes and
+# packets) and its last ticks (tick times)
+class NetStats:
+    def __init__(self, window: int = 600):
+        self.start = time.perf_counter()
+        self.ticks = 0
+        self.tick_times: deque[float] = deque(maxlen=window)
+        self.bytes_sent = 0
+        self.packets_sent = 0
+        self.bytes_received = 0
+        self.packets_received = 0
+        self.largest_packet = 0
+        # datagrams ignored: malformed, or from clients over max_clients
+        self.rejected = 0
+
+    def end_tick(self, elapsed: float) -> None:
+        self.ticks += 1
+        self.tick_times.append(elapsed)
+
+    def sent(self, size: int) -> None:
+        self.bytes_sent += size
+        self.packets_sent += 1
+        self.largest_packet = max(self.largest_packet, size)
+
+    def tick_percentile(self, p: float) -> float:
+        return float(np.percentile(self.tick_times, p)) if self.tick_times else 0.0
+
+    def summary(self) -> str:
+        elapsed = max(time.perf_counter() - self.start, 1e-9)
+        mean = sum(self.tick_times) / len(self.tick_times) if self.tick_times else 0.0
+        return (
+            f"{self.ticks} ticks: {mean * 1000.0:.2f} ms mean, {self.tick_percentile(99) * 1000.0:.2f} ms p99; "
+            f"sent {self.bytes_sent / 1024.0:.1f} KB in {self.packets_sent} packets ({self.bytes_sent / elapsed / 1024.0:.1f} KB/s, "
+            f"largest {self.largest_packet} B), received {self.bytes_received / 1024.0:.1f} KB in {self.packets_received} packets"
+        )
+
+
+# A client as the server sees it
+class RemoteClient:
+    def __init__(self, client_id: int, address: tuple[str, int]):
+        self.id = client_id
+        self.address = address
+        # the object it plays, from Game.add_client
+        self.object: Optional[GameObject] = None
+        self.keys: frozenset[int] = frozenset()
+        self.input_sequence = 0
+        # last snapshot it acknowledged, and the states sent to it by sequence
+        self.acked: Optional[int] = None
+        self.history: dict[int, np.ndarray] = {}
+        self.last_heard = time.monotonic()
+        self.bytes_sent = 0
+
+
+class ServerProtocol(asyncio.DatagramProtocol):
+    def __init__(self, server: "GameServer"):
+        self.server = server
+
+    def datagram_received(self, data: bytes, address: tuple[str, int]) -> None:
+        self.server.receive(data, address)
+
+
+# Runs a game authoritatively, headless, on an asyncio UDP endpoint: clients
+# only send the keys they hold, the server steps the game at a fixed tick
+# rate and sends every client a snapshot of the objects around it.
+#
+# The game takes part through Game.add_client, remove_client and
+# client_input; every object of game_objects() is replicated.
+#
+# Snapshots are deltas against the last one the client acknowledged (in
+# its inputs): only records new or changed since then, and the ids gone.
+# Records are quantized (see NET_ENTITY_DTYPE), so objects at rest cost
+# nothing. Interest management: a client only gets the objects within
+# radius of its own, nearest first, as many as fit in max_packet; the state
+# kept for the next delta is what was actually sent, so whatever did not fit
+# goes out in the next ticks. A client whose acknowledged snapshot is older
+# than the history kept gets a full one.
+class GameServer:
+    def __init__(
+        self,
+        game: Game,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        tick_rate: int = 30,
+        radius: float = 640.0,
+        max_packet: int = 1200,
+        max_clients: int = 16,
+        timeout: float = 5.0
+    ):
+        self.game = game
+        self.host = host
+        self.port = port
+        self.tick_rate = tick_rate
+        self.radius = radius
+        self.max_packet = max_packet
+        self.max_clients = max_clients
+        self.timeout = timeout
+
+        self.transport: Optional[asyncio.DatagramTransport] = None
+        self.address: Optional[tuple[str, int]] = None
+        self.clients: dict[tuple[str, int], RemoteClient] = {}
+        self.next_client = 1
+        self.sequence = 0
+        self.running = False
+
+        # network ids of the replicated objects, ids of removed ones are reused
+        self.ids: dict[GameObject, int] = {}
+        self.free_ids: list[int] = []
+        self.next_id = 0
+
+        self.stats = NetStats()
+
+    # initializes the game headless and opens the socket; address is then the bound one
+    async def start(self) -> None:
+        from elyria import core
+
+        ResourceManager.headless = True
+        core.game = self.game
+        self.game.init()
+        loop = asyncio.get_running_loop()
+        self.transport, _ = await loop.create_datagram_endpoint(lambda: ServerProtocol(self), local_addr=(self.host, self.port))
+        self.address = self.transport.get_extra_info("sockname")[:2]
+        self.stats = NetStats()
+
+    # ticks until stop is called (or for a number of ticks); a server too far
+    # behind drops the ticks it missed rather than running them in a burst
+    async def run(self, ticks: Optional[int] = None) -> None:
+        loop = asyncio.get_running_loop()
+        dt = 1.0 / self.tick_rate
+        next_tick = loop.time()
+        self.running = True
+        while self.running and (ticks is None or self.stats.ticks < ticks):
+            self.tick(dt)
+            next_tick += dt
+            delay = next_tick - loop.time()
+            if delay < -dt:
+                next_tick = loop.time()
+            await asyncio.sleep(max(delay, 0.0))
+
+    async def serve(self, ticks: Optional[int] = None) -> None:
+        await self.start()
+        try:
+            await self.run(ticks)
+        finally:
+            self.close()
+
+    def stop(self) -> None:
+        self.running = False
+
+    def close(self) -> None:
+        for client in list(self.clients.values()):
+            self.remove_client(client)
+        if self.transport is not None:
+            self.transport.close()
+            self.transport = None
+
+    def receive(self, data: bytes, address: tuple[str, int]) -> None:
+        self.stats.bytes_received += len(data)
+        self.stats.packets_received += 1
+        kind = data[0] if data else 0
+        client = self.clients.get(address)
+        if kind == DISCONNECT:
+            if client is not None:
+                self.remove_client(client)
+            return
+        if kind not in (CONNECT, INPUT):
+            self.stats.rejected += 1
+            return
+        if client is None:
+            if len(self.clients) >= self.max_clients:
+                self.stats.rejected += 1
+                return
+            client = self.add_client(address)
+        client.last_heard = time.monotonic()
+        if kind == INPUT:
+            self.read_input(client, data)
+
+    def read_input(self, client: RemoteClient, data: bytes) -> None:
+        if len(data) < INPUT_HEADER.size:
+            self.stats.rejected += 1
+            return
+        _, sequence, ack, count = INPUT_HEADER.unpack_from(data)
+        if len(data) < INPUT_HEADER.size + 2 * count:
+            self.stats.rejected += 1
+            return
+        # late or duplicated inputs are older than what the client holds now
+        if sequence <= client.input_sequence:
+            return
+        client.input_sequence = sequence
+        client.keys = frozenset(np.frombuffer(data, dtype="<u2", count=count, offset=INPUT_HEADER.size).tolist())
+        if ack in client.history and (client.acked is None or ack > client.acked):
+            client.acked = ack
+
+    def add_client(self, address: tuple[str, int]) -> RemoteClient:
+        client = RemoteClient(self.next_client, address)
+        self.next_client += 1
+        self.clients[address] = client
+        client.object = self.game.add_client(client.id)
+        return client
+
+    def remove_client(self, client: RemoteClient) -> None:
+        self.clients.pop(client.address, None)
+        self.game.remove_client(client.id)
+
+    # one step of the game, then a snapshot to every client
+    def tick(self, dt: float) -> None:
+        start = time.perf_counter()
+        now = time.monotonic()
+        for client in list(self.clients.values()):
+            if now - client.last_heard > self.timeout:
+                self.remove_client(client)
+
+        for client in self.clients.values():
+            self.game.client_input(client.id, client.keys)
+        self.game.process_input(dt)
+        self.game.update(dt)
+        self.game.scripts.update(dt)
+
+        self.sequence += 1
+        entities = self.capture()
+        centers = (entities["position"] + entities["size"] * 0.5) / POSITION_SCALE
+        for client in self.clients.values():
+            self.send_snapshot(client, entities, centers)
+        self.stats.end_tick(time.perf_counter() - start)
+
+    # records of the game's objects, giving new ones an id
+    def capture(self) -> np.ndarray:
+        objects = self.game.game_objects()
+        alive = set(objects)
+        for o in [o for o in self.ids if o not in alive]:
+            self.free_ids.append(self.ids.pop(o))
+        ids = []
+        for o in objects:
+            net_id = self.ids.get(o)
+            if net_id is None:
+                if self.free_ids:
+                    net_id = self.free_ids.pop()
+                else:
+                    net_id = self.next_id
+                    self.next_id += 1
+                self.ids[o] = net_id
+            ids.append(net_id)
+        return capture_entities(objects, ids)
+
+    def send_snapshot(self, client: RemoteClient, entities: np.ndarray, centers: np.ndarray) -> None:
+        own = self.ids.get(client.object, NO_ENTITY) if client.object is not None else NO_ENTITY
+        if client.object is not None:
+            center = np.array((client.object.position + client.object.size * 0.5).to_tuple())
+            distances = np.hypot(*(centers - center).T)
+            visible = (distances <= self.radius) | (entities["id"] == own)
+        else:
+            # nothing to center on: everything, in id order
+            distances = np.zeros(len(entities))
+            visible = np.ones(len(entities), dtype=bool)
+        current, distances = entities[visible], distances[visible]
+
+        baseline = client.history.get(client.acked) if client.acked is not None else None
+        changed, removed = delta(current, baseline)
+        room = self.max_packet - SNAPSHOT_HEADER.size
+        removed = removed[:room // 2]
+        room -= 2 * len(removed)
+        order = np.argsort(distances[changed], kind="stable")[:room // NET_ENTITY_DTYPE.itemsize]
+        changed = current[changed][order]
+
+        packet = b"".join((
+            SNAPSHOT_HEADER.pack(
+                SNAPSHOT, self.sequence, client.acked if baseline is not None else NO_BASELINE,
+                own, len(changed), len(removed)
+            ),
+            changed.tobytes(),
+            removed.astype("<u2").tobytes()
+        ))
+        client.history[self.sequence] = apply_delta(baseline, changed, removed)
+        for sequence in [s for s in client.history if s <= self.sequence - SERVER_HISTORY]:
+            del client.history[sequence]
+        if client.acked is not None and client.acked not in client.history:
+            client.acked = None
+
+        self.transport.sendto(packet, client.address)
+        client.bytes_sent += len(packet)
+        self.stats.sent(len(packet))
+
+
+# The engine side of a GameServer, polled from the game loop: send_input
+# once per frame with the keys held, poll to read the snapshots received.
+# The replicated objects are kept as GameObjects in entities (by network
+# id), ready to draw; player is the id of the client's own object.
+class NetClient:
+    def __init__(self, host: str, port: int):
+        self.address = (host, port)
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setblocking(False)
+        self.socket.connect(self.address)
+
+        self.input_sequence = 0
+        # latest snapshot applied, the states received by sequence
+        self.sequence = 0
+        self.snapshots: dict[int, np.ndarray] = {}
+        self.state = np.zeros(0, dtype=NET_ENTITY_DTYPE)
+        self.player: Optional[int] = None
+        self.entities: dict[int, GameObject] = {}
+        self.sprites: dict[int, int] = {}
+        self.resources: dict[int, object] = {}
+
+        # statistics
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.received = 0
+        # snapshots dropped: older than the latest, or against a baseline not received
+        self.dropped = 0
+
+    @property
+    def connected(self) -> bool:
+        return self.player is not None
+
+    @property
+    def player_object(self) -> Optional[GameObject]:
+        return self.entities.get(self.player) if self.player is not None else None
+
+    def connect(self) -> None:
+        self.send(bytes((CONNECT,)))
+
+    def disconnect(self) -> None:
+        self.send(bytes((DISCONNECT,)))
+
+    def close(self) -> None:
+        self.socket.close()
+
+    def send(self, data: bytes) -> None:
+        try:
+            self.socket.send(data)
+            self.bytes_sent += len(data)
+        except OSError:
+            # nobody listening (yet): the next input tries again
+            pass
+
+    # the keys held (Keys or their values), with the last snapshot received
+    def send_input(self, keys: Iterable[Key | int]) -> None:
+        keys = [key.value if isinstance(key, Key) else int(key) for key in keys][:255]
+        self.input_sequence += 1
+        self.send(INPUT_HEADER.pack(INPUT, self.input_sequence, self.sequence or NO_BASELINE, len(keys)) + struct.pack(f"<{len(keys)}H", *keys))
+
+    # reads every datagram received, returns how many snapshots were applied
+    def poll(self) -> int:
+        applied = 0
+        while True:
+            try:
+                data = self.socket.recv(65536)
+            except (BlockingIOError, ConnectionRefusedError):
+                break
+            self.bytes_received += len(data)
+            if data and data[0] == SNAPSHOT and self.read_snapshot(data):
+                applied += 1
+        return applied
+
+    def read_snapshot(self, data: bytes) -> bool:
+        if len(data) < SNAPSHOT_HEADER.size:
+            return False
+        _, sequence, baseline_sequence, player, changed_count, removed_count = SNAPSHOT_HEADER.unpack_from(data)
+        offset = SNAPSHOT_HEADER.size + changed_count * NET_ENTITY_DTYPE.itemsize
+        if len(data) < offset + 2 * removed_count:
+            return False
+        if sequence <= self.sequence:
+            self.dropped += 1
+            return False
+        if baseline_sequence == NO_BASELINE:
+            baseline = None
+        elif baseline_sequence in self.snapshots:
+            baseline = self.snapshots[baseline_sequence]
+        else:
+            self.dropped += 1
+            return False
+
+        changed = np.frombuffer(data, dtype=NET_ENTITY_DTYPE, count=changed_count, offset=SNAPSHOT_HEADER.size)
+        removed = np.frombuffer(data, dtype="<u2", count=removed_count, offset=offset)
+        state = apply_delta(baseline, changed, removed)
+        self.snapshots[sequence] = state
+        for old in [s for s in self.snapshots if s <= sequence - CLIENT_HISTORY]:
+            del self.snapshots[old]
+
+        # the objects follow the difference with what they show, which is
+        # not the baseline when snapshots were lost in between
+        shown, gone = delta(state, self.state)
+        self.update_entities(state[shown], gone)
+        self.state = state
+        self.sequence = sequence
+        self.player = player if player != NO_ENTITY else None
+        self.received += 1
+        return True
+
+    def update_entities(self, records: np.ndarray, removed: np.ndarray) -> None:
+        for net_id in removed.tolist():
+            self.entities.pop(net_id, None)
+            self.sprites.pop(net_id, None)
+        for net_id, sprite, position, size, rotation, frame, flags, palette, color in records.tolist():
+            o = self.entities.get(net_id)
+            if o is None:
+                o = self.entities[net_id] = GameObject(glm.vec2(0.0, 0.0))
+            if self.sprites.get(net_id) != sprite:
+                self.sprites[net_id] = sprite
+                if sprite not in self.resources:
+                    self.resources = resources_by_hash()
+                resource = self.resources.get(sprite)
+                # every object plays its own copy of an animation
+                o.animation = copy.copy(resource) if isinstance(resource, Animation) else None
+                o.texture = None if isinstance(resource, Animation) else resource
+            o.position = glm.vec2(position[0], position[1]) / POSITION_SCALE
+            o.size = glm.vec2(size[0], size[1]) / POSITION_SCALE
+            o.rotation = rotation / ROTATION_SCALE
+            if o.animation is not None:
+                o.animation.frame = float(frame)
+            o.is_solid = bool(flags & SOLID)
+            o.destroyed = bool(flags & DESTROYED)
+            o.palette = palette if palette >= 0 else None
+            o.color = glm.vec3(color[0], color[1], color[2]) / 255.0
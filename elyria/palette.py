@@ -0,0 +1,120 @@
+from OpenGL.GL import *
+from PIL import Image
+import numpy as np
+
+# colors of a palette row, the most an R8 index can address
+PALETTE_SIZE = 256
+
+
+# RGBA pixels packed into one integer each, for exact color lookups
+def pack_colors(pixels: np.ndarray) -> np.ndarray:
+    return np.ascontiguousarray(pixels, dtype=np.uint8).reshape(-1, 4).view("<u4").ravel()
+
+
+# splits an (height, width, 4) RGBA image into an index image and its
+# palette: the image's own colors when there are at most max_colors of them
+# (exact), a quantized palette otherwise. Fully transparent pixels all
+# share one entry.
+def index_image(pixels: np.ndarray, max_colors: int = PALETTE_SIZE) -> tuple[np.ndarray, np.ndarray]:
+    pixels = pixels.copy()
+    pixels[pixels[..., 3] == 0] = 0
+    colors, indices = np.unique(pack_colors(pixels), return_inverse=True)
+    if len(colors) <= max_colors:
+        palette = colors.view(np.uint8).reshape(-1, 4)
+        return indices.reshape(pixels.shape[:2]).astype(np.uint8), palette
+
+    quantized = Image.fromarray(pixels, "RGBA").quantize(max_colors, method=Image.Quantize.FASTOCTREE)
+    palette = np.array(quantized.getpalette("RGBA")[:4 * max_colors], dtype=np.uint8).reshape(-1, 4)
+    return map_to_palette(pixels, palette), palette
+
+
+# indices of the palette colors closest to the pixels (an exact match when
+# there is one), as an (height, width) uint8 image
+def map_to_palette(pixels: np.ndarray, palette: np.ndarray) -> np.ndarray:
+    pixels = pixels.copy()
+    pixels[pixels[..., 3] == 0] = 0
+    packed = pack_colors(pixels)
+    keys = pack_colors(palette)
+    order = np.argsort(keys)
+    position = np.minimum(np.searchsorted(keys[order], packed), len(keys) - 1)
+    indices = order[position]
+    missing = np.nonzero(keys[indices] != packed)[0]
+    if len(missing):
+        # nearest color, a chunk of pixels at a time
+        flat = pixels.reshape(-1, 4).astype(np.int32)
+        reference = palette.astype(np.int32)
+        for start in range(0, len(missing), 4096):
+            chunk = missing[start:start + 4096]
+            distance = ((flat[chunk, None, :] - reference[None, :, :]) ** 2).sum(axis=2)
+            indices[chunk] = distance.argmin(axis=1)
+    return indices.reshape(pixels.shape[:2]).astype(np.uint8)
+
+
+# The palettes of every indexed texture, as the rows of one small RGBA
+# texture (PALETTE_SIZE colors wide): an indexed texture holds palette
+# indices in an R8 texture (a quarter of the memory of RGBA), and the
+# sprite shaders look the colors up in the row given per sprite. A recolor
+# is one more row rather than a copy of the sheet, and since all palettes
+# share a texture, sprites using different ones still batch together.
+#
+# Rows are kept in memory as well, the texture is (re)uploaded when bound
+# after a change.
+class PaletteTexture:
+    def __init__(self, capacity: int = 16):
+        self.id = 0
+        self.colors = np.zeros((capacity, PALETTE_SIZE, 4), dtype=np.uint8)
+        self.rows = 0
+        self.dirty = True
+
+    # adds a palette (up to PALETTE_SIZE RGBA colors), returns its row
+    def add(self, colors: np.ndarray) -> int:
+        if self.rows == len(self.colors):
+            self.colors = np.concatenate((self.colors, np.zeros_like(self.colors)))
+        self.rows += 1
+        self.set(self.rows - 1, colors)
+        return self.rows - 1
+
+    def set(self, row: int, colors: np.ndarray) -> None:
+        colors = np.asarray(colors, dtype=np.uint8).reshape(-1, 4)
+        if len(colors) > PALETTE_SIZE:
+            raise ValueError(f"a palette holds at most {PALETTE_SIZE} colors, got {len(colors)}")
+        self.colors[row] = 0
+        self.colors[row, :len(colors)] = colors
+        self.dirty = True
+
+    def get(self, row: int) -> np.ndarray:
+        return self.colors[row]
+
+    # the palette texture is sampled texel by texel
+    def upload(self) -> None:
+        if self.id == 0:
+            self.id = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, self.id)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA8, PALETTE_SIZE, len(self.colors), 0, GL_RGBA, GL_UNSIGNED_BYTE, self.colors)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+        self.dirty = False
+
+    def bind(self) -> None:
+        if self.dirty:
+            self.upload()
+        glBindTexture(GL_TEXTURE_2D, self.id)
+
+    def delete(self) -> None:
+        if self.id != 0:
+            glDeleteTextures(1, [self.id])
+            self.id = 0
+        self.dirty = True
+
+    # forgets every palette
+    def clear(self) -> None:
+        self.delete()
+        self.colors[:] = 0
+        self.rows = 0
+
+    @property
+    def memory(self) -> int:
+        return self.colors.nbytes if self.id != 0 else 0
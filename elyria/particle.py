@@ -6,6 +6,11 @@ from elyria.shader import Shader
 from elyria.texture2d import Texture2D
 from elyria.game_object import GameObject
 from elyria.resource_manager import ResourceManager
+from elyria.stream_buffer import StreamingBuffers
+
+
+# per-particle instance data: vec2 offset, vec4 color
+PARTICLE_INSTANCE_SIZE = 6 * 4
 
 
 # Represents a single particle and its state
@@ -39,7 +44,13 @@ class ParticleGenerator:
         self.last_used_particle = 0
 
         # initializes buffer and vertex attributes
+        self.init_render_data()
+
+        # create self.amount default particle instances
+        for i in range(self.amount):
+            self.particles.append(Particle())
 
+    def init_render_data(self) -> None:
         # set up mesh and attribute properties
         particle_quad = np.array([
             0.0, 1.0, 0.0, 1.0,
@@ -51,21 +62,25 @@ class ParticleGenerator:
             1.0, 0.0, 1.0, 0.0
         ], dtype=np.float32)
         self.vao = glGenVertexArrays(1)
-        vbo = glGenBuffers(1)
+        self.quad_vbo = glGenBuffers(1)
         glBindVertexArray(self.vao)
 
         # fill mesh buffer
-        glBindBuffer(GL_ARRAY_BUFFER, vbo)
+        glBindBuffer(GL_ARRAY_BUFFER, self.quad_vbo)
         glBufferData(GL_ARRAY_BUFFER, particle_quad.nbytes, particle_quad, GL_STATIC_DRAW)
 
         # set mesh attributes
         glEnableVertexAttribArray(0)
         glVertexAttribPointer(0, 4, GL_FLOAT, GL_FALSE, 4 * glm.sizeof(glm.float32), ctypes.c_void_p(0))
-        glBindVertexArray(0)
 
-        # create self.amount default particle instances
-        for i in range(self.amount):
-            self.particles.append(Particle())
+        # per-instance offset and color, streamed every frame
+        self.stream = StreamingBuffers.vertex_buffer()
+        glEnableVertexAttribArray(1)
+        glVertexAttribDivisor(1, 1)
+        glEnableVertexAttribArray(2)
+        glVertexAttribDivisor(2, 1)
+        glBindVertexArray(0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
 
     # update all particles
     def update(self, dt: float, go: GameObject, new_particles: int, offset: glm.vec2 = glm.vec2(0.0, 0.0)) -> None:
@@ -88,14 +103,23 @@ class ParticleGenerator:
         glBlendFunc(GL_SRC_ALPHA, GL_ONE)
         self.shader.use()
 
-        for particle in self.particles:
-            if particle.life > 0.0:
-                self.shader.set_vec2("offset", particle.position)
-                self.shader.set_vec4("color", particle.color)
-                self.texture.bind()
-                glBindVertexArray(self.vao)
-                glDrawArrays(GL_TRIANGLES, 0, 6)
-                glBindVertexArray(0)
+        alive = [
+            (p.position.x, p.position.y, p.color.x, p.color.y, p.color.z, p.color.w)
+            for p in self.particles if p.life > 0.0
+        ]
+        if alive:
+            # stream all instances and draw them in a single call
+            instances = np.array(alive, dtype=np.float32)
+            offset = self.stream.allocate(instances, PARTICLE_INSTANCE_SIZE)
+
+            self.texture.bind()
+            glBindVertexArray(self.vao)
+            glBindBuffer(GL_ARRAY_BUFFER, self.stream.id)
+            glVertexAttribPointer(1, 2, GL_FLOAT, GL_FALSE, PARTICLE_INSTANCE_SIZE, ctypes.c_void_p(offset))
+            glVertexAttribPointer(2, 4, GL_FLOAT, GL_FALSE, PARTICLE_INSTANCE_SIZE, ctypes.c_void_p(offset + 2 * 4))
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+            glDrawArraysInstanced(GL_TRIANGLES, 0, 6, len(alive))
+            glBindVertexArray(0)
 
         # don't forget to reset to default blending mode
         glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
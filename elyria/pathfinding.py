@@ -0,0 +1,637 @@
+import heapq
+import math
+import time
+import numpy as np
+from collections import OrderedDict
+from typing import Callable, Generator, Optional
+
+Tile = tuple[int, int]
+Path = list[Tile]
+# a search is a generator yielding regularly (so it can be spread over
+# several frames) and returning its result once done
+Search = Generator[None, None, Optional[Path]]
+
+SQRT2 = math.sqrt(2.0)
+
+# the eight moves, in the order of small_rpg's Direction (UP first, then
+# clockwise), y pointing down as on screen
+DIRECTIONS: list[Tile] = [(0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1)]
+
+# number of node expansions between two yields of a search
+EXPANSIONS_PER_YIELD = 64
+
+
+# index in DIRECTIONS of the move from a to the adjacent tile b
+def step_direction(a: Tile, b: Tile) -> int:
+    return DIRECTIONS.index((max(-1, min(1, b[0] - a[0])), max(-1, min(1, b[1] - a[1]))))
+
+
+# octile distance: the cost of the shortest 8-way path without obstacles
+def octile(a: Tile, b: Tile) -> float:
+    dx, dy = abs(a[0] - b[0]), abs(a[1] - b[1])
+    return max(dx, dy) + (SQRT2 - 1.0) * min(dx, dy)
+
+
+def path_cost(path: Path) -> float:
+    return sum(octile(path[i], path[i + 1]) for i in range(len(path) - 1))
+
+
+# runs a search to completion
+def run(search: Search):
+    while True:
+        try:
+            next(search)
+        except StopIteration as stop:
+            return stop.value
+
+
+# The searches below work on "cells": a flat bytearray of walkable flags
+# surrounded by a margin of one blocked tile, so neighbours never need a
+# bounds check. pitch is the length of a row, margin included, and a tile
+# (x, y) lives at index (y + 1) * pitch + x + 1.
+
+# (index offset, cost, offsets of the two tiles a diagonal move passes by)
+def moves(pitch: int) -> list[tuple[int, float, int, int]]:
+    return [(dx + dy * pitch, SQRT2 if dx and dy else 1.0, dx if dx and dy else 0, dy * pitch if dx and dy else 0) for dx, dy in DIRECTIONS]
+
+
+def cell_octile(a: int, b: int, pitch: int) -> float:
+    dx, dy = abs(a % pitch - b % pitch), abs(a // pitch - b // pitch)
+    return dx + dy + (SQRT2 - 2.0) * min(dx, dy)
+
+
+def reconstruct(parents: dict[int, int], goal: int) -> list[int]:
+    path = [goal]
+    while parents[path[-1]] >= 0:
+        path.append(parents[path[-1]])
+    path.reverse()
+    return path
+
+
+# plain A*; a diagonal move never cuts a corner, both orthogonal tiles it
+# passes by must be walkable as well
+def astar(cells: bytearray, pitch: int, start: int, goal: int) -> Generator[None, None, Optional[list[int]]]:
+    if not cells[start] or not cells[goal]:
+        return None
+    offsets = moves(pitch)
+    gx, gy = goal % pitch, goal // pitch
+    g = {start: 0.0}
+    parents = {start: -1}
+    open_heap = [(cell_octile(start, goal, pitch), 0.0, start)]
+    closed = set()
+    while open_heap:
+        _, cost, node = heapq.heappop(open_heap)
+        if node in closed:
+            continue
+        if node == goal:
+            return reconstruct(parents, goal)
+        closed.add(node)
+        if len(closed) % EXPANSIONS_PER_YIELD == 0:
+            yield
+
+        for offset, step, side_a, side_b in offsets:
+            neighbour = node + offset
+            if not cells[neighbour] or (side_a and not (cells[node + side_a] and cells[node + side_b])):
+                continue
+            new_cost = cost + step
+            if new_cost < g.get(neighbour, math.inf):
+                g[neighbour] = new_cost
+                parents[neighbour] = node
+                dx, dy = abs(neighbour % pitch - gx), abs(neighbour // pitch - gy)
+                heapq.heappush(open_heap, (new_cost + dx + dy + (SQRT2 - 2.0) * min(dx, dy), new_cost, neighbour))
+    return None
+
+
+# Dijkstra from source until every target is reached (or none is left to
+# reach), returns target -> (cost, path) for the reachable ones
+def dijkstra(cells: bytearray, pitch: int, source: int, targets: set[int]) -> Generator[None, None, dict[int, tuple[float, list[int]]]]:
+    found = {}
+    if not cells[source]:
+        return found
+    offsets = moves(pitch)
+    remaining = set(targets)
+    g = {source: 0.0}
+    parents = {source: -1}
+    open_heap = [(0.0, source)]
+    closed = set()
+    while open_heap and remaining:
+        cost, node = heapq.heappop(open_heap)
+        if node in closed:
+            continue
+        closed.add(node)
+        if node in remaining:
+            remaining.discard(node)
+            found[node] = (cost, reconstruct(parents, node))
+        if len(closed) % EXPANSIONS_PER_YIELD == 0:
+            yield
+
+        for offset, step, side_a, side_b in offsets:
+            neighbour = node + offset
+            if not cells[neighbour] or (side_a and not (cells[node + side_a] and cells[node + side_b])):
+                continue
+            new_cost = cost + step
+            if new_cost < g.get(neighbour, math.inf):
+                g[neighbour] = new_cost
+                parents[neighbour] = node
+                heapq.heappush(open_heap, (new_cost, neighbour))
+    return found
+
+
+# Jump Point Search, for grids where diagonal moves never cut corners:
+# straight and diagonal runs without decisions are skipped in one go,
+# only tiles where the path may turn (jump points) enter the open list
+def jps(cells: bytearray, pitch: int, start: int, goal: int) -> Generator[None, None, Optional[list[int]]]:
+    if not cells[start] or not cells[goal]:
+        return None
+    g = {start: 0.0}
+    parents = {start: -1}
+    open_heap = [(cell_octile(start, goal, pitch), 0.0, start)]
+    closed = set()
+    while open_heap:
+        _, cost, node = heapq.heappop(open_heap)
+        if node in closed:
+            continue
+        if node == goal:
+            return expand(reconstruct(parents, goal), pitch)
+        closed.add(node)
+        if len(closed) % EXPANSIONS_PER_YIELD == 0:
+            yield
+
+        for dx, dy in pruned_directions(cells, pitch, node, parents[node]):
+            jump_point = jump(cells, pitch, node + dx + dy * pitch, dx, dy, goal)
+            if jump_point < 0 or jump_point in closed:
+                continue
+            new_cost = cost + cell_octile(node, jump_point, pitch)
+            if new_cost < g.get(jump_point, math.inf):
+                g[jump_point] = new_cost
+                parents[jump_point] = node
+                heapq.heappush(open_heap, (new_cost + cell_octile(jump_point, goal, pitch), new_cost, jump_point))
+    return None
+
+
+# directions worth exploring from node, given the jump point it was reached from
+def pruned_directions(cells: bytearray, pitch: int, node: int, parent: int) -> list[Tile]:
+    if parent < 0:
+        return [(dx, dy) for (dx, dy), (offset, _, side_a, side_b) in zip(DIRECTIONS, moves(pitch))
+                if cells[node + offset] and not (side_a and not (cells[node + side_a] and cells[node + side_b]))]
+
+    dx = max(-1, min(1, node % pitch - parent % pitch))
+    dy = max(-1, min(1, node // pitch - parent // pitch))
+    directions = []
+    if dx and dy:
+        vertical, horizontal = cells[node + dy * pitch], cells[node + dx]
+        if vertical:
+            directions.append((0, dy))
+        if horizontal:
+            directions.append((dx, 0))
+        if vertical and horizontal:
+            directions.append((dx, dy))
+    elif dx:
+        ahead, up, down = cells[node + dx], cells[node - pitch], cells[node + pitch]
+        if ahead:
+            directions.append((dx, 0))
+            if up:
+                directions.append((dx, -1))
+            if down:
+                directions.append((dx, 1))
+        if up:
+            directions.append((0, -1))
+        if down:
+            directions.append((0, 1))
+    else:
+        ahead, left, right = cells[node + dy * pitch], cells[node - 1], cells[node + 1]
+        if ahead:
+            directions.append((0, dy))
+            if left:
+                directions.append((-1, dy))
+            if right:
+                directions.append((1, dy))
+        if left:
+            directions.append((-1, 0))
+        if right:
+            directions.append((1, 0))
+    return directions
+
+
+# walks from node in direction (dx, dy) until a jump point (the goal, or a
+# tile with a forced neighbour) is reached, returns -1 on an obstacle
+def jump(cells: bytearray, pitch: int, node: int, dx: int, dy: int, goal: int) -> int:
+    step = dx + dy * pitch
+    while True:
+        if not cells[node]:
+            return -1
+        if node == goal:
+            return node
+        if dx and dy:
+            # a straight run from here reaches a jump point
+            if jump(cells, pitch, node + dx, dx, 0, goal) >= 0 or jump(cells, pitch, node + dy * pitch, 0, dy, goal) >= 0:
+                return node
+            if not (cells[node + dx] and cells[node + dy * pitch]):
+                return -1
+        elif dx:
+            if (cells[node - pitch] and not cells[node - dx - pitch]) or (cells[node + pitch] and not cells[node - dx + pitch]):
+                return node
+        elif (cells[node - 1] and not cells[node - 1 - dy * pitch]) or (cells[node + 1] and not cells[node + 1 - dy * pitch]):
+            return node
+        node += step
+
+
+# turns a path of jump points (each pair on a straight or diagonal line)
+# into a path going through every tile
+def expand(points: list[int], pitch: int) -> list[int]:
+    path = [points[0]]
+    for a, b in zip(points, points[1:]):
+        dx = max(-1, min(1, b % pitch - a % pitch))
+        dy = max(-1, min(1, b // pitch - a // pitch))
+        step = dx + dy * pitch
+        node = a
+        while node != b:
+            node += step
+            path.append(node)
+    return path
+
+
+# A walkability grid searched with 8-way moves. A diagonal move never cuts
+# a corner: both orthogonal tiles it passes by must be walkable too.
+#
+# Short routes are searched with Jump Point Search. Longer ones go through a
+# hierarchy of clusters (HPA*): the grid is split in square clusters, the
+# walkable openings between neighbouring clusters get portal tiles and the
+# routes between the portals of a cluster are precomputed, so a long query
+# only searches the small graph of portals then stitches the stored routes.
+# Those routes are near optimal, not always the shortest.
+#
+# Found paths are kept in an LRU cache. Blocking a tile drops the cached
+# paths going through it, opening one drops every cached path (shorter
+# routes may exist anywhere) and both update the affected clusters.
+class NavGrid:
+    def __init__(self, walkable: np.ndarray, cluster_size: int = 16, cache_size: int = 1024):
+        self.walkable = np.array(walkable, dtype=bool)
+        self.height, self.width = self.walkable.shape
+        self.pitch = self.width + 2
+        padded = np.zeros((self.height + 2, self.pitch), dtype=np.uint8)
+        padded[1:-1, 1:-1] = self.walkable
+        self.cells = bytearray(padded.tobytes())
+
+        self.cluster_size = cluster_size
+        self.hierarchy: Optional[ClusterHierarchy] = None  # built on the first long query
+        # routes at least this long (octile) go through the hierarchy
+        self.hierarchy_distance = 2 * cluster_size
+
+        self.cache_size = cache_size
+        self.cache: OrderedDict[tuple[Tile, Tile], Optional[Path]] = OrderedDict()
+        self.cached_tiles: dict[Tile, set[tuple[Tile, Tile]]] = {}  # cache keys by tile their path goes through
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # bumped on every tile change, so searches know when they ran on a stale grid
+        self.version = 0
+
+    def index(self, tile: Tile) -> int:
+        return (tile[1] + 1) * self.pitch + tile[0] + 1
+
+    def tile(self, index: int) -> Tile:
+        return index % self.pitch - 1, index // self.pitch - 1
+
+    def is_walkable(self, x: int, y: int) -> bool:
+        return 0 <= x < self.width and 0 <= y < self.height and self.cells[(y + 1) * self.pitch + x + 1] == 1
+
+    def set_walkable(self, x: int, y: int, walkable: bool) -> None:
+        if self.is_walkable(x, y) == walkable:
+            return
+        self.cells[self.index((x, y))] = walkable
+        self.walkable[y, x] = walkable
+        self.version += 1
+
+        if walkable:
+            self.clear_cache()
+        else:
+            for key in list(self.cached_tiles.get((x, y), ())):
+                self.uncache(key)
+        if self.hierarchy is not None:
+            self.hierarchy.update_tile(x, y)
+
+    def astar(self, start: Tile, goal: Tile) -> Search:
+        if not self.is_walkable(*start) or not self.is_walkable(*goal):
+            return None
+        path = yield from astar(self.cells, self.pitch, self.index(start), self.index(goal))
+        return [self.tile(i) for i in path] if path is not None else None
+
+    def jps(self, start: Tile, goal: Tile) -> Search:
+        if not self.is_walkable(*start) or not self.is_walkable(*goal):
+            return None
+        path = yield from jps(self.cells, self.pitch, self.index(start), self.index(goal))
+        return [self.tile(i) for i in path] if path is not None else None
+
+    # the search for a route: JPS, or the cluster hierarchy for long routes
+    def search(self, start: Tile, goal: Tile) -> Search:
+        if octile(start, goal) >= self.hierarchy_distance:
+            if self.hierarchy is None:
+                self.hierarchy = ClusterHierarchy(self, self.cluster_size)
+            return self.hierarchy.search(start, goal)
+        return self.jps(start, goal)
+
+    # search for a route going through the path cache
+    def plan(self, start: Tile, goal: Tile) -> Search:
+        key = (start, goal)
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            self.cache_hits += 1
+            return self.cache[key]
+
+        self.cache_misses += 1
+        while True:
+            # a search spread over several frames may see the grid change,
+            # its result is then thrown away and the search started again
+            version = self.version
+            path = yield from self.search(start, goal)
+            if version == self.version:
+                break
+        self.store(key, path)
+        return path
+
+    # finds a route in one go
+    def find_path(self, start: Tile, goal: Tile) -> Optional[Path]:
+        return run(self.plan(start, goal))
+
+    def store(self, key: tuple[Tile, Tile], path: Optional[Path]) -> None:
+        self.cache[key] = path
+        # a missing path only changes when a tile opens, which clears everything
+        for tile in path or ():
+            self.cached_tiles.setdefault(tile, set()).add(key)
+        while len(self.cache) > self.cache_size:
+            self.uncache(next(iter(self.cache)))
+
+    def uncache(self, key: tuple[Tile, Tile]) -> None:
+        path = self.cache.pop(key, None)
+        for tile in path or ():
+            keys = self.cached_tiles.get(tile)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.cached_tiles[tile]
+
+    def clear_cache(self) -> None:
+        self.cache.clear()
+        self.cached_tiles.clear()
+
+
+# The portal graph of a NavGrid split in square clusters (HPA*). Searches
+# inside a cluster run on a copy of its tiles only.
+class ClusterHierarchy:
+    def __init__(self, grid: NavGrid, size: int):
+        self.grid = grid
+        self.size = size
+        self.columns = -(-grid.width // size)
+        self.rows = -(-grid.height // size)
+
+        # portal tile pairs on the east and south border of each cluster
+        self.borders: dict[tuple[int, int, str], list[tuple[Tile, Tile]]] = {}
+        # tiles across a border each portal tile leads to, and portal tiles by cluster
+        self.links: dict[Tile, set[Tile]] = {}
+        self.cluster_portals: dict[tuple[int, int], list[Tile]] = {}
+        # routes between the portals of each cluster: cluster -> portal -> portal -> (cost, path),
+        # computed the first time a search goes through the cluster
+        self.routes: dict[tuple[int, int], dict[Tile, dict[Tile, tuple[float, Path]]]] = {}
+
+        for cy in range(self.rows):
+            for cx in range(self.columns):
+                self.find_portals(cx, cy, "E")
+                self.find_portals(cx, cy, "S")
+        self.link_portals()
+
+    def cluster_of(self, tile: Tile) -> tuple[int, int]:
+        return tile[0] // self.size, tile[1] // self.size
+
+    def bounds(self, cluster: tuple[int, int]) -> tuple[int, int, int, int]:
+        cx, cy = cluster
+        return (cx * self.size, cy * self.size, min((cx + 1) * self.size, self.grid.width), min((cy + 1) * self.size, self.grid.height))
+
+    # copies the tiles of a cluster into cells of their own, returns them
+    # with their pitch and a function mapping a tile to its index
+    def cluster_cells(self, cluster: tuple[int, int]) -> tuple[bytearray, int, Callable[[Tile], int]]:
+        x0, y0, x1, y1 = self.bounds(cluster)
+        pitch = x1 - x0 + 2
+        cells = bytearray(pitch * (y1 - y0 + 2))
+        grid = self.grid
+        for y in range(y0, y1):
+            row = grid.index((x0, y))
+            cells[(y - y0 + 1) * pitch + 1:(y - y0 + 2) * pitch - 1] = grid.cells[row:row + x1 - x0]
+        return cells, pitch, lambda tile: (tile[1] - y0 + 1) * pitch + tile[0] - x0 + 1
+
+    # maps a path of cluster cell indices back to tiles
+    def tiles(self, path: list[int], cluster: tuple[int, int], pitch: int) -> Path:
+        x0, y0, _, _ = self.bounds(cluster)
+        return [(i % pitch - 1 + x0, i // pitch - 1 + y0) for i in path]
+
+    # finds the openings across one border of a cluster; each run of open
+    # tiles gets a portal in its middle, long runs one at each end
+    def find_portals(self, cx: int, cy: int, side: str) -> None:
+        free = self.grid.is_walkable
+        x0, y0, x1, y1 = self.bounds((cx, cy))
+        if side == "E":
+            if x1 >= self.grid.width:
+                return
+            pairs = [((x1 - 1, y), (x1, y)) for y in range(y0, y1)]
+        else:
+            if y1 >= self.grid.height:
+                return
+            pairs = [((x, y1 - 1), (x, y1)) for x in range(x0, x1)]
+
+        portals = []
+        run_: list[tuple[Tile, Tile]] = []
+        for pair in pairs + [None]:
+            if pair is not None and free(*pair[0]) and free(*pair[1]):
+                run_.append(pair)
+                continue
+            if run_:
+                if len(run_) >= 6:
+                    portals += [run_[0], run_[-1]]
+                else:
+                    portals.append(run_[len(run_) // 2])
+                run_ = []
+        self.borders[(cx, cy, side)] = portals
+
+    def link_portals(self) -> None:
+        self.links = {}
+        for portals in self.borders.values():
+            for a, b in portals:
+                self.links.setdefault(a, set()).add(b)
+                self.links.setdefault(b, set()).add(a)
+        self.cluster_portals = {}
+        for tile in self.links:
+            self.cluster_portals.setdefault(self.cluster_of(tile), []).append(tile)
+
+    # computes the routes between the portals of a cluster, one Dijkstra
+    # per portal reaching all the others. Routes computed while the grid
+    # changed are dropped: update_tile may have thrown away the cluster's
+    # routes in the meantime, these would put stale ones back
+    def connect_cluster(self, cluster: tuple[int, int]) -> Generator[None, None, None]:
+        version = self.grid.version
+        cells, pitch, index = self.cluster_cells(cluster)
+        portals = self.cluster_portals.get(cluster, [])
+        indices = {index(portal): portal for portal in portals}
+        routes: dict[Tile, dict[Tile, tuple[float, Path]]] = {portal: {} for portal in portals}
+        for i, portal in enumerate(portals):
+            # routes are symmetric, only search towards the portals not done yet
+            targets = {index(other) for other in portals[i + 1:]}
+            found = yield from dijkstra(cells, pitch, index(portal), targets)
+            for target, (cost, path) in found.items():
+                path = self.tiles(path, cluster, pitch)
+                routes[portal][indices[target]] = (cost, path)
+                routes[indices[target]][portal] = (cost, path[::-1])
+        if version == self.grid.version:
+            self.routes[cluster] = routes
+
+    # rebuilds the portals and routes a tile change may affect
+    def update_tile(self, x: int, y: int) -> None:
+        cx, cy = self.cluster_of((x, y))
+        for border in ((cx, cy, "E"), (cx, cy, "S"), (cx - 1, cy, "E"), (cx, cy - 1, "S")):
+            if border[0] >= 0 and border[1] >= 0:
+                self.find_portals(*border)
+        self.link_portals()
+        for cluster in ((cx, cy), (cx - 1, cy), (cx + 1, cy), (cx, cy - 1), (cx, cy + 1)):
+            self.routes.pop(cluster, None)
+
+    # routes from tile to the portals of its cluster it can reach (none if
+    # the grid changed meanwhile, the search is then started again anyway)
+    def attach(self, tile: Tile) -> Generator[None, None, dict[Tile, tuple[float, Path]]]:
+        version = self.grid.version
+        cluster = self.cluster_of(tile)
+        cells, pitch, index = self.cluster_cells(cluster)
+        indices = {index(portal): portal for portal in self.cluster_portals.get(cluster, [])}
+        found = yield from dijkstra(cells, pitch, index(tile), set(indices))
+        if version != self.grid.version:
+            return {}
+        return {indices[target]: (cost, self.tiles(path, cluster, pitch)) for target, (cost, path) in found.items()}
+
+    def search(self, start: Tile, goal: Tile) -> Search:
+        if not self.grid.is_walkable(*start) or not self.grid.is_walkable(*goal):
+            return None
+
+        if self.cluster_of(start) == self.cluster_of(goal):
+            cluster = self.cluster_of(start)
+            cells, pitch, index = self.cluster_cells(cluster)
+            path = yield from astar(cells, pitch, index(start), index(goal))
+            if path is not None:
+                return self.tiles(path, cluster, pitch)
+
+        # start and goal temporarily join the portal graph
+        start_routes = yield from self.attach(start)
+        goal_routes = yield from self.attach(goal)
+
+        def edges(node: Tile) -> list[tuple[Tile, float, Path]]:
+            result = []
+            if node == start:
+                result += [(portal, cost, path) for portal, (cost, path) in start_routes.items()]
+            for other in self.links.get(node, ()):
+                result.append((other, 1.0, [node, other]))
+            for other, (cost, path) in self.routes[self.cluster_of(node)].get(node, {}).items():
+                result.append((other, cost, path))
+            if node in goal_routes:
+                cost, path = goal_routes[node]
+                result.append((goal, cost, path[::-1]))
+            return result
+
+        g = {start: 0.0}
+        parents: dict[Tile, Optional[tuple[Tile, Path]]] = {start: None}
+        open_heap = [(octile(start, goal), 0.0, start)]
+        closed = set()
+        while open_heap:
+            _, cost, node = heapq.heappop(open_heap)
+            if node in closed:
+                continue
+            if node == goal:
+                # stitches the routes between the portals together
+                path = [goal]
+                while parents[node] is not None:
+                    node, route = parents[node]
+                    path[-1:] = route[::-1]
+                path.reverse()
+                return path
+            closed.add(node)
+            if len(closed) % EXPANSIONS_PER_YIELD == 0:
+                yield
+
+            if self.cluster_of(node) not in self.routes:
+                yield from self.connect_cluster(self.cluster_of(node))
+                if self.cluster_of(node) not in self.routes:
+                    # the grid changed: NavGrid.plan searches again
+                    return None
+            for neighbour, step, route in edges(node):
+                new_cost = cost + step
+                if new_cost < g.get(neighbour, math.inf):
+                    g[neighbour] = new_cost
+                    parents[neighbour] = (node, route)
+                    heapq.heappush(open_heap, (new_cost + octile(neighbour, goal), new_cost, neighbour))
+        return None
+
+
+class PathRequest:
+    def __init__(self, start: Tile, goal: Tile, callback: Optional[Callable[["PathRequest"], None]] = None):
+        self.start = start
+        self.goal = goal
+        self.callback = callback  # called with the request once done
+        self.path: Optional[Path] = None
+        self.done = False
+        self.cancelled = False
+        self.search: Optional[Search] = None
+
+
+# Serves path requests within a time budget per frame: requests are queued
+# and update() works through them (first come, first served) until the
+# budget is spent. Searches are resumable, so a long search simply goes on
+# during the next frames instead of making one frame spike.
+class PathfindingService:
+    def __init__(self, grid: NavGrid, budget_ms: float = 1.0):
+        self.grid = grid
+        self.budget = budget_ms / 1000.0
+        self.queue: list[PathRequest] = []
+        # statistics
+        self.completed = 0
+        self.last_update_time = 0.0
+
+    def request(self, start: Tile, goal: Tile, callback: Optional[Callable[[PathRequest], None]] = None) -> PathRequest:
+        request = PathRequest(start, goal, callback)
+        self.queue.append(request)
+        return request
+
+    def cancel(self, request: PathRequest) -> None:
+        request.cancelled = True
+
+    @property
+    def pending(self) -> int:
+        return len(self.queue)
+
+    # called once per frame; always makes some progress, even over budget
+    def update(self) -> None:
+        start_time = time.perf_counter()
+        deadline = start_time + self.budget
+        done = 0
+        progressed = False
+        for request in self.queue:
+            if request.cancelled:
+                done += 1
+                continue
+            if progressed and time.perf_counter() >= deadline:
+                break
+            progressed = True
+
+            if request.search is None:
+                request.search = self.grid.plan(request.start, request.goal)
+            try:
+                next(request.search)
+                while time.perf_counter() < deadline:
+                    next(request.search)
+            except StopIteration as stop:
+                request.path = stop.value
+                request.done = True
+                request.search = None
+                self.completed += 1
+                done += 1
+                if request.callback is not None:
+                    request.callback(request)
+                continue
+            # out of time in the middle of this search, resumed next frame
+            break
+        del self.queue[:done]
+        self.last_update_time = time.perf_counter() - start_time
@@ -0,0 +1,517 @@
+import glm
+import numpy as np
+from typing import Optional
+from elyria.game_object import GameObject
+from elyria.ball_object import BallObject
+from elyria.collision import Collision, vector_direction
+
+# distance kept between a body and the static collider it stopped against
+SKIN = 1e-3
+
+
+# A contact of the last step: body touched another body, or the static
+# collider of index other. The collision is seen from body: its difference
+# goes from the body centre to the contact point, like check_ball_collision.
+class Contact:
+    def __init__(self, body: int, other: int, static: bool, collision: Collision):
+        self.body = body
+        self.other = other
+        self.static = static
+        self.collision = collision
+
+
+# The dynamic bodies of a scene, held in arrays (one row per body) and moved
+# together by step. Bodies are boxes or circles (radius > 0), positioned by
+# their top-left corner like game objects.
+#   - motion against static colliders (walls, axis-aligned boxes) is swept:
+#     each body is cast along its displacement against every collider, so
+#     fast bodies stop at thin walls instead of tunneling through them, and
+#     bounce off with their restitution
+#   - overlapping bodies are pushed apart and exchange momentum, found by
+#     sorting them along x
+#   - bodies moving slower than sleep_speed for sleep_time seconds fall
+#     asleep (touching bodies together) and are skipped, until a moving
+#     body touches them or they are moved through the world
+# Contacts of the last step are listed in contacts, built on first access.
+class PhysicsWorld:
+    def __init__(
+        self,
+        capacity: int,
+        gravity: tuple[float, float] = (0.0, 0.0),
+        damping: float = 0.0,
+        sleep_speed: float = 5.0,
+        sleep_time: float = 0.5,
+        bounce_speed: float = 20.0,
+        iterations: int = 4
+    ):
+        self.capacity = capacity
+        self.count = 0
+        self.gravity = np.array(gravity, dtype=np.float64)
+        # fraction of the velocity lost per second, e.g. ground friction in a top-down view
+        self.damping = damping
+        self.sleep_speed = sleep_speed
+        self.sleep_time = sleep_time
+        # slower impacts don't bounce, so resting bodies settle instead of jittering
+        self.bounce_speed = bounce_speed
+        # bounces resolved per body and step, the rest of the motion is dropped
+        self.iterations = iterations
+
+        # bodies
+        self.positions = np.zeros((capacity, 2), dtype=np.float64)
+        self.velocities = np.zeros((capacity, 2), dtype=np.float64)
+        self.half_sizes = np.zeros((capacity, 2), dtype=np.float64)
+        self.radii = np.zeros(capacity, dtype=np.float64)
+        self.restitutions = np.ones(capacity, dtype=np.float64)
+        self.inverse_masses = np.ones(capacity, dtype=np.float64)
+        self.awake = np.zeros(capacity, dtype=bool)
+        self.rest_times = np.zeros(capacity, dtype=np.float64)
+        # game objects following the bodies, updated after every step
+        self.objects: list[Optional[GameObject]] = [None] * capacity
+
+        # static colliders, as top-left and bottom-right corners
+        self.static_min = np.zeros((0, 2), dtype=np.float64)
+        self.static_max = np.zeros((0, 2), dtype=np.float64)
+
+        # contacts of the last step, as (bodies, others, differences, static) batches
+        self.contact_batches: list[tuple[np.ndarray, np.ndarray, np.ndarray, bool]] = []
+        self.contact_list: Optional[list[Contact]] = None
+        # pairs of bodies touching in the last step
+        self.touching: tuple[np.ndarray, np.ndarray] = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+
+    # adds a body and returns its index; a mass of 0 makes it immovable by other bodies
+    def add(
+        self,
+        position: tuple[float, float],
+        size: tuple[float, float],
+        velocity: tuple[float, float] = (0.0, 0.0),
+        radius: float = 0.0,
+        restitution: float = 1.0,
+        mass: float = 1.0
+    ) -> int:
+        if self.count == self.capacity:
+            raise ValueError(f"physics world is full ({self.capacity} bodies)")
+        index = self.count
+        self.count += 1
+        self.positions[index] = position
+        self.velocities[index] = velocity
+        self.half_sizes[index] = (size[0] / 2.0, size[1] / 2.0)
+        self.radii[index] = radius
+        self.restitutions[index] = restitution
+        self.inverse_masses[index] = 1.0 / mass if mass > 0.0 else 0.0
+        self.awake[index] = True
+        self.rest_times[index] = 0.0
+        self.objects[index] = None
+        return index
+
+    # adds a body following a game object (a circle for balls)
+    def add_object(self, go: GameObject, restitution: float = 1.0, mass: float = 1.0) -> int:
+        radius = go.radius if isinstance(go, BallObject) else 0.0
+        index = self.add(tuple(go.position), tuple(go.size), tuple(go.velocity), radius, restitution, mass)
+        self.objects[index] = go
+        return index
+
+    # removes a body; the last body takes its index
+    def remove(self, index: int) -> None:
+        last = self.count - 1
+        for array in (self.positions, self.velocities, self.half_sizes, self.radii, self.restitutions,
+                      self.inverse_masses, self.awake, self.rest_times):
+            array[index] = array[last]
+        self.objects[index] = self.objects[last]
+        self.objects[last] = None
+        self.count = last
+
+    # adds an axis-aligned static collider and returns its index
+    def add_static(self, position: tuple[float, float], size: tuple[float, float]) -> int:
+        self.static_min = np.vstack([self.static_min, [position]])
+        self.static_max = np.vstack([self.static_max, [(position[0] + size[0], position[1] + size[1])]])
+        return len(self.static_min) - 1
+
+    # walls around a width * height area, thick enough to be seen by any
+    # query; without bottom, bodies leave through it (like the ball of a breakout)
+    def add_bounds(self, width: float, height: float, bottom: bool = True, thickness: float = 1000.0) -> None:
+        self.add_static((-thickness, -thickness), (thickness, height + 2 * thickness))
+        self.add_static((width, -thickness), (thickness, height + 2 * thickness))
+        self.add_static((0.0, -thickness), (width, thickness))
+        if bottom:
+            self.add_static((0.0, height), (width, thickness))
+
+    # removes every static collider, waking the bodies that rested on them
+    def clear_statics(self) -> None:
+        self.static_min = np.zeros((0, 2), dtype=np.float64)
+        self.static_max = np.zeros((0, 2), dtype=np.float64)
+        self.wake()
+
+    # wakes a body, or every body
+    def wake(self, index: Optional[int] = None) -> None:
+        if index is None:
+            self.awake[:self.count] = True
+            self.rest_times[:self.count] = 0.0
+        else:
+            self.awake[index] = True
+            self.rest_times[index] = 0.0
+
+    def set_position(self, index: int, position: tuple[float, float]) -> None:
+        self.positions[index] = position
+        self.wake(index)
+
+    def set_velocity(self, index: int, velocity: tuple[float, float]) -> None:
+        self.velocities[index] = velocity
+        self.wake(index)
+
+    def apply_impulse(self, index: int, impulse: tuple[float, float]) -> None:
+        self.velocities[index] += np.asarray(impulse) * self.inverse_masses[index]
+        self.wake(index)
+
+    def step(self, dt: float) -> None:
+        self.contact_batches = []
+        self.contact_list = None
+        self.touching = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+        n = self.count
+        if n == 0:
+            return
+        bodies = np.flatnonzero(self.awake[:n])
+        previous = self.positions[:n].copy()
+        if len(bodies):
+            self.velocities[bodies] = (self.velocities[bodies] + self.gravity * dt) * max(1.0 - self.damping * dt, 0.0)
+            self.sweep(bodies, dt)
+            self.collide_bodies()
+        self.update_sleep(previous, dt)
+        # bodies that moved, including those woken up or put to sleep this step
+        self.sync(np.union1d(bodies, np.flatnonzero(self.awake[:n])))
+
+    # moves the bodies along their velocities, stopping and bouncing at the
+    # first static collider in the way, up to iterations times
+    def sweep(self, bodies: np.ndarray, dt: float) -> None:
+        remaining = np.full(len(bodies), dt)
+        for _ in range(self.iterations):
+            motion = self.velocities[bodies] * remaining[:, None]
+            if len(self.static_min) == 0:
+                self.positions[bodies] += motion
+                return
+            centers = self.positions[bodies] + self.half_sizes[bodies]
+            times, normals, statics = self.time_of_impact(centers, motion, self.half_sizes[bodies], self.radii[bodies])
+            hit = times <= 1.0
+            self.positions[bodies[~hit]] += motion[~hit]
+            if not hit.any():
+                return
+
+            bodies, remaining = bodies[hit], remaining[hit]
+            times, normals, statics, motion = times[hit], normals[hit], statics[hit], motion[hit]
+            # stop just short of the collider
+            travel = np.sqrt((motion * motion).sum(axis=1))
+            self.positions[bodies] += motion * np.maximum(times - SKIN / np.maximum(travel, 1e-12), 0.0)[:, None]
+            # bounce: reflect the velocity along the normal, scaled by the restitution
+            velocities = self.velocities[bodies]
+            along = (velocities * normals).sum(axis=1)
+            restitutions = np.where(along < -self.bounce_speed, self.restitutions[bodies], 0.0)
+            velocities -= ((1.0 + restitutions) * along)[:, None] * normals
+            self.velocities[bodies] = velocities
+            remaining = remaining * (1.0 - times)
+            self.report(bodies, statics, -normals, static=True)
+
+    # earliest collision of each moving body with the static colliders, as
+    # a fraction of its motion (inf when it hits none), the normal of the
+    # collider surface and the collider index
+    def time_of_impact(
+        self,
+        centers: np.ndarray,
+        motion: np.ndarray,
+        half_sizes: np.ndarray,
+        radii: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        count = len(centers)
+        times = np.full(count, np.inf)
+        normals = np.zeros((count, 2))
+        statics = np.zeros(count, dtype=np.int64)
+
+        # (body, collider) pairs whose boxes meet along the whole motion
+        sweep_low = np.minimum(centers, centers + motion) - half_sizes
+        sweep_high = np.maximum(centers, centers + motion) + half_sizes
+        rows, colliders = np.nonzero(
+            ((sweep_low[:, None, :] <= self.static_max[None]) & (sweep_high[:, None, :] >= self.static_min[None])).all(axis=2)
+        )
+        if len(rows) == 0:
+            return times, normals, statics
+
+        # the body centre is cast as a ray against the collider grown by the
+        # body's half size: (pairs, axis) slab test
+        static_min, static_max = self.static_min[colliders], self.static_max[colliders]
+        low = static_min - half_sizes[rows]
+        high = static_max + half_sizes[rows]
+        origin = centers[rows]
+        direction = motion[rows]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t1 = (low - origin) / direction
+            t2 = (high - origin) / direction
+        near = np.minimum(t1, t2)
+        far = np.maximum(t1, t2)
+        # not moving along an axis: within that slab for ever, or never
+        still = direction == 0.0
+        inside = (origin >= low) & (origin <= high)
+        near = np.where(still, np.where(inside, -np.inf, np.inf), near)
+        far = np.where(still, np.where(inside, np.inf, -np.inf), far)
+
+        enter = near.max(axis=1)
+        # bodies already overlapping a collider are left to move out of it
+        hit = (enter <= far.min(axis=1)) & (enter >= 0.0) & (enter <= 1.0)
+        axis = near.argmax(axis=1)
+        pairs = np.arange(len(rows))
+        pair_normals = np.zeros((len(rows), 2))
+        pair_normals[pairs, axis] = -np.sign(direction[pairs, axis])
+
+        # grown boxes have square corners, circles round ones: a circle
+        # entering a corner region hits the circle around the collider corner
+        pair_radii = radii[rows]
+        entry = origin + direction * np.where(hit, enter, 0.0)[:, None]
+        rounded = hit & (pair_radii > 0.0) & ((entry < static_min) | (entry > static_max)).all(axis=1)
+        if rounded.any():
+            corner = np.clip(entry, static_min, static_max)
+            offset = origin - corner
+            a = (direction * direction).sum(axis=1)
+            b = (offset * direction).sum(axis=1)
+            c = (offset * offset).sum(axis=1) - pair_radii * pair_radii
+            discriminant = b * b - a * c
+            with np.errstate(divide="ignore", invalid="ignore"):
+                t = (-b - np.sqrt(np.maximum(discriminant, 0.0))) / a
+            touches = (discriminant >= 0.0) & (t >= 0.0) & (t <= 1.0)
+            hit &= ~rounded | touches
+            enter = np.where(rounded, t, enter)
+            corner_normals = (offset + direction * t[:, None]) / np.maximum(pair_radii, 1e-12)[:, None]
+            pair_normals = np.where(rounded[:, None], corner_normals, pair_normals)
+
+        # the earliest hit of each body
+        rows, enter, pair_normals, colliders = rows[hit], enter[hit], pair_normals[hit], colliders[hit]
+        order = np.lexsort((enter, rows))
+        first = order[np.r_[True, rows[order][1:] != rows[order][:-1]]] if len(order) else order
+        times[rows[first]] = enter[first]
+        normals[rows[first]] = pair_normals[first]
+        statics[rows[first]] = colliders[first]
+        return times, normals, statics
+
+    # separates overlapping bodies, at least one of them awake, and
+    # exchanges their momentum along the contact normal
+    def collide_bodies(self) -> None:
+        n = self.count
+        low = self.positions[:n]
+        high = low + 2.0 * self.half_sizes[:n]
+        # sorted along x, each body is paired with the run of bodies starting
+        # within its own x extent, which covers every overlapping pair once
+        order = np.argsort(low[:, 0], kind="stable")
+        xs = low[order, 0]
+        start = np.arange(1, n + 1)
+        end = np.searchsorted(xs, high[order, 0], "right")
+        counts = np.maximum(end - start, 0)
+        total = int(counts.sum())
+        if total == 0:
+            return
+        ranks = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        a = order[np.repeat(np.arange(n), counts)]
+        b = order[np.repeat(start, counts) + ranks]
+        candidates = (low[a, 1] <= high[b, 1]) & (low[b, 1] <= high[a, 1]) & (self.awake[a] | self.awake[b])
+        a, b = a[candidates], b[candidates]
+        if len(a) == 0:
+            return
+
+        normals, penetrations = self.narrow_phase(a, b)
+        touching = penetrations > 0.0
+        a, b, normals, penetrations = a[touching], b[touching], normals[touching], penetrations[touching]
+        self.touching = (a, b)
+
+        # moving bodies wake the sleeping bodies they touch; bodies resting
+        # against each other don't, so piles fall asleep as a whole
+        moving = self.awake & (self.rest_times == 0.0)
+        woken = np.concatenate([b[moving[a] & ~self.awake[b]], a[moving[b] & ~self.awake[a]]])
+        self.awake[woken] = True
+        self.rest_times[woken] = 0.0
+        # bodies still asleep hold still, like walls
+        inverse_masses = np.where(self.awake, self.inverse_masses, 0.0)
+        weights = inverse_masses[a] + inverse_masses[b]
+        movable = weights > 0.0
+        a, b, normals, penetrations, weights = a[movable], b[movable], normals[movable], penetrations[movable], weights[movable]
+        if len(a) == 0:
+            return
+
+        # every pair is solved at once from the same state: a body touching
+        # several others gets the average of their pushes, not their sum,
+        # which would overshoot and blow piles up
+        contacts = np.bincount(np.concatenate([a, b]), minlength=n).astype(np.float64)
+        share_a = inverse_masses[a] / contacts[a]
+        share_b = inverse_masses[b] / contacts[b]
+
+        # push apart in proportion of the inverse masses
+        correction = normals * (penetrations / weights)[:, None]
+        np.add.at(self.positions, a, -correction * share_a[:, None])
+        np.add.at(self.positions, b, correction * share_b[:, None])
+        # bodies moving towards each other bounce with the lower restitution:
+        # relaxed over a few passes, each starting from the velocities the
+        # previous one left, so that contacts resting on contacts settle
+        closing = ((self.velocities[b] - self.velocities[a]) * normals).sum(axis=1)
+        restitutions = np.where(closing < -self.bounce_speed, np.minimum(self.restitutions[a], self.restitutions[b]), 0.0)
+        separating = -restitutions * np.minimum(closing, 0.0)
+        # the walls bodies lie against take part as immovable bodies, or
+        # piles would keep pushing their bottom row into the ground
+        resting, walls = self.resting_contacts(np.unique(np.concatenate([a, b])))
+        for _ in range(self.iterations):
+            closing = ((self.velocities[b] - self.velocities[a]) * normals).sum(axis=1)
+            impulse = np.maximum(separating - closing, 0.0) / weights
+            np.add.at(self.velocities, a, -normals * (impulse * share_a)[:, None])
+            np.add.at(self.velocities, b, normals * (impulse * share_b)[:, None])
+            into = np.minimum((self.velocities[resting] * walls).sum(axis=1), 0.0)
+            np.add.at(self.velocities, resting, -walls * into[:, None])
+
+        self.report(a, b, normals, static=False)
+        self.report(b, a, -normals, static=False)
+        # separating bodies may push them into walls
+        moved = np.unique(np.concatenate([a, b]))
+        self.push_out(moved[self.awake[moved]])
+
+    # moves bodies overlapping static colliders out along the axis of least
+    # penetration (boxes around circles), stopping them on that axis; one
+    # collider per body at a time, the deepest first, so bodies wedged in
+    # a corner leave each wall through the right side
+    def push_out(self, bodies: np.ndarray) -> None:
+        if len(self.static_min) == 0:
+            return
+        for _ in range(self.iterations):
+            half_sizes = self.half_sizes[bodies][:, None, :]
+            centers = self.positions[bodies][:, None, :] + half_sizes
+            # penetration through each side of each collider: (bodies, colliders, axis)
+            before = centers + half_sizes - self.static_min[None]
+            after = self.static_max[None] - (centers - half_sizes)
+            depth = np.minimum(before, after)
+            least = depth.min(axis=2)
+            overlapping = least > 0.0
+            rows = np.flatnonzero(overlapping.any(axis=1))
+            if len(rows) == 0:
+                return
+            statics = np.where(overlapping[rows], least[rows], -np.inf).argmax(axis=1)
+            depth, before, after = depth[rows, statics], before[rows, statics], after[rows, statics]
+            axis = depth.argmin(axis=1)
+            pairs = np.arange(len(rows))
+            # out through the nearest side
+            sign = np.where(before[pairs, axis] < after[pairs, axis], -1.0, 1.0)
+            bodies = bodies[rows]
+            self.positions[bodies, axis] += sign * (depth[pairs, axis] + SKIN)
+            velocities = self.velocities[bodies, axis]
+            self.velocities[bodies, axis] = np.where(velocities * sign < 0.0, 0.0, velocities)
+
+    # awake bodies touching static colliders (within tolerance) and the
+    # normals of the collider sides they touch, one row per contact
+    def resting_contacts(self, bodies: np.ndarray, tolerance: float = 2 * SKIN) -> tuple[np.ndarray, np.ndarray]:
+        bodies = bodies[self.awake[bodies]]
+        if len(self.static_min) == 0 or len(bodies) == 0:
+            return bodies[:0], np.zeros((0, 2))
+        half_sizes = self.half_sizes[bodies][:, None, :]
+        centers = self.positions[bodies][:, None, :] + half_sizes
+        before = centers + half_sizes - self.static_min[None]
+        after = self.static_max[None] - (centers - half_sizes)
+        depth = np.minimum(before, after)
+        rows, statics = np.nonzero((depth > -tolerance).all(axis=2))
+        depth, before, after = depth[rows, statics], before[rows, statics], after[rows, statics]
+        axis = depth.argmin(axis=1)
+        pairs = np.arange(len(rows))
+        walls = np.zeros((len(rows), 2))
+        walls[pairs, axis] = np.where(before[pairs, axis] < after[pairs, axis], -1.0, 1.0)
+        return bodies[rows], walls
+
+    # contact normals (from a to b) and penetration depths of pairs of bodies
+    def narrow_phase(self, a: np.ndarray, b: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        half_a, half_b = self.half_sizes[a], self.half_sizes[b]
+        radius_a, radius_b = self.radii[a], self.radii[b]
+        delta = (self.positions[b] + half_b) - (self.positions[a] + half_a)
+
+        # boxes: along the axis of least overlap
+        overlap = half_a + half_b - np.abs(delta)
+        axis = overlap.argmin(axis=1)
+        rows = np.arange(len(a))
+        penetrations = overlap[rows, axis]
+        normals = np.zeros_like(delta)
+        normals[rows, axis] = np.where(delta[rows, axis] < 0.0, -1.0, 1.0)
+
+        # circles: along the line between the centres
+        circles = (radius_a > 0.0) & (radius_b > 0.0)
+        distance = np.sqrt((delta * delta).sum(axis=1))
+        concentric = distance == 0.0
+        safe = np.where(concentric, 1.0, distance)
+        normals = np.where((circles & ~concentric)[:, None], delta / safe[:, None], normals)
+        penetrations = np.where(circles, radius_a + radius_b - distance, penetrations)
+
+        # a box and a circle: from the point of the box closest to the circle
+        # centre, unless the centre is inside the box
+        mixed = (radius_a > 0.0) != (radius_b > 0.0)
+        if mixed.any():
+            circle_is_b = radius_b > 0.0
+            sign = np.where(circle_is_b, 1.0, -1.0)[:, None]
+            box_half = np.where(circle_is_b[:, None], half_a, half_b)
+            radius = np.where(circle_is_b, radius_b, radius_a)
+            # circle centre relative to the box centre
+            relative = delta * sign
+            outside = relative - np.clip(relative, -box_half, box_half)
+            gap = np.sqrt((outside * outside).sum(axis=1))
+            apart = mixed & (gap > 0.0)
+            normals = np.where(apart[:, None], outside / np.maximum(gap, 1e-12)[:, None] * sign, normals)
+            penetrations = np.where(apart, radius - gap, penetrations)
+        return normals, penetrations
+
+    # records the contacts of bodies with others, normals pointing from the bodies to the others
+    def report(self, bodies: np.ndarray, others: np.ndarray, normals: np.ndarray, static: bool) -> None:
+        # distance from the body centre to its surface along the normal
+        reach = np.where(self.radii[bodies] > 0.0, self.radii[bodies], (np.abs(normals) * self.half_sizes[bodies]).sum(axis=1))
+        self.contact_batches.append((bodies, others, normals * reach[:, None], static))
+
+    # contacts of the last step; piles touch every step, so they are only
+    # turned into objects when asked for
+    @property
+    def contacts(self) -> list[Contact]:
+        if self.contact_list is None:
+            self.contact_list = []
+            for bodies, others, differences, static in self.contact_batches:
+                for body, other, difference in zip(bodies.tolist(), others.tolist(), differences.tolist()):
+                    difference = glm.vec2(difference)
+                    self.contact_list.append(Contact(body, other, static, Collision(True, vector_direction(difference), difference)))
+        return self.contact_list
+
+    # puts to sleep the bodies that stayed slow for sleep_time; speeds are
+    # measured from the distance moved, bodies pressed against each other
+    # in a pile keep some velocity (gravity is only partly cancelled by
+    # the contacts every step) while going nowhere. Touching bodies fall
+    # asleep together, once all of them are ready: a body left awake on a
+    # sleeping one would be pushed out of it at once and wake it again
+    def update_sleep(self, previous: np.ndarray, dt: float) -> None:
+        n = self.count
+        velocities = self.velocities[:n]
+        awake = self.awake[:n]
+        moved = self.positions[:n] - previous
+        resting = awake & ((moved * moved).sum(axis=1) < (self.sleep_speed * dt) ** 2)
+        rest_times = self.rest_times[:n]
+        rest_times[resting] += dt
+        rest_times[awake & ~resting] = 0.0
+        ready = resting & (rest_times >= self.sleep_time)
+        if not ready.any():
+            return
+
+        a, b = self.touching
+        if len(a):
+            # islands of touching bodies, labelled by their smallest index
+            labels = np.arange(n)
+            while True:
+                merged = labels.copy()
+                np.minimum.at(merged, a, labels[b])
+                np.minimum.at(merged, b, labels[a])
+                merged = merged[merged]
+                if (merged == labels).all():
+                    break
+                labels = merged
+            island_ready = np.ones(n, dtype=bool)
+            np.logical_and.at(island_ready, labels, ready | ~awake)
+            ready &= island_ready[labels]
+        awake[ready] = False
+        velocities[ready] = 0.0
+
+    # copies the state of bodies into their game objects
+    def sync(self, bodies: np.ndarray) -> None:
+        for index in bodies.tolist():
+            go = self.objects[index]
+            if go is not None:
+                go.position = glm.vec2(*self.positions[index])
+                go.velocity = glm.vec2(*self.velocities[index])
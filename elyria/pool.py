@@ -0,0 +1,177 @@
+import glm
+import tracemalloc
+from typing import Callable, Generic, Optional, TypeVar
+from elyria.game_object import GameObject
+from elyria.sprite_renderer import SpriteRenderer
+
+T = TypeVar("T", bound=GameObject)
+
+# vector types whose instances are copied, so pooled objects own them
+VECTOR_TYPES = (glm.vec2, glm.vec3, glm.vec4)
+
+
+# A pool of game objects of one type, for transient entities (projectiles,
+# hit effects, damage numbers, pickups...) created and destroyed all the
+# time. Objects are created up front and recycled: acquire resets a free
+# object in place, through its reset method (see GameObject.reset), with
+# the given arguments; nothing is allocated once the pool is warm.
+#
+# An active object dies by being released, or by having its destroyed flag
+# set anywhere in the game code: collect returns those to the pool.
+# When the pool runs out, it grows (counted in created), or acquire
+# returns None if grow is False.
+class ObjectPool(Generic[T]):
+    def __init__(self, factory: Callable[[], T], capacity: int, grow: bool = True):
+        self.factory = factory
+        self.grow = grow
+        self.active: list[T] = []
+        self.free: list[T] = []
+
+        # statistics
+        self.created = 0
+        self.acquired = 0
+        self.exhausted = 0
+
+        for _ in range(capacity):
+            self.free.append(self.create())
+
+    def create(self) -> T:
+        obj = self.factory()
+        # default arguments share their vectors between instances, and the
+        # pooled objects are reset in place: give each its own
+        for name, value in vars(obj).items():
+            if isinstance(value, VECTOR_TYPES):
+                setattr(obj, name, type(value)(value))
+        obj.destroyed = True
+        self.created += 1
+        return obj
+
+    # a free object reset with the given arguments, or None when the pool
+    # is exhausted and does not grow
+    def acquire(self, *args) -> Optional[T]:
+        if self.free:
+            obj = self.free.pop()
+        elif self.grow:
+            obj = self.create()
+        else:
+            self.exhausted += 1
+            return None
+        obj.reset(*args)
+        obj.destroyed = False
+        self.active.append(obj)
+        self.acquired += 1
+        return obj
+
+    # marks an object destroyed; it returns to the pool on the next collect
+    def release(self, obj: T) -> None:
+        obj.destroyed = True
+
+    # returns the destroyed objects to the pool, keeping the order of the others
+    def collect(self) -> int:
+        count = len(self.active)
+        self.free.extend([obj for obj in self.active if obj.destroyed])
+        self.active = [obj for obj in self.active if not obj.destroyed]
+        return count - len(self.active)
+
+    # releases every active object
+    def clear(self) -> None:
+        for obj in self.active:
+            obj.destroyed = True
+        self.collect()
+
+    def update(self, dt: float) -> None:
+        for obj in self.active:
+            if not obj.destroyed:
+                obj.update(dt)
+
+    def draw(self, renderer: SpriteRenderer) -> None:
+        for obj in self.active:
+            if not obj.destroyed:
+                obj.draw(renderer)
+
+    def __len__(self) -> int:
+        return len(self.active)
+
+
+# Debug instrumentation of the allocations of each frame, through
+# tracemalloc (which slows everything down while tracing). At the end of
+# every frame, the memory blocks still alive that were allocated during the
+# frame are counted per source line: in a steady state, nothing should be
+# left over. The cyclic GC is driven by exactly that (objects allocated and
+# not yet freed), and so is memory growth. The peak of transient memory
+# (allocated and freed within the frame) is recorded too.
+class AllocationTracker:
+    def __init__(self, top: int = 10, depth: int = 1):
+        self.top = top
+        self.depth = depth
+        self.snapshot: Optional[tracemalloc.Snapshot] = None
+        self.frame_start_memory = 0
+
+        # per frame: blocks and bytes left over, peak of transient bytes
+        self.blocks: list[int] = []
+        self.sizes: list[int] = []
+        self.peaks: list[int] = []
+        # (file, line) -> [blocks, bytes] left over, over all frames
+        self.sites: dict[tuple[str, int], list[int]] = {}
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.depth)
+        # the first snapshots compile and cache the filters, which must not
+        # count as allocations of the first frame
+        self.take_snapshot().compare_to(self.take_snapshot(), "lineno")
+        self.snapshot = self.take_snapshot()
+        self.frame_start_memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+    def take_snapshot(self) -> tracemalloc.Snapshot:
+        # leave out the snapshots and the tracker's own bookkeeping
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__)
+        ])
+
+    def end_frame(self) -> None:
+        if self.snapshot is None:
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        self.peaks.append(max(peak - self.frame_start_memory, 0))
+
+        snapshot = self.take_snapshot()
+        blocks = size = 0
+        for stat in snapshot.compare_to(self.snapshot, "lineno"):
+            if stat.count_diff <= 0:
+                continue
+            blocks += stat.count_diff
+            size += stat.size_diff
+            frame = stat.traceback[0]
+            site = self.sites.setdefault((frame.filename, frame.lineno), [0, 0])
+            site[0] += stat.count_diff
+            site[1] += max(stat.size_diff, 0)
+        self.blocks.append(blocks)
+        self.sizes.append(size)
+
+        self.snapshot = snapshot
+        self.frame_start_memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+    def stop(self) -> None:
+        self.snapshot = None
+        tracemalloc.stop()
+
+    # the source lines that left the most blocks over, most first
+    def top_sites(self) -> list[tuple[str, int, int, int]]:
+        sites = sorted(self.sites.items(), key=lambda item: item[1][0], reverse=True)
+        return [(filename, line, blocks, size) for (filename, line), (blocks, size) in sites[:self.top]]
+
+    def summary(self) -> str:
+        if not self.blocks:
+            return "no frame tracked"
+        frames = len(self.blocks)
+        lines = [
+            f"{frames} frames: {sum(self.blocks) / frames:.1f} blocks ({sum(self.sizes) / frames:.0f} bytes) left over per frame, "
+            f"worst {max(self.blocks)}; transient peak {sum(self.peaks) / frames:.0f} bytes per frame, worst {max(self.peaks)}"
+        ]
+        for filename, line, blocks, size in self.top_sites():
+            lines.append(f"  {filename}:{line}: {blocks} blocks, {size} bytes")
+        return "\n".join(lines)
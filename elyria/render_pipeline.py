@@ -0,0 +1,193 @@
+import time
+import glm
+import numpy as np
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+from elyria.shader import Shader
+from elyria.texture2d import Texture2D
+from elyria.sprite_renderer import SpriteRenderer
+
+# per recorded sprite: position, size, rotation, color, texture coordinates (u0, v0, u1, v1), palette row (-1 for none)
+SPRITE_RECORD_SIZE = 13
+
+# uniform setter of the Shader for each type of value
+UNIFORM_SETTERS = {
+    bool: "set_bool",
+    int: "set_int",
+    float: "set_float",
+    glm.vec2: "set_vec2",
+    glm.vec3: "set_vec3",
+    glm.vec4: "set_vec4",
+    glm.mat2: "set_mat2",
+    glm.mat3: "set_mat3",
+    glm.mat4: "set_mat4"
+}
+
+
+# A frame's draw commands recorded without any GL call, to be replayed
+# later on the GL thread. It has the drawing methods of SpriteRenderer, so
+# a GameObject draws itself into it the same way (go.draw(draw_list)).
+#
+# Sprites are copied into a numpy array as they are recorded (with the
+# texture they use), uniforms are copied too: once recorded, the list
+# doesn't depend on the game state anymore. Anything else that must run on
+# the GL thread (particles, cached layers...) is recorded as a call, run
+# in order at replay time.
+class DrawList:
+    def __init__(self, capacity: int = 1024):
+        self.sprites = np.zeros((capacity, SPRITE_RECORD_SIZE), dtype=np.float32)
+        self.textures: list[Texture2D] = []
+        self.count = 0
+        # in order: (None, (first, end)) for a range of sprites, (function, args) for a call
+        self.commands: list[tuple[Optional[Callable], Any]] = []
+
+    def draw_sprite(
+        self,
+        texture: Texture2D,
+        position: glm.vec2,
+        size: glm.vec2 = glm.vec2(10.0, 10.0),
+        rotate: float = 0.0,
+        color: glm.vec3 = glm.vec3(1.0),
+        palette: Optional[int] = None
+    ) -> None:
+        self.add(texture, position, size, rotate, color, 0.0, 0.0, 1.0, 1.0, palette)
+
+    def draw_subsprite(
+        self,
+        texture: Texture2D,
+        position: glm.vec2,
+        size: glm.vec2 = glm.vec2(10.0, 10.0),
+        rotate: float = 0.0,
+        color: glm.vec3 = glm.vec3(1.0),
+        tex_coords: tuple[int, int, int, int] = [0, 0, 0, 0],
+        palette: Optional[int] = None
+    ) -> None:
+        tex_x, tex_y, tex_w, tex_h = tex_coords
+        tex_width, tex_height = texture.width, texture.height
+        self.add(
+            texture, position, size, rotate, color,
+            tex_x / tex_width, tex_y / tex_height, (tex_x + tex_w) / tex_width, (tex_y + tex_h) / tex_height,
+            palette
+        )
+
+    def add(
+        self,
+        texture: Texture2D,
+        position: glm.vec2,
+        size: glm.vec2,
+        rotate: float,
+        color: glm.vec3,
+        u0: float, v0: float, u1: float, v1: float,
+        palette: Optional[int] = None
+    ) -> None:
+        if self.count == len(self.sprites):
+            self.sprites = np.concatenate((self.sprites, np.zeros_like(self.sprites)))
+        self.sprites[self.count] = (
+            position.x, position.y, size.x, size.y, rotate, color.x, color.y, color.z,
+            u0, v0, u1, v1, palette if palette is not None else -1
+        )
+        self.textures.append(texture)
+        self.count += 1
+
+        # consecutive sprites share one command
+        if self.commands and self.commands[-1][0] is None:
+            self.commands[-1] = (None, (self.commands[-1][1][0], self.count))
+        else:
+            self.commands.append((None, (self.count - 1, self.count)))
+
+    # records a call run on the GL thread at replay time; it must not read
+    # state the simulation changes, which is already one frame ahead then
+    def call(self, function: Callable, *args) -> None:
+        self.commands.append((function, args))
+
+    # records a uniform of shader, its value copied now
+    def uniform(self, shader: Shader, name: str, value: Any) -> None:
+        setter = UNIFORM_SETTERS[type(value)]
+        if isinstance(value, (glm.vec2, glm.vec3, glm.vec4, glm.mat2, glm.mat3, glm.mat4)):
+            value = type(value)(value)
+        self.call(self.set_uniform, shader, setter, name, value)
+
+    @staticmethod
+    def set_uniform(shader: Shader, setter: str, name: str, value: Any) -> None:
+        shader.use()
+        getattr(shader, setter)(name, value)
+
+    # nothing to do while recording: replay flushes the renderer before every call
+    def flush(self) -> None:
+        pass
+
+    def replay(self, renderer: SpriteRenderer) -> None:
+        for function, args in self.commands:
+            if function is not None:
+                # the sprites replayed so far are drawn before whatever the call draws
+                renderer.flush()
+                function(*args)
+                continue
+            first, end = args
+            for texture, (x, y, w, h, rotate, r, g, b, u0, v0, u1, v1, palette) in zip(self.textures[first:end], self.sprites[first:end].tolist()):
+                renderer.draw_quad(
+                    texture, glm.vec2(x, y), glm.vec2(w, h), rotate, glm.vec3(r, g, b), (u0, v0, u1, v1),
+                    int(palette) if palette >= 0 else None
+                )
+
+    def clear(self) -> None:
+        self.count = 0
+        self.textures.clear()
+        self.commands.clear()
+
+    def __len__(self) -> int:
+        return len(self.commands)
+
+
+# Pipelined update and render: while the GL thread replays the draw list
+# recorded for frame N, a worker thread runs the input, update and
+# recording of frame N+1 (game.process_input, game.update, game.record).
+# The two draw lists are double-buffered: the worker only writes the back
+# one, the GL thread only reads the front one, and they swap in wait, once
+# the worker is done. The frame is displayed one frame late, in exchange
+# for a frame time closer to max(update, render) than their sum, as far as
+# the two overlap: NumPy and the GL calls (through ctypes) release the GIL,
+# pure Python code doesn't.
+class RenderPipeline:
+    def __init__(self, game):
+        self.game = game
+        self.draw_lists = [DrawList(), DrawList()]
+        self.front = 0
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="simulation")
+        self.pending: Optional[Future] = None
+        # duration of the last simulated frame (input, update and recording)
+        self.update_time = 0.0
+
+    # the draw list of the last simulated frame, to replay
+    @property
+    def draw_list(self) -> DrawList:
+        return self.draw_lists[self.front]
+
+    # starts simulating the next frame on the worker
+    def submit(self, dt: float) -> None:
+        self.wait()
+        back = self.draw_lists[1 - self.front]
+        back.clear()
+        self.pending = self.executor.submit(self.simulate, dt, back)
+
+    def simulate(self, dt: float, draw_list: DrawList) -> float:
+        start = time.perf_counter()
+        self.game.process_input(dt)
+        self.game.update(dt)
+        self.game.scripts.update(dt)
+        self.game.record(draw_list)
+        return time.perf_counter() - start
+
+    # waits for the simulated frame (raising its exception, if any) and makes its draw list the front one
+    def wait(self) -> None:
+        if self.pending is None:
+            return
+        pending, self.pending = self.pending, None
+        self.update_time = pending.result()
+        self.front = 1 - self.front
+
+    def close(self) -> None:
+        try:
+            self.wait()
+        finally:
+            self.executor.shutdown(wait=True)
@@ -0,0 +1,305 @@
+import ctypes
+import functools
+import importlib
+import re
+import zlib
+import numpy as np
+from collections import defaultdict
+from OpenGL.GL import *
+from typing import Callable, Optional
+
+# engine modules whose GL calls are counted and traced
+INSTRUMENTED_MODULES = [
+    "elyria.sprite_renderer",
+    "elyria.sprite_batch",
+    "elyria.layer_cache",
+    "elyria.particle",
+    "elyria.gpu_particles",
+    "elyria.text_renderer",
+    "elyria.glyph_atlas",
+    "elyria.post_processor",
+    "elyria.shader",
+    "elyria.texture2d",
+    "elyria.stream_buffer",
+    "elyria.game",
+    "elyria.core"
+]
+
+# (module, class, methods, subsystem): GL calls made while one of these
+# methods runs are counted for the subsystem; the innermost one wins
+SECTIONS = [
+    ("elyria.sprite_renderer", "SpriteRenderer", ("draw_quad",), "sprites"),
+    ("elyria.sprite_batch", "SpriteBatch", ("flush",), "sprites"),
+    ("elyria.layer_cache", "Layer", ("render",), "layers"),
+    ("elyria.particle", "ParticleGenerator", ("update", "draw"), "particles"),
+    ("elyria.gpu_particles", "GPUParticleGenerator", ("update", "draw"), "particles"),
+    ("elyria.text_renderer", "TextRenderer", ("load", "warm_up", "render_text"), "text"),
+    ("elyria.post_processor", "PostProcessor", ("begin_render", "end_render", "render"), "post")
+]
+
+# counters, in report order
+COUNTERS = [
+    "draw_calls",
+    "vertices",
+    "program_binds",
+    "texture_binds",
+    "vao_binds",
+    "uniforms",
+    "buffers_created",
+    "bytes_uploaded",
+    "framebuffer_binds"
+]
+
+# components read behind the pointer of glUniform*v calls, for the trace
+UNIFORM_VECTOR = re.compile(r"glUniform(Matrix)?([234])[fi]v$")
+
+
+# counts of one GL call, added to the counters of the current subsystem
+def count_call(counters: dict, name: str, args: tuple) -> None:
+    if name == "glDrawArrays":
+        counters["draw_calls"] += 1
+        counters["vertices"] += int(args[2])
+    elif name == "glDrawArraysInstanced":
+        counters["draw_calls"] += 1
+        counters["vertices"] += int(args[2]) * int(args[3])
+    elif name == "glDrawElements":
+        counters["draw_calls"] += 1
+        counters["vertices"] += int(args[1])
+    elif name == "glDrawElementsInstanced":
+        counters["draw_calls"] += 1
+        counters["vertices"] += int(args[1]) * int(args[4])
+    elif name == "glUseProgram":
+        counters["program_binds"] += 1
+    elif name == "glBindTexture":
+        counters["texture_binds"] += 1
+    elif name == "glBindVertexArray":
+        counters["vao_binds"] += 1
+    elif name.startswith("glUniform"):
+        counters["uniforms"] += 1
+    elif name in ("glGenBuffers", "glCreateBuffers"):
+        counters["buffers_created"] += int(args[0])
+    elif name == "glBufferData":
+        if len(args) > 2 and args[2] is not None:
+            counters["bytes_uploaded"] += int(args[1])
+    elif name == "glBufferSubData":
+        counters["bytes_uploaded"] += int(args[2])
+    elif name in ("glTexImage2D", "glTexSubImage2D", "glTexImage3D", "glTexSubImage3D"):
+        data = args[-1]
+        if isinstance(data, np.ndarray):
+            counters["bytes_uploaded"] += data.nbytes
+        elif isinstance(data, (bytes, bytearray)):
+            counters["bytes_uploaded"] += len(data)
+    elif name == "glBindFramebuffer":
+        counters["framebuffer_binds"] += 1
+
+
+# a call argument written the same way from one run to the next
+def format_arg(value) -> str:
+    if hasattr(value, "name") and isinstance(value, int):
+        return value.name
+    if isinstance(value, (bool, int, np.integer)) or value is None:
+        return str(value)
+    if isinstance(value, (float, np.floating)):
+        return f"{float(value):.6g}"
+    if isinstance(value, np.ndarray):
+        return f"array({value.dtype}, {value.shape}, crc={zlib.crc32(np.ascontiguousarray(value).tobytes()):08x})"
+    if isinstance(value, (bytes, bytearray)):
+        return f"bytes({len(value)}, crc={zlib.crc32(value):08x})"
+    if isinstance(value, ctypes.c_void_p):
+        return f"c_void_p({value.value or 0})"
+    if isinstance(value, str):
+        return repr(value)
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(format_arg(v) for v in value) + "]"
+    return type(value).__name__
+
+
+def format_call(name: str, args: tuple) -> str:
+    parts = [format_arg(arg) for arg in args]
+    # vector and matrix uniforms: the values behind the pointer
+    match = UNIFORM_VECTOR.match(name)
+    if match and len(args) >= 3 and isinstance(args[-1], ctypes._Pointer):
+        size = int(match.group(2)) ** (2 if match.group(1) else 1) * int(args[1])
+        element = ctypes.c_float if name.endswith("fv") else ctypes.c_int
+        values = ctypes.cast(args[-1], ctypes.POINTER(element))[:size]
+        parts[-1] = "[" + ", ".join(format_arg(v) for v in values) + "]"
+    return f"{name}({', '.join(parts)})"
+
+
+# Instrumentation of the renderer, for finding out why a frame is
+# expensive. Once installed, the GL functions used by the engine modules
+# and the entry points of each subsystem (sprites, layers, particles, text,
+# post) are wrapped: every frame counts draw calls and vertices, program,
+# texture, VAO and framebuffer binds, uniform uploads, buffer creations and
+# bytes uploaded (buffer data, textures, streamed vertices) per subsystem.
+# Calls made outside of a subsystem are counted as "other".
+#
+# debug_output captures the driver's debug messages through
+# glDebugMessageCallback (GL 4.3 / KHR_debug, best in a debug context, see
+# create_window). trace_path writes every GL call of frame trace_frame,
+# with its arguments, to a file that can be diffed between builds.
+#
+# Nothing is wrapped until install, and uninstall restores everything.
+class RenderStats:
+    def __init__(
+        self,
+        debug_output: bool = False,
+        trace_path: Optional[str] = None,
+        trace_frame: int = 1,
+        modules: Optional[list[str]] = None,
+        sections: Optional[list[tuple[str, str, tuple[str, ...], str]]] = None
+    ):
+        self.debug_output = debug_output
+        self.trace_path = trace_path
+        self.trace_frame = trace_frame
+        self.modules = modules if modules is not None else INSTRUMENTED_MODULES
+        self.sections = sections if sections is not None else SECTIONS
+
+        self.frame = 0
+        # subsystem -> counter -> value, for the current frame, the last one and all frames
+        self.current: dict[str, dict[str, int]] = self.new_counters()
+        self.last_frame: dict[str, dict[str, int]] = {}
+        self.totals: dict[str, dict[str, int]] = self.new_counters()
+        # subsystems of the sections being run, innermost last
+        self.stack: list[str] = []
+        # calls of the traced frame
+        self.trace: Optional[list[str]] = None
+        # (frame, subsystem, source, type, id, severity, message)
+        self.debug_messages: list[tuple[int, str, int, int, int, int, str]] = []
+        self.debug_callback = None
+
+        # (owner, name, original) of everything wrapped
+        self.patches: list[tuple[object, str, object]] = []
+
+    @staticmethod
+    def new_counters() -> dict[str, dict[str, int]]:
+        return defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+
+    @property
+    def subsystem(self) -> str:
+        return self.stack[-1] if self.stack else "other"
+
+    def install(self) -> None:
+        if self.patches:
+            return
+        for module_name in self.modules:
+            module = importlib.import_module(module_name)
+            for name, value in list(vars(module).items()):
+                if name.startswith("gl") and not name.startswith("glfw") and callable(value) and not isinstance(value, type):
+                    self.patch(module, name, self.wrap_call(name, value))
+        for module_name, class_name, methods, subsystem in self.sections:
+            cls = getattr(importlib.import_module(module_name), class_name)
+            for method in methods:
+                if method in vars(cls):
+                    self.patch(cls, method, self.wrap_section(vars(cls)[method], subsystem))
+
+        # streamed vertices are written through a mapping, not a GL call
+        stream_buffer = importlib.import_module("elyria.stream_buffer")
+        self.patch(stream_buffer.StreamBuffer, "allocate", self.wrap_stream(stream_buffer.StreamBuffer.allocate))
+
+        if self.trace_path and self.trace_frame == self.frame:
+            self.trace = []
+        if self.debug_output:
+            self.enable_debug_output()
+
+    def patch(self, owner: object, name: str, replacement: object) -> None:
+        self.patches.append((owner, name, getattr(owner, name)))
+        setattr(owner, name, replacement)
+
+    def uninstall(self) -> None:
+        if self.debug_callback is not None:
+            glDebugMessageCallback(GLDEBUGPROC(0), None)
+            glDisable(GL_DEBUG_OUTPUT)
+            self.debug_callback = None
+        for owner, name, original in reversed(self.patches):
+            setattr(owner, name, original)
+        self.patches.clear()
+
+    def wrap_call(self, name: str, function: Callable) -> Callable:
+        stats = self
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            count_call(stats.current[stats.subsystem], name, args)
+            if stats.trace is not None:
+                stats.trace.append(f"[{stats.subsystem}] {format_call(name, args)}")
+            return function(*args, **kwargs)
+        return wrapper
+
+    def wrap_section(self, method: Callable, subsystem: str) -> Callable:
+        stack = self.stack
+
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            stack.append(subsystem)
+            try:
+                return method(*args, **kwargs)
+            finally:
+                stack.pop()
+        return wrapper
+
+    def wrap_stream(self, allocate: Callable) -> Callable:
+        stats = self
+
+        @functools.wraps(allocate)
+        def wrapper(buffer, data, *args, **kwargs):
+            stats.current[stats.subsystem]["bytes_uploaded"] += data.nbytes
+            if stats.trace is not None:
+                stats.trace.append(f"[{stats.subsystem}] stream({format_arg(data)})")
+            return allocate(buffer, data, *args, **kwargs)
+        return wrapper
+
+    def enable_debug_output(self) -> None:
+        if not bool(glDebugMessageCallback):
+            print("ERROR::RENDER_STATS: glDebugMessageCallback is not supported")
+            return
+
+        def callback(source, message_type, message_id, severity, length, message, user_param):
+            text = ctypes.string_at(message, length).decode(errors="replace")
+            self.debug_messages.append((self.frame, self.subsystem, int(source), int(message_type), int(message_id), int(severity), text))
+            if message_type == GL_DEBUG_TYPE_ERROR:
+                print(f"ERROR::GL: [{self.subsystem}] {text}")
+
+        # kept alive as long as the driver may call it
+        self.debug_callback = GLDEBUGPROC(callback)
+        glEnable(GL_DEBUG_OUTPUT)
+        glEnable(GL_DEBUG_OUTPUT_SYNCHRONOUS)
+        glDebugMessageCallback(self.debug_callback, None)
+
+    # to call after the frame is swapped
+    def end_frame(self) -> None:
+        for subsystem, counters in self.current.items():
+            total = self.totals[subsystem]
+            for counter, value in counters.items():
+                total[counter] += value
+        self.last_frame = dict(self.current)
+        self.current = self.new_counters()
+
+        if self.trace is not None:
+            with open(self.trace_path, "w") as file:
+                file.write("\n".join(self.trace) + "\n")
+            self.trace = None
+        self.frame += 1
+        if self.trace_path and self.trace_frame == self.frame:
+            self.trace = []
+
+    # counters of the last frame (all subsystems if None)
+    def frame_counters(self, subsystem: Optional[str] = None) -> dict[str, int]:
+        if subsystem is not None:
+            return dict(self.last_frame.get(subsystem, dict.fromkeys(COUNTERS, 0)))
+        counters = dict.fromkeys(COUNTERS, 0)
+        for values in self.last_frame.values():
+            for counter, value in values.items():
+                counters[counter] += value
+        return counters
+
+    def summary(self) -> str:
+        frames = max(self.frame, 1)
+        header = "per frame".ljust(12) + "".join(counter.rjust(18) for counter in COUNTERS)
+        lines = [header]
+        for subsystem in sorted(self.totals):
+            values = self.totals[subsystem]
+            lines.append(subsystem.ljust(12) + "".join(f"{values[counter] / frames:18.1f}" for counter in COUNTERS))
+        if self.debug_messages:
+            lines.append(f"{len(self.debug_messages)} GL debug messages")
+        return "\n".join(lines)
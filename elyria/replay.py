@@ -0,0 +1,177 @@
+import os
+import random
+import struct
+import zlib
+import numpy as np
+from typing import Optional
+from elyria.game_object import GameObject
+
+
+# file layout: a small uncompressed header followed by a zlib-compressed
+# stream of frames. Each frame stores its delta time and the key events
+# that were polled during that frame, in the order GLFW reported them.
+REPLAY_MAGIC = b"ELRP"
+REPLAY_VERSION = 1
+HEADER = struct.Struct("<4sHQI")  # magic, version, seed, frame count
+FRAME = struct.Struct("<fH")      # delta time, event count
+EVENT = struct.Struct("<hB")      # key, action
+
+
+# seeds every random number generator the engine and games rely on
+def seed_rng(seed: int) -> None:
+    random.seed(seed)
+    np.random.seed(seed & 0xFFFFFFFF)
+
+
+# Captures a play session (RNG seed, dt sequence and input events)
+# so it can be replayed frame by frame later on.
+class Recorder:
+    def __init__(self, seed: Optional[int] = None):
+        self.seed = seed if seed is not None else int.from_bytes(os.urandom(8), "little")
+        self.frames: list[tuple[float, list[tuple[int, int]]]] = []
+        self.pending: list[tuple[int, int]] = []
+
+    # stores a key event for the frame currently being polled
+    def record_event(self, key: int, action: int) -> None:
+        self.pending.append((key, action))
+
+    # closes the current frame and returns its delta time rounded to the
+    # stored precision, so the live run simulates exactly what gets replayed
+    def end_frame(self, dt: float) -> float:
+        dt = FRAME.unpack(FRAME.pack(dt, 0))[0]
+        self.frames.append((dt, self.pending))
+        self.pending = []
+        return dt
+
+    def save(self, path: str) -> None:
+        body = bytearray()
+        for dt, events in self.frames:
+            body += FRAME.pack(dt, len(events))
+            for key, action in events:
+                body += EVENT.pack(key, action)
+
+        with open(path, "wb") as file:
+            file.write(HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, self.seed, len(self.frames)))
+            file.write(zlib.compress(bytes(body), 9))
+
+
+# Feeds a recorded session back to the main loop, one frame at a time.
+class Replayer:
+    def __init__(self, seed: int, frames: list[tuple[float, list[tuple[int, int]]]]):
+        self.seed = seed
+        self.frames = frames
+        self.current = 0
+
+    @staticmethod
+    def load(path: str) -> "Replayer":
+        with open(path, "rb") as file:
+            data = file.read()
+
+        magic, version, seed, count = HEADER.unpack_from(data, 0)
+        if magic != REPLAY_MAGIC:
+            raise ValueError(f"{path} is not a replay file")
+        if version != REPLAY_VERSION:
+            raise ValueError(f"unsupported replay version {version} in {path}")
+
+        body = zlib.decompress(data[HEADER.size:])
+        frames = []
+        offset = 0
+        for _ in range(count):
+            dt, event_count = FRAME.unpack_from(body, offset)
+            offset += FRAME.size
+            events = []
+            for _ in range(event_count):
+                events.append(EVENT.unpack_from(body, offset))
+                offset += EVENT.size
+            frames.append((dt, events))
+
+        return Replayer(seed, frames)
+
+    @property
+    def finished(self) -> bool:
+        return self.current >= len(self.frames)
+
+    # returns the delta time and key events of the next recorded frame
+    def next_frame(self) -> tuple[float, list[tuple[int, int]]]:
+        frame = self.frames[self.current]
+        self.current += 1
+        return frame
+
+
+# Frame-time statistics gathered while replaying a session. Times are
+# stored in seconds and reported in milliseconds.
+class FrameTimeReport:
+    def __init__(self, frame_times: list[float], checksums: Optional[list[int]] = None, worst_count: int = 10):
+        self.frame_times = np.asarray(frame_times, dtype=np.float64)
+        self.checksums = checksums or []
+        self.worst_count = worst_count
+
+    @property
+    def mean(self) -> float:
+        return float(self.frame_times.mean()) * 1000.0 if len(self.frame_times) else 0.0
+
+    def percentile(self, p: float) -> float:
+        return float(np.percentile(self.frame_times, p)) * 1000.0 if len(self.frame_times) else 0.0
+
+    # standard deviation of the frame times, in milliseconds
+    @property
+    def stddev(self) -> float:
+        return float(self.frame_times.std()) * 1000.0 if len(self.frame_times) else 0.0
+
+    # mean change of frame time from one frame to the next, in milliseconds:
+    # what shows as stutter, where the deviation also counts slow drifts
+    @property
+    def jitter(self) -> float:
+        return float(np.abs(np.diff(self.frame_times)).mean()) * 1000.0 if len(self.frame_times) > 1 else 0.0
+
+    # returns the slowest frames as (frame index, milliseconds), slowest first
+    def worst_frames(self) -> list[tuple[int, float]]:
+        order = np.argsort(self.frame_times)[::-1][:self.worst_count]
+        return [(int(i), float(self.frame_times[i]) * 1000.0) for i in order]
+
+    def to_dict(self) -> dict:
+        return {
+            "frames": len(self.frame_times),
+            "mean_ms": self.mean,
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "stddev_ms": self.stddev,
+            "jitter_ms": self.jitter,
+            "worst_frames": self.worst_frames(),
+            "checksums": self.checksums
+        }
+
+    def summary(self) -> str:
+        lines = [
+            f"frames: {len(self.frame_times)}",
+            f"mean:   {self.mean:.3f} ms",
+            f"p95:    {self.percentile(95):.3f} ms",
+            f"p99:    {self.percentile(99):.3f} ms",
+            f"stddev: {self.stddev:.3f} ms",
+            f"jitter: {self.jitter:.3f} ms",
+            "worst frames:"
+        ]
+        for index, ms in self.worst_frames():
+            lines.append(f"  #{index}: {ms:.3f} ms")
+        if self.checksums:
+            lines.append(f"final checksum: {self.checksums[-1]:08x}")
+        return "\n".join(lines)
+
+
+# computes a CRC32 over the simulation-relevant state of every game object,
+# so two replays of the same session can be compared frame by frame
+def state_checksum(game_objects: list[GameObject]) -> int:
+    crc = 0
+    for go in game_objects:
+        frame = go.animation.frame if go.animation else 0.0
+        data = struct.pack(
+            "<8f?",
+            go.position.x, go.position.y,
+            go.rotation,
+            go.velocity.x, go.velocity.y,
+            go.size.x, go.size.y,
+            frame,
+            go.destroyed
+        )
+        crc = zlib.crc32(data, crc)
+    return crc
@@ -1,11 +1,49 @@
 import numpy as np
+from collections import OrderedDict
 from OpenGL.GL import *
 from pygame import mixer
 from PIL import Image
-from elyria.texture2d import Texture2D
+from elyria.texture2d import Texture2D, TextureArray
+from elyria.palette import PaletteTexture, index_image, map_to_palette, pack_colors
 from elyria.animation import Animation
 from elyria.shader import Shader
-from typing import Optional
+from elyria.audio import MusicTrack, SoundEffect, MusicPlayer, SoundPool
+from typing import Optional, Any
+
+
+# bytes per texel of the texture formats the manager creates
+BYTES_PER_PIXEL = {
+    GL_RED: 1,
+    GL_R8: 1,
+    GL_RGB: 3,
+    GL_RGB8: 3,
+    GL_RGBA: 4,
+    GL_RGBA8: 4
+}
+
+
+# A counted reference to a stored resource. While at least one handle on a
+# resource is alive, the resource is never evicted; get() always returns the
+# resource, transparently reloading it if it was evicted in the meantime.
+class ResourceHandle:
+    def __init__(self, category: str, name: str):
+        self.category = category
+        self.name = name
+        self.released = False
+
+    def get(self) -> Any:
+        return ResourceManager.get(self.category, self.name)
+
+    def release(self) -> None:
+        if not self.released:
+            self.released = True
+            ResourceManager.release(self.category, self.name)
+
+    def __enter__(self) -> Any:
+        return self.get()
+
+    def __exit__(self, *args) -> None:
+        self.release()
 
 
 class ResourceManager:
@@ -13,15 +51,46 @@ class ResourceManager:
     shaders: dict[str, Shader] = {}
     textures: dict[str, Texture2D] = {}
     animations: dict[str, Animation] = {}
-    audios: dict[str, mixer.Sound] = {}
+    musics: dict[str, MusicTrack] = {}
+    sounds: dict[str, SoundEffect] = {}
+
+    # audio playback
+    music_player: MusicPlayer = MusicPlayer()
+    sound_pool: Optional[SoundPool] = None
+
+    # reference counting and eviction, keyed by (category, name) where
+    # category is the name of one of the storage dicts above
+    references: dict[tuple[str, str], int] = {}
+    dependencies: dict[tuple[str, str], list[tuple[str, str]]] = {}
+    lru: OrderedDict[tuple[str, str], None] = OrderedDict()
+    texture_sources: dict[str, tuple[str, bool]] = {}
+    budget: Optional[int] = None  # in bytes, no eviction if None
+    # running memory totals: bytes held per category and per resource
+    usage: dict[str, int] = {category: 0 for category in ("shaders", "textures", "animations", "musics", "sounds")}
+    sizes: dict[tuple[str, str], int] = {}
+    # set when there is no GL context (e.g. simulation workers): textures
+    # only read their image size and shaders are not compiled
+    headless: bool = False
+    # puts textures loaded from files into texture arrays, grouped by format
+    # and size, so that a SpriteBatch draws sprites of different sheets at
+    # once; a texture without a same-sized peer stays a texture of its own
+    texture_arrays: bool = False
+    # layers of the biggest texture array, the driver's limit applies too
+    max_array_layers: int = 64
+    arrays: dict[tuple[int, int, int], list[TextureArray]] = {}
+    # palettes of the indexed textures, and palette rows by name (see load_palette)
+    palettes: PaletteTexture = PaletteTexture()
+    palette_rows: dict[str, int] = {}
 
     # loads (and generates) a shader program from file loading 
     # vertex, fragment (and geometry) shader's source code.
     # If gShaderFile is not nullptr, it also loads a 
     # geometry shader
     @staticmethod
-    def load_shader(name: str, v_shader_file: str, f_shader_file: str, g_shader_file: Optional[str] = None) -> Shader:
-        ResourceManager.shaders[name] = ResourceManager.load_shader_from_file(v_shader_file, f_shader_file, g_shader_file)
+    def load_shader(name: str, v_shader_file: str, f_shader_file: str, g_shader_file: Optional[str] = None, varyings: Optional[list[str]] = None) -> Shader:
+        if ResourceManager.headless:
+            return None
+        ResourceManager.shaders[name] = ResourceManager.load_shader_from_file(v_shader_file, f_shader_file, g_shader_file, varyings)
         return ResourceManager.shaders[name]
 
     # retrieves a stored shader
@@ -29,35 +98,367 @@ class ResourceManager:
     def get_shader(name: str) -> Optional[Shader]:
         return ResourceManager.shaders.get(name)
 
-    # loads (and generates) a texture from file
+    # loads (and generates) a texture from file; an indexed texture stores
+    # palette indices and its colors as a row of palettes (see PaletteTexture)
+    @staticmethod
+    def load_texture(file: str, alpha: bool, name: str, indexed: bool = False) -> Texture2D:
+        texture = ResourceManager.load_texture_from_file(file, alpha, indexed)
+        ResourceManager.textures[name] = texture
+        if texture is not None:
+            # evicted textures reload themselves when bound again
+            ResourceManager.texture_sources[name] = (file, alpha)
+            texture.loader = lambda t: ResourceManager.reload_texture(name)
+            if ResourceManager.texture_arrays and not ResourceManager.headless:
+                ResourceManager.group_texture(name)
+        ResourceManager.touch("textures", name)
+        ResourceManager.enforce_budget(("textures", name))
+        return texture
+
+    # moves a texture into the texture array of its format and size, along
+    # with the same-sized textures still on their own. A full array is
+    # replaced by one twice as big (up to max_array_layers), its layers
+    # uploaded again from their files; past that, a new array is started.
+    @staticmethod
+    def group_texture(name: str) -> None:
+        texture = ResourceManager.textures[name]
+        key = (texture.internal_format, texture.width, texture.height)
+        arrays = ResourceManager.arrays.setdefault(key, [])
+        array = arrays[-1] if arrays else None
+        if array is not None and not array.full:
+            ResourceManager.add_to_array(array, [name])
+            return
+
+        names = [
+            other_name for other_name, other in ResourceManager.textures.items()
+            if other is not None and other.array is None and other_name in ResourceManager.texture_sources
+            and (other.internal_format, other.width, other.height) == key
+        ]
+        limit = min(ResourceManager.max_array_layers, int(glGetIntegerv(GL_MAX_ARRAY_TEXTURE_LAYERS)))
+        replaced = array if array is not None and array.capacity < limit else None
+        if replaced is not None:
+            names = [ResourceManager.texture_name(member) for member in replaced.textures] + names
+        if len(names) < 2:
+            return
+
+        capacity = 2
+        while capacity < len(names) and capacity < limit:
+            capacity *= 2
+        capacity = min(capacity, limit)
+        new_array = TextureArray(
+            texture.width, texture.height, capacity, texture.internal_format, texture.image_format,
+            texture.wrap_s, texture.wrap_t, texture.filter_min, texture.filter_max
+        )
+        new_array.generate()
+        if replaced is not None:
+            arrays.remove(replaced)
+            for member in replaced.textures:
+                member.array = None
+                member.layer = -1
+            replaced.delete()
+        arrays.append(new_array)
+        # whatever does not fit stays on its own
+        ResourceManager.add_to_array(new_array, names[:capacity])
+
+    # uploads the images of textures into the next layers of array, and
+    # releases their own storage
+    @staticmethod
+    def add_to_array(array: TextureArray, names: list[str]) -> None:
+        for name in names:
+            texture = ResourceManager.textures[name]
+            data = ResourceManager.texture_pixels(texture, *ResourceManager.texture_sources[name])
+            if data is None:
+                continue
+            array.add(texture, data)
+            if texture.id != 0:
+                glDeleteTextures(1, np.array([texture.id], dtype=np.uint32))
+                texture.id = 0
+            ResourceManager.account("textures", name)
+
+    # adds a recolor of an indexed texture: one color per entry of its
+    # palette, stored as a palette row under name. Returns the row, to draw
+    # the texture with (e.g. GameObject.palette)
+    @staticmethod
+    def load_palette(texture_name: str, colors: np.ndarray, name: str) -> Optional[int]:
+        texture = ResourceManager.textures.get(texture_name)
+        if texture is None or texture.palette < 0:
+            if not ResourceManager.headless:
+                print(f"ERROR::PALETTE: {texture_name} is not an indexed texture")
+            return None
+        row = ResourceManager.palettes.add(colors)
+        ResourceManager.palette_rows[name] = row
+        return row
+
+    # the same from a recolored copy of the texture's image (same layout):
+    # every palette entry takes the color of the pixels it indexes there
+    @staticmethod
+    def load_palette_from_file(texture_name: str, file: str, name: str) -> Optional[int]:
+        texture = ResourceManager.textures.get(texture_name)
+        if texture is None or texture.palette < 0:
+            if not ResourceManager.headless:
+                print(f"ERROR::PALETTE: {texture_name} is not an indexed texture")
+            return None
+        indices = ResourceManager.texture_pixels(texture, *ResourceManager.texture_sources[texture_name])
+        pixels = ResourceManager.read_image(file, True)
+        if indices is None or pixels is None:
+            return None
+        if pixels.shape[:2] != indices.shape:
+            print(f"ERROR::PALETTE: {file} is {pixels.shape[1]}x{pixels.shape[0]}, {texture_name} is {indices.shape[1]}x{indices.shape[0]}")
+            return None
+
+        pixels[pixels[..., 3] == 0] = 0
+        indices = indices.ravel()
+        packed = pack_colors(pixels).astype(np.uint64)
+        # each entry must stand for a single color of the recolor
+        pairs = np.unique((indices.astype(np.uint64) << np.uint64(32)) | packed)
+        colors_per_index = np.bincount((pairs >> np.uint64(32)).astype(np.int64))
+        if colors_per_index.max() > 1:
+            print(f"ERROR::PALETTE: {file} is not a recolor of {texture_name}, palette entry {int(colors_per_index.argmax())} takes {int(colors_per_index.max())} colors")
+            return None
+
+        used, first = np.unique(indices, return_index=True)
+        colors = ResourceManager.palettes.get(texture.palette).copy()
+        colors[used] = pixels.reshape(-1, 4)[first]
+        return ResourceManager.load_palette(texture_name, colors, name)
+
+    # retrieves the row of a named palette
+    @staticmethod
+    def get_palette(name: str) -> Optional[int]:
+        return ResourceManager.palette_rows.get(name)
+
     @staticmethod
-    def load_texture(file: str, alpha: bool, name: str) -> Texture2D:
-        ResourceManager.textures[name] = ResourceManager.load_texture_from_file(file, alpha)
-        return ResourceManager.textures[name]
+    def texture_name(texture: Texture2D) -> Optional[str]:
+        for name, other in ResourceManager.textures.items():
+            if other is texture:
+                return name
+        return None
 
     # retrieves a stored texture
     @staticmethod
     def get_texture(name: str) -> Optional[Texture2D]:
-        return ResourceManager.textures.get(name)
+        texture = ResourceManager.textures.get(name)
+        if texture is not None:
+            if texture.id == 0 and texture.array is None and not ResourceManager.headless:
+                ResourceManager.reload_texture(name)
+            else:
+                ResourceManager.touch("textures", name)
+        return texture
+
+    # regenerates an evicted texture from its source file, in place
+    @staticmethod
+    def reload_texture(name: str) -> None:
+        texture = ResourceManager.textures[name]
+        file, alpha = ResourceManager.texture_sources[name]
+        # a texture that fails to reload stays evicted (id 0)
+        if not ResourceManager.upload_texture_file(texture, file, alpha):
+            print(f"ERROR::RESOURCE_MANAGER: Failed to reload evicted texture {name}")
+            return
+        ResourceManager.touch("textures", name)
+        ResourceManager.enforce_budget(("textures", name))
     
     def load_animation(animation: Animation, name: str) -> Animation:
         ResourceManager.animations[name] = animation
+        # an animation keeps the texture it is cut from alive
+        for texture_name, texture in ResourceManager.textures.items():
+            if texture is animation.texture:
+                ResourceManager.dependencies[("animations", name)] = [("textures", texture_name)]
+        ResourceManager.touch("animations", name)
         return animation
     
     def get_animation(name: str) -> Optional[Animation]:
-        return ResourceManager.animations.get(name)
-    
-    # loads an audio from file
-    def load_music(file: str, name: str) -> mixer.Sound:
-        ResourceManager.audios[name] = mixer.Sound(file)
-        return ResourceManager.audios[name]
+        animation = ResourceManager.animations.get(name)
+        if animation is not None:
+            ResourceManager.touch("animations", name)
+        return animation
     
-    # play a stored music
+    # registers a music file; music is streamed, never decoded in memory as a whole
+    def load_music(file: str, name: str) -> MusicTrack:
+        ResourceManager.musics[name] = MusicTrack(file)
+        ResourceManager.touch("musics", name)
+        return ResourceManager.musics[name]
+
+    # play a stored music, crossfading from the current one over fade_ms
+    @staticmethod
+    def play_music(name: str, fade_ms: int = 0, loops: int = -1) -> None:
+        track = ResourceManager.musics.get(name)
+        if track:
+            ResourceManager.music_player.play(track, fade_ms, loops)
+            ResourceManager.touch("musics", name)
+            ResourceManager.enforce_budget(("musics", name))
+
+    # preloads a stored music and plays it as soon as the current one ends
+    @staticmethod
+    def queue_music(name: str) -> None:
+        track = ResourceManager.musics.get(name)
+        if track:
+            ResourceManager.music_player.queue(track)
+            ResourceManager.touch("musics", name)
+            ResourceManager.enforce_budget(("musics", name))
+
+    @staticmethod
+    def stop_music(fade_ms: int = 0) -> None:
+        ResourceManager.music_player.stop(fade_ms)
+
+    # registers a sound effect; lazy effects are only decoded when first played
+    @staticmethod
+    def load_sound(file: str, name: str, max_voices: int = 4, priority: int = 0, lazy: bool = True) -> SoundEffect:
+        ResourceManager.sounds[name] = SoundEffect(file, max_voices, priority, lazy)
+        ResourceManager.touch("sounds", name)
+        ResourceManager.enforce_budget(("sounds", name))
+        return ResourceManager.sounds[name]
+
+    # play a stored sound effect, returns the channel it plays on (if any)
     @staticmethod
-    def play_music(name: str) -> None:
-        audio = ResourceManager.audios.get(name)
-        if audio:
-            audio.play()
+    def play_sound(name: str, priority: Optional[int] = None, volume: float = 1.0) -> Optional[mixer.Channel]:
+        effect = ResourceManager.sounds.get(name)
+        if effect is None:
+            return None
+        if ResourceManager.sound_pool is None:
+            ResourceManager.sound_pool = SoundPool()
+        decoded = effect.sound is not None
+        channel = ResourceManager.sound_pool.play(effect, priority, volume)
+        ResourceManager.touch("sounds", name)
+        if not decoded:
+            ResourceManager.enforce_budget(("sounds", name))
+        return channel
+
+    # advances music fades, called once per frame
+    @staticmethod
+    def update_audio(dt: float) -> None:
+        ResourceManager.music_player.update(dt)
+
+    # memory used by each loaded audio asset, in bytes, per category
+    @staticmethod
+    def audio_memory() -> dict[str, dict[str, int]]:
+        return {
+            "musics": {name: track.memory for name, track in ResourceManager.musics.items()},
+            "sounds": {name: effect.memory for name, effect in ResourceManager.sounds.items()}
+        }
+
+    # returns a counted handle on a stored resource, category being one of
+    # "shaders", "textures", "animations", "musics" or "sounds"
+    @staticmethod
+    def acquire(category: str, name: str) -> ResourceHandle:
+        if name not in getattr(ResourceManager, category):
+            raise KeyError(f"no {category} resource named {name}")
+        key = (category, name)
+        for dependency in [key] + ResourceManager.dependencies.get(key, []):
+            ResourceManager.references[dependency] = ResourceManager.references.get(dependency, 0) + 1
+        ResourceManager.touch(category, name)
+        return ResourceHandle(category, name)
+
+    # drops a reference taken by acquire(); prefer ResourceHandle.release()
+    @staticmethod
+    def release(category: str, name: str) -> None:
+        key = (category, name)
+        for dependency in [key] + ResourceManager.dependencies.get(key, []):
+            count = ResourceManager.references.get(dependency, 0) - 1
+            if count > 0:
+                ResourceManager.references[dependency] = count
+            else:
+                ResourceManager.references.pop(dependency, None)
+        ResourceManager.enforce_budget()
+
+    # retrieves a stored resource of any category, reloading it if needed
+    @staticmethod
+    def get(category: str, name: str) -> Any:
+        if category == "textures":
+            return ResourceManager.get_texture(name)
+        if category == "animations":
+            return ResourceManager.get_animation(name)
+        if category == "sounds":
+            effect = ResourceManager.sounds.get(name)
+            if effect is not None and effect.sound is None:
+                effect.get()
+                ResourceManager.touch(category, name)
+                ResourceManager.enforce_budget((category, name))
+            return effect
+        resource = getattr(ResourceManager, category).get(name)
+        if resource is not None:
+            ResourceManager.touch(category, name)
+        return resource
+
+    # sets the memory budget (in bytes, None to disable) evicted assets are kept under
+    @staticmethod
+    def set_budget(budget: Optional[int]) -> None:
+        ResourceManager.budget = budget
+        ResourceManager.enforce_budget()
+
+    # marks a resource as the most recently used one and updates its
+    # share of the memory totals
+    @staticmethod
+    def touch(category: str, name: str) -> None:
+        key = (category, name)
+        ResourceManager.lru[key] = None
+        ResourceManager.lru.move_to_end(key)
+        ResourceManager.account(category, name)
+
+    # refreshes the memory a resource counts for in the running totals
+    @staticmethod
+    def account(category: str, name: str) -> None:
+        key = (category, name)
+        memory = ResourceManager.resource_memory(category, name)
+        ResourceManager.usage[category] += memory - ResourceManager.sizes.get(key, 0)
+        ResourceManager.sizes[key] = memory
+
+    # memory currently held by a resource, in bytes
+    @staticmethod
+    def resource_memory(category: str, name: str) -> int:
+        if category == "textures":
+            texture = ResourceManager.textures.get(name)
+            if texture is None:
+                return 0
+            # its own storage, and its layer in a texture array
+            copies = (texture.id != 0) + (texture.array is not None)
+            return copies * texture.width * texture.height * BYTES_PER_PIXEL.get(texture.internal_format, 4)
+        if category == "sounds":
+            return ResourceManager.sounds[name].memory
+        if category == "musics":
+            return ResourceManager.musics[name].memory
+        return 0
+
+    # memory held per category, in bytes
+    @staticmethod
+    def memory_usage() -> dict[str, int]:
+        return dict(ResourceManager.usage)
+
+    # releases the memory of unreferenced resources, least recently used first,
+    # until the total is back under budget; keep is never evicted
+    @staticmethod
+    def enforce_budget(keep: Optional[tuple[str, str]] = None) -> None:
+        if ResourceManager.budget is None:
+            return
+        if sum(ResourceManager.usage.values()) <= ResourceManager.budget:
+            return
+        for key in list(ResourceManager.lru):
+            if key == keep or key in ResourceManager.references:
+                continue
+            if ResourceManager.sizes.get(key, 0) > 0 and ResourceManager.evict(*key):
+                ResourceManager.account(*key)
+                if sum(ResourceManager.usage.values()) <= ResourceManager.budget:
+                    break
+
+    # releases the memory of a resource while keeping it registered,
+    # returns whether anything was released
+    @staticmethod
+    def evict(category: str, name: str) -> bool:
+        if category == "textures":
+            texture = ResourceManager.textures[name]
+            # the layers of texture arrays are never evicted
+            if name not in ResourceManager.texture_sources or texture.id == 0:
+                return False
+            glDeleteTextures(1, np.array([texture.id], dtype=np.uint32))
+            texture.id = 0
+        elif category == "sounds":
+            ResourceManager.sounds[name].unload()
+        elif category == "musics":
+            track = ResourceManager.musics[name]
+            # the playing track may still be streamed from its preloaded bytes
+            if track is ResourceManager.music_player.current:
+                return False
+            track.data = None
+        else:
+            return False
+        return True
 
     # properly de-allocates all loaded resources
     @staticmethod
@@ -68,43 +469,117 @@ class ResourceManager:
 
         # properly delete all textures
         for texture in ResourceManager.textures.values():
-            texture_id = np.array([texture.id], dtype=np.uint32)
-            glDeleteTextures(1, texture_id)
+            if texture is not None and texture.id != 0:
+                texture_id = np.array([texture.id], dtype=np.uint32)
+                glDeleteTextures(1, texture_id)
+        for arrays in ResourceManager.arrays.values():
+            for array in arrays:
+                array.delete()
+        ResourceManager.arrays.clear()
+        ResourceManager.palettes.clear()
+        ResourceManager.palette_rows.clear()
+
+        # stop and release all audio
+        if mixer.get_init():
+            ResourceManager.music_player.stop()
+            if ResourceManager.sound_pool is not None:
+                ResourceManager.sound_pool.stop()
+        for effect in ResourceManager.sounds.values():
+            effect.unload()
+
+        # forget everything
+        for storage in (ResourceManager.shaders, ResourceManager.textures, ResourceManager.animations, ResourceManager.musics, ResourceManager.sounds):
+            storage.clear()
+        ResourceManager.references.clear()
+        ResourceManager.dependencies.clear()
+        ResourceManager.lru.clear()
+        ResourceManager.texture_sources.clear()
+        ResourceManager.sizes.clear()
+        for category in ResourceManager.usage:
+            ResourceManager.usage[category] = 0
 
     # loads and generates a shader from file
     @staticmethod
-    def load_shader_from_file(v_shader_file: str, f_shader_file: str, g_shader_file: Optional[str] = None) -> Shader:
-        shader = Shader(v_shader_file, f_shader_file, g_shader_file)
+    def load_shader_from_file(v_shader_file: str, f_shader_file: str, g_shader_file: Optional[str] = None, varyings: Optional[list[str]] = None) -> Shader:
+        shader = Shader(v_shader_file, f_shader_file, g_shader_file, varyings)
         return shader
 
     # loads a single texture from file
     @staticmethod
-    def load_texture_from_file(file: str, alpha: bool) -> Texture2D:
+    def load_texture_from_file(file: str, alpha: bool, indexed: bool = False) -> Texture2D:
         # create texture object
         texture = Texture2D()
-        if alpha:
+        if indexed:
+            texture.internal_format = GL_R8
+            texture.image_format = GL_RED
+            # indices can't be interpolated
+            texture.filter_min = texture.filter_max = GL_NEAREST
+            if not ResourceManager.headless:
+                pixels = ResourceManager.read_image(file, True)
+                if pixels is None:
+                    return None
+                indices, palette = index_image(pixels)
+                texture.palette = ResourceManager.palettes.add(palette)
+                texture.palette_texture = ResourceManager.palettes
+                texture.height, texture.width = indices.shape
+                texture.generate(indices)
+                return texture
+        elif alpha:
             texture.internal_format = GL_RGBA
             texture.image_format = GL_RGBA
         else:
             texture.internal_format = GL_RGB
             texture.image_format = GL_RGB
 
-        # load image
+        if not ResourceManager.upload_texture_file(texture, file, alpha):
+            return None
+
+        return texture
+
+    # loads an image file into an existing texture object
+    @staticmethod
+    def upload_texture_file(texture: Texture2D, file: str, alpha: bool) -> bool:
+        if ResourceManager.headless:
+            # only the size matters (e.g. for animations), nothing is uploaded
+            try:
+                texture.width, texture.height = Image.open(file).size
+            except Exception as e:
+                print(f"ERROR::TEXTURE: Failed to load texture file {file}\n{e}")
+                return False
+            return True
+
+        image_data = ResourceManager.texture_pixels(texture, file, alpha)
+        if image_data is None:
+            return False
+
+        # now generate texture
+        texture.height, texture.width = image_data.shape[:2]
+        texture.generate(image_data)
+
+        return True
+
+    # what a texture holds of an image file: its pixels, or their indices in
+    # the texture's palette for an indexed texture
+    @staticmethod
+    def texture_pixels(texture: Texture2D, file: str, alpha: bool) -> Optional[np.ndarray]:
+        if texture.palette < 0:
+            return ResourceManager.read_image(file, alpha)
+        pixels = ResourceManager.read_image(file, True)
+        if pixels is None:
+            return None
+        return map_to_palette(pixels, ResourceManager.palettes.get(texture.palette))
+
+    # pixels of an image file, as an (height, width, 3 or 4) array
+    @staticmethod
+    def read_image(file: str, alpha: bool) -> Optional[np.ndarray]:
         try:
             image = Image.open(file)
             if alpha:
                 image = image.convert("RGBA")
             else:
                 image = image.convert("RGB")
-            image_data = np.array(image, dtype=np.uint8)
+            return np.array(image, dtype=np.uint8)
         except Exception as e:
             print(f"ERROR::TEXTURE: Failed to load texture file {file}\n{e}")
             return None
-        
-        # now generate texture
-        texture.width = image.width
-        texture.height = image.height
-        texture.generate(image_data)
-
-        return texture
     
\ No newline at end of file
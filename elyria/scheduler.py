@@ -0,0 +1,316 @@
+import heapq
+import time
+import traceback
+from collections import deque
+from typing import Any, Callable, Generator, Coroutine, Optional, Union
+
+
+# What a script waits for: it yields (or awaits) one of these, and the
+# scheduler resumes it once it is over, sending back the value it produced
+class Wait:
+    def __await__(self):
+        return (yield self)
+
+
+# game time, in seconds
+class Sleep(Wait):
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+
+
+# a condition, checked once per frame
+class Until(Wait):
+    def __init__(self, condition: Callable[[], bool]):
+        self.condition = condition
+
+
+# the next frame
+class NextFrame(Wait):
+    pass
+
+
+# a signal sent through Scheduler.signal, resumed with its value
+class Signal(Wait):
+    def __init__(self, name: str):
+        self.name = name
+
+
+def wait(seconds: float) -> Sleep:
+    return Sleep(seconds)
+
+
+def until(condition: Callable[[], bool]) -> Until:
+    return Until(condition)
+
+
+def next_frame() -> NextFrame:
+    return NextFrame()
+
+
+def wait_signal(name: str) -> Signal:
+    return Signal(name)
+
+
+# A running script and its statistics
+class Script:
+    def __init__(self, routine: Union[Generator, Coroutine], name: str):
+        self.routine = routine
+        self.name = name
+        # "runnable", "sleeping", "waiting", "done", "failed" or "cancelled"
+        self.state = "runnable"
+        self.result: Any = None
+        # value sent to the script when it resumes, and the condition it waits for
+        self.value: Any = None
+        self.condition: Optional[Callable[[], bool]] = None
+        # scripts that yielded (joined) this one
+        self.joiners: list["Script"] = []
+
+        # statistics: steps run, CPU time spent (steps and conditions), longest step
+        self.steps = 0
+        self.cpu_time = 0.0
+        self.longest_step = 0.0
+
+    @property
+    def done(self) -> bool:
+        return self.state in ("done", "failed", "cancelled")
+
+    def __await__(self):
+        return (yield self)
+
+    def __repr__(self) -> str:
+        return f"Script({self.name!r}, {self.state})"
+
+
+# Cooperative scheduler for game scripts (cutscenes, dialogues, NPC
+# routines, quest triggers...), written as generators or coroutines:
+#
+#     def patrol(npc):
+#         while True:
+#             npc.walk_to(a)
+#             yield until(lambda: npc.arrived)
+#             yield wait(2.0)
+#
+#     async def intro():
+#         await wait(0.5)
+#         choice = await wait_signal("dialogue_closed")
+#
+# A script runs until it yields (or awaits) what it waits for: wait(seconds)
+# of game time, until(condition), next_frame() (or None), wait_signal(name),
+# or another Script, to resume once it finishes with its result.
+# Sleeping scripts sit in a heap of wake-up times and cost nothing until
+# then; scripts waiting on a signal cost nothing either; conditions are
+# checked once per frame.
+#
+# update runs the scripts ready in the frame, in order, until budget (wall
+# time, in seconds) is spent: the others stay first in line for the next
+# frame. Since that depends on timing, recorded and replayed sessions run
+# without a budget (see core.main). The CPU time of every script is kept,
+# report gives the most expensive ones.
+class Scheduler:
+    def __init__(self, budget: Optional[float] = 0.002):
+        self.budget = budget
+        # game time, the sum of the update deltas
+        self.time = 0.0
+        self.frame = 0
+
+        self.scripts: list[Script] = []
+        self.runnable: deque[Script] = deque()
+        self.next_frame: list[Script] = []
+        # (wake-up time, start order, script)
+        self.sleeping: list[tuple[float, int, Script]] = []
+        self.polling: list[Script] = []
+        self.signals: dict[str, list[Script]] = {}
+        self.sequence = 0
+        # the script being run
+        self.current: Optional[Script] = None
+        # the last finished scripts, for report
+        self.finished: list[Script] = []
+        self.history = 32
+
+        # statistics
+        self.deferred = 0
+        self.last_deferred = 0
+        self.frames_over_budget = 0
+
+    # starts a script (a generator or a coroutine), run from the next update
+    def start(self, routine: Union[Generator, Coroutine], name: Optional[str] = None) -> Script:
+        if name is None:
+            name = getattr(routine, "__qualname__", None) or repr(routine)
+        script = Script(routine, name)
+        self.scripts.append(script)
+        self.runnable.append(script)
+        return script
+
+    def cancel(self, script: Script) -> None:
+        if script.done:
+            return
+        script.state = "cancelled"
+        self.forget(script)
+        # a script cancelling itself is closed once it yields
+        if script is self.current:
+            return
+        script.routine.close()
+        self.finish(script)
+
+    # sends a signal to the scripts waiting for it, resumed with value
+    def signal(self, name: str, value: Any = None) -> int:
+        waiting = self.signals.pop(name, [])
+        for script in waiting:
+            self.resume(script, value)
+        return len(waiting)
+
+    def update(self, dt: float) -> None:
+        start = time.perf_counter()
+        self.time += dt
+        self.frame += 1
+
+        # scripts of the last frame go after the ones deferred by the budget
+        self.runnable.extend(self.next_frame)
+        self.next_frame.clear()
+        while self.sleeping and self.sleeping[0][0] <= self.time:
+            _, _, script = heapq.heappop(self.sleeping)
+            if script.state == "sleeping":
+                self.resume(script)
+        for script in list(self.polling):
+            cpu_start = time.thread_time()
+            try:
+                ready = script.condition()
+            except Exception:
+                ready = False
+                self.fail(script)
+            script.cpu_time += time.thread_time() - cpu_start
+            if ready:
+                self.polling.remove(script)
+                self.resume(script)
+
+        ran = 0
+        self.last_deferred = 0
+        while self.runnable:
+            # at least one script runs every frame
+            if ran and self.budget is not None and time.perf_counter() - start >= self.budget:
+                self.last_deferred = len(self.runnable)
+                self.deferred += self.last_deferred
+                self.frames_over_budget += 1
+                break
+            self.step(self.runnable.popleft())
+            ran += 1
+
+    # runs a script until it yields
+    def step(self, script: Script) -> None:
+        if script.state != "runnable":
+            return
+        value, script.value = script.value, None
+        cpu_start = time.thread_time()
+        self.current = script
+        try:
+            waited = script.routine.send(value)
+        except StopIteration as stop:
+            script.state = "done"
+            script.result = stop.value
+            waited = None
+        except Exception:
+            self.fail(script)
+            waited = None
+        self.current = None
+        elapsed = time.thread_time() - cpu_start
+        script.steps += 1
+        script.cpu_time += elapsed
+        script.longest_step = max(script.longest_step, elapsed)
+
+        if script.state == "cancelled":
+            script.routine.close()
+            self.finish(script)
+        elif script.done:
+            self.finish(script)
+        else:
+            self.suspend(script, waited)
+
+    # puts a script aside until what it yielded is over
+    def suspend(self, script: Script, waited: Any) -> None:
+        if waited is None or isinstance(waited, NextFrame):
+            self.next_frame.append(script)
+        elif isinstance(waited, Sleep):
+            if waited.seconds <= 0.0:
+                self.next_frame.append(script)
+                return
+            script.state = "sleeping"
+            self.sequence += 1
+            heapq.heappush(self.sleeping, (self.time + waited.seconds, self.sequence, script))
+        elif isinstance(waited, Until):
+            script.state = "waiting"
+            script.condition = waited.condition
+            self.polling.append(script)
+        elif isinstance(waited, Signal):
+            script.state = "waiting"
+            self.signals.setdefault(waited.name, []).append(script)
+        elif isinstance(waited, Script):
+            if waited.done:
+                script.value = waited.result
+                self.next_frame.append(script)
+            else:
+                script.state = "waiting"
+                waited.joiners.append(script)
+        else:
+            print(f"ERROR::SCHEDULER: script {script.name} yielded {waited!r}, not something to wait for")
+            self.cancel(script)
+
+    # makes a waiting script runnable in the current frame, with value sent back to it
+    def resume(self, script: Script, value: Any = None) -> None:
+        script.state = "runnable"
+        script.value = value
+        script.condition = None
+        self.runnable.append(script)
+
+    def fail(self, script: Script) -> None:
+        print(f"ERROR::SCHEDULER: script {script.name} failed\n{traceback.format_exc()}")
+        script.state = "failed"
+        self.forget(script)
+        self.finish(script)
+
+    # removes a script from whatever it waits on (sleepers are skipped when they wake up)
+    def forget(self, script: Script) -> None:
+        if script in self.polling:
+            self.polling.remove(script)
+        for waiting in self.signals.values():
+            if script in waiting:
+                waiting.remove(script)
+        if script in self.next_frame:
+            self.next_frame.remove(script)
+
+    # resumes the scripts that joined a finished one
+    def finish(self, script: Script) -> None:
+        if script not in self.scripts:
+            return
+        self.scripts.remove(script)
+        for joiner in script.joiners:
+            if joiner.state == "waiting":
+                self.resume(joiner, script.result)
+        script.joiners.clear()
+        self.finished.append(script)
+        del self.finished[:-self.history]
+
+    @property
+    def running(self) -> int:
+        return len(self.scripts)
+
+    # (name, steps, CPU time, longest step) of the scripts that cost the most,
+    # running and recently finished
+    def report(self, count: int = 10) -> list[tuple[str, int, float, float]]:
+        scripts = sorted(self.scripts + self.finished, key=lambda script: script.cpu_time, reverse=True)[:count]
+        return [(script.name, script.steps, script.cpu_time, script.longest_step) for script in scripts]
+
+    def summary(self) -> str:
+        lines = [f"{self.running} scripts running, {self.deferred} deferred over {self.frames_over_budget} frames over budget"]
+        for name, steps, cpu_time, longest in self.report():
+            lines.append(f"  {name}: {steps} steps, {cpu_time * 1000:.2f} ms CPU, longest step {longest * 1000:.3f} ms")
+        return "\n".join(lines)
+
+    # cancels every script
+    def clear(self) -> None:
+        for script in list(self.scripts):
+            self.cancel(script)
+        self.runnable.clear()
+        self.next_frame.clear()
+        self.sleeping.clear()
+        self.polling.clear()
+        self.signals.clear()
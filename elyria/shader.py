@@ -1,9 +1,14 @@
 from OpenGL.GL import *
+from typing import Optional
 import glm
 
 
 class Shader:
-    def __init__(self, vertex_path: str, fragment_path: str, geometry_path: str = None) -> None:
+    # varyings: vertex shader outputs captured by transform feedback, interleaved in one buffer
+    def __init__(self, vertex_path: str, fragment_path: str, geometry_path: str = None, varyings: Optional[list[str]] = None) -> None:
+        # palette row the sprite shader was last given, -1 for textures of colors
+        # (see SpriteRenderer): the uniform is shared by every renderer using it
+        self.palette_row: Optional[int] = None
         # 1. retrieve the vertex/fragment source code from filepath
         try:
             # open files
@@ -53,6 +58,11 @@ class Shader:
             if geometry_path:
                 glAttachShader(self.id, geometry)
 
+            # must be declared before linking
+            if varyings:
+                names = (ctypes.POINTER(ctypes.c_char) * len(varyings))(*(ctypes.create_string_buffer(v.encode()) for v in varyings))
+                glTransformFeedbackVaryings(self.id, len(varyings), ctypes.cast(names, ctypes.POINTER(ctypes.POINTER(ctypes.c_char))), GL_INTERLEAVED_ATTRIBS)
+
             glLinkProgram(self.id)
             self.check_compile_errors(self.id, "PROGRAM")
 
@@ -1,13 +1,13 @@
 #version 330 core
 
 layout (location = 0) in vec4 vertex;  // <vec2 position, vec2 texCoords>
+layout (location = 1) in vec2 offset;  // per particle
+layout (location = 2) in vec4 color;   // per particle
 
 out vec2 TexCoords;
 out vec4 ParticleColor;
 
 uniform mat4 projection;
-uniform vec2 offset;
-uniform vec4 color;
 
 void main() {
     float scale = 10.0f;
@@ -0,0 +1,8 @@
+#version 330 core
+
+// never runs: the update pass discards its points before rasterization
+out vec4 color;
+
+void main() {
+    color = vec4(0.0);
+}
@@ -0,0 +1,28 @@
+#version 330 core
+
+// particle state, read from one buffer and written to the other by transform feedback
+layout (location = 0) in vec2 position;
+layout (location = 1) in vec2 velocity;
+layout (location = 2) in vec4 color;
+layout (location = 3) in float life;
+
+out vec2 outPosition;
+out vec2 outVelocity;
+out vec4 outColor;
+out float outLife;
+
+uniform float dt;
+
+void main() {
+    outVelocity = velocity;
+    outLife = life - dt;  // reduce life
+    if (outLife > 0.0) {
+        // particle is alive, thus update
+        outPosition = position - velocity * dt;
+        outColor = vec4(color.rgb, color.a - dt * 2.5);
+    } else {
+        // dead particles are still drawn (all instances are), but transparent
+        outPosition = position;
+        outColor = vec4(color.rgb, min(color.a, 0.0));
+    }
+}
@@ -5,7 +5,14 @@ out vec4 color;
 
 uniform sampler2D image;
 uniform vec3 spriteColor;
+// indexed textures: image holds indices into this row of the palette, -1 otherwise
+uniform sampler2D palette;
+uniform int paletteRow;
 
 void main() {
-    color = vec4(spriteColor, 1.0) * texture(image, TexCoords);
+    vec4 texel = texture(image, TexCoords);
+    if (paletteRow >= 0) {
+        texel = texelFetch(palette, ivec2(int(texel.r * 255.0 + 0.5), paletteRow), 0);
+    }
+    color = vec4(spriteColor, 1.0) * texel;
 }
\ No newline at end of file
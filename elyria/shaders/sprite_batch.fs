@@ -0,0 +1,22 @@
+#version 330 core
+
+in vec2 TexCoords;
+in vec3 SpriteColor;
+flat in float Layer;
+flat in float PaletteRow;
+out vec4 color;
+
+uniform sampler2D image;
+uniform sampler2DArray images;
+uniform sampler2D palette;
+
+void main() {
+    // both are sampled so that control flow stays uniform
+    vec4 single = texture(image, TexCoords);
+    vec4 layered = texture(images, vec3(TexCoords, max(Layer, 0.0)));
+    vec4 texel = Layer < 0.0 ? single : layered;
+    if (PaletteRow >= 0.0) {
+        texel = texelFetch(palette, ivec2(int(texel.r * 255.0 + 0.5), int(PaletteRow)), 0);
+    }
+    color = vec4(SpriteColor, 1.0) * texel;
+}
@@ -0,0 +1,21 @@
+#version 330 core
+
+layout (location = 0) in vec4 vertex; // <vec2 position, vec2 texCoords>, position already in the world
+layout (location = 1) in vec3 color;
+layout (location = 2) in float layer; // in the texture array, -1 for the image texture
+layout (location = 3) in float paletteRow; // of an indexed texture, -1 for a texture of colors
+
+out vec2 TexCoords;
+out vec3 SpriteColor;
+flat out float Layer;
+flat out float PaletteRow;
+
+uniform mat4 projection;
+
+void main() {
+    TexCoords = vertex.zw;
+    SpriteColor = color;
+    Layer = layer;
+    PaletteRow = paletteRow;
+    gl_Position = projection * vec4(vertex.xy, 0.0, 1.0);
+}
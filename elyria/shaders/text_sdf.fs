@@ -0,0 +1,20 @@
+#version 330 core
+
+in vec2 TexCoords;
+
+out vec4 color;
+
+uniform sampler2D text;
+uniform vec3 textColor;
+uniform vec3 outlineColor;
+uniform float edge;         // distance value on the glyph outline
+uniform float outlineEdge;  // distance value on the outer edge of the outline
+
+void main() {
+    float distance = texture(text, TexCoords).r;
+    // about one screen pixel of antialiasing, whatever the scale
+    float smoothing = 0.7 * fwidth(distance);
+    float fill = smoothstep(edge - smoothing, edge + smoothing, distance);
+    float shape = smoothstep(outlineEdge - smoothing, outlineEdge + smoothing, distance);
+    color = vec4(mix(outlineColor, textColor, fill), shape);
+}
@@ -0,0 +1,273 @@
+import os
+import random
+import time
+import traceback
+import multiprocessing
+from multiprocessing.connection import Connection, wait
+from typing import Callable, Optional, Any
+from elyria.game import Game
+from elyria.input import Input
+from elyria.replay import Replayer, seed_rng, state_checksum
+
+
+# An input script returns the key events (key, action) to apply before a
+# given frame. It must be picklable (e.g. a module-level class or function),
+# since it is sent to the worker processes.
+InputScript = Callable[[int, random.Random], list[tuple[int, int]]]
+
+
+# One independent world to simulate: its seed, how many frames to step and
+# where its inputs come from (a script, a recorded session, or nothing).
+# A recorded session brings its own seed, frame count and dt sequence.
+class SimulationJob:
+    def __init__(
+        self,
+        seed: int,
+        frames: int = 3600,
+        dt: float = 1.0 / 60.0,
+        script: Optional[InputScript] = None,
+        replay: Optional[str] = None
+    ):
+        self.seed = seed
+        self.frames = frames
+        self.dt = dt
+        self.script = script
+        self.replay = replay
+
+
+class SimulationResult:
+    def __init__(self, job: int, seed: int, steps: int, elapsed: float, checksum: int, metrics: dict[str, Any]):
+        self.job = job  # index of the job in the submitted list
+        self.seed = seed
+        self.steps = steps
+        self.elapsed = elapsed  # wall time spent stepping, in seconds
+        self.checksum = checksum  # final state checksum of the world
+        self.metrics = metrics  # whatever the game reported through Game.metrics()
+
+    @property
+    def steps_per_second(self) -> float:
+        return self.steps / self.elapsed if self.elapsed > 0.0 else 0.0
+
+
+# steps one world to completion in the current process, without rendering
+def simulate(game: Game, job: SimulationJob, on_progress: Optional[Callable[[int], None]] = None, progress_every: int = 1000) -> tuple[int, float, int]:
+    from elyria import core
+
+    frames = job.frames
+    replayer = None
+    seed = job.seed
+    if job.replay:
+        replayer = Replayer.load(job.replay)
+        frames = len(replayer.frames)
+        seed = replayer.seed
+
+    seed_rng(seed)
+    script_rng = random.Random(seed)
+    Input.reset()
+
+    core.game = game
+    # scripts run in the same frames whatever the machine's speed
+    game.scripts.budget = None
+    game.init()
+
+    start = time.perf_counter()
+    for frame in range(frames):
+        dt = job.dt
+        if replayer is not None:
+            dt, events = replayer.next_frame()
+        elif job.script is not None:
+            events = job.script(frame, script_rng)
+        else:
+            events = []
+        for key, action in events:
+            core.process_key(key, action)
+
+        game.process_input(dt)
+        game.update(dt)
+        game.scripts.update(dt)
+
+        if on_progress is not None and (frame + 1) % progress_every == 0:
+            on_progress(progress_every)
+    elapsed = time.perf_counter() - start
+
+    if on_progress is not None and frames % progress_every:
+        on_progress(frames % progress_every)
+    return frames, elapsed, state_checksum(game.game_objects())
+
+
+# entry point of a worker process: pulls jobs until it receives None and
+# sends progress and results back to the parent through its own pipe. Sends
+# are synchronous, so whatever was sent survives the process dying abruptly.
+def worker_main(
+    worker: int,
+    game_factory: Callable[[], Game],
+    gl_context: bool,
+    jobs: multiprocessing.Queue,
+    results: Connection,
+    progress_every: int
+) -> None:
+    from elyria import core
+    from elyria.resource_manager import ResourceManager
+
+    # without a context, games skip every GL resource (see Game.init)
+    ResourceManager.headless = not gl_context
+
+    window = None
+    while True:
+        item = jobs.get()
+        if item is None:
+            break
+        index, job = item
+        results.send(("start", index))
+
+        try:
+            game = game_factory()
+            if gl_context and window is None:
+                # resources still need a context to load into, even if nothing is drawn
+                window = core.create_window(game.width, game.height, game.title, headless=True)
+                if window is None:
+                    raise RuntimeError("failed to create an OpenGL context")
+
+            steps, elapsed, checksum = simulate(
+                game, job,
+                lambda steps: results.send(("progress", steps)),
+                progress_every
+            )
+            results.send(("result", SimulationResult(index, job.seed, steps, elapsed, checksum, game.metrics())))
+        except Exception:
+            results.send(("error", index, traceback.format_exc()))
+        finally:
+            ResourceManager.clear()
+
+    if window is not None:
+        core.glfwTerminate()
+    results.close()
+
+
+# Steps many independent game worlds in parallel, one worker process per core.
+# game_factory builds a fresh (uninitialized) game for every job and must be
+# picklable, e.g. the Game subclass itself. Worlds are simulated headless:
+# no GL context exists and Game.init skips shaders and renderers, textures only
+# read their size. Games that really need GL resources can ask for gl_context,
+# which gives each worker a hidden window (and thus a display, e.g. through
+# xvfb-run on servers); nothing is ever rendered.
+class SimulationRunner:
+    def __init__(
+        self,
+        game_factory: Callable[[], Game],
+        workers: Optional[int] = None,
+        gl_context: bool = False,
+        progress_every: int = 1000,
+        poll_interval: float = 0.5
+    ):
+        self.game_factory = game_factory
+        self.workers = workers or os.cpu_count() or 1
+        self.gl_context = gl_context
+        self.progress_every = progress_every
+        self.poll_interval = poll_interval  # seconds between checks that workers are still alive
+        # filled by run()
+        self.elapsed = 0.0
+        self.steps = 0
+        self.errors: list[tuple[int, str]] = []
+        self.results: list[Optional[SimulationResult]] = []
+        self.done: list[bool] = []
+        self.active: dict[int, int] = {}  # job each worker is running
+
+    # runs every job and returns their results in job order (None for failed
+    # jobs, see errors); on_progress is called in the parent with the total
+    # number of world-steps done so far
+    def run(self, jobs: list[SimulationJob], on_progress: Optional[Callable[[int], None]] = None) -> list[Optional[SimulationResult]]:
+        context = multiprocessing.get_context("spawn")
+        job_queue = context.Queue()
+
+        for index, job in enumerate(jobs):
+            job_queue.put((index, job))
+        workers = min(self.workers, len(jobs))
+        for _ in range(workers):
+            job_queue.put(None)
+
+        start = time.perf_counter()
+        processes = []
+        readers: dict[Connection, int] = {}
+        for i in range(workers):
+            reader, writer = context.Pipe(duplex=False)
+            process = context.Process(
+                target=worker_main,
+                args=(i, self.game_factory, self.gl_context, job_queue, writer, self.progress_every),
+                daemon=True
+            )
+            process.start()
+            # the worker holds the only write end left, its pipe hits EOF once it exits
+            writer.close()
+            processes.append(process)
+            readers[reader] = i
+
+        self.results = [None] * len(jobs)
+        self.done = [False] * len(jobs)
+        self.active = {}
+        self.steps = 0
+        self.errors = []
+        while not all(self.done):
+            if not readers:
+                for job, done in enumerate(self.done):
+                    if not done:
+                        self.fail(job, "never ran: every worker exited")
+                break
+
+            for reader in wait(list(readers), self.poll_interval):
+                worker = readers[reader]
+                try:
+                    self.receive(worker, reader.recv(), on_progress)
+                except EOFError:
+                    del readers[reader]
+                    processes[worker].join()
+                    self.lost(worker, processes[worker].exitcode)
+
+            # a dead worker's pipe stays open if processes it started inherited
+            # it, so liveness is checked as well every poll interval
+            for reader, worker in list(readers.items()):
+                if not processes[worker].is_alive() and not reader.poll():
+                    del readers[reader]
+                    self.lost(worker, processes[worker].exitcode)
+
+        for process in processes:
+            process.join(self.poll_interval)
+            if process.is_alive():
+                process.terminate()
+        self.elapsed = time.perf_counter() - start
+        return self.results
+
+    # handles one message sent by a worker
+    def receive(self, worker: int, message: tuple, on_progress: Optional[Callable[[int], None]]) -> None:
+        kind = message[0]
+        if kind == "start":
+            self.active[worker] = message[1]
+        elif kind == "progress":
+            self.steps += message[1]
+            if on_progress is not None:
+                on_progress(self.steps)
+        elif kind == "result":
+            self.active.pop(worker, None)
+            result = message[1]
+            self.results[result.job] = result
+            self.done[result.job] = True
+        elif kind == "error":
+            self.active.pop(worker, None)
+            self.fail(message[1], f"failed on worker {worker}\n{message[2]}")
+
+    # counts the job a dead worker was running as failed
+    def lost(self, worker: int, exitcode: Optional[int]) -> None:
+        if worker in self.active:
+            self.fail(self.active.pop(worker), f"lost: worker {worker} exited with code {exitcode}")
+
+    def fail(self, job: int, reason: str) -> None:
+        if self.done[job]:
+            return
+        self.done[job] = True
+        self.errors.append((job, reason))
+        print(f"ERROR::SIMULATION: job {job} {reason}")
+
+    # world-steps per second over the last run, across all workers
+    @property
+    def throughput(self) -> float:
+        return self.steps / self.elapsed if self.elapsed > 0.0 else 0.0
@@ -0,0 +1,256 @@
+import os
+import glm
+import struct
+import zlib
+import numpy as np
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+from elyria.game_object import GameObject
+from elyria.ball_object import BallObject
+from elyria.resource_manager import ResourceManager
+
+
+# file layout: an uncompressed header, the table of resource names entities
+# refer to (utf-8, one per line) and the entity records, zlib-compressed
+# when the COMPRESSED flag is set
+SNAPSHOT_MAGIC = b"ELSN"
+SNAPSHOT_VERSION = 1
+HEADER = struct.Struct("<4sHHqII")  # magic, version, flags, frame, entity count, name table size
+COMPRESSED = 1
+
+# entity kinds
+KIND_GAME_OBJECT = 0
+KIND_BALL = 1
+
+# bits of the flags field
+SOLID = 1
+DESTROYED = 2
+STUCK = 4
+STICKY = 8
+PASS_THROUGH = 16
+
+# one record per entity; texture and animation are indices in the name
+# table (-1 for none), ball fields are only meaningful for KIND_BALL
+ENTITY_DTYPE = np.dtype([
+    ("kind", "<u1"),
+    ("flags", "<u1"),
+    ("texture", "<i2"),
+    ("animation", "<i2"),
+    ("frame", "<f4"),
+    ("position", "<f4", 2),
+    ("rotation", "<f4"),
+    ("size", "<f4", 2),
+    ("color", "<f4", 3),
+    ("velocity", "<f4", 2),
+    ("radius", "<f4")
+])
+
+
+# The state of a list of game objects at a given frame, one structured
+# array record per object. Restoring writes the records back into the
+# same objects, in the same order (spawned or removed objects are the
+# game's business, a snapshot does not create or delete any).
+class Snapshot:
+    def __init__(self, entities: np.ndarray, names: list[str], frame: int = 0):
+        self.entities = entities
+        self.names = names  # "textures/<name>" or "animations/<name>", indexed by the records
+        self.frame = frame
+
+    # captures the objects, reusing out's storage when it has the right size
+    @staticmethod
+    def capture(objects: list[GameObject], frame: int = 0, out: Optional[np.ndarray] = None) -> "Snapshot":
+        count = len(objects)
+        entities = out if out is not None and len(out) == count else np.empty(count, dtype=ENTITY_DTYPE)
+
+        # resources are referred to by name, each one stored once
+        resource_names = {}
+        for category in ("textures", "animations"):
+            for name, resource in getattr(ResourceManager, category).items():
+                resource_names[id(resource)] = f"{category}/{name}"
+        names: list[str] = []
+        indices: dict[str, int] = {}
+
+        def name_index(resource) -> int:
+            name = resource_names.get(id(resource)) if resource is not None else None
+            if name is None:
+                return -1
+            if name not in indices:
+                indices[name] = len(names)
+                names.append(name)
+            return indices[name]
+
+        # field by field: one list comprehension per column is much faster
+        # than building a tuple per record
+        entities["kind"] = [KIND_BALL if isinstance(o, BallObject) else KIND_GAME_OBJECT for o in objects]
+        entities["flags"] = [
+            o.is_solid * SOLID | o.destroyed * DESTROYED | (
+                o.stuck * STUCK | o.sticky * STICKY | o.pass_through * PASS_THROUGH if isinstance(o, BallObject) else 0
+            )
+            for o in objects
+        ]
+        entities["texture"] = [name_index(o.texture) for o in objects]
+        entities["animation"] = [name_index(o.animation) for o in objects]
+        entities["frame"] = [o.animation.frame if o.animation else 0.0 for o in objects]
+        entities["position"] = [o.position.to_tuple() for o in objects]
+        entities["rotation"] = [o.rotation for o in objects]
+        entities["size"] = [o.size.to_tuple() for o in objects]
+        entities["color"] = [o.color.to_tuple() for o in objects]
+        entities["velocity"] = [o.velocity.to_tuple() for o in objects]
+        entities["radius"] = [o.radius if isinstance(o, BallObject) else 0.0 for o in objects]
+
+        return Snapshot(entities, names, frame)
+
+    # writes the captured state back into the objects it was taken from
+    def restore(self, objects: list[GameObject]) -> None:
+        if len(objects) != len(self.entities):
+            raise ValueError(f"snapshot holds {len(self.entities)} entities, got {len(objects)} objects")
+
+        resources = []
+        for name in self.names:
+            category, _, resource_name = name.partition("/")
+            resources.append(getattr(ResourceManager, category).get(resource_name))
+
+        # columns are converted to Python values in bulk, then assigned
+        entities = self.entities
+        kinds = entities["kind"].tolist()
+        flags = entities["flags"].tolist()
+        textures = entities["texture"].tolist()
+        animations = entities["animation"].tolist()
+        frames = entities["frame"].tolist()
+        positions = entities["position"].tolist()
+        rotations = entities["rotation"].tolist()
+        sizes = entities["size"].tolist()
+        colors = entities["color"].tolist()
+        velocities = entities["velocity"].tolist()
+        radii = entities["radius"].tolist()
+
+        for i, o in enumerate(objects):
+            if (kinds[i] == KIND_BALL) != isinstance(o, BallObject):
+                raise ValueError(f"entity {i} does not match the kind of object it was captured from")
+            # fresh vectors, objects may share their default ones
+            o.position = glm.vec2(positions[i])
+            o.rotation = rotations[i]
+            o.size = glm.vec2(sizes[i])
+            o.color = glm.vec3(colors[i])
+            o.velocity = glm.vec2(velocities[i])
+            o.is_solid = bool(flags[i] & SOLID)
+            o.destroyed = bool(flags[i] & DESTROYED)
+            o.texture = resources[textures[i]] if textures[i] >= 0 else None
+            o.animation = resources[animations[i]] if animations[i] >= 0 else None
+            if o.animation:
+                o.animation.frame = frames[i]
+            if kinds[i] == KIND_BALL:
+                o.radius = radii[i]
+                o.stuck = bool(flags[i] & STUCK)
+                o.sticky = bool(flags[i] & STICKY)
+                o.pass_through = bool(flags[i] & PASS_THROUGH)
+
+    def to_bytes(self, compress: bool = True) -> bytes:
+        return encode_snapshot(self.entities.tobytes(), self.names, self.frame, compress)
+
+    @staticmethod
+    def from_bytes(data: bytes) -> "Snapshot":
+        magic, version, flags, frame, count, names_size = HEADER.unpack_from(data, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError("not a snapshot")
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"unsupported snapshot version {version}")
+
+        offset = HEADER.size
+        names_data = data[offset:offset + names_size].decode("utf-8")
+        names = names_data.split("\n") if names_data else []
+        body = data[offset + names_size:]
+        if flags & COMPRESSED:
+            body = zlib.decompress(body)
+        if len(body) != count * ENTITY_DTYPE.itemsize:
+            raise ValueError(f"snapshot body holds {len(body)} bytes, expected {count} entities")
+        # copy, so the entities are writable and do not keep data alive
+        entities = np.frombuffer(body, dtype=ENTITY_DTYPE, count=count).copy()
+        return Snapshot(entities, names, frame)
+
+
+def encode_snapshot(body: bytes, names: list[str], frame: int, compress: bool) -> bytes:
+    names_data = "\n".join(names).encode("utf-8")
+    count = len(body) // ENTITY_DTYPE.itemsize
+    if compress:
+        # level 1: entity records compress well enough, favour speed
+        body = zlib.compress(body, 1)
+    header = HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, COMPRESSED if compress else 0, frame, count, len(names_data))
+    return header + names_data + body
+
+
+def save_snapshot(snapshot: Snapshot, path: str, compress: bool = True) -> None:
+    with open(path, "wb") as file:
+        file.write(snapshot.to_bytes(compress))
+
+
+def load_snapshot(path: str) -> Snapshot:
+    with open(path, "rb") as file:
+        return Snapshot.from_bytes(file.read())
+
+
+# Writes snapshots to disk on a background thread so compression and I/O
+# do not stall the frame (zlib releases the GIL while compressing). The
+# records are copied before returning, the snapshot can be reused at once.
+class SnapshotWriter:
+    def __init__(self):
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="snapshot-writer")
+
+    def save(self, snapshot: Snapshot, path: str, compress: bool = True) -> Future:
+        body = snapshot.entities.tobytes()
+        return self.executor.submit(self.write, body, list(snapshot.names), snapshot.frame, path, compress)
+
+    @staticmethod
+    def write(body: bytes, names: list[str], frame: int, path: str, compress: bool) -> None:
+        data = encode_snapshot(body, names, frame, compress)
+        # written aside then swapped in, a reader never sees a partial file
+        with open(path + ".tmp", "wb") as file:
+            file.write(data)
+        os.replace(path + ".tmp", path)
+
+    # waits for every pending write
+    def close(self) -> None:
+        self.executor.shutdown(wait=True)
+
+
+# The most recent snapshots, for rewinding or rolling back the simulation.
+# Once full, capturing reuses the storage of the oldest snapshot.
+class SnapshotRing:
+    def __init__(self, capacity: int = 120):
+        self.capacity = capacity
+        self.snapshots: deque[Snapshot] = deque()
+
+    def capture(self, objects: list[GameObject], frame: int) -> Snapshot:
+        out = None
+        if len(self.snapshots) == self.capacity:
+            out = self.snapshots.popleft().entities
+        snapshot = Snapshot.capture(objects, frame, out)
+        self.snapshots.append(snapshot)
+        return snapshot
+
+    # the snapshot taken at frame, if still in the ring
+    def at(self, frame: int) -> Optional[Snapshot]:
+        for snapshot in reversed(self.snapshots):
+            if snapshot.frame == frame:
+                return snapshot
+            if snapshot.frame < frame:
+                break
+        return None
+
+    # restores the newest snapshot taken at or before frame and forgets the
+    # later ones, returns the frame actually restored (None if too old)
+    def rollback(self, objects: list[GameObject], frame: int) -> Optional[int]:
+        while self.snapshots and self.snapshots[-1].frame > frame:
+            self.snapshots.pop()
+        if not self.snapshots:
+            return None
+        snapshot = self.snapshots[-1]
+        snapshot.restore(objects)
+        return snapshot.frame
+
+    def clear(self) -> None:
+        self.snapshots.clear()
+
+    def __len__(self) -> int:
+        return len(self.snapshots)
@@ -0,0 +1,186 @@
+from OpenGL.GL import *
+from typing import Optional
+from elyria.shader import Shader
+from elyria.texture2d import Texture2D, TextureArray
+from elyria.palette import PaletteTexture
+from elyria.stream_buffer import StreamingBuffers
+import ctypes
+import glm
+import numpy as np
+
+
+# per sprite: position, size, rotation, color, texture coordinates (u0, v0, u1, v1), array layer, palette row
+SPRITE_BATCH_RECORD_SIZE = 14
+# vec2 position, vec2 texture coordinates, vec3 color, float layer, float palette row
+BATCH_VERTEX_SIZE = 9 * 4
+
+# corners of a quad in the order of SpriteRenderer (two triangles), and the
+# texture coordinates each one takes: indices into (u0, v0, u1, v1)
+QUAD_CORNERS = np.array([[0.0, 1.0], [1.0, 0.0], [0.0, 0.0], [0.0, 1.0], [1.0, 1.0], [1.0, 0.0]], dtype=np.float32)
+QUAD_UVS = np.array([[0, 3], [2, 1], [0, 1], [0, 3], [2, 3], [2, 1]])
+
+
+# the 6 vertices of every recorded sprite, as an (sprites * 6, 9) array:
+# the SpriteRenderer's model transform (rotation around the center) done
+# on the CPU, for all sprites at once
+def sprite_vertices(records: np.ndarray) -> np.ndarray:
+    count = len(records)
+    position, size = records[:, 0:2], records[:, 2:4]
+    angle = np.radians(records[:, 4])
+    cos, sin = np.cos(angle)[:, None], np.sin(angle)[:, None]
+
+    local = (QUAD_CORNERS[None, :, :] - 0.5) * size[:, None, :]
+    center = position + 0.5 * size
+    vertices = np.empty((count, 6, 9), dtype=np.float32)
+    vertices[:, :, 0] = center[:, None, 0] + local[:, :, 0] * cos - local[:, :, 1] * sin
+    vertices[:, :, 1] = center[:, None, 1] + local[:, :, 0] * sin + local[:, :, 1] * cos
+    vertices[:, :, 2:4] = records[:, 8:12][:, QUAD_UVS]
+    vertices[:, :, 4:7] = records[:, None, 5:8]
+    vertices[:, :, 7:9] = records[:, None, 12:14]
+    return vertices.reshape(count * 6, 9)
+
+
+# A sprite renderer that draws many sprites at once. It has the drawing
+# methods of SpriteRenderer; sprites are only recorded, and drawn with a
+# single draw call per batch when flushed.
+#
+# A batch ends when a sprite needs another texture: the batch shader
+# samples one texture and one texture array (see ResourceManager's
+# texture_arrays), so sprites of any sheet of the same array, mixed with
+# sprites of one texture of its own, share a draw. Indexed textures look
+# their colors up in the palette row of each sprite (see PaletteTexture).
+#
+# Everything drawn otherwise (particles, text, another shader, another
+# framebuffer or projection) must wait for the sprites recorded before it:
+# call flush first. The engine does so around layers and at the end of the
+# scene; SpriteRenderer.flush does nothing, so code written for either
+# renderer works with both.
+class SpriteBatch:
+    def __init__(self, shader: Shader, capacity: int = 1024) -> None:
+        self.shader = shader
+        self.records = np.zeros((capacity, SPRITE_BATCH_RECORD_SIZE), dtype=np.float32)
+        self.count = 0
+        # textures the recorded sprites sample
+        self.texture: Optional[Texture2D] = None
+        self.array: Optional[TextureArray] = None
+        self.palettes: Optional[PaletteTexture] = None
+        self.vao = None
+
+        # statistics, over the batch's whole life
+        self.sprites = 0
+        self.batches = 0
+        self.init_render_data()
+
+    def draw_sprite(
+        self,
+        texture: Texture2D,
+        position: glm.vec2,
+        size: glm.vec2 = glm.vec2(10.0, 10.0),
+        rotate: float = 0.0,
+        color: glm.vec3 = glm.vec3(1.0),
+        palette: Optional[int] = None
+    ) -> None:
+        self.draw_quad(texture, position, size, rotate, color, (0.0, 0.0, 1.0, 1.0), palette)
+
+    # tex_coords: (x, y, width, height) in pixels
+    def draw_subsprite(
+        self,
+        texture: Texture2D,
+        position: glm.vec2,
+        size: glm.vec2 = glm.vec2(10.0, 10.0),
+        rotate: float = 0.0,
+        color: glm.vec3 = glm.vec3(1.0),
+        tex_coords: tuple[int, int, int, int] = [0, 0, 0, 0],
+        palette: Optional[int] = None
+    ) -> None:
+        tex_x, tex_y, tex_w, tex_h = tex_coords
+        tex_width, tex_height = texture.width, texture.height
+        self.draw_quad(
+            texture, position, size, rotate, color,
+            (tex_x / tex_width, tex_y / tex_height, (tex_x + tex_w) / tex_width, (tex_y + tex_h) / tex_height),
+            palette
+        )
+
+    # records a sprite with normalized texture coordinates (u0, v0, u1, v1);
+    # palette: row of the palette an indexed texture is drawn with, its own if None
+    def draw_quad(
+        self,
+        texture: Texture2D,
+        position: glm.vec2,
+        size: glm.vec2,
+        rotate: float,
+        color: glm.vec3,
+        uv: tuple[float, float, float, float],
+        palette: Optional[int] = None
+    ) -> None:
+        array = texture.array
+        if array is not None:
+            if self.array is not array:
+                if self.array is not None:
+                    self.flush()
+                self.array = array
+        elif self.texture is not texture:
+            if self.texture is not None:
+                self.flush()
+            self.texture = texture
+        row = texture.palette if palette is None or texture.palette < 0 else palette
+        if row >= 0 and self.palettes is not texture.palette_texture:
+            if self.palettes is not None:
+                self.flush()
+            self.palettes = texture.palette_texture
+
+        if self.count == len(self.records):
+            self.records = np.concatenate((self.records, np.zeros_like(self.records)))
+        u0, v0, u1, v1 = uv
+        self.records[self.count] = (
+            position.x, position.y, size.x, size.y, rotate, color.x, color.y, color.z,
+            u0, v0, u1, v1, texture.layer if array is not None else -1.0, row
+        )
+        self.count += 1
+
+    # draws the recorded sprites
+    def flush(self) -> None:
+        if self.count == 0:
+            self.texture = self.array = self.palettes = None
+            return
+        vertices = sprite_vertices(self.records[:self.count])
+
+        self.shader.use()
+        if self.texture is not None:
+            glActiveTexture(GL_TEXTURE0)
+            self.texture.bind()
+        if self.array is not None:
+            glActiveTexture(GL_TEXTURE1)
+            self.array.bind()
+            glActiveTexture(GL_TEXTURE0)
+        if self.palettes is not None:
+            glActiveTexture(GL_TEXTURE2)
+            self.palettes.bind()
+            glActiveTexture(GL_TEXTURE0)
+
+        offset = self.stream.allocate(vertices, BATCH_VERTEX_SIZE)
+        glBindVertexArray(self.vao)
+        glDrawArrays(GL_TRIANGLES, offset // BATCH_VERTEX_SIZE, len(vertices))
+        glBindVertexArray(0)
+
+        self.sprites += self.count
+        self.batches += 1
+        self.count = 0
+        self.texture = self.array = self.palettes = None
+
+    def init_render_data(self) -> None:
+        # vertices are written to the shared vertex stream buffer on each flush
+        self.stream = StreamingBuffers.vertex_buffer()
+        self.vao = glGenVertexArrays(1)
+        glBindVertexArray(self.vao)
+        glBindBuffer(GL_ARRAY_BUFFER, self.stream.id)
+        glEnableVertexAttribArray(0)
+        glVertexAttribPointer(0, 4, GL_FLOAT, GL_FALSE, BATCH_VERTEX_SIZE, None)
+        glEnableVertexAttribArray(1)
+        glVertexAttribPointer(1, 3, GL_FLOAT, GL_FALSE, BATCH_VERTEX_SIZE, ctypes.c_void_p(4 * 4))
+        glEnableVertexAttribArray(2)
+        glVertexAttribPointer(2, 1, GL_FLOAT, GL_FALSE, BATCH_VERTEX_SIZE, ctypes.c_void_p(7 * 4))
+        glEnableVertexAttribArray(3)
+        glVertexAttribPointer(3, 1, GL_FLOAT, GL_FALSE, BATCH_VERTEX_SIZE, ctypes.c_void_p(8 * 4))
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glBindVertexArray(0)
@@ -1,10 +1,16 @@
 from OpenGL.GL import *
 from elyria.shader import Shader
 from elyria.texture2d import Texture2D
+from elyria.stream_buffer import StreamingBuffers
+from typing import Optional
 import glm
 import numpy as np
 
 
+# vec2 position, vec2 texture coordinates
+SPRITE_VERTEX_SIZE = 4 * 4
+
+
 class SpriteRenderer:
     def __init__(self, shader: Shader) -> None:
         self.shader = shader
@@ -17,10 +23,11 @@ class SpriteRenderer:
         position: glm.vec2,
         size: glm.vec2 = glm.vec2(10.0, 10.0),
         rotate: float = 0.0,
-        color: glm.vec3 = glm.vec3(1.0)
+        color: glm.vec3 = glm.vec3(1.0),
+        palette: Optional[int] = None
     ) -> None:
         tex_width, tex_height = texture.width, texture.height
-        self.draw_subsprite(texture, position, size, rotate, color, (0, 0, tex_width, tex_height))
+        self.draw_subsprite(texture, position, size, rotate, color, (0, 0, tex_width, tex_height), palette)
 
     def draw_subsprite(
         self,
@@ -29,12 +36,32 @@ class SpriteRenderer:
         size: glm.vec2 = glm.vec2(10.0, 10.0),
         rotate: float = 0.0,
         color: glm.vec3 = glm.vec3(1.0),
-        tex_coords: tuple[int, int, int, int] = [0, 0, 0, 0]
+        tex_coords: tuple[int, int, int, int] = [0, 0, 0, 0],
+        palette: Optional[int] = None
     ) -> None:
         """
         Affiche une portion de la texture.
         tex_coords: (x, y, width, height) en pixels.
+        palette: ligne de palette d'une texture indexée (sa propre palette si None).
         """
+        tex_x, tex_y, tex_w, tex_h = tex_coords
+        tex_width, tex_height = texture.width, texture.height
+        u0, v0 = tex_x / tex_width, tex_y / tex_height
+        u1, v1 = (tex_x + tex_w) / tex_width, (tex_y + tex_h) / tex_height
+        self.draw_quad(texture, position, size, rotate, color, (u0, v0, u1, v1), palette)
+
+    # draws a sprite with normalized texture coordinates (u0, v0, u1, v1);
+    # palette: row of the palette an indexed texture is drawn with (see PaletteTexture)
+    def draw_quad(
+        self,
+        texture: Texture2D,
+        position: glm.vec2,
+        size: glm.vec2,
+        rotate: float,
+        color: glm.vec3,
+        uv: tuple[float, float, float, float],
+        palette: Optional[int] = None
+    ) -> None:
         self.shader.use()
 
         model = glm.mat4(1.0)
@@ -49,36 +76,64 @@ class SpriteRenderer:
 
         glActiveTexture(GL_TEXTURE0)
         texture.bind()
+        row = texture.palette if palette is None or texture.palette < 0 else palette
+        # the uniform belongs to the shader, which other renderers may have drawn with since
+        if row != self.shader.palette_row:
+            self.shader.set_int("paletteRow", row)
+            self.shader.palette_row = row
+        if row >= 0:
+            glActiveTexture(GL_TEXTURE1)
+            texture.palette_texture.bind()
+            glActiveTexture(GL_TEXTURE0)
 
-        tex_x, tex_y, tex_w, tex_h = tex_coords
-        tex_width, tex_height = texture.width, texture.height
-        u0, v0 = tex_x / tex_width, tex_y / tex_height
-        u1, v1 = (tex_x + tex_w) / tex_width, (tex_y + tex_h) / tex_height
+        u0, v0, u1, v1 = uv
 
-        vertices = np.array([
-            # pos    # tex
-            0.0, 1.0, u0, v1,
-            1.0, 0.0, u1, v0,
-            0.0, 0.0, u0, v0,
-            
-            0.0, 1.0, u0, v1,
-            1.0, 1.0, u1, v1,
-            1.0, 0.0, u1, v0
-        ], dtype=np.float32)
+        # quads only differ by their texture coordinates, so a quad already
+        # streamed this frame (and not overwritten since) is drawn again as is
+        self.check_quads()
+        offset = self.quads.get((u0, v0, u1, v1))
+        if offset is None:
+            vertices = np.array([
+                # pos    # tex
+                0.0, 1.0, u0, v1,
+                1.0, 0.0, u1, v0,
+                0.0, 0.0, u0, v0,
+                
+                0.0, 1.0, u0, v1,
+                1.0, 1.0, u1, v1,
+                1.0, 0.0, u1, v0
+            ], dtype=np.float32)
 
-        glBindVertexArray(self.quad_vao)
-        vbo = glGenBuffers(1)
-        glBindBuffer(GL_ARRAY_BUFFER, vbo)
-        glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, vertices, GL_STATIC_DRAW)
-        glEnableVertexAttribArray(0)
-        glVertexAttribPointer(0, 4, GL_FLOAT, GL_FALSE, 4 * vertices.itemsize, None)
-        
-        glDrawArrays(GL_TRIANGLES, 0, 6)
+            # stream the quad, aligned on the vertex size so it can be drawn by index
+            offset = self.stream.allocate(vertices, SPRITE_VERTEX_SIZE)
+            self.check_quads()
+            self.quads[(u0, v0, u1, v1)] = offset
 
-        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glBindVertexArray(self.quad_vao)
+        glDrawArrays(GL_TRIANGLES, offset // SPRITE_VERTEX_SIZE, 6)
         glBindVertexArray(0)
 
+    # sprites are drawn right away, there is nothing to flush (see SpriteBatch)
+    def flush(self) -> None:
+        pass
+
+    # forgets the streamed quads once a new frame started or the ring wrapped
+    def check_quads(self) -> None:
+        epoch = (self.stream.frame, self.stream.generation)
+        if epoch != self.quads_epoch:
+            self.quads.clear()
+            self.quads_epoch = epoch
+
     def init_render_data(self) -> None:
+        # quads are written to the shared vertex stream buffer on each draw
+        self.stream = StreamingBuffers.vertex_buffer()
+        # byte offset of the quads streamed during the current frame, by texture coordinates
+        self.quads: dict[tuple[float, float, float, float], int] = {}
+        self.quads_epoch = (self.stream.frame, self.stream.generation)
         self.quad_vao = glGenVertexArrays(1)
         glBindVertexArray(self.quad_vao)
+        glBindBuffer(GL_ARRAY_BUFFER, self.stream.id)
+        glEnableVertexAttribArray(0)
+        glVertexAttribPointer(0, 4, GL_FLOAT, GL_FALSE, SPRITE_VERTEX_SIZE, None)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
         glBindVertexArray(0)
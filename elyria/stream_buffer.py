@@ -0,0 +1,198 @@
+import ctypes
+import time
+import numpy as np
+from collections import deque
+from OpenGL.GL import *
+from OpenGL.GL.ARB.buffer_storage import glInitBufferStorageARB
+from typing import Optional
+
+
+# persistent mapping needs immutable buffer storage (GL 4.4 or ARB_buffer_storage)
+def persistent_mapping_supported() -> bool:
+    if (glGetIntegerv(GL_MAJOR_VERSION), glGetIntegerv(GL_MINOR_VERSION)) >= (4, 4):
+        return True
+    return bool(glInitBufferStorageARB())
+
+
+# A ring buffer for transient (per-frame) vertex or index data.
+#
+# Data is appended at an ever increasing head and wraps around to the start of
+# the buffer once the end is reached. Where persistent mapping is supported
+# (GL 4.4 / ARB_buffer_storage) the buffer stays mapped and a fence is inserted
+# at the end of every frame: before overwriting bytes written by an older frame
+# we make sure the GPU is done reading them (a frame that wraps onto its own
+# data is fenced at the wrap and waited for the same way). Otherwise the buffer
+# is orphaned on every wrap, so the driver hands out fresh storage instead of
+# stalling, and data is written through unsynchronized mappings.
+class StreamBuffer:
+    def __init__(self, size: int = 4 * 1024 * 1024, persistent: Optional[bool] = None):
+        self.size = size
+        self.id = glGenBuffers(1)
+        self.persistent = persistent if persistent is not None else persistent_mapping_supported()
+
+        # absolute write position (never wraps, the ring offset is head % size)
+        self.head = 0
+        self.frame_start = 0
+        # number of times the ring wrapped around and of ended frames, together
+        # they tell whether an earlier allocation is still in the buffer
+        self.generation = 0
+        self.frame = 0
+        # (fence, absolute start of the frame it protects) of in-flight frames
+        self.fences: deque = deque()
+        self.pointer: Optional[int] = None
+
+        # statistics
+        self.bytes_streamed = 0
+        self.frame_bytes = 0
+        self.last_frame_bytes = 0
+        self.allocations = 0
+        self.orphans = 0
+        self.stalls = 0
+        self.failed_stalls = 0
+        self.stall_time = 0.0
+
+        glBindBuffer(GL_COPY_WRITE_BUFFER, self.id)
+        if self.persistent:
+            flags = GL_MAP_WRITE_BIT | GL_MAP_PERSISTENT_BIT | GL_MAP_COHERENT_BIT
+            glBufferStorage(GL_COPY_WRITE_BUFFER, size, None, flags)
+            self.pointer = ctypes.cast(glMapBufferRange(GL_COPY_WRITE_BUFFER, 0, size, flags), ctypes.c_void_p).value
+        else:
+            glBufferData(GL_COPY_WRITE_BUFFER, size, None, GL_STREAM_DRAW)
+        glBindBuffer(GL_COPY_WRITE_BUFFER, 0)
+
+    # copies data into the ring and returns its byte offset in the buffer;
+    # the offset is a multiple of alignment (e.g. the vertex stride)
+    def allocate(self, data: np.ndarray, alignment: int = 4) -> int:
+        nbytes = data.nbytes
+        if nbytes > self.size:
+            raise ValueError(f"stream allocation of {nbytes} bytes exceeds buffer size {self.size}")
+
+        start = -(-self.head // alignment) * alignment
+        if start % self.size + nbytes > self.size:
+            # does not fit before the end of the buffer, wrap around
+            start = -(-start // self.size) * self.size
+        if start // self.size != self.generation:
+            if not self.persistent:
+                self.orphan()
+            self.generation = start // self.size
+        end = start + nbytes
+        offset = start % self.size
+
+        if self.persistent:
+            if end - self.size > self.frame_start:
+                # the current frame wrapped onto its own data: fence what it
+                # submitted so far, so it is waited for like an older frame
+                self.fences.append((glFenceSync(GL_SYNC_GPU_COMMANDS_COMPLETE, 0), self.frame_start))
+                self.frame_start = self.head
+            self.wait_for_range(end)
+            ctypes.memmove(self.pointer + offset, data.ctypes.data, nbytes)
+        else:
+            glBindBuffer(GL_COPY_WRITE_BUFFER, self.id)
+            access = GL_MAP_WRITE_BIT | GL_MAP_UNSYNCHRONIZED_BIT | GL_MAP_INVALIDATE_RANGE_BIT
+            pointer = ctypes.cast(glMapBufferRange(GL_COPY_WRITE_BUFFER, offset, nbytes, access), ctypes.c_void_p).value
+            ctypes.memmove(pointer, data.ctypes.data, nbytes)
+            glUnmapBuffer(GL_COPY_WRITE_BUFFER)
+            glBindBuffer(GL_COPY_WRITE_BUFFER, 0)
+
+        self.head = end
+        self.allocations += 1
+        self.frame_bytes += nbytes
+        self.bytes_streamed += nbytes
+        return offset
+
+    # gives the buffer fresh storage, the GPU keeps reading the old one
+    def orphan(self) -> None:
+        glBindBuffer(GL_COPY_WRITE_BUFFER, self.id)
+        glBufferData(GL_COPY_WRITE_BUFFER, self.size, None, GL_STREAM_DRAW)
+        glBindBuffer(GL_COPY_WRITE_BUFFER, 0)
+        self.orphans += 1
+
+    # waits until the GPU no longer reads any frame whose data lives where
+    # the ring is about to write (up to absolute position end)
+    def wait_for_range(self, end: int) -> None:
+        while self.fences and self.fences[0][1] < end - self.size:
+            fence, _ = self.fences.popleft()
+            if glClientWaitSync(fence, 0, 0) in (GL_TIMEOUT_EXPIRED, GL_WAIT_FAILED):
+                self.stalls += 1
+                stall_start = time.perf_counter()
+                status = glClientWaitSync(fence, GL_SYNC_FLUSH_COMMANDS_BIT, 1_000_000_000)
+                self.stall_time += time.perf_counter() - stall_start
+                if status in (GL_TIMEOUT_EXPIRED, GL_WAIT_FAILED):
+                    # the range gets overwritten anyway while the GPU may still read it
+                    self.failed_stalls += 1
+                    print("ERROR::STREAM_BUFFER: Timed out waiting for the GPU to release a buffer range")
+            glDeleteSync(fence)
+
+    # marks the end of a frame's allocations
+    def end_frame(self) -> None:
+        if self.persistent and self.head > self.frame_start:
+            self.fences.append((glFenceSync(GL_SYNC_GPU_COMMANDS_COMPLETE, 0), self.frame_start))
+        self.frame_start = self.head
+        self.frame += 1
+        self.last_frame_bytes = self.frame_bytes
+        self.frame_bytes = 0
+
+    def stats(self) -> dict:
+        return {
+            "persistent": self.persistent,
+            "bytes_streamed": self.bytes_streamed,
+            "frame_bytes": self.last_frame_bytes,
+            "allocations": self.allocations,
+            "orphans": self.orphans,
+            "stalls": self.stalls,
+            "failed_stalls": self.failed_stalls,
+            "stall_time": self.stall_time
+        }
+
+    def delete(self) -> None:
+        glBindBuffer(GL_COPY_WRITE_BUFFER, self.id)
+        if self.persistent:
+            glUnmapBuffer(GL_COPY_WRITE_BUFFER)
+        glBindBuffer(GL_COPY_WRITE_BUFFER, 0)
+        for fence, _ in self.fences:
+            glDeleteSync(fence)
+        self.fences.clear()
+        glDeleteBuffers(1, np.array([self.id], dtype=np.uint32))
+
+
+# Shared stream buffers every renderer allocates its transient vertex and
+# index ranges from. Buffers are created on first use (once a GL context exists).
+class StreamingBuffers:
+    vertices: Optional[StreamBuffer] = None
+    indices: Optional[StreamBuffer] = None
+
+    @staticmethod
+    def vertex_buffer() -> StreamBuffer:
+        if StreamingBuffers.vertices is None:
+            StreamingBuffers.vertices = StreamBuffer(4 * 1024 * 1024)
+        return StreamingBuffers.vertices
+
+    @staticmethod
+    def index_buffer() -> StreamBuffer:
+        if StreamingBuffers.indices is None:
+            StreamingBuffers.indices = StreamBuffer(1024 * 1024)
+        return StreamingBuffers.indices
+
+    # called once per frame, after the frame's draw calls were submitted
+    @staticmethod
+    def end_frame() -> None:
+        for buffer in (StreamingBuffers.vertices, StreamingBuffers.indices):
+            if buffer is not None:
+                buffer.end_frame()
+
+    @staticmethod
+    def stats() -> dict[str, dict]:
+        stats = {}
+        if StreamingBuffers.vertices is not None:
+            stats["vertices"] = StreamingBuffers.vertices.stats()
+        if StreamingBuffers.indices is not None:
+            stats["indices"] = StreamingBuffers.indices.stats()
+        return stats
+
+    @staticmethod
+    def clear() -> None:
+        for buffer in (StreamingBuffers.vertices, StreamingBuffers.indices):
+            if buffer is not None:
+                buffer.delete()
+        StreamingBuffers.vertices = None
+        StreamingBuffers.indices = None
@@ -1,157 +1,173 @@
 import os
 import glm
-import freetype
 import numpy as np
+from typing import Iterable, Optional
 from OpenGL.GL import *
 from elyria import base_dir
 from elyria.resource_manager import ResourceManager
 from elyria.texture2d import Texture2D
 from elyria.shader import Shader
+from elyria.stream_buffer import StreamingBuffers
+from elyria.glyph_atlas import Character, GlyphAtlas
+from elyria.font_cache import FontCache
 
-
-# Holds all state information relevant to a character as loaded using FreeType
-class Character:
-    def __init__(
-        self,
-        texture_id: int,
-        size: glm.ivec2,
-        bearing: glm.ivec2,
-        advance: int
-    ):
-        # ID handle of the glyph texture
-        self.texture_id = texture_id
-        # size of glyph
-        self.size = size
-        # offset from baseline to left/top of glyph
-        self.bearing = bearing
-        # horizontal offset to advance to next glyph
-        self.advance = advance
+# printable ASCII characters
+ASCII = "".join(chr(c) for c in range(32, 127))
 
 
 # A renderer class for rendering text displayed by a font loaded using the
-# FreeType library. A single font is loaded, processed into a list of Character
-# items for later rendering
+# FreeType library. A single font is loaded; its glyphs are rasterized on
+# first use into the pages of a GlyphAtlas, shared by every renderer using
+# the same font at the same size
 class TextRenderer:
+    # glyph atlases by (font, size, sdf, spread)
+    atlases: dict[tuple[str, int, bool, int], GlyphAtlas] = {}
+    # characters loaded with every font, and where their glyphs are baked so
+    # that later runs load them without FreeType (None to always rasterize)
+    charset = ASCII
+    font_cache: Optional[FontCache] = FontCache(os.path.join(base_dir, "fonts", "baked"))
+
     def __init__(self, width: int, height: int):
-        # holds a list of pre-compiled Characters
-        self.characters: dict[str, Character] = {}
-        # load and configure shader
+        # glyphs of the loaded font
+        self.atlas: Optional[GlyphAtlas] = None
+        # distance field mode (see load), and the size of the baked glyphs
+        # relative to the font size
+        self.sdf = False
+        self.glyph_scale = 1.0
+        # load and configure shaders
         self.text_shader = ResourceManager.load_shader(
             "text",
             os.path.join(base_dir, "shaders", "text_2d.vs"),
             os.path.join(base_dir, "shaders", "text_2d.fs")
         )
-        self.text_shader.use()
+        self.sdf_shader = ResourceManager.load_shader(
+            "text_sdf",
+            os.path.join(base_dir, "shaders", "text_2d.vs"),
+            os.path.join(base_dir, "shaders", "text_sdf.fs")
+        )
         projection = glm.ortho(0.0, float(width), float(height), 0.0)
-        self.text_shader.set_mat4("projection", projection)
-        self.text_shader.set_int("text", 0)
-
-        # configure vao / vbo for texture quads
+        for shader in (self.text_shader, self.sdf_shader):
+            shader.use()
+            shader.set_mat4("projection", projection)
+            shader.set_int("text", 0)
+
+        # configure vao for texture quads, streamed from the shared buffers
+        self.vertex_stream = StreamingBuffers.vertex_buffer()
+        self.index_stream = StreamingBuffers.index_buffer()
         self.vao = glGenVertexArrays(1)
-        self.vbo = glGenBuffers(1)
         glBindVertexArray(self.vao)
-        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
-        glBufferData(GL_ARRAY_BUFFER, 6 * 6 * 4, None, GL_DYNAMIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vertex_stream.id)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.index_stream.id)
         glEnableVertexAttribArray(0)
         glVertexAttribPointer(0, 4, GL_FLOAT, GL_FALSE, 4 * 4, None)
-        glBindBuffer(GL_ARRAY_BUFFER, 0)
         glBindVertexArray(0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
 
-    # pre-compiles a list of characters from the given font
-    def load(self, font: str, font_size: int) -> None:
-        # first clear the previously loaded Characters
-        self.characters.clear()
-
-        # load font as face
-        face: freetype.Face = freetype.Face(font)
-
-        # set size to load glyphs as
-        face.set_pixel_sizes(font_size, font_size)
-
-        # disable byte-alignment restriction
-        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
-
-        # Then for the first 128 ASCII characters, pre-load / compile their characters and store them
-        for c in range(128):
-            # load character glyph
-            if face.load_char(c, freetype.FT_LOAD_RENDER):
-                print(f"ERROR::FREETYPE: Failed to load {c} Glyph")
-                continue
-
-            # generate texture
-            texture = glGenTextures(1)
-            glBindTexture(GL_TEXTURE_2D, texture)
-            glTexImage2D(
-                GL_TEXTURE_2D,
-                0,
-                GL_RED,
-                face.glyph.bitmap.width,
-                face.glyph.bitmap.rows,
-                0,
-                GL_RED,
-                GL_UNSIGNED_BYTE,
-                face.glyph.bitmap.buffer
-            )
-
-            # set texture options
-            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
-            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
-            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-
-            # now store character for later use
-            self.characters[chr(c)] = Character(
-                texture_id=texture,
-                size=glm.ivec2(face.glyph.bitmap.width, face.glyph.bitmap.rows),
-                bearing=glm.ivec2(face.glyph.bitmap_left, face.glyph.bitmap_top),
-                advance=face.glyph.advance.x
-            )
-        
-        glBindTexture(GL_TEXTURE_2D, 0)
-
-    # renders a string of text using the precompiled list of characters
-    def render_text(self, text: str, x: float, y: float, scale: float, color: glm.vec3 = glm.vec3(1.0)):
+    # loads the given font, pre-compiling the characters of charset (from
+    # the font cache, if any); others are rasterized on first use. With sdf,
+    # glyphs are baked at sdf_size pixels as distance fields instead,
+    # rendered crisp at any scale (and with outlines)
+    def load(self, font: str, font_size: int, sdf: bool = False, sdf_size: int = 48, spread: int = 6, max_pages: int = 4) -> None:
+        size = sdf_size if sdf else font_size
+        key = (font, size, sdf, spread if sdf else 0)
+        if key not in TextRenderer.atlases:
+            if TextRenderer.font_cache is not None:
+                baked = TextRenderer.font_cache.get(font, size, TextRenderer.charset, sdf, spread)
+                atlas = GlyphAtlas(font, size, sdf, spread, max_pages=max_pages, cell=baked.cell)
+                atlas.add_baked(baked.glyphs)
+            else:
+                atlas = GlyphAtlas(font, size, sdf, spread, max_pages=max_pages)
+            TextRenderer.atlases[key] = atlas
+        self.atlas = TextRenderer.atlases[key]
+        self.sdf = sdf
+        self.glyph_scale = font_size / size
+        self.atlas.warm_up(TextRenderer.charset)
+
+    # deletes the pages of every atlas, to call before the GL context goes away
+    @staticmethod
+    def clear() -> None:
+        for atlas in TextRenderer.atlases.values():
+            atlas.delete()
+        TextRenderer.atlases.clear()
+
+    # rasterizes the characters of every string ahead of time (e.g. the lines
+    # of a dialogue, during a loading screen); returns how many were new
+    def warm_up(self, strings: Iterable[str]) -> int:
+        return self.atlas.warm_up(strings)
+
+    # renders a string of text, rasterizing the characters not cached yet; in
+    # distance field mode the glyphs can be surrounded by an outline, outline
+    # pixels thick at scale 1 (at most the spread of the atlas)
+    def render_text(
+        self,
+        text: str,
+        x: float,
+        y: float,
+        scale: float,
+        color: glm.vec3 = glm.vec3(1.0),
+        outline: float = 0.0,
+        outline_color: glm.vec3 = glm.vec3(0.0)
+    ):
         # activate corresponding render state
-        self.text_shader.use()
-        self.text_shader.set_vec3("text_color", color)
+        if self.sdf:
+            shader = self.sdf_shader
+            shader.use()
+            # distance values (see signed_distance_field) of the glyph edge and of the outline edge
+            spread = self.atlas.spread
+            thickness = min(outline / self.glyph_scale, spread)
+            shader.set_float("edge", 128.0 / 255.0)
+            shader.set_float("outlineEdge", (128.0 - thickness * 127.0 / spread) / 255.0)
+            shader.set_vec3("outlineColor", outline_color)
+        else:
+            shader = self.text_shader
+            shader.use()
+        shader.set_vec3("textColor", color)
+        # glyph metrics are in baked pixels
+        scale *= self.glyph_scale
         glActiveTexture(GL_TEXTURE0)
         glBindVertexArray(self.vao)
 
-        # iterate through all characters
-        for c in text:
-            ch = self.characters[c]
-
+        # build the quads of the whole string at once (4 vertices, 6 indices per glyph)
+        if not text:
+            glBindVertexArray(0)
+            return
+        # 'H' sets the top line, it must not be evicted by the text either
+        glyphs = self.atlas.get_all(text + 'H')
+        top = glyphs.pop().bearing.y
+        vertices = np.empty((len(glyphs), 4, 4), dtype=np.float32)
+        for i, ch in enumerate(glyphs):
             xpos = x + ch.bearing.x * scale
-            ypos = y + (self.characters['H'].bearing.y - ch.bearing.y) * scale
+            ypos = y + (top - ch.bearing.y) * scale
 
             w = ch.size.x * scale
             h = ch.size.y * scale
+            u0, v0, u1, v1 = ch.tex_coords
 
-            # update VBO for each character
-            vertices = np.array([
-                [xpos,     ypos + h,   0.0, 1.0],
-                [xpos + w, ypos,       1.0, 0.0],
-                [xpos,     ypos,       0.0, 0.0],
-
-                [xpos,     ypos + h,   0.0, 1.0],
-                [xpos + w, ypos + h,   1.0, 1.0],
-                [xpos + w, ypos,       1.0, 0.0]
-            ], dtype=np.float32)
-
-            # render glyph texture over quad
-            glBindTexture(GL_TEXTURE_2D, ch.texture_id)
-
-            # update content of vbo memory
-            glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
-            glBufferSubData(GL_ARRAY_BUFFER, 0, vertices.nbytes, vertices)
-            glBindBuffer(GL_ARRAY_BUFFER, 0)
-
-            # render quad
-            glDrawArrays(GL_TRIANGLES, 0, 6)
+            vertices[i] = [
+                [xpos,     ypos + h,   u0, v1],
+                [xpos + w, ypos,       u1, v0],
+                [xpos,     ypos,       u0, v0],
+                [xpos + w, ypos + h,   u1, v1]
+            ]
 
             # now advance cursor for next glyph
             x += (ch.advance >> 6) * scale  # bitshift by 6 to get value in pixels (1/64th times 2^6 = 64)
-        
+
+        # upload everything in one go to the stream buffers
+        first_vertex = self.vertex_stream.allocate(vertices, 4 * 4) // (4 * 4)
+        quad = np.array([0, 1, 2, 0, 3, 1], dtype=np.uint32)
+        indices = (first_vertex + 4 * np.arange(len(glyphs), dtype=np.uint32)[:, None] + quad).astype(np.uint32)
+        index_offset = self.index_stream.allocate(indices, 4)
+
+        # render the glyphs in runs sharing a texture: one draw per glyph
+        # with a texture each, one for the whole string from an atlas
+        start = 0
+        for end in range(1, len(glyphs) + 1):
+            if end < len(glyphs) and glyphs[end].texture_id == glyphs[start].texture_id:
+                continue
+            glBindTexture(GL_TEXTURE_2D, glyphs[start].texture_id)
+            glDrawElements(GL_TRIANGLES, 6 * (end - start), GL_UNSIGNED_INT, ctypes.c_void_p(index_offset + start * 6 * 4))
+            start = end
+
         glBindVertexArray(0)
         glBindTexture(GL_TEXTURE_2D, 0)
-        
\ No newline at end of file
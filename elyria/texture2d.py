@@ -1,4 +1,6 @@
 from OpenGL.GL import *
+from typing import Callable, Optional
+from elyria.palette import PaletteTexture
 
 
 class Texture2D:
@@ -13,8 +15,9 @@ class Texture2D:
         filter_min: int = GL_LINEAR,
         filter_max: int = GL_LINEAR
     ):
-        # holds the ID of the texture object, used for all texture operations to reference to this particular texture
-        self.id = glGenTextures(1)
+        # holds the ID of the texture object, used for all texture operations to reference to this particular texture;
+        # 0 until the texture storage is first generated (and again once evicted)
+        self.id = 0
 
         # texture image dimensions
         self.width = width
@@ -30,9 +33,27 @@ class Texture2D:
         self.filter_min = filter_min  # filtering mode if texture pixels < screen pixels
         self.filter_max = filter_max  # filtering mode if texture pixels > screen pixels
 
+        # regenerates the texture after its storage was evicted (id set to 0)
+        self.loader: Optional[Callable[["Texture2D"], None]] = None
+
+        # the texture array holding the image as one of its layers, if any (see
+        # ResourceManager.texture_arrays); such a texture only gets a storage
+        # of its own (id) once it is bound by itself
+        self.array: Optional["TextureArray"] = None
+        self.layer = -1
+
+        # an indexed texture (R8) holds indices into the row palette of
+        # palette_texture, its colors; -1 for a texture of colors
+        self.palette = -1
+        self.palette_texture: Optional[PaletteTexture] = None
+
     def generate(self, data):        
-        # bind texture
+        if self.id == 0:
+            self.id = glGenTextures(1)
+
+        # bind texture; rows of the data are tightly packed
         glBindTexture(GL_TEXTURE_2D, self.id)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
         glTexImage2D(GL_TEXTURE_2D, 0, self.internal_format, self.width, self.height, 0, self.image_format, GL_UNSIGNED_BYTE, data)
 
         # set texture wrap and filter modes
@@ -45,4 +66,72 @@ class Texture2D:
         glBindTexture(GL_TEXTURE_2D, 0)
 
     def bind(self):
+        if self.id == 0 and self.loader:
+            self.loader(self)
         glBindTexture(GL_TEXTURE_2D, self.id)
+
+
+# Same-sized images stored as the layers of a single GL_TEXTURE_2D_ARRAY,
+# so that sprites cut from any of them are drawn together (see SpriteBatch).
+# The storage of every layer is allocated up front: an array is never
+# resized, a bigger one replaces it (see ResourceManager.group_texture).
+class TextureArray:
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        capacity: int,
+        internal_format: int = GL_RGBA,
+        image_format: int = GL_RGBA,
+        wrap_s: int = GL_REPEAT,
+        wrap_t: int = GL_REPEAT,
+        filter_min: int = GL_LINEAR,
+        filter_max: int = GL_LINEAR
+    ):
+        self.id = 0
+        self.width = width
+        self.height = height
+        self.capacity = capacity
+        self.internal_format = internal_format
+        self.image_format = image_format
+        self.wrap_s = wrap_s
+        self.wrap_t = wrap_t
+        self.filter_min = filter_min
+        self.filter_max = filter_max
+        # the texture of each used layer, in layer order
+        self.textures: list[Texture2D] = []
+
+    @property
+    def full(self) -> bool:
+        return len(self.textures) >= self.capacity
+
+    def generate(self) -> None:
+        if self.id == 0:
+            self.id = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D_ARRAY, self.id)
+        glTexImage3D(GL_TEXTURE_2D_ARRAY, 0, self.internal_format, self.width, self.height, self.capacity, 0, self.image_format, GL_UNSIGNED_BYTE, None)
+        glTexParameteri(GL_TEXTURE_2D_ARRAY, GL_TEXTURE_WRAP_S, self.wrap_s)
+        glTexParameteri(GL_TEXTURE_2D_ARRAY, GL_TEXTURE_WRAP_T, self.wrap_t)
+        glTexParameteri(GL_TEXTURE_2D_ARRAY, GL_TEXTURE_MIN_FILTER, self.filter_min)
+        glTexParameteri(GL_TEXTURE_2D_ARRAY, GL_TEXTURE_MAG_FILTER, self.filter_max)
+        glBindTexture(GL_TEXTURE_2D_ARRAY, 0)
+
+    # adds a texture's image as the next layer, returns the layer
+    def add(self, texture: Texture2D, data) -> int:
+        layer = len(self.textures)
+        glBindTexture(GL_TEXTURE_2D_ARRAY, self.id)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        glTexSubImage3D(GL_TEXTURE_2D_ARRAY, 0, 0, 0, layer, self.width, self.height, 1, self.image_format, GL_UNSIGNED_BYTE, data)
+        glBindTexture(GL_TEXTURE_2D_ARRAY, 0)
+        self.textures.append(texture)
+        texture.array = self
+        texture.layer = layer
+        return layer
+
+    def bind(self) -> None:
+        glBindTexture(GL_TEXTURE_2D_ARRAY, self.id)
+
+    def delete(self) -> None:
+        if self.id != 0:
+            glDeleteTextures(1, [self.id])
+            self.id = 0
@@ -0,0 +1,466 @@
+import os
+import json
+import gzip
+import zlib
+import base64
+import struct
+import glm
+import numpy as np
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+from elyria.texture2d import Texture2D
+from elyria.sprite_renderer import SpriteRenderer
+
+
+# file layout: a header, a JSON metadata block (layer names, tilesets,
+# entity types), then one fixed-size record per chunk, row by row, so any
+# chunk is found by its index alone and read through a memory map
+WORLD_MAGIC = b"ELWM"
+WORLD_VERSION = 1
+# magic, version, chunk size (tiles), layers, tile size (pixels),
+# chunks wide, chunks high, spawns per chunk, metadata length
+WORLD_HEADER = struct.Struct("<4sHHHHIIII")
+# chunk records start on a multiple of this
+WORLD_ALIGNMENT = 64
+
+# an entity spawn point: entity type (index in the map's entity types),
+# editor id, world position in pixels
+SPAWN_DTYPE = np.dtype([("type", "<u2"), ("id", "<u4"), ("x", "<f4"), ("y", "<f4")])
+
+# flags Tiled stores in the high bits of a tile gid (flips, hexagonal rotation)
+TILED_FLAGS = 0xF0000000
+
+
+# layout of a chunk record: tile gids of every layer (0 is empty), the
+# collision bits of its tiles, and its spawns (the first spawn_count are used)
+def chunk_dtype(layers: int, chunk_size: int, max_spawns: int) -> np.dtype:
+    return np.dtype([
+        ("tiles", "<u2", (layers, chunk_size, chunk_size)),
+        ("collision", "u1", (chunk_size * chunk_size // 8,)),
+        ("spawn_count", "<u2"),
+        ("spawns", SPAWN_DTYPE, (max_spawns,))
+    ])
+
+
+# A chunk of the world loaded in memory, copied out of the map file
+class Chunk:
+    def __init__(self, x: int, y: int, tiles: np.ndarray, collision: np.ndarray, spawns: np.ndarray):
+        # chunk coordinates
+        self.x = x
+        self.y = y
+        # (layers, chunk size, chunk size) tile gids, by row
+        self.tiles = tiles
+        # (chunk size, chunk size) booleans, by row
+        self.collision = collision
+        self.spawns = spawns
+
+
+# writes a world to a map file.
+# tiles: (layers, height, width) tile gids; collision: (height, width) booleans
+# spawns: (entity type, id, x, y) with positions in pixels
+# metadata: tilesets and anything else to keep (see convert_tiled)
+def write_world_map(
+    path: str,
+    tiles: np.ndarray,
+    collision: np.ndarray,
+    spawns: list[tuple[str, int, float, float]],
+    tile_size: int,
+    chunk_size: int = 32,
+    layer_names: Optional[list[str]] = None,
+    metadata: Optional[dict] = None
+) -> None:
+    if chunk_size % 8 != 0:
+        raise ValueError(f"chunk size must be a multiple of 8, got {chunk_size}")
+    layers, height, width = tiles.shape
+    chunks_wide = -(-width // chunk_size)
+    chunks_high = -(-height // chunk_size)
+
+    # spawns sorted into chunks
+    entity_types = sorted({spawn[0] for spawn in spawns})
+    chunk_spawns: dict[tuple[int, int], list] = {}
+    for entity_type, spawn_id, x, y in spawns:
+        cx = min(max(int(x // (chunk_size * tile_size)), 0), chunks_wide - 1)
+        cy = min(max(int(y // (chunk_size * tile_size)), 0), chunks_high - 1)
+        chunk_spawns.setdefault((cx, cy), []).append((entity_types.index(entity_type), spawn_id, x, y))
+    max_spawns = max((len(s) for s in chunk_spawns.values()), default=0)
+
+    meta = dict(metadata or {})
+    meta.update({
+        "width": width,
+        "height": height,
+        "layers": layer_names or [f"layer{i}" for i in range(layers)],
+        "entity_types": entity_types
+    })
+    meta_bytes = json.dumps(meta).encode()
+    data_offset = -(-(WORLD_HEADER.size + len(meta_bytes)) // WORLD_ALIGNMENT) * WORLD_ALIGNMENT
+
+    with open(path, "wb") as file:
+        file.write(WORLD_HEADER.pack(
+            WORLD_MAGIC, WORLD_VERSION, chunk_size, layers, tile_size,
+            chunks_wide, chunks_high, max_spawns, len(meta_bytes)
+        ))
+        file.write(meta_bytes)
+        file.write(b"\0" * (data_offset - WORLD_HEADER.size - len(meta_bytes)))
+
+    # edges are padded with empty tiles
+    padded = np.zeros((layers, chunks_high * chunk_size, chunks_wide * chunk_size), dtype=np.uint16)
+    padded[:, :height, :width] = tiles
+    padded_collision = np.zeros((chunks_high * chunk_size, chunks_wide * chunk_size), dtype=bool)
+    padded_collision[:height, :width] = collision
+
+    records = np.memmap(path, dtype=chunk_dtype(layers, chunk_size, max_spawns), mode="r+", offset=data_offset, shape=(chunks_high, chunks_wide))
+    for cy in range(chunks_high):
+        rows = slice(cy * chunk_size, (cy + 1) * chunk_size)
+        for cx in range(chunks_wide):
+            columns = slice(cx * chunk_size, (cx + 1) * chunk_size)
+            record = records[cy, cx]
+            record["tiles"] = padded[:, rows, columns]
+            record["collision"] = np.packbits(padded_collision[rows, columns])
+            chunk = chunk_spawns.get((cx, cy), [])
+            record["spawn_count"] = len(chunk)
+            for i, spawn in enumerate(chunk):
+                record["spawns"][i] = spawn
+    records.flush()
+    del records
+
+
+# A world map file, memory-mapped: opening it reads the header and the
+# metadata only, chunks are read on demand (see read_chunk and WorldStreamer)
+class WorldMap:
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as file:
+            header = file.read(WORLD_HEADER.size)
+            (magic, version, self.chunk_size, layers, self.tile_size,
+             self.chunks_wide, self.chunks_high, self.max_spawns, meta_length) = WORLD_HEADER.unpack(header)
+            if magic != WORLD_MAGIC:
+                raise ValueError(f"{path} is not a world map")
+            if version != WORLD_VERSION:
+                raise ValueError(f"unsupported world map version {version}")
+            self.metadata = json.loads(file.read(meta_length))
+
+        self.width = self.metadata["width"]
+        self.height = self.metadata["height"]
+        self.layers: list[str] = self.metadata["layers"]
+        self.entity_types: list[str] = self.metadata["entity_types"]
+        self.tilesets: list[dict] = self.metadata.get("tilesets", [])
+        self.init_tile_sources()
+
+        data_offset = -(-(WORLD_HEADER.size + meta_length) // WORLD_ALIGNMENT) * WORLD_ALIGNMENT
+        self.chunks = np.memmap(
+            path, dtype=chunk_dtype(len(self.layers), self.chunk_size, self.max_spawns), mode="r",
+            offset=data_offset, shape=(self.chunks_high, self.chunks_wide)
+        )
+
+    # per tile gid: tileset index (-1 for none) and source rectangle in its image
+    def init_tile_sources(self) -> None:
+        last_gid = max((tileset["firstgid"] + tileset["tilecount"] for tileset in self.tilesets), default=1)
+        self.tile_tilesets = np.full(last_gid, -1, dtype=np.int32)
+        self.tile_rects = np.zeros((last_gid, 4), dtype=np.int32)
+        for index, tileset in enumerate(self.tilesets):
+            local = np.arange(tileset["tilecount"])
+            columns = max(tileset["columns"], 1)
+            margin, spacing = tileset.get("margin", 0), tileset.get("spacing", 0)
+            gids = tileset["firstgid"] + local
+            self.tile_tilesets[gids] = index
+            self.tile_rects[gids, 0] = margin + (local % columns) * (tileset["tilewidth"] + spacing)
+            self.tile_rects[gids, 1] = margin + (local // columns) * (tileset["tileheight"] + spacing)
+            self.tile_rects[gids, 2] = tileset["tilewidth"]
+            self.tile_rects[gids, 3] = tileset["tileheight"]
+
+    def contains_chunk(self, x: int, y: int) -> bool:
+        return 0 <= x < self.chunks_wide and 0 <= y < self.chunks_high
+
+    # chunk coordinates of a world position in pixels
+    def chunk_at(self, position: glm.vec2) -> tuple[int, int]:
+        span = self.chunk_size * self.tile_size
+        return int(position.x // span), int(position.y // span)
+
+    # copies a chunk out of the file
+    def read_chunk(self, x: int, y: int) -> Chunk:
+        record = self.chunks[y, x]
+        tiles = np.array(record["tiles"])
+        collision = np.unpackbits(record["collision"]).astype(bool).reshape(self.chunk_size, self.chunk_size)
+        spawns = np.array(record["spawns"][:int(record["spawn_count"])])
+        return Chunk(x, y, tiles, collision, spawns)
+
+    def close(self) -> None:
+        # the mapping is released with the last reference to it
+        self.chunks = None
+
+
+# Keeps the chunks around a position loaded: every chunk within
+# load_radius chunks of the position's chunk is loaded on a background
+# thread, and unloaded once it is more than unload_radius chunks away. The
+# gap between the two radii (hysteresis) keeps chunks from being loaded and
+# unloaded over and over while the player walks along a chunk border.
+# At most (2 * unload_radius + 1)^2 chunks are in memory, whatever the size
+# of the world.
+#
+# on_load and on_unload are called from update, on the calling thread, for
+# instance to spawn the chunk's entities (from a pool) and release them.
+class WorldStreamer:
+    def __init__(
+        self,
+        world: WorldMap,
+        load_radius: int = 1,
+        unload_radius: int = 2,
+        on_load: Optional[Callable[[Chunk], None]] = None,
+        on_unload: Optional[Callable[[Chunk], None]] = None
+    ):
+        if unload_radius < load_radius:
+            raise ValueError(f"unload radius {unload_radius} is smaller than load radius {load_radius}")
+        self.world = world
+        self.load_radius = load_radius
+        self.unload_radius = unload_radius
+        self.on_load = on_load
+        self.on_unload = on_unload
+
+        self.loaded: dict[tuple[int, int], Chunk] = {}
+        self.pending: dict[tuple[int, int], Future] = {}
+        self.center: Optional[tuple[int, int]] = None
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="world-streamer")
+
+        # statistics
+        self.loads = 0
+        self.unloads = 0
+        self.cancelled = 0
+
+    def distance(self, key: tuple[int, int]) -> int:
+        return max(abs(key[0] - self.center[0]), abs(key[1] - self.center[1]))
+
+    # to call every frame with the player position, in pixels
+    def update(self, position: glm.vec2) -> None:
+        self.center = self.world.chunk_at(position)
+
+        # chunks read since the last update
+        for key, future in list(self.pending.items()):
+            if future.done():
+                del self.pending[key]
+                self.add(future.result())
+
+        # chunks too far away
+        for key in [key for key in self.loaded if self.distance(key) > self.unload_radius]:
+            chunk = self.loaded.pop(key)
+            self.unloads += 1
+            if self.on_unload:
+                self.on_unload(chunk)
+        for key in [key for key in self.pending if self.distance(key) > self.unload_radius]:
+            if self.pending.pop(key).cancel():
+                self.cancelled += 1
+
+        # missing chunks, nearest first
+        cx, cy = self.center
+        radius = self.load_radius
+        wanted = [
+            (x, y)
+            for y in range(cy - radius, cy + radius + 1)
+            for x in range(cx - radius, cx + radius + 1)
+            if self.world.contains_chunk(x, y) and (x, y) not in self.loaded and (x, y) not in self.pending
+        ]
+        wanted.sort(key=lambda key: (key[0] - cx) ** 2 + (key[1] - cy) ** 2)
+        for key in wanted:
+            self.pending[key] = self.executor.submit(self.world.read_chunk, *key)
+
+    def add(self, chunk: Chunk) -> None:
+        key = (chunk.x, chunk.y)
+        # it may have gone out of range while being read
+        if self.distance(key) > self.unload_radius:
+            return
+        self.loaded[key] = chunk
+        self.loads += 1
+        if self.on_load:
+            self.on_load(chunk)
+
+    # loads everything within the load radius of position before returning,
+    # e.g. before the first frame or after a teleport
+    def load_now(self, position: glm.vec2) -> None:
+        self.update(position)
+        for key, future in list(self.pending.items()):
+            del self.pending[key]
+            self.add(future.result())
+
+    # the loaded chunk holding a tile, and the tile coordinates in it
+    def locate(self, tile_x: int, tile_y: int) -> tuple[Optional[Chunk], int, int]:
+        size = self.world.chunk_size
+        chunk = self.loaded.get((tile_x // size, tile_y // size))
+        return chunk, tile_x % size, tile_y % size
+
+    # tile gid of a layer, 0 where nothing is loaded
+    def tile(self, layer: int, tile_x: int, tile_y: int) -> int:
+        chunk, x, y = self.locate(tile_x, tile_y)
+        return int(chunk.tiles[layer, y, x]) if chunk is not None else 0
+
+    # tiles that aren't loaded block, so nothing walks into the unknown
+    def is_solid(self, tile_x: int, tile_y: int) -> bool:
+        chunk, x, y = self.locate(tile_x, tile_y)
+        return bool(chunk.collision[y, x]) if chunk is not None else True
+
+    # draws the loaded tiles of a layer within a rectangle of the world (in
+    # pixels), one texture per tileset; meant for the draw callback of a
+    # static Layer, redrawn only when the camera moves far enough
+    def draw(
+        self,
+        renderer: SpriteRenderer,
+        textures: list[Texture2D],
+        layer: int,
+        left: float,
+        top: float,
+        width: float,
+        height: float
+    ) -> None:
+        world = self.world
+        tile_size = world.tile_size
+        size = glm.vec2(tile_size, tile_size)
+        first_x, first_y = int(left // tile_size), int(top // tile_size)
+        last_x, last_y = int((left + width) // tile_size), int((top + height) // tile_size)
+        for (cx, cy), chunk in self.loaded.items():
+            x0, y0 = cx * world.chunk_size, cy * world.chunk_size
+            # the part of the chunk inside the rectangle
+            xs = slice(max(first_x - x0, 0), max(min(last_x - x0 + 1, world.chunk_size), 0))
+            ys = slice(max(first_y - y0, 0), max(min(last_y - y0 + 1, world.chunk_size), 0))
+            tiles = chunk.tiles[layer, ys, xs]
+            rows, columns = np.nonzero(tiles)
+            for row, column, gid in zip(rows.tolist(), columns.tolist(), tiles[rows, columns].tolist()):
+                tileset = world.tile_tilesets[gid] if gid < len(world.tile_tilesets) else -1
+                if tileset < 0:
+                    continue
+                position = glm.vec2((x0 + xs.start + column) * tile_size, (y0 + ys.start + row) * tile_size)
+                renderer.draw_subsprite(textures[tileset], position, size, 0.0, glm.vec3(1.0), world.tile_rects[gid].tolist())
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+# tile gids of a Tiled layer data block (a list, or base64 with optional compression)
+def tiled_layer_data(layer: dict, data) -> np.ndarray:
+    if isinstance(data, list):
+        return np.asarray(data, dtype=np.uint32)
+    raw = base64.b64decode(data)
+    compression = layer.get("compression", "")
+    if compression == "zlib":
+        raw = zlib.decompress(raw)
+    elif compression == "gzip":
+        raw = gzip.decompress(raw)
+    elif compression:
+        raise ValueError(f"unsupported Tiled layer compression {compression}")
+    return np.frombuffer(raw, dtype="<u4")
+
+
+# the tile layers of a Tiled map, group layers flattened, in drawing order
+def tiled_layers(layers: list[dict], kind: str) -> list[dict]:
+    found = []
+    for layer in layers:
+        if layer["type"] == "group":
+            found.extend(tiled_layers(layer.get("layers", []), kind))
+        elif layer["type"] == kind:
+            found.append(layer)
+    return found
+
+
+def tiled_property(properties: list[dict], name: str, default=None):
+    for prop in properties or []:
+        if prop["name"] == name:
+            return prop["value"]
+    return default
+
+
+# converts a map saved by the Tiled editor in JSON (orthogonal, finite or
+# infinite) to a world map file. Every tile layer becomes a layer, except
+# the one named collision_layer whose non-empty tiles are the collision,
+# along with the tiles of any layer whose tileset marks them "collides".
+# Every object of the object layers becomes a spawn, typed by its class
+# (type in older Tiled versions), or by its name. Tile flips are dropped.
+# Returns the opened world map.
+def convert_tiled(
+    map_path: str,
+    output_path: str,
+    chunk_size: int = 32,
+    collision_layer: str = "collision"
+) -> WorldMap:
+    with open(map_path) as file:
+        tiled = json.load(file)
+    if tiled.get("orientation", "orthogonal") != "orthogonal":
+        raise ValueError(f"only orthogonal Tiled maps are supported, got {tiled['orientation']}")
+    if tiled["tilewidth"] != tiled["tileheight"]:
+        raise ValueError("only square tiles are supported")
+    tile_size = tiled["tilewidth"]
+    map_dir = os.path.dirname(os.path.abspath(map_path))
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+
+    # tilesets, external ones read from their file; images relative to the output
+    tilesets = []
+    solid_gids = []
+    for entry in tiled.get("tilesets", []):
+        tileset = dict(entry)
+        tileset_dir = map_dir
+        if "source" in entry:
+            source = os.path.join(map_dir, entry["source"])
+            with open(source) as file:
+                tileset.update(json.load(file))
+            tileset_dir = os.path.dirname(source)
+        if "image" not in tileset:
+            raise ValueError(f"tileset {tileset.get('name')} is a collection of images, only single-image tilesets are supported")
+        for tile in tileset.get("tiles", []):
+            if tiled_property(tile.get("properties"), "collides", False):
+                solid_gids.append(entry["firstgid"] + tile["id"])
+        tilesets.append({
+            "name": tileset.get("name", ""),
+            "image": os.path.relpath(os.path.join(tileset_dir, tileset["image"]), output_dir),
+            "firstgid": entry["firstgid"],
+            "tilecount": tileset["tilecount"],
+            "columns": tileset["columns"],
+            "tilewidth": tileset["tilewidth"],
+            "tileheight": tileset["tileheight"],
+            "margin": tileset.get("margin", 0),
+            "spacing": tileset.get("spacing", 0)
+        })
+
+    layers = tiled_layers(tiled["layers"], "tilelayer")
+    # bounds in tiles: the map, or every chunk of an infinite map
+    if tiled.get("infinite"):
+        chunks = [chunk for layer in layers for chunk in layer.get("chunks", [])]
+        origin_x = min((chunk["x"] for chunk in chunks), default=0)
+        origin_y = min((chunk["y"] for chunk in chunks), default=0)
+        width = max((chunk["x"] + chunk["width"] for chunk in chunks), default=0) - origin_x
+        height = max((chunk["y"] + chunk["height"] for chunk in chunks), default=0) - origin_y
+    else:
+        origin_x = origin_y = 0
+        width, height = tiled["width"], tiled["height"]
+
+    grids = []
+    names = []
+    collision = np.zeros((height, width), dtype=bool)
+    for layer in layers:
+        grid = np.zeros((height, width), dtype=np.uint32)
+        if "chunks" in layer:
+            for chunk in layer["chunks"]:
+                x, y = chunk["x"] - origin_x, chunk["y"] - origin_y
+                grid[y:y + chunk["height"], x:x + chunk["width"]] = tiled_layer_data(layer, chunk["data"]).reshape(chunk["height"], chunk["width"])
+        else:
+            grid[:] = tiled_layer_data(layer, layer["data"]).reshape(height, width)
+        grid &= ~np.uint32(TILED_FLAGS)
+        if grid.max(initial=0) > np.iinfo(np.uint16).max:
+            raise ValueError(f"layer {layer['name']} uses tile gids above {np.iinfo(np.uint16).max}")
+
+        if layer["name"] == collision_layer:
+            collision |= grid != 0
+            continue
+        if solid_gids:
+            collision |= np.isin(grid, solid_gids)
+        grids.append(grid.astype(np.uint16))
+        names.append(layer["name"])
+    tiles = np.stack(grids) if grids else np.zeros((0, height, width), dtype=np.uint16)
+
+    # positions relative to the converted map's origin
+    spawns = []
+    for layer in tiled_layers(tiled["layers"], "objectgroup"):
+        for obj in layer.get("objects", []):
+            entity_type = obj.get("class") or obj.get("type") or obj.get("name") or "object"
+            spawns.append((entity_type, obj.get("id", 0), obj["x"] - origin_x * tile_size, obj["y"] - origin_y * tile_size))
+
+    write_world_map(
+        output_path, tiles, collision, spawns, tile_size, chunk_size, names,
+        {"tilesets": tilesets, "origin": [origin_x, origin_y], "source": os.path.basename(map_path)}
+    )
+    return WorldMap(output_path)
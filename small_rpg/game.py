@@ -1,7 +1,9 @@
-from elyria import Game, ResourceManager, GameObject, Animation, core, Input, Key
+from elyria import Game, ResourceManager, GameObject, Animation, core, Input, Key, NetClient
 import glm
 from glfw.GLFW import glfwGetTime
 from enum import StrEnum
+from typing import Optional
+from elyria.crowd import facing
 
 
 class Direction(StrEnum):
@@ -15,9 +17,12 @@ class Direction(StrEnum):
     UP_LEFT    = "UP_LEFT"
 
 
+DIRECTIONS = list(Direction)
+
+
 class Player(GameObject):
     def __init__(self):
-        animation = ResourceManager.get_animation("character")
+        animation = ResourceManager.get_animation("character_down")
         size = glm.vec2(animation.width * 5, animation.height * 5)
         position = glm.vec2((core.game.width - size.x) / 2.0, (core.game.height - size.y) / 2.0)
         super().__init__(
@@ -27,44 +32,45 @@ class Player(GameObject):
             animation=animation
         )
         self.direction = Direction.DOWN
+        # walk cycle per facing, in Direction order
+        self.animations = [ResourceManager.get_animation(f"character_{direction.lower()}") for direction in Direction]
+        # keys held by the remote client playing it, local input if None
+        self.keys: Optional[frozenset[int]] = None
+
+    def is_pressed(self, key: Key) -> bool:
+        return Input.is_pressed(key) if self.keys is None else key.value in self.keys
 
     def update(self, dt: float) -> None:
         super().update(dt)
 
-        new_direction = self.direction
-        if Input.is_pressed(Key.Z):
-            if Input.is_pressed(Key.Q):
-                new_direction = Direction.UP_LEFT
-            elif Input.is_pressed(Key.D):
-                new_direction = Direction.UP_RIGHT
-            else:
-                new_direction = Direction.UP
-        elif Input.is_pressed(Key.S):
-            if Input.is_pressed(Key.Q):
-                new_direction = Direction.DOWN_LEFT
-            elif Input.is_pressed(Key.D):
-                new_direction = Direction.DOWN_RIGHT
-            else:
-                new_direction = Direction.DOWN
-        elif Input.is_pressed(Key.Q):
-            new_direction = Direction.LEFT
-        elif Input.is_pressed(Key.D):
-            new_direction = Direction.RIGHT
-
-        if new_direction != self.direction and self.animation:
-            self.animation = ResourceManager.get_animation(f"character_{self.direction}")
-
-        self.direction = new_direction
-        
+        # opposite keys cancel each other out
+        dx = self.is_pressed(Key.D) - self.is_pressed(Key.Q)
+        dy = self.is_pressed(Key.S) - self.is_pressed(Key.Z)
+        if dx or dy:
+            index = facing(dx, dy)
+            if DIRECTIONS[index] != self.direction and self.animation:
+                self.animation = self.animations[index]
+            self.direction = DIRECTIONS[index]
+
+
+MOVE_KEYS = [Key.Z, Key.Q, Key.S, Key.D]
+
 
 class SmallRPG(Game):
     def __init__(self):
         super().__init__(800, 600, "Small RPG")
+        # co-op: a server has no local player, a client (server address) shows the server's world
+        self.local_player = True
+        self.server_address: Optional[tuple[str, int]] = None
+        self.net: Optional[NetClient] = None
+        self.players: dict[int, Player] = {}
 
     def init(self):
         super().init()
 
-        ResourceManager.load_texture("textures/background.jpg", False, "background")
+        background = ResourceManager.load_texture("textures/background.jpg", False, "background")
+        # the background never changes, it is rendered once and composited every frame
+        self.layers.add("background", lambda renderer: renderer.draw_sprite(background, glm.vec2(0.0, 0.0), glm.vec2(self.width, self.height)), static=True)
 
         # 128 * 288 pixels
         # 128 pixels de large et 8 frames par lignes, soit des sprites de 16 pixels
@@ -82,13 +88,59 @@ class SmallRPG(Game):
 
 
 
-        self.player = Player()
+        if self.server_address is not None:
+            self.net = NetClient(*self.server_address)
+            self.net.connect()
+        elif self.local_player:
+            self.player = Player()
+
+    def add_client(self, client):
+        player = Player()
+        self.players[client] = player
+        return player
+
+    def remove_client(self, client):
+        self.players.pop(client, None)
+
+    def client_input(self, client, keys):
+        self.players[client].keys = keys
 
     def update(self, dt: float):
-        self.player.update(dt)
+        if self.net is not None:
+            self.net.send_input([key for key in MOVE_KEYS if Input.is_pressed(key)])
+            self.net.poll()
+            return
+        if self.player is not None:
+            self.player.update(dt)
+        for player in self.players.values():
+            player.update(dt)
+
+    # what the screen shows: the server's world when connected to one
+    def visible_objects(self) -> list[GameObject]:
+        if self.net is not None:
+            return list(self.net.entities.values())
+        return self.game_objects()
+
+    def metrics(self):
+        # a server plays no one itself
+        if self.player is None:
+            return {"clients": len(self.players)}
+        return {
+            "player_x": self.player.position.x,
+            "player_y": self.player.position.y,
+            "direction": str(self.player.direction)
+        }
 
     def render(self):
-        self.player.draw(self.renderer)
+        self.layers.render(self.renderer)
+        for o in self.visible_objects():
+            o.draw(self.renderer)
+
+    def record(self, draw_list):
+        # the layers are static, they can render from the GL thread
+        draw_list.call(self.layers.render, self.renderer)
+        for o in self.visible_objects():
+            o.draw(draw_list)
 
     def gui_render(self):
         # self.text.render_text("Hello Small RPG", 250.0, self.height / 2.0, 1.0)
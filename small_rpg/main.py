@@ -1,12 +1,53 @@
 import sys
 import os
+import argparse
 
-# We dynamically add Elyria to the python path
+# We dynamically add Elyria to the python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from game import SmallRPG
-from elyria import main
+from elyria import main, RenderStats, ResourceManager, FramePacer
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Small RPG")
+    parser.add_argument("--record", help="record the played session to this file")
+    parser.add_argument("--replay", help="replay a recorded session and print a frame-time report")
+    parser.add_argument("--headless", action="store_true", help="run without showing the window")
+    parser.add_argument("--checksum", action="store_true", help="compute a state checksum for every replayed frame")
+    parser.add_argument("--report", help="write the replay report to this JSON file")
+    parser.add_argument("--pipelined", action="store_true", help="update the next frame while the current one renders")
+    parser.add_argument("--batch", action="store_true", help="batch sprites, same-sized sheets grouped into texture arrays")
+    parser.add_argument("--render-stats", action="store_true", help="print GL counters per frame and subsystem at exit")
+    parser.add_argument("--gl-debug", action="store_true", help="use a debug context and report the driver's messages")
+    parser.add_argument("--gl-trace", help="write the GL calls of the second frame to this file")
+    parser.add_argument("--fps", type=float, help="cap the frame rate")
+    parser.add_argument("--no-vsync", action="store_true", help="don't wait for the display's refresh")
+    parser.add_argument("--connect", help="play on a server (see server.py), as host:port")
+    args = parser.parse_args()
+
+    render_stats = None
+    if args.render_stats or args.gl_debug or args.gl_trace:
+        render_stats = RenderStats(debug_output=args.gl_debug, trace_path=args.gl_trace)
+
+    frame_pacer = None
+    if args.fps or args.no_vsync:
+        frame_pacer = FramePacer(vsync=not (args.no_vsync or args.headless), target_fps=args.fps)
+
     small_rpg = SmallRPG()
-    main(small_rpg)
+    if args.connect:
+        host, _, port = args.connect.rpartition(":")
+        small_rpg.server_address = (host, int(port))
+    if args.batch:
+        small_rpg.batch_sprites = True
+        ResourceManager.texture_arrays = True
+    main(
+        small_rpg,
+        record=args.record,
+        replay=args.replay,
+        headless=args.headless,
+        checksum=args.checksum,
+        report=args.report,
+        frame_pacer=frame_pacer,
+        pipelined=args.pipelined,
+        render_stats=render_stats
+    )
@@ -0,0 +1,83 @@
+import sys
+import os
+import time
+import random
+import queue
+import asyncio
+import argparse
+import multiprocessing
+
+# We dynamically add Elyria to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from game import SmallRPG, MOVE_KEYS
+from elyria import GameServer, NetClient
+
+
+# a client process wandering around: holds a random movement key for a
+# random duration, then reports what it received
+def bot(host: str, port: int, seconds: float, seed: int, results) -> None:
+    rng = random.Random(seed)
+    client = NetClient(host, port)
+    client.connect()
+    held = []
+    change_at = 0.0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        now = time.perf_counter() - start
+        if now >= change_at:
+            held = [rng.choice(MOVE_KEYS)]
+            change_at = now + rng.uniform(0.25, 1.5)
+        client.send_input(held)
+        client.poll()
+        time.sleep(1.0 / 60.0)
+    client.disconnect()
+    client.close()
+    results.put((seed, client.received, client.dropped, client.bytes_received, len(client.entities)))
+
+
+async def serve(server: GameServer, seconds: float, bots: int) -> None:
+    await server.start()
+    print(f"serving on {server.address[0]}:{server.address[1]} at {server.tick_rate} ticks/s")
+    processes = []
+    results = multiprocessing.Queue()
+    for i in range(bots):
+        process = multiprocessing.Process(target=bot, args=(*server.address, seconds, i, results), daemon=True)
+        process.start()
+        processes.append(process)
+    try:
+        await server.run(int(seconds * server.tick_rate) if seconds > 0 else None)
+    finally:
+        for _ in processes:
+            try:
+                seed, received, dropped, received_bytes, entities = results.get(timeout=10.0)
+            except queue.Empty:
+                print("a bot did not report")
+                break
+            print(f"bot {seed}: {received} snapshots ({dropped} dropped), {received_bytes / 1024.0:.1f} KB, {entities} objects in view")
+        for process in processes:
+            process.join()
+        print(server.stats.summary())
+        server.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a headless, authoritative Small RPG server")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=7777, help="UDP port to listen on (0 for any)")
+    parser.add_argument("--tick-rate", type=int, default=30, help="simulation ticks (and snapshots) per second")
+    parser.add_argument("--radius", type=float, default=640.0, help="distance within which clients see objects")
+    parser.add_argument("--seconds", type=float, default=0.0, help="stop after this long (0 to run until interrupted)")
+    parser.add_argument("--bots", type=int, default=0, help="random-walking client processes to connect")
+    args = parser.parse_args()
+
+    # resources are loaded relative to the game directory
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    small_rpg = SmallRPG()
+    small_rpg.local_player = False
+    server = GameServer(small_rpg, args.host, args.port, args.tick_rate, args.radius)
+    try:
+        asyncio.run(serve(server, args.seconds, args.bots))
+    except KeyboardInterrupt:
+        print(server.stats.summary())
@@ -0,0 +1,58 @@
+import sys
+import os
+import random
+import argparse
+
+# We dynamically add Elyria to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from game import SmallRPG
+from elyria import SimulationJob, SimulationRunner, Key
+from glfw.GLFW import GLFW_PRESS, GLFW_RELEASE
+
+MOVE_KEYS = [Key.Z.value, Key.Q.value, Key.S.value, Key.D.value]
+
+
+# wanders around by holding a random movement key for a random duration
+class RandomWalk:
+    def __init__(self, min_frames: int = 15, max_frames: int = 90):
+        self.min_frames = min_frames
+        self.max_frames = max_frames
+        self.held = None
+        self.release_at = 0
+
+    def __call__(self, frame: int, rng: random.Random) -> list[tuple[int, int]]:
+        if frame < self.release_at:
+            return []
+        events = []
+        if self.held is not None:
+            events.append((self.held, GLFW_RELEASE))
+        self.held = rng.choice(MOVE_KEYS)
+        self.release_at = frame + rng.randint(self.min_frames, self.max_frames)
+        events.append((self.held, GLFW_PRESS))
+        return events
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run many headless Small RPG worlds in parallel")
+    parser.add_argument("--worlds", type=int, default=8, help="number of independent worlds to simulate")
+    parser.add_argument("--frames", type=int, default=36000, help="frames to step per world")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (defaults to the number of cores)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first world, the others follow")
+    parser.add_argument("--replay", help="drive every world with this recorded session instead of random input")
+    args = parser.parse_args()
+
+    # resources are loaded relative to the game directory
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    jobs = [
+        SimulationJob(args.seed + i, args.frames, script=None if args.replay else RandomWalk(), replay=args.replay)
+        for i in range(args.worlds)
+    ]
+    runner = SimulationRunner(SmallRPG, args.workers)
+    results = runner.run(jobs)
+
+    for result in results:
+        if result is not None:
+            print(f"world {result.job} (seed {result.seed}): {result.steps_per_second:.0f} steps/s, checksum {result.checksum:08x}, {result.metrics}")
+    print(f"{runner.steps} world-steps in {runner.elapsed:.2f} s: {runner.throughput:.0f} steps/s with {runner.workers} workers")
@@ -0,0 +1,121 @@
+import wave
+import numpy as np
+import pytest
+from pygame import mixer
+import elyria.audio as audio
+from elyria.audio import MusicTrack, SoundEffect, SoundPool
+
+
+class FakeChannel:
+    def __init__(self, index):
+        self.index = index
+        self.busy = False
+
+    def get_busy(self):
+        return self.busy
+
+    def set_volume(self, volume):
+        pass
+
+    def play(self, sound):
+        self.busy = True
+
+    def stop(self):
+        self.busy = False
+
+
+class FakeMixer:
+    def set_num_channels(self, count):
+        pass
+
+    def Channel(self, index):
+        return FakeChannel(index)
+
+
+class FakeEffect(SoundEffect):
+    def __init__(self, max_voices=4, priority=0):
+        super().__init__("unused.wav", max_voices, priority)
+
+    def get(self):
+        return None
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(audio, "mixer", FakeMixer())
+    return SoundPool(channels=3)
+
+
+def test_idle_channels_are_used_first(pool):
+    effect = FakeEffect()
+    assert pool.play(effect).index == 0
+    assert pool.play(effect).index == 1
+
+    # a finished voice frees its channel
+    pool.channels[0].busy = False
+    assert pool.play(effect).index == 0
+
+
+def test_voice_limit_restarts_oldest_voice(pool):
+    effect = FakeEffect(max_voices=2)
+    pool.play(effect)
+    pool.play(effect)
+    # limit reached: channel 0 (the oldest) is reused although channel 2 is idle
+    assert pool.play(effect).index == 0
+    assert pool.play(effect).index == 1
+
+
+def test_priority_stealing(pool):
+    low = FakeEffect(priority=0)
+    mid = FakeEffect(priority=1)
+    high = FakeEffect(priority=2)
+    pool.play(mid)
+    pool.play(low)
+    pool.play(mid)
+
+    # every channel busy: the lowest priority voice is stolen
+    assert pool.play(high).index == 1
+    # nothing with a priority low enough left for a new low voice
+    assert pool.play(low) is None
+    # equal priority steals the oldest voice
+    assert pool.play(high, priority=1).index == 0
+
+
+def test_audio_memory_per_category(tmp_path, monkeypatch):
+    from elyria.resource_manager import ResourceManager
+    monkeypatch.setattr(ResourceManager, "musics", {})
+    monkeypatch.setattr(ResourceManager, "sounds", {})
+
+    path = tmp_path / "tone.wav"
+    with wave.open(str(path), "wb") as file:
+        file.setnchannels(1)
+        file.setsampwidth(2)
+        file.setframerate(22050)
+        file.writeframes(np.zeros(22050, dtype=np.int16).tobytes())
+
+    track = ResourceManager.load_music(str(path), "theme")
+    track.preload()
+    ResourceManager.load_sound(str(path), "theme")
+
+    memory = ResourceManager.audio_memory()
+    # same name in both categories, neither hides the other
+    assert memory["musics"]["theme"] == path.stat().st_size
+    assert memory["sounds"]["theme"] == 0  # not decoded yet
+
+
+def test_preloaded_music_plays_from_memory(tmp_path):
+    path = tmp_path / "music.wav"
+    with wave.open(str(path), "wb") as file:
+        file.setnchannels(1)
+        file.setsampwidth(2)
+        file.setframerate(22050)
+        file.writeframes(np.zeros(2205, dtype=np.int16).tobytes())
+
+    mixer.init()
+    try:
+        track = MusicTrack(str(path))
+        track.preload()
+        track.load()
+        track.queue()
+    finally:
+        mixer.quit()
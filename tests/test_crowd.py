@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from elyria import Animation, Texture2D
+from elyria.crowd import Crowd, facing, facing_of, UP, RIGHT, DOWN, LEFT
+from elyria.pathfinding import DIRECTIONS
+
+
+def test_facing_buckets_follow_direction_order():
+    dx = np.array([d[0] for d in DIRECTIONS], dtype=np.float32)
+    dy = np.array([d[1] for d in DIRECTIONS], dtype=np.float32)
+    assert facing_of(dx, dy).tolist() == list(range(8))
+    assert [facing(x, y) for x, y in DIRECTIONS] == list(range(8))
+    # each bucket spans 45 degrees around its direction
+    assert facing(1.0, 0.4) == RIGHT
+    assert facing(-0.4, -1.0) == UP
+    assert facing(-1.0, 0.3) == LEFT
+
+
+def test_agents_arrive_at_their_targets():
+    crowd = Crowd(4)
+    crowd.add((0.0, 0.0), target=(100.0, 0.0))
+    crowd.add((0.0, 200.0), target=(0.0, 100.0))
+    for _ in range(600):
+        crowd.update(1.0 / 60.0)
+    assert np.allclose(crowd.positions[:2], [[100.0, 0.0], [0.0, 100.0]], atol=1.0)
+    assert np.allclose(crowd.velocities[:2], 0.0, atol=1.0)
+    # facings are kept once standing
+    assert crowd.facings[:2].tolist() == [RIGHT, UP]
+
+
+def test_separation_pushes_neighbours_apart():
+    crowd = Crowd(3, radius=10.0)
+    crowd.add((50.0, 50.0))
+    crowd.add((52.0, 50.0))
+    crowd.add((200.0, 50.0))
+    for _ in range(60):
+        crowd.update(1.0 / 60.0)
+    assert crowd.positions[1, 0] - crowd.positions[0, 0] >= 10.0
+    # far away agents are left alone
+    assert crowd.positions[2].tolist() == [200.0, 50.0]
+
+
+def test_agents_walk_around_obstacles():
+    crowd = Crowd(1)
+    crowd.add((0.0, 1.0), target=(200.0, 0.0))
+    crowd.set_obstacles([[100.0, 0.0]], [20.0])
+    closest = float("inf")
+    for _ in range(900):
+        crowd.update(1.0 / 60.0)
+        closest = min(closest, float(np.hypot(*(crowd.positions[0] - (100.0, 0.0)))))
+    assert closest >= 20.0
+    assert crowd.positions[0, 0] > 190.0
+
+
+def test_clips_follow_facings():
+    texture = Texture2D(64, 64)
+    animations = [Animation(texture, row=row + 1, frames=4, width=16, height=16, animation_speed=5) for row in range(8)]
+    # the clip of each facing is the row of the reverse direction
+    crowd = Crowd(8, animations, facing_clips=[(i + 4) % 8 for i in range(8)])
+    for dx, dy in DIRECTIONS:
+        crowd.add((0.0, 0.0), target=(1000.0 * dx, 1000.0 * dy))
+    crowd.update(0.1)
+    assert crowd.facings.tolist() == list(range(8))
+    assert crowd.clips.tolist() == [(i + 4) % 8 for i in range(8)]
+    assert crowd.frames.tolist() == pytest.approx([0.5] * 8)
+
+
+def test_remove_moves_the_last_agent():
+    crowd = Crowd(3)
+    for x in range(3):
+        crowd.add((float(x), 0.0))
+    crowd.remove(0)
+    assert crowd.count == 2
+    assert crowd.positions[:2, 0].tolist() == [2.0, 1.0]
+    with pytest.raises(ValueError):
+        Crowd(0).add((0.0, 0.0))
@@ -0,0 +1,116 @@
+import os
+import numpy as np
+import pytest
+import elyria.glyph_atlas as glyph_atlas
+import elyria.texture2d as texture2d
+from elyria import base_dir
+from elyria.glyph_atlas import GlyphAtlas
+from elyria.font_cache import FontCache, bake_font, read_baked_font, write_baked_font
+from elyria.text_renderer import ASCII
+
+FONT = os.path.join(base_dir, "fonts", "ocraext.ttf")
+
+
+class FakeGL:
+    def __init__(self):
+        self.textures = 0
+        self.bound = 0
+        self.uploads = 0
+        # texture id -> pixels
+        self.pages = {}
+
+    def glGenTextures(self, count):
+        self.textures += 1
+        return self.textures
+
+    def glBindTexture(self, target, texture):
+        self.bound = texture
+
+    def glTexImage2D(self, target, level, internal_format, width, height, border, image_format, type, data):
+        self.uploads += 1
+        self.pages[self.bound] = np.array(data, dtype=np.uint8).reshape(height, width)
+
+    def glTexSubImage2D(self, target, level, x, y, width, height, image_format, type, data):
+        self.uploads += 1
+        self.pages[self.bound][y:y + height, x:x + width] = data
+
+    def noop(self, *args):
+        pass
+
+
+@pytest.fixture
+def gl(monkeypatch):
+    fake = FakeGL()
+    for module in (glyph_atlas, texture2d):
+        for name in ("glGenTextures", "glBindTexture", "glTexImage2D", "glTexSubImage2D"):
+            if hasattr(module, name):
+                monkeypatch.setattr(module, name, getattr(fake, name))
+        for name in ("glTexParameteri", "glPixelStorei", "glDeleteTextures"):
+            if hasattr(module, name):
+                monkeypatch.setattr(module, name, fake.noop)
+    return fake
+
+
+def glyph_pixels(gl, atlas, character):
+    page = gl.pages[character.texture_id]
+    u0, v0, u1, v1 = (character.tex_coords * atlas.page_size)
+    return page[int(v0):int(v1), int(u0):int(u1)]
+
+
+def no_freetype(*args):
+    raise AssertionError("FreeType opened")
+
+
+def test_baked_font_round_trips(tmp_path):
+    baked = bake_font(FONT, 32, ASCII, sdf=True, spread=4)
+    path = str(tmp_path / "font.glyphs")
+    write_baked_font(path, baked)
+    loaded = read_baked_font(path)
+    assert (loaded.size, loaded.sdf, loaded.spread, loaded.cell) == (32, True, 4, baked.cell)
+    assert list(loaded.glyphs) == list(baked.glyphs)
+    for c, (bitmap, left, top, advance) in baked.glyphs.items():
+        other = loaded.glyphs[c]
+        assert np.array_equal(other[0], bitmap)
+        assert other[1:] == (left, top, advance)
+
+    # a truncated file is not a baked font
+    with open(path, "r+b") as file:
+        file.truncate(os.path.getsize(path) - 10)
+    assert read_baked_font(path) is None
+
+
+def test_cached_glyphs_load_without_freetype(gl, tmp_path, monkeypatch):
+    cache = FontCache(str(tmp_path / "cache"))
+    baked = cache.get(FONT, 24, ASCII)
+    assert cache.misses == 1 and os.path.exists(cache.path(FONT, 24, ASCII))
+    # one entry per size and charset
+    assert cache.path(FONT, 24, ASCII) != cache.path(FONT, 32, ASCII) != cache.path(FONT, 24, ASCII + "é")
+
+    reference = GlyphAtlas(FONT, 24)
+    reference.warm_up(ASCII)
+
+    monkeypatch.setattr(glyph_atlas.freetype, "Face", no_freetype)
+    baked = cache.get(FONT, 24, ASCII)
+    assert cache.hits == 1
+    uploads = gl.uploads
+    atlas = GlyphAtlas(FONT, 24, cell=baked.cell)
+    assert atlas.add_baked(baked.glyphs) == len(ASCII)
+    # one upload for the whole page, nothing left to rasterize
+    assert gl.uploads - uploads == 1
+    assert atlas.warm_up(ASCII) == 0 and atlas.rasterized == 0
+    for c in "Hello, World!":
+        assert np.array_equal(glyph_pixels(gl, atlas, atlas.get(c)), glyph_pixels(gl, reference, reference.get(c)))
+        assert atlas.get(c).advance == reference.get(c).advance
+        assert atlas.get(c).bearing == reference.get(c).bearing
+
+
+def test_baked_glyphs_past_the_first_page_fill_free_cells(gl):
+    baked = bake_font(FONT, 24, "abcdefghijklmnopqrstuvwxyz")
+    atlas = GlyphAtlas(FONT, 24, page_size=64, max_pages=2, cell=baked.cell)
+    capacity = atlas.capacity()
+    atlas.add_baked(baked.glyphs)
+    # two pages built in memory, the rest evicts the least recently used
+    assert len(atlas.pages) == 2
+    assert len(atlas.glyphs) == 2 * capacity
+    assert atlas.evicted == 26 - 2 * capacity
+    assert "z" in atlas.glyphs and "a" not in atlas.glyphs
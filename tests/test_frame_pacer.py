@@ -0,0 +1,90 @@
+import pytest
+import elyria.frame_pacer as frame_pacer
+from elyria.frame_pacer import FramePacer, MAX_SPIN
+from elyria.replay import FrameTimeReport
+
+
+# a clock where sleeping oversleeps by a fixed amount and spinning advances time
+class FakeClock:
+    def __init__(self, oversleep: float = 0.0003):
+        self.now = 100.0
+        self.oversleep = oversleep
+        self.sleeps: list[float] = []
+
+    def perf_counter(self) -> float:
+        self.now += 0.00001
+        return self.now
+
+    def sleep(self, duration: float) -> None:
+        self.sleeps.append(duration)
+        self.now += duration + self.oversleep
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(frame_pacer.time, "perf_counter", clock.perf_counter)
+    monkeypatch.setattr(frame_pacer.time, "sleep", clock.sleep)
+    return clock
+
+
+def run(pacer: FramePacer, clock: FakeClock, frames: int, work: float) -> None:
+    pacer.start()
+    for _ in range(frames):
+        clock.now += work
+        pacer.wait()
+
+
+def test_capped_frames_follow_the_target_rate(clock):
+    pacer = FramePacer(vsync=False, target_fps=100.0)
+    run(pacer, clock, 50, 0.004)
+
+    intervals = list(pacer.intervals)
+    assert intervals == pytest.approx([0.01] * 50, abs=0.00005)
+    # sleeps most of the wait, spins less than the spin bound
+    assert pacer.slept > 50 * 0.004 and pacer.spun < 50 * MAX_SPIN
+    assert pacer.spin >= clock.oversleep
+
+
+def test_a_late_frame_does_not_rush_the_next_ones(clock):
+    pacer = FramePacer(vsync=False, target_fps=100.0)
+    run(pacer, clock, 5, 0.004)
+    clock.now += 0.05
+    pacer.wait()
+    run_intervals = len(pacer.intervals)
+    for _ in range(5):
+        clock.now += 0.004
+        pacer.wait()
+    assert list(pacer.intervals)[run_intervals:] == pytest.approx([0.01] * 5, abs=0.00005)
+
+
+def test_unfocused_window_runs_at_the_background_rate(clock):
+    pacer = FramePacer(vsync=True, background_fps=10.0)
+    assert pacer.fps is None
+    run(pacer, clock, 3, 0.004)
+    assert clock.sleeps == []
+
+    pacer.focused = False
+    assert pacer.fps == 10.0
+    pacer.iconified = True
+    assert not pacer.should_render
+    run(pacer, clock, 3, 0.004)
+    assert list(pacer.intervals)[-3:] == pytest.approx([0.1] * 3, abs=0.00005)
+
+
+def test_report_measures_frame_time_variance():
+    report = FrameTimeReport([0.010, 0.020, 0.010, 0.020])
+    assert report.stddev == pytest.approx(5.0)
+    assert report.jitter == pytest.approx(10.0)
+    assert report.to_dict()["jitter_ms"] == pytest.approx(10.0)
+    assert FrameTimeReport([0.01]).jitter == 0.0
+
+
+def test_frame_budget_follows_the_cap_and_refresh_rate():
+    assert FramePacer(vsync=False, target_fps=30.0).frame_budget == pytest.approx(1.0 / 30.0)
+    pacer = FramePacer(vsync=True, target_fps=240.0)
+    pacer.refresh_rate = 144.0
+    assert pacer.frame_budget == pytest.approx(1.0 / 144.0)
+    pacer.target_fps = None
+    assert pacer.frame_budget == pytest.approx(1.0 / 144.0)
+    assert FramePacer(vsync=False).frame_budget == pytest.approx(1.0 / 60.0)
@@ -0,0 +1,121 @@
+import gc
+import pytest
+import elyria.gc_policy as gc_policy
+from elyria.gc_policy import GCPolicy, HitchDetector
+
+
+class FakeGC:
+    def __init__(self):
+        self.threshold = (2000, 10, 10)
+        self.enabled = True
+        self.frozen = False
+        self.counts = (0, 0, 0)
+        self.collected: list[int] = []
+
+    def get_threshold(self):
+        return self.threshold
+
+    def set_threshold(self, *threshold):
+        self.threshold = threshold
+
+    def isenabled(self):
+        return self.enabled
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def freeze(self):
+        self.frozen = True
+
+    def unfreeze(self):
+        self.frozen = False
+
+    def get_count(self):
+        return self.counts
+
+    def collect(self, generation=2):
+        self.collected.append(generation)
+        return 0
+
+
+@pytest.fixture
+def fake_gc(monkeypatch):
+    fake = FakeGC()
+    monkeypatch.setattr(gc_policy, "gc", fake)
+    return fake
+
+
+def test_start_freezes_and_disables_automatic_collections(fake_gc):
+    policy = GCPolicy()
+    policy.start()
+    assert fake_gc.frozen and not fake_gc.enabled
+    # a full collection before freezing, then each generation measured
+    assert fake_gc.collected == [2, 0, 1, 2]
+
+    policy.set_thresholds((5000, 20, 20))
+    assert fake_gc.enabled and fake_gc.threshold == (5000, 20, 20)
+    policy.set_thresholds(None)
+    assert not fake_gc.enabled
+
+    policy.stop()
+    assert not fake_gc.frozen and fake_gc.enabled and fake_gc.threshold == (2000, 10, 10)
+
+
+def test_end_frame_collects_what_is_due_if_it_fits(fake_gc):
+    policy = GCPolicy(frame_budget=0.016, margin=0.001)
+    policy.start()
+    fake_gc.collected.clear()
+    policy.costs = [0.0001, 0.002, 0.05]
+
+    # nothing due
+    fake_gc.counts = (100, 2, 1)
+    policy.end_frame(0.004)
+    # generation 1 due, 11 ms left
+    fake_gc.counts = (2500, 10, 3)
+    policy.end_frame(0.004)
+    # no time left
+    policy.end_frame(0.0155)
+    # generation 2 due but too long: the young generations instead
+    fake_gc.counts = (2500, 10, 10)
+    policy.end_frame(0.004)
+    policy.end_frame(0.0145)
+    assert fake_gc.collected == [1, 1, 0]
+
+
+def test_collections_are_forced_past_the_limit(fake_gc):
+    policy = GCPolicy(frame_budget=0.016, limit=4)
+    policy.start()
+    fake_gc.collected.clear()
+
+    fake_gc.counts = (8000, 0, 0)
+    policy.end_frame(0.03)
+    assert fake_gc.collected == [0] and policy.forced == 1
+
+    # automatic collections on: the GC takes care of it
+    policy.set_thresholds((2000, 10, 10))
+    policy.end_frame(0.03)
+    assert fake_gc.collected == [0]
+
+
+def test_hitches_carry_the_collections_of_their_frame():
+    detector = HitchDetector(frame_budget=0.016, log=False)
+    detector.start()
+    try:
+        gc.collect()
+        assert detector.end_frame(0.010) is None
+        slow = detector.end_frame(0.030)
+
+        gc.collect(1)
+        hitch = detector.end_frame(0.030)
+    finally:
+        detector.stop()
+
+    assert detector.hitches == [slow, hitch]
+    assert slow.collections == [] and "no GC" in str(slow)
+    assert hitch.frame == 2 and [generation for generation, _, _ in hitch.collections] == [1]
+    assert "gen 1" in str(hitch)
+    assert detector.gc_collections == 2
+    assert "3 frames: 2 over budget, 1 of them with collections" in detector.summary()
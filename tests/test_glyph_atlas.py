@@ -0,0 +1,144 @@
+import os
+import numpy as np
+import pytest
+import elyria.glyph_atlas as glyph_atlas
+import elyria.texture2d as texture2d
+from elyria import base_dir
+from elyria.glyph_atlas import GlyphAtlas, squared_distance, signed_distance_field
+from elyria.text_renderer import TextRenderer
+
+FONT = os.path.join(base_dir, "fonts", "ocraext.ttf")
+
+
+class FakeGL:
+    def __init__(self):
+        self.textures = 0
+        self.bound = 0
+        # texture id -> pixels
+        self.pages = {}
+        self.deleted = []
+
+    def glGenTextures(self, count):
+        self.textures += 1
+        return self.textures
+
+    def glBindTexture(self, target, texture):
+        self.bound = texture
+
+    def glTexImage2D(self, target, level, internal_format, width, height, border, image_format, type, data):
+        self.pages[self.bound] = np.zeros((height, width), dtype=np.uint8)
+
+    def glTexSubImage2D(self, target, level, x, y, width, height, image_format, type, data):
+        self.pages[self.bound][y:y + height, x:x + width] = data
+
+    def glDeleteTextures(self, count, textures):
+        self.deleted.extend(textures)
+
+    def noop(self, *args):
+        pass
+
+
+@pytest.fixture
+def gl(monkeypatch):
+    fake = FakeGL()
+    for module in (glyph_atlas, texture2d):
+        for name in ("glGenTextures", "glBindTexture", "glTexImage2D", "glTexSubImage2D", "glDeleteTextures"):
+            if hasattr(module, name):
+                monkeypatch.setattr(module, name, getattr(fake, name))
+        for name in ("glTexParameteri", "glPixelStorei"):
+            if hasattr(module, name):
+                monkeypatch.setattr(module, name, fake.noop)
+    return fake
+
+
+def glyph_pixels(gl, atlas, character):
+    page = gl.pages[character.texture_id]
+    u0, v0, u1, v1 = (character.tex_coords * atlas.page_size)
+    return page[int(v0):int(v1), int(u0):int(u1)]
+
+
+def test_squared_distance_is_exact():
+    rng = np.random.default_rng(1)
+    mask = rng.random((9, 13)) > 0.9
+    points = np.argwhere(mask)
+    expected = np.array([[((points - (y, x)) ** 2).sum(axis=1).min() for x in range(13)] for y in range(9)])
+    assert np.array_equal(squared_distance(mask), expected)
+
+
+def test_distance_field_of_a_square():
+    bitmap = np.zeros((20, 20), dtype=np.uint8)
+    bitmap[5:15, 5:15] = 255
+    field = signed_distance_field(bitmap, spread=4)
+    # the outline sits at 128, inside above, outside below
+    assert field[10, 10] == 255 and field[0, 0] == 0
+    assert field[10, 4] < 128 < field[10, 5]
+    assert abs(int(field[10, 4]) + int(field[10, 5]) - 256) <= 1
+    # values fall one step per pixel away from the outline
+    assert field[10, 3] < field[10, 4]
+
+
+def test_glyphs_are_rasterized_on_first_use(gl):
+    atlas = GlyphAtlas(FONT, 24)
+    assert atlas.rasterized == 0 and not atlas.pages
+    e = atlas.get("é")
+    assert atlas.get("é") is e
+    assert atlas.rasterized == 1 and len(atlas.pages) == 1
+    # the accent sits above the letter
+    assert e.bearing.y > atlas.get("e").bearing.y
+    assert glyph_pixels(gl, atlas, e).max() == 255
+
+    # e is already there
+    assert atlas.warm_up(["Où êtes-vous ?", "Ça va."]) == 14
+    assert atlas.warm_up("Où") == 0
+
+
+def test_least_recently_used_glyphs_are_evicted(gl):
+    atlas = GlyphAtlas(FONT, 24, page_size=64, max_pages=1)
+    capacity = atlas.capacity()
+    letters = "abcdefghijklmnopqrstuvwxyz"[:capacity + 1]
+    for c in letters[:capacity]:
+        atlas.get(c)
+    atlas.get(letters[0])
+    # b is now the least recently used glyph
+    cell = tuple(atlas.glyphs[letters[1]].tex_coords)[:2]
+
+    # the page is full: the new glyph takes its cell, and the whole cell is rewritten
+    new = atlas.get(letters[capacity])
+    assert len(atlas.pages) == 1 and atlas.evicted == 1
+    assert letters[1] not in atlas.glyphs and letters[0] in atlas.glyphs
+    assert tuple(new.tex_coords)[:2] == cell
+    assert glyph_pixels(gl, atlas, new).max() == 255
+
+
+def test_text_glyphs_do_not_evict_each_other(gl):
+    atlas = GlyphAtlas(FONT, 24, page_size=64, max_pages=1)
+    text = "abcdefghijklmnopqrstuvwxyz"[:atlas.capacity() + 2]
+    glyphs = atlas.get_all(text)
+    # a single text larger than the budget goes over it rather than drawing wrong glyphs
+    assert len(atlas.pages) == 2 and atlas.evicted == 0
+    cells = {(g.texture_id, tuple(g.tex_coords)) for g in glyphs}
+    assert len(cells) == len(text)
+
+
+def test_distance_field_glyphs_are_padded(gl):
+    atlas = GlyphAtlas(FONT, 32, sdf=True, spread=4)
+    a = atlas.get("A")
+    pixels = glyph_pixels(gl, atlas, a)
+    assert pixels.shape == (a.size.y, a.size.x)
+    # the borders are nearly faded out, the strokes above the outline value
+    assert pixels.max() > 128
+    assert pixels[0].max() < 32 and pixels[:, 0].max() < 32
+    # spaces have no pixels but keep their advance
+    space = atlas.get(" ")
+    assert space.size.x == 8 and space.advance > 0
+
+
+def test_text_renderer_clear_deletes_the_shared_atlases(gl, monkeypatch):
+    monkeypatch.setattr(TextRenderer, "atlases", {})
+    atlas = GlyphAtlas(FONT, 24)
+    atlas.warm_up("abc")
+    TextRenderer.atlases[(FONT, 24, False, 0)] = atlas
+    pages = [page.texture.id for page in atlas.pages]
+    TextRenderer.clear()
+    assert TextRenderer.atlases == {}
+    assert gl.deleted == pages and not atlas.pages and not atlas.glyphs
@@ -0,0 +1,163 @@
+import os
+import ctypes
+import glm
+import random
+import multiprocessing
+import numpy as np
+import pytest
+import elyria.gpu_particles as gpu_particles
+from elyria import base_dir
+from elyria.game_object import GameObject
+from elyria.resource_manager import ResourceManager
+from elyria.stream_buffer import StreamingBuffers
+from elyria.particle import Particle, ParticleGenerator
+from elyria.gpu_particles import GPUParticleGenerator, PARTICLE_STATE_SIZE
+
+
+class FakeStream:
+    id = 5
+
+    def __init__(self):
+        self.records = None
+
+    def allocate(self, data, alignment=4):
+        self.records = data
+        return 10 * alignment
+
+
+class FakeGL:
+    def __init__(self):
+        self.copies = []
+        self.bound = {}
+
+    def glBindBuffer(self, target, buffer):
+        self.bound[target] = buffer
+
+    def glCopyBufferSubData(self, read_target, write_target, read_offset, write_offset, size):
+        self.copies.append((self.bound[write_target], read_offset, write_offset, size))
+
+
+@pytest.fixture
+def generator(monkeypatch):
+    gl = FakeGL()
+    stream = FakeStream()
+    monkeypatch.setattr(gpu_particles, "glBindBuffer", gl.glBindBuffer)
+    monkeypatch.setattr(gpu_particles, "glCopyBufferSubData", gl.glCopyBufferSubData)
+    monkeypatch.setattr(gpu_particles.StreamingBuffers, "vertex_buffer", staticmethod(lambda: stream))
+
+    # no GL objects needed to spawn and emit
+    generator = GPUParticleGenerator.__new__(GPUParticleGenerator)
+    generator.amount = 8
+    generator.emit_cursor = 0
+    generator.current = 1
+    generator.state_buffers = [21, 22]
+    return generator, gl, stream
+
+
+def game_object():
+    go = GameObject(glm.vec2(100.0, 50.0), size=glm.vec2(10.0, 10.0))
+    go.velocity = glm.vec2(30.0, -20.0)
+    return go
+
+
+def test_spawned_records_match_the_cpu_generator(generator):
+    generator, _, _ = generator
+    go = game_object()
+
+    random.seed(3)
+    records = generator.spawn(go, 4, glm.vec2(5.0, 5.0))
+    random.seed(3)
+    for record in records:
+        particle = Particle()
+        ParticleGenerator.respawn_particle(generator, particle, go, glm.vec2(5.0, 5.0))
+        assert record.tolist() == pytest.approx([*particle.position, *particle.velocity, *particle.color, particle.life])
+
+
+def test_spawning_more_than_amount_keeps_the_newest(generator):
+    generator, _, _ = generator
+    records = generator.spawn(game_object(), 11)
+    assert records.shape == (8, 9)
+
+
+def test_emit_copies_into_the_current_state_and_wraps(generator):
+    generator, gl, stream = generator
+    generator.emit_cursor = 6
+    generator.emit(np.zeros((5, 9), dtype=np.float32))
+
+    base = 10 * PARTICLE_STATE_SIZE
+    # slots 6 and 7, then 0 to 2 of the current state buffer
+    assert gl.copies == [
+        (22, base, 6 * PARTICLE_STATE_SIZE, 2 * PARTICLE_STATE_SIZE),
+        (22, base + 2 * PARTICLE_STATE_SIZE, 0, 3 * PARTICLE_STATE_SIZE)
+    ]
+    assert generator.emit_cursor == 3
+    assert stream.records.shape == (5, 9)
+
+
+# an offscreen OpenGL 3.3 core context through EGL, False if there is none
+def egl_context() -> bool:
+    try:
+        from OpenGL import EGL
+        display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+        major, minor = EGL.EGLint(), EGL.EGLint()
+        if not EGL.eglInitialize(display, ctypes.pointer(major), ctypes.pointer(minor)):
+            return False
+        attributes = (EGL.EGLint * 5)(EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT, EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT, EGL.EGL_NONE)
+        config, count = EGL.EGLConfig(), EGL.EGLint()
+        if not EGL.eglChooseConfig(display, attributes, ctypes.pointer(config), 1, ctypes.pointer(count)) or count.value == 0:
+            return False
+        surface = EGL.eglCreatePbufferSurface(display, config, (EGL.EGLint * 5)(EGL.EGL_WIDTH, 64, EGL.EGL_HEIGHT, 64, EGL.EGL_NONE))
+        EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+        version = (EGL.EGLint * 7)(
+            EGL.EGL_CONTEXT_MAJOR_VERSION, 3, EGL.EGL_CONTEXT_MINOR_VERSION, 3,
+            EGL.EGL_CONTEXT_OPENGL_PROFILE_MASK, EGL.EGL_CONTEXT_OPENGL_CORE_PROFILE_BIT, EGL.EGL_NONE
+        )
+        context = EGL.eglCreateContext(display, config, EGL.EGL_NO_CONTEXT, version)
+        return bool(context) and bool(EGL.eglMakeCurrent(display, surface, surface, context))
+    except Exception:
+        return False
+
+
+# live particles of both generators after the same updates, in a process of
+# its own as PyOpenGL picks its platform (EGL here) once, when first imported
+def simulate_both(frames, results):
+    if not egl_context():
+        results.put(None)
+        return
+    ResourceManager.load_shader(
+        "particle", os.path.join(base_dir, "shaders", "particle.vs"), os.path.join(base_dir, "shaders", "particle.fs")
+    )
+    go = game_object()
+    live = []
+    for generator_class in (ParticleGenerator, GPUParticleGenerator):
+        random.seed(5)
+        generator = generator_class(None, 200)
+        for frame in range(frames):
+            go.position = glm.vec2(100.0 + 3.0 * frame, 50.0)
+            generator.update(1.0 / 64.0, go, 2, glm.vec2(5.0, 5.0))
+            StreamingBuffers.end_frame()
+        if generator_class is ParticleGenerator:
+            state = np.array([[*p.position, *p.velocity, *p.color, p.life] for p in generator.particles], dtype=np.float32)
+        else:
+            state = generator.read_state()
+        live.append(state[state[:, 8] > 0.0])
+    results.put(live)
+
+
+def test_gpu_particles_follow_the_cpu_generator(monkeypatch):
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    monkeypatch.setenv("PYOPENGL_PLATFORM", "egl")
+    # Mesa's EGL needs no window system this way
+    monkeypatch.setenv("EGL_PLATFORM", os.environ.get("EGL_PLATFORM", "surfaceless"))
+    process = context.Process(target=simulate_both, args=(90, results))
+    process.start()
+    live = results.get(timeout=60.0)
+    process.join(10.0)
+    if live is None:
+        pytest.skip("no EGL context available")
+
+    cpu, gpu = (state[np.lexsort(state[:, ::-1].T)] for state in live)
+    # one second of life at two per frame: the particles of the last 63 frames are alive
+    assert len(cpu) == len(gpu) == 2 * 63
+    assert gpu == pytest.approx(cpu, abs=1e-3)
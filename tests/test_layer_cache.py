@@ -0,0 +1,138 @@
+import glm
+import pytest
+import elyria.layer_cache as layer_cache
+import elyria.texture2d as texture2d
+from elyria.layer_cache import Layer, LayerStack
+
+
+class FakeGL:
+    def __init__(self):
+        self.framebuffer = 7
+        self.viewport = [0, 0, 800, 600]
+        self.blend = None
+
+    def glGetIntegerv(self, name):
+        return self.framebuffer if name == layer_cache.GL_DRAW_FRAMEBUFFER_BINDING else list(self.viewport)
+
+    def glBindFramebuffer(self, target, framebuffer):
+        self.framebuffer = framebuffer
+
+    def glViewport(self, x, y, width, height):
+        self.viewport = [x, y, width, height]
+
+    def glBlendFunc(self, source, destination):
+        self.blend = (source, destination)
+
+    def glGenFramebuffers(self, count):
+        return 3
+
+    def glCheckFramebufferStatus(self, target):
+        return layer_cache.GL_FRAMEBUFFER_COMPLETE
+
+    def noop(self, *args):
+        return 1
+
+
+class FakeShader:
+    def __init__(self):
+        self.projection = None
+
+    def use(self):
+        pass
+
+    def set_mat4(self, name, value):
+        self.projection = value
+
+
+class FakeRenderer:
+    def __init__(self, gl):
+        self.gl = gl
+        self.shader = FakeShader()
+        self.sprites = []
+
+    def draw_sprite(self, texture, position, size):
+        self.sprites.append((texture, glm.vec2(position), glm.vec2(size), self.gl.framebuffer, self.gl.blend))
+
+    def flush(self):
+        pass
+
+
+@pytest.fixture
+def gl(monkeypatch):
+    fake = FakeGL()
+    for name in ("glGetIntegerv", "glBindFramebuffer", "glViewport", "glBlendFunc", "glGenFramebuffers", "glCheckFramebufferStatus"):
+        monkeypatch.setattr(layer_cache, name, getattr(fake, name))
+    for name in ("glClearColor", "glClear", "glBlendFuncSeparate", "glFramebufferTexture2D", "glDeleteFramebuffers", "glDeleteTextures"):
+        monkeypatch.setattr(layer_cache, name, fake.noop)
+    for name in ("glGenTextures", "glBindTexture", "glTexImage2D", "glTexParameteri"):
+        monkeypatch.setattr(texture2d, name, fake.noop)
+    return fake
+
+
+# a layer drawing one sprite, counting its draws
+def counting_layer(static, margin=100):
+    draws = []
+    layer = Layer(800, 600, lambda renderer: draws.append(renderer.shader.projection), static, margin)
+    return layer, draws
+
+
+def test_static_layer_is_drawn_once_then_composited(gl):
+    renderer = FakeRenderer(gl)
+    layer, draws = counting_layer(static=True)
+    for _ in range(3):
+        layer.render(renderer, glm.vec2(10.0, 20.0))
+    assert len(draws) == 1 and layer.redraws == 1
+    assert (layer.texture.width, layer.texture.height) == (1000, 800)
+
+    # one quad per frame, on the target bound before the layer, with the
+    # cached texture placed at its world position
+    assert len(renderer.sprites) == 3
+    texture, position, size, framebuffer, blend = renderer.sprites[-1]
+    assert texture is layer.texture
+    assert position == glm.vec2(-100.0, -100.0)
+    assert size == glm.vec2(1000.0, 800.0)
+    assert framebuffer == 7
+    assert blend == (layer_cache.GL_ONE, layer_cache.GL_ONE_MINUS_SRC_ALPHA)
+    # everything is restored after the redraw
+    assert gl.viewport == [0, 0, 800, 600]
+    assert gl.blend == (layer_cache.GL_SRC_ALPHA, layer_cache.GL_ONE_MINUS_SRC_ALPHA)
+    assert renderer.shader.projection == glm.ortho(0.0, 800.0, 600.0, 0.0, -1.0, 1.0)
+
+
+def test_static_layer_redraws_beyond_margin_or_once_invalidated(gl):
+    renderer = FakeRenderer(gl)
+    layer, draws = counting_layer(static=True)
+    layer.render(renderer, glm.vec2(0.0, 0.0))
+    # within the margin the cached texture is only moved
+    layer.render(renderer, glm.vec2(100.0, -100.0))
+    assert layer.redraws == 1
+    assert renderer.sprites[-1][1] == glm.vec2(-200.0, 0.0)
+
+    layer.render(renderer, glm.vec2(101.0, 0.0))
+    assert layer.redraws == 2
+    assert layer.origin == glm.vec2(1.0, -100.0)
+
+    layer.invalidate()
+    layer.render(renderer, glm.vec2(101.0, 0.0))
+    assert layer.redraws == 3
+    # drawn upside down, looking at the screen plus the margin
+    assert draws[-1] == glm.ortho(1.0, 1001.0, -100.0, 700.0, -1.0, 1.0)
+
+
+def test_other_layers_are_drawn_every_frame(gl):
+    renderer = FakeRenderer(gl)
+    stack = LayerStack(800, 600)
+    draws = []
+    stack.add("background", lambda renderer: draws.append("background"), static=True)
+    stack.add("actors", lambda renderer: draws.append(renderer.shader.projection))
+    for _ in range(2):
+        stack.render(renderer, glm.vec2(5.0, 5.0))
+    assert draws[0] == "background"
+    assert draws[1:] == [glm.ortho(5.0, 805.0, 605.0, 5.0, -1.0, 1.0)] * 2
+    assert stack.layers["actors"].texture is None
+
+    stack.invalidate("background")
+    stack.render(renderer, glm.vec2(5.0, 5.0))
+    assert draws.count("background") == 2
+    stack.clear()
+    assert not stack.layers
@@ -0,0 +1,229 @@
+import os
+import asyncio
+import multiprocessing
+import time
+import glm
+import numpy as np
+import pytest
+from elyria import Game, GameObject, ResourceManager, Key
+from elyria.netcode import (
+    GameServer, NetClient, NET_ENTITY_DTYPE, SNAPSHOT_HEADER, capture_entities, delta, apply_delta
+)
+
+SMALL_RPG_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "small_rpg"))
+
+
+# players walk right while they hold D; walkers stand still along the x axis
+class ArenaGame(Game):
+    def __init__(self, walkers: tuple[float, ...] = ()):
+        super().__init__(800, 600)
+        self.walker_positions = walkers
+        self.walkers: list[GameObject] = []
+        self.players: dict[int, GameObject] = {}
+        self.keys: dict[int, frozenset[int]] = {}
+
+    def init(self):
+        super().init()
+        self.walkers = [GameObject(glm.vec2(x, 0.0), size=glm.vec2(16.0, 16.0)) for x in self.walker_positions]
+
+    def add_client(self, client):
+        self.players[client] = GameObject(glm.vec2(0.0, 0.0), size=glm.vec2(16.0, 16.0))
+        return self.players[client]
+
+    def remove_client(self, client):
+        self.players.pop(client, None)
+
+    def client_input(self, client, keys):
+        self.keys[client] = keys
+
+    def update(self, dt):
+        for client, player in self.players.items():
+            if Key.D.value in self.keys.get(client, ()):
+                player.position.x += 100.0 * dt
+
+
+@pytest.fixture
+def headless():
+    yield
+    ResourceManager.headless = False
+    ResourceManager.clear()
+
+
+# one round trip: inputs in, a tick, snapshots out
+async def exchange(server, clients, keys=()):
+    for client in clients:
+        client.send_input(keys)
+    await asyncio.sleep(0.01)
+    server.tick(1.0 / 30.0)
+    await asyncio.sleep(0.01)
+    for client in clients:
+        client.poll()
+
+
+def test_records_are_quantized():
+    o = GameObject(glm.vec2(10.06, -3.5), 90.0, glm.vec2(16.0, 24.0), color=glm.vec3(1.0, 0.5, 0.0), palette=2)
+    record = capture_entities([o], [7])[0]
+    assert record["id"] == 7
+    assert record["position"].tolist() == [80, -28]
+    assert record["size"].tolist() == [128, 192]
+    assert record["rotation"] == 16384
+    assert record["color"].tolist() == [255, 128, 0]
+    assert record["palette"] == 2 and record["sprite"] == 0
+
+
+def test_delta_applied_to_its_baseline_gives_the_current_state():
+    rng = np.random.default_rng(3)
+    baseline = np.zeros(50, dtype=NET_ENTITY_DTYPE)
+    baseline["id"] = np.arange(50)
+    baseline["position"] = rng.integers(-1000, 1000, (50, 2))
+    current = baseline[5:].copy()
+    current["position"][::7] += 8
+    extra = np.zeros(3, dtype=NET_ENTITY_DTYPE)
+    extra["id"] = [60, 61, 62]
+    current = np.concatenate((current, extra))
+
+    changed, removed = delta(current, baseline)
+    assert changed.sum() == len(current[:45][::7]) + 3
+    assert removed.tolist() == [0, 1, 2, 3, 4]
+    rebuilt = apply_delta(baseline, current[changed], removed)
+    assert rebuilt.tobytes() == current.tobytes()
+
+
+def test_loopback_clients_see_their_surroundings(headless):
+    async def scenario():
+        game = ArenaGame(walkers=(0.0, 200.0, 1000.0))
+        server = GameServer(game, radius=300.0)
+        await server.start()
+        first, second = NetClient(*server.address), NetClient(*server.address)
+        try:
+            for _ in range(3):
+                await exchange(server, [first, second])
+            assert first.connected and second.connected
+            assert first.player != second.player
+            # both players and the two nearest walkers, not the far one
+            assert len(first.entities) == 4
+            assert sorted(o.position.x for o in first.entities.values()) == [0.0, 0.0, 0.0, 200.0]
+
+            # at rest, snapshots only hold their header
+            before = first.bytes_received
+            await exchange(server, [first, second])
+            assert first.bytes_received - before == SNAPSHOT_HEADER.size
+
+            for _ in range(10):
+                await exchange(server, [first, second], [Key.D])
+            # the server plays the keys last received: released before this tick
+            await exchange(server, [first, second])
+            player = game.players[1]
+            assert player.position.x > 30.0
+            assert abs(first.player_object.position.x - player.position.x) <= 1.0 / 16.0
+
+            second.disconnect()
+            await exchange(server, [first])
+            assert len(game.players) == 1
+            assert len(first.entities) == 3
+        finally:
+            first.close()
+            second.close()
+            server.close()
+        return server.stats
+
+    stats = asyncio.run(scenario())
+    assert stats.ticks > 0 and stats.bytes_sent > 0
+    assert stats.largest_packet <= 1200
+
+
+def test_snapshots_over_the_packet_size_catch_up(headless):
+    async def scenario():
+        game = ArenaGame(walkers=tuple(float(x) for x in range(10, 110, 10)))
+        # room for three records per snapshot
+        server = GameServer(game, max_packet=SNAPSHOT_HEADER.size + 3 * NET_ENTITY_DTYPE.itemsize)
+        await server.start()
+        client = NetClient(*server.address)
+        try:
+            await exchange(server, [client])
+            assert len(client.entities) == 3
+            for _ in range(4):
+                await exchange(server, [client])
+            assert len(client.entities) == 11
+            # the nearest came first, all are right now
+            assert sorted(o.position.x for o in client.entities.values()) == [0.0] + [float(x) for x in range(10, 110, 10)]
+        finally:
+            client.close()
+            server.close()
+
+    asyncio.run(scenario())
+
+
+def test_client_drops_snapshots_it_cannot_decode(headless):
+    client = NetClient("127.0.0.1", 9)
+    try:
+        record = np.zeros(1, dtype=NET_ENTITY_DTYPE)
+        full = SNAPSHOT_HEADER.pack(4, 5, 0xFFFFFFFF, 0, 1, 0) + record.tobytes()
+        assert client.read_snapshot(full)
+        # against a baseline it never received, or older than the latest
+        assert not client.read_snapshot(SNAPSHOT_HEADER.pack(4, 7, 6, 0, 0, 0))
+        assert not client.read_snapshot(SNAPSHOT_HEADER.pack(4, 4, 0xFFFFFFFF, 0, 0, 0))
+        assert client.dropped == 2
+        assert client.read_snapshot(SNAPSHOT_HEADER.pack(4, 8, 5, 0, 0, 1) + np.array([0], dtype="<u2").tobytes())
+        assert client.entities == {}
+    finally:
+        client.close()
+
+
+def test_small_rpg_server_reports_its_clients(headless, monkeypatch):
+    monkeypatch.chdir(SMALL_RPG_DIR)
+    monkeypatch.syspath_prepend(SMALL_RPG_DIR)
+    from game import SmallRPG
+
+    async def scenario():
+        game = SmallRPG()
+        game.local_player = False
+        server = GameServer(game)
+        await server.start()
+        client = NetClient(*server.address)
+        try:
+            assert game.metrics() == {"clients": 0}
+            for _ in range(3):
+                await exchange(server, [client], [Key.D])
+            assert game.player is None and client.connected
+            assert game.metrics() == {"clients": 1}
+        finally:
+            client.close()
+            server.close()
+
+    asyncio.run(scenario())
+
+
+# a client in its own process, holding D
+def remote_client(address, seconds, results):
+    client = NetClient(*address)
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        client.send_input([Key.D])
+        client.poll()
+        time.sleep(0.01)
+    results.put((client.received, client.player_object.position.x if client.player_object else None))
+    client.disconnect()
+    client.close()
+
+
+def test_client_in_another_process(headless):
+    results = multiprocessing.Queue()
+
+    async def scenario():
+        game = ArenaGame()
+        server = GameServer(game)
+        await server.start()
+        process = multiprocessing.Process(target=remote_client, args=(server.address, 1.0, results))
+        process.start()
+        try:
+            await server.run(ticks=45)
+        finally:
+            server.close()
+        process.join(10.0)
+        return game
+
+    asyncio.run(scenario())
+    received, x = results.get(timeout=5.0)
+    assert received > 10
+    assert x is not None and x > 0.0
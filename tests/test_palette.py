@@ -0,0 +1,42 @@
+import numpy as np
+from elyria.palette import PaletteTexture, PALETTE_SIZE, index_image, map_to_palette
+
+
+def test_few_colors_are_indexed_exactly():
+    rng = np.random.default_rng(3)
+    colors = rng.integers(0, 256, (12, 4), dtype=np.uint8)
+    colors[:, 3] = 255
+    pixels = colors[rng.integers(0, 12, (24, 16))]
+    # transparent pixels, whatever their color, share an entry
+    pixels[0, :4] = (10, 20, 30, 0)
+    pixels[1, :4] = (40, 50, 60, 0)
+
+    indices, palette = index_image(pixels)
+    assert indices.dtype == np.uint8 and indices.shape == (24, 16)
+    assert len(palette) <= 13
+    rebuilt = palette[indices]
+    assert np.array_equal(rebuilt[2:], pixels[2:])
+    assert not rebuilt[:2, :4].any()
+
+
+def test_many_colors_are_quantized_to_the_nearest():
+    rng = np.random.default_rng(5)
+    pixels = rng.integers(0, 256, (64, 64, 4), dtype=np.uint8)
+    pixels[..., 3] = 255
+    indices, palette = index_image(pixels)
+    assert len(palette) == PALETTE_SIZE
+    error = np.abs(palette[indices].astype(int) - pixels.astype(int)).mean()
+    assert error < 20
+    # reloading maps the image onto the same palette the same way
+    assert np.array_equal(map_to_palette(pixels, palette), indices)
+
+
+def test_palette_rows_grow_and_clear():
+    palettes = PaletteTexture(capacity=1)
+    first = palettes.add(np.full((3, 4), 7, dtype=np.uint8))
+    second = palettes.add([(1, 2, 3, 4)])
+    assert (first, second) == (0, 1)
+    assert palettes.get(1)[0].tolist() == [1, 2, 3, 4] and not palettes.get(1)[1:].any()
+    assert palettes.dirty
+    palettes.clear()
+    assert palettes.rows == 0 and not palettes.colors.any()
@@ -0,0 +1,145 @@
+import numpy as np
+import pytest
+from elyria.pathfinding import NavGrid, PathfindingService, ClusterHierarchy, DIRECTIONS, path_cost, run, step_direction
+
+
+def check_path(grid, path, start, goal):
+    assert path[0] == start and path[-1] == goal
+    for (x0, y0), (x1, y1) in zip(path, path[1:]):
+        dx, dy = x1 - x0, y1 - y0
+        assert (dx, dy) in DIRECTIONS
+        assert grid.is_walkable(x1, y1)
+        if dx and dy:
+            # never cuts a corner
+            assert grid.is_walkable(x0 + dx, y0) and grid.is_walkable(x0, y0 + dy)
+
+
+def random_queries(walkable, count, rng):
+    free = np.argwhere(walkable)
+    for _ in range(count):
+        a, b = free[rng.integers(len(free), size=2)]
+        yield (int(a[1]), int(a[0])), (int(b[1]), int(b[0]))
+
+
+def test_open_grid_path_is_octile_length():
+    grid = NavGrid(np.ones((10, 10), dtype=bool))
+    path = grid.find_path((0, 0), (9, 4))
+    check_path(grid, path, (0, 0), (9, 4))
+    assert path_cost(path) == pytest.approx(5 + 4 * np.sqrt(2))
+
+
+def test_diagonal_moves_do_not_cut_corners():
+    walkable = np.ones((3, 3), dtype=bool)
+    walkable[0, 1] = False
+    grid = NavGrid(walkable)
+    # (0, 0) -> (1, 1) passes by the blocked (1, 0): two straight moves instead
+    assert grid.find_path((0, 0), (1, 1)) == [(0, 0), (0, 1), (1, 1)]
+
+
+def test_unreachable_goal():
+    walkable = np.ones((5, 5), dtype=bool)
+    walkable[:, 2] = False
+    grid = NavGrid(walkable)
+    assert grid.find_path((0, 0), (4, 4)) is None
+    assert grid.find_path((2, 2), (4, 4)) is None
+
+
+def test_jps_and_hierarchy_agree_with_astar():
+    rng = np.random.default_rng(7)
+    for _ in range(10):
+        walkable = rng.random((40, 50)) > 0.3
+        grid = NavGrid(walkable, cluster_size=8)
+        hierarchy = ClusterHierarchy(grid, 8)
+        for start, goal in random_queries(walkable, 20, rng):
+            expected = run(grid.astar(start, goal))
+            found = run(grid.jps(start, goal))
+            routed = run(hierarchy.search(start, goal))
+            if expected is None:
+                assert found is None and routed is None
+                continue
+            check_path(grid, found, start, goal)
+            check_path(grid, routed, start, goal)
+            # JPS is optimal, the hierarchy near optimal
+            assert path_cost(found) == pytest.approx(path_cost(expected))
+            assert path_cost(routed) <= 1.5 * path_cost(expected)
+
+
+def test_cache_is_invalidated_by_tile_changes():
+    grid = NavGrid(np.ones((5, 5), dtype=bool))
+    path = grid.find_path((0, 2), (4, 2))
+    assert grid.find_path((0, 2), (4, 2)) is path
+    assert grid.cache_hits == 1
+
+    # blocking a tile of the path drops it, the new one goes around
+    grid.set_walkable(2, 2, False)
+    detour = grid.find_path((0, 2), (4, 2))
+    assert (2, 2) not in detour
+    check_path(grid, detour, (0, 2), (4, 2))
+
+    # blocking a tile elsewhere keeps it
+    grid.set_walkable(0, 0, False)
+    assert grid.find_path((0, 2), (4, 2)) is detour
+
+    # opening one drops everything
+    grid.set_walkable(2, 2, True)
+    assert grid.find_path((0, 2), (4, 2)) == path
+
+
+def test_hierarchy_follows_tile_changes():
+    walkable = np.ones((32, 32), dtype=bool)
+    walkable[:, 16] = False
+    walkable[30, 16] = True
+    grid = NavGrid(walkable, cluster_size=8)
+    path = grid.find_path((0, 0), (31, 0))
+    assert (16, 30) in path
+
+    grid.set_walkable(16, 30, False)
+    assert grid.find_path((0, 0), (31, 0)) is None
+    grid.set_walkable(16, 2, True)
+    path = grid.find_path((0, 0), (31, 0))
+    check_path(grid, path, (0, 0), (31, 0))
+    assert (16, 2) in path
+
+
+def test_tile_changes_in_the_middle_of_a_plan():
+    # every step at which a wall can go up while clusters are being connected
+    for steps in range(40):
+        grid = NavGrid(np.ones((16, 64), dtype=bool), cluster_size=16)
+        search = grid.plan((0, 15), (63, 15))
+        try:
+            for _ in range(steps):
+                next(search)
+        except StopIteration:
+            break
+        for y in range(1, 16):
+            grid.set_walkable(20, y, False)
+        path = run(search)
+        check_path(grid, path, (0, 15), (63, 15))
+        assert (20, 0) in path
+
+
+def test_service_spreads_requests_over_frames():
+    rng = np.random.default_rng(3)
+    walkable = rng.random((64, 64)) > 0.2
+    grid = NavGrid(walkable)
+    service = PathfindingService(grid, budget_ms=0.0)
+    finished = []
+    requests = [service.request(start, goal, finished.append) for start, goal in random_queries(walkable, 20, rng)]
+    cancelled = service.request((0, 0), (1, 1))
+    service.cancel(cancelled)
+
+    frames = 0
+    while service.pending:
+        service.update()
+        frames += 1
+    # without budget, every frame still makes some progress
+    assert frames > len(requests)
+    assert finished == requests
+    for request in requests:
+        assert request.done
+        assert request.path == grid.find_path(request.start, request.goal)
+    assert not cancelled.done
+
+
+def test_step_direction_follows_direction_order():
+    assert [step_direction((5, 5), (5 + dx, 5 + dy)) for dx, dy in DIRECTIONS] == list(range(8))
@@ -0,0 +1,98 @@
+import glm
+import numpy as np
+import pytest
+from elyria import BallObject
+from elyria.collision import Direction
+from elyria.physics import PhysicsWorld
+
+
+def test_fast_bodies_do_not_tunnel_through_thin_walls():
+    world = PhysicsWorld(2)
+    world.add_static((100.0, 0.0), (2.0, 200.0))
+    # 1666 pixels in a single step
+    body = world.add((0.0, 50.0), (10.0, 10.0), velocity=(100000.0, 0.0), restitution=0.0)
+    world.step(1.0 / 60.0)
+
+    assert world.positions[body, 0] == pytest.approx(90.0, abs=0.01)
+    assert world.velocities[body].tolist() == [0.0, 0.0]
+    contact, = world.contacts
+    assert (contact.body, contact.other, contact.static) == (body, 0, True)
+    assert contact.collision.is_collided
+    assert contact.collision.direction == Direction.RIGHT
+
+
+def test_bodies_bounce_off_walls():
+    world = PhysicsWorld(1)
+    world.add_bounds(200.0, 200.0)
+    body = world.add((180.0, 50.0), (10.0, 10.0), velocity=(600.0, 0.0))
+    world.step(1.0 / 60.0)
+    # 10 pixels to the wall, the last 0 back
+    assert world.positions[body, 0] == pytest.approx(190.0, abs=0.01)
+    world.step(1.0 / 60.0)
+    assert world.positions[body, 0] == pytest.approx(180.0, abs=0.01)
+    assert world.velocities[body].tolist() == [-600.0, 0.0]
+
+
+def test_circles_go_round_box_corners():
+    world = PhysicsWorld(2)
+    world.add_static((100.0, 100.0), (50.0, 50.0))
+    # passes the corner 5.66 pixels away: the grown box is entered, the rounded corner missed
+    ball = world.add((85.0, 97.0), (10.0, 10.0), velocity=(600.0, -600.0), radius=5.0, restitution=0.0)
+    world.step(1.0 / 60.0)
+    assert world.positions[ball].tolist() == pytest.approx([95.0, 87.0])
+    assert world.contacts == []
+
+    # straight at the corner: stops radius away from it, without restitution
+    world.set_position(ball, (84.0, 84.0))
+    world.set_velocity(ball, (600.0, 600.0))
+    world.step(1.0 / 60.0)
+    center = world.positions[ball] + 5.0
+    assert np.linalg.norm(center - 100.0) == pytest.approx(5.0, abs=0.01)
+    assert world.contacts[0].static
+
+
+def test_equal_balls_exchange_their_velocities():
+    world = PhysicsWorld(2)
+    a = world.add((0.0, 0.0), (10.0, 10.0), velocity=(50.0, 0.0), radius=5.0)
+    b = world.add((9.0, 0.0), (10.0, 10.0), radius=5.0)
+    world.step(1.0 / 60.0)
+    assert world.velocities[a].tolist() == pytest.approx([0.0, 0.0])
+    assert world.velocities[b].tolist() == pytest.approx([50.0, 0.0])
+    assert world.positions[b, 0] - world.positions[a, 0] >= 10.0 - 1e-9
+    assert sorted((c.body, c.other) for c in world.contacts) == [(a, b), (b, a)]
+
+
+def test_piles_fall_asleep_together_and_wake_up():
+    world = PhysicsWorld(4, gravity=(0.0, 400.0))
+    world.add_bounds(300.0, 200.0)
+    stack = [world.add((100.0 + k * 3.0, 150.0 - k * 12.0), (10.0, 10.0), restitution=0.3) for k in range(3)]
+    for _ in range(600):
+        world.step(1.0 / 60.0)
+    assert not world.awake[stack].any()
+    assert world.positions[stack, 1] == pytest.approx([190.0, 180.0, 170.0], abs=2.0)
+
+    # sleeping bodies are skipped
+    before = world.positions[stack].copy()
+    world.step(1.0 / 60.0)
+    assert (world.positions[stack] == before).all()
+
+    # until something hits them
+    world.add((0.0, 170.0), (10.0, 10.0), velocity=(400.0, 0.0))
+    for _ in range(30):
+        world.step(1.0 / 60.0)
+    assert world.awake[stack].any()
+
+
+def test_game_objects_follow_their_bodies():
+    world = PhysicsWorld(2)
+    ball = BallObject(glm.vec2(10.0, 10.0), radius=5.0, velocity=glm.vec2(60.0, 0.0))
+    index = world.add_object(ball)
+    assert world.radii[index] == 5.0
+    world.step(0.5)
+    assert ball.position == glm.vec2(40.0, 10.0)
+
+    other = world.add((0.0, 100.0), (4.0, 4.0))
+    world.remove(index)
+    assert world.count == 1
+    assert world.objects[0] is None and world.positions[0].tolist() == [0.0, 100.0]
+    assert other == 1
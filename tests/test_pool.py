@@ -0,0 +1,100 @@
+import glm
+import pytest
+from elyria.game_object import GameObject
+from elyria.pool import ObjectPool, AllocationTracker
+
+
+class Bullet(GameObject):
+    def __init__(self):
+        super().__init__(size=glm.vec2(2.0, 2.0))
+        self.life = 0.0
+
+    def reset(self, position: glm.vec2, velocity: glm.vec2, life: float = 1.0) -> None:
+        super().reset(position, velocity)
+        self.life = life
+
+    def update(self, dt: float) -> None:
+        self.position.x += self.velocity.x * dt
+        self.position.y += self.velocity.y * dt
+        self.life -= dt
+        if self.life <= 0.0:
+            self.destroyed = True
+
+
+def test_pooled_objects_own_their_vectors_and_reset_in_place():
+    pool = ObjectPool(Bullet, 2)
+    first = pool.acquire(glm.vec2(1.0, 2.0), glm.vec2(3.0, 4.0))
+    second = pool.acquire(glm.vec2(5.0, 6.0), glm.vec2(7.0, 8.0))
+    assert first.position is not second.position
+    assert first.position == glm.vec2(1.0, 2.0)
+    assert second.velocity == glm.vec2(7.0, 8.0)
+
+    position = first.position
+    first.destroyed = True
+    assert pool.collect() == 1
+    again = pool.acquire(glm.vec2(9.0, 9.0), glm.vec2(0.0, 0.0))
+    assert again is first and again.position is position
+    assert again.position == glm.vec2(9.0, 9.0) and not again.destroyed
+    assert pool.created == 2
+
+
+def test_collect_returns_destroyed_objects_keeping_the_order():
+    pool = ObjectPool(Bullet, 4)
+    bullets = [pool.acquire(glm.vec2(0.0), glm.vec2(0.0), life) for life in (0.5, 2.0, 0.5, 2.0)]
+    pool.update(1.0)
+    assert pool.collect() == 2
+    assert pool.active == [bullets[1], bullets[3]]
+    assert len(pool.free) == 2
+
+    pool.release(bullets[3])
+    pool.clear()
+    assert len(pool) == 0 and len(pool.free) == 4
+
+
+def test_exhausted_pool_grows_or_refuses():
+    pool = ObjectPool(Bullet, 1, grow=False)
+    assert pool.acquire(glm.vec2(0.0), glm.vec2(0.0)) is not None
+    assert pool.acquire(glm.vec2(0.0), glm.vec2(0.0)) is None
+    assert pool.exhausted == 1
+
+    pool = ObjectPool(Bullet, 1)
+    pool.acquire(glm.vec2(0.0), glm.vec2(0.0))
+    pool.acquire(glm.vec2(0.0), glm.vec2(0.0))
+    assert pool.created == 2 and len(pool) == 2
+
+
+def test_tracker_counts_what_each_frame_leaves_over():
+    pool = ObjectPool(Bullet, 64)
+    position, velocity = glm.vec2(0.0), glm.vec2(1.0, 1.0)
+
+    # steady pooled frames: spawn, move, collect
+    def frame():
+        for _ in range(8):
+            pool.acquire(position, velocity, 1.0 / 30.0)
+        pool.update(1.0 / 60.0)
+        pool.collect()
+
+    # warm up, lists at their final size
+    for _ in range(5):
+        frame()
+    kept = []
+    tracker = AllocationTracker(top=3)
+    tracker.start()
+    try:
+        for _ in range(5):
+            frame()
+            tracker.end_frame()
+        pooled = sum(tracker.blocks)
+
+        # frames keeping new objects alive
+        for _ in range(5):
+            kept.extend(Bullet() for _ in range(8))
+            tracker.end_frame()
+    finally:
+        tracker.stop()
+
+    assert pooled <= 5
+    assert sum(tracker.blocks[5:]) >= 5 * 8
+    filename, line, blocks, size = tracker.top_sites()[0]
+    assert filename == __file__ and blocks >= 5 * 8
+    assert "10 frames" in tracker.summary()
@@ -0,0 +1,132 @@
+import time
+import glm
+import pytest
+from elyria.game_object import GameObject
+from elyria.render_pipeline import DrawList, RenderPipeline
+from elyria.scheduler import Scheduler
+
+
+class FakeTexture:
+    width = 64
+    height = 32
+
+
+class FakeRenderer:
+    def __init__(self):
+        self.quads = []
+
+    def draw_quad(self, texture, position, size, rotate, color, uv, palette=None):
+        self.quads.append((texture, tuple(position), tuple(size), rotate, tuple(color), uv))
+
+    def flush(self):
+        self.quads.append("flush")
+
+
+class FakeShader:
+    def __init__(self):
+        self.uniforms = []
+
+    def use(self):
+        pass
+
+    def set_vec2(self, name, value):
+        self.uniforms.append((name, value))
+
+
+def test_recorded_sprites_replay_as_they_were():
+    texture = FakeTexture()
+    go = GameObject(glm.vec2(10.0, 20.0), 45.0, glm.vec2(16.0, 8.0), texture=texture, color=glm.vec3(1.0, 0.5, 0.25))
+    calls = []
+    draw_list = DrawList(capacity=1)
+    go.draw(draw_list)
+    draw_list.draw_subsprite(texture, glm.vec2(1.0, 2.0), glm.vec2(3.0, 4.0), tex_coords=(16, 8, 16, 8))
+    draw_list.call(calls.append, "layers")
+    draw_list.draw_sprite(texture, glm.vec2(5.0, 6.0))
+
+    # recorded values don't follow the object anymore
+    go.position.x = 99.0
+    assert draw_list.count == 3 and len(draw_list) == 3
+
+    renderer = FakeRenderer()
+    draw_list.replay(renderer)
+    assert calls == ["layers"]
+    assert renderer.quads == [
+        (texture, (10.0, 20.0), (16.0, 8.0), 45.0, (1.0, 0.5, 0.25), (0.0, 0.0, 1.0, 1.0)),
+        (texture, (1.0, 2.0), (3.0, 4.0), 0.0, (1.0, 1.0, 1.0), (0.25, 0.25, 0.5, 0.5)),
+        # sprites batched before a recorded call are drawn first
+        "flush",
+        (texture, (5.0, 6.0), (10.0, 10.0), 0.0, (1.0, 1.0, 1.0), (0.0, 0.0, 1.0, 1.0))
+    ]
+
+    draw_list.clear()
+    assert draw_list.count == 0 and len(draw_list) == 0
+
+
+def test_uniforms_are_copied_when_recorded():
+    shader = FakeShader()
+    offset = glm.vec2(1.0, 2.0)
+    draw_list = DrawList()
+    draw_list.uniform(shader, "offset", offset)
+    offset.x = 5.0
+    draw_list.replay(FakeRenderer())
+    assert shader.uniforms == [("offset", glm.vec2(1.0, 2.0))]
+
+
+class CountingGame:
+    def __init__(self, delay: float = 0.0):
+        self.frame = 0
+        self.delay = delay
+        self.scripts = Scheduler()
+
+    def process_input(self, dt):
+        pass
+
+    def update(self, dt):
+        time.sleep(self.delay)
+        self.frame += 1
+
+    def record(self, draw_list):
+        draw_list.call(lambda frame=self.frame: frame)
+
+
+def test_render_thread_replays_the_last_simulated_frame():
+    game = CountingGame()
+    pipeline = RenderPipeline(game)
+    try:
+        pipeline.submit(0.016)
+        # frame 1 is being simulated, nothing recorded yet to render
+        assert len(pipeline.draw_list) == 0
+        pipeline.wait()
+        pipeline.submit(0.016)
+        front = pipeline.draw_list
+        assert front.commands[0][0]() == 1
+        pipeline.wait()
+        assert pipeline.draw_list is not front and pipeline.draw_list.commands[0][0]() == 2
+    finally:
+        pipeline.close()
+
+
+def test_update_overlaps_the_render():
+    game = CountingGame(delay=0.03)
+    pipeline = RenderPipeline(game)
+    try:
+        start = time.perf_counter()
+        for _ in range(4):
+            pipeline.submit(0.016)
+            # a render blocked in the driver, the GIL released
+            time.sleep(0.03)
+            pipeline.wait()
+        elapsed = time.perf_counter() - start
+    finally:
+        pipeline.close()
+    assert game.frame == 4
+    assert elapsed < 4 * 0.06 * 0.8
+
+
+def test_simulation_errors_reach_the_render_thread():
+    game = CountingGame()
+    game.update = lambda dt: 1 / 0
+    pipeline = RenderPipeline(game)
+    pipeline.submit(0.016)
+    with pytest.raises(ZeroDivisionError):
+        pipeline.close()
@@ -0,0 +1,115 @@
+import sys
+import types
+import ctypes
+import glm
+import numpy as np
+import pytest
+from OpenGL.GL import GL_TRIANGLES
+from elyria.render_stats import RenderStats, format_call
+
+
+def fake_module(calls):
+    module = types.ModuleType("fake_renderer")
+
+    def record(name):
+        return lambda *args: calls.append(name)
+
+    for name in ("glDrawArrays", "glDrawArraysInstanced", "glUseProgram", "glBindTexture", "glUniform3fv", "glBufferData", "glGenBuffers", "glBindFramebuffer"):
+        setattr(module, name, record(name))
+    module.glfwGetTime = lambda: 0.0
+
+    class Renderer:
+        def draw(self):
+            module.glUseProgram(3)
+            module.glBindTexture(0, 7)
+            module.glDrawArrays(GL_TRIANGLES, 0, 6)
+
+        def post(self):
+            module.glBindFramebuffer(0, 1)
+            # nested: counted for the innermost section
+            self.draw()
+            module.glDrawArraysInstanced(GL_TRIANGLES, 0, 6, 10)
+
+    module.Renderer = Renderer
+    return module
+
+
+@pytest.fixture
+def stats(monkeypatch, tmp_path):
+    calls = []
+    module = fake_module(calls)
+    monkeypatch.setitem(sys.modules, "fake_renderer", module)
+    stats = RenderStats(
+        trace_path=str(tmp_path / "frame.trace"),
+        trace_frame=1,
+        modules=["fake_renderer"],
+        sections=[("fake_renderer", "Renderer", ("draw",), "sprites"), ("fake_renderer", "Renderer", ("post",), "post")]
+    )
+    stats.install()
+    yield stats, module, calls
+    stats.uninstall()
+
+
+def test_calls_are_counted_per_frame_and_subsystem(stats):
+    stats, module, calls = stats
+    renderer = module.Renderer()
+    renderer.post()
+    module.glGenBuffers(2)
+    module.glBufferData(0, 256, np.zeros(64, dtype=np.float32), 0)
+    module.glBufferData(0, 1024, None, 0)
+    stats.end_frame()
+
+    assert calls[:3] == ["glBindFramebuffer", "glUseProgram", "glBindTexture"]
+    # glfw functions are left alone
+    assert hasattr(module.glDrawArrays, "__wrapped__") and not hasattr(module.glfwGetTime, "__wrapped__")
+    sprites = stats.frame_counters("sprites")
+    assert sprites["draw_calls"] == 1 and sprites["vertices"] == 6
+    assert sprites["program_binds"] == 1 and sprites["texture_binds"] == 1
+    post = stats.frame_counters("post")
+    assert post["draw_calls"] == 1 and post["vertices"] == 60 and post["framebuffer_binds"] == 1
+    other = stats.frame_counters("other")
+    assert other["buffers_created"] == 2 and other["bytes_uploaded"] == 256
+    assert stats.frame_counters()["draw_calls"] == 2
+
+    # counters start over every frame and add up in the totals
+    renderer.draw()
+    stats.end_frame()
+    assert stats.frame_counters()["draw_calls"] == 1
+    assert stats.totals["sprites"]["draw_calls"] == 2
+    assert "sprites" in stats.summary()
+
+
+def test_one_frame_is_traced_to_a_file(stats):
+    stats, module, calls = stats
+    renderer = module.Renderer()
+    renderer.draw()
+    stats.end_frame()
+    renderer.post()
+    stats.end_frame()
+    renderer.draw()
+    stats.end_frame()
+
+    with open(stats.trace_path) as file:
+        lines = file.read().splitlines()
+    assert lines == [
+        "[post] glBindFramebuffer(0, 1)",
+        "[sprites] glUseProgram(3)",
+        "[sprites] glBindTexture(0, 7)",
+        "[sprites] glDrawArrays(GL_TRIANGLES, 0, 6)",
+        "[post] glDrawArraysInstanced(GL_TRIANGLES, 0, 6, 10)"
+    ]
+
+
+def test_uninstall_restores_everything(stats):
+    stats, module, calls = stats
+    draw = module.Renderer.draw
+    stats.uninstall()
+    assert module.Renderer.draw is not draw
+    assert not hasattr(module.Renderer.draw, "__wrapped__")
+    assert not hasattr(module.glDrawArrays, "__wrapped__")
+
+
+def test_trace_reads_uniform_values():
+    color = glm.vec3(1.0, 0.5, 0.25)
+    assert format_call("glUniform3fv", (4, 1, glm.value_ptr(color))) == "glUniform3fv(4, 1, [1, 0.5, 0.25])"
+    assert format_call("glDrawArrays", (GL_TRIANGLES, np.uint32(6), ctypes.c_void_p(16))) == "glDrawArrays(GL_TRIANGLES, 6, c_void_p(16))"
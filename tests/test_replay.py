@@ -0,0 +1,66 @@
+import glm
+import pytest
+from elyria import GameObject
+from elyria.replay import Recorder, Replayer, FrameTimeReport, state_checksum
+
+
+def test_recording_round_trip(tmp_path):
+    recorder = Recorder(seed=1234)
+    recorder.record_event(87, 1)
+    recorder.record_event(68, 1)
+    first = recorder.end_frame(1.0 / 60.0)
+    second = recorder.end_frame(0.1)
+    recorder.record_event(87, 0)
+    third = recorder.end_frame(0.02)
+
+    path = tmp_path / "session.rec"
+    recorder.save(str(path))
+    replayer = Replayer.load(str(path))
+
+    assert replayer.seed == 1234
+    assert replayer.next_frame() == (first, [(87, 1), (68, 1)])
+    assert replayer.next_frame() == (second, [])
+    assert replayer.next_frame() == (third, [(87, 0)])
+    assert replayer.finished
+
+
+def test_recorded_dt_matches_replayed_dt():
+    recorder = Recorder(seed=0)
+    dt = recorder.end_frame(0.1)
+    # the live run simulates with the stored (float32) precision
+    assert dt != 0.1
+    assert dt == pytest.approx(0.1)
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / "not_a_replay.bin"
+    path.write_bytes(b"\x00" * 32)
+    with pytest.raises(ValueError):
+        Replayer.load(str(path))
+
+
+def test_frame_time_report_statistics():
+    # 1 ms to 100 ms
+    times = [i / 1000.0 for i in range(1, 101)]
+    report = FrameTimeReport(times, worst_count=3)
+
+    assert report.mean == pytest.approx(50.5)
+    assert report.percentile(95) == pytest.approx(95.05)
+    assert report.percentile(99) == pytest.approx(99.01)
+    assert report.worst_frames() == [(99, pytest.approx(100.0)), (98, pytest.approx(99.0)), (97, pytest.approx(98.0))]
+
+
+def test_empty_frame_time_report():
+    report = FrameTimeReport([])
+    assert report.mean == 0.0
+    assert report.percentile(99) == 0.0
+    assert report.worst_frames() == []
+
+
+def test_state_checksum_tracks_state():
+    a = GameObject(glm.vec2(1.0, 2.0), velocity=glm.vec2(3.0, 4.0))
+    b = GameObject(glm.vec2(1.0, 2.0), velocity=glm.vec2(3.0, 4.0))
+    assert state_checksum([a]) == state_checksum([b])
+
+    b.position.x += 0.5
+    assert state_checksum([a]) != state_checksum([b])
@@ -0,0 +1,204 @@
+import itertools
+import numpy as np
+import pytest
+from PIL import Image
+import elyria.resource_manager as resource_manager
+import elyria.texture2d as texture2d
+from elyria.resource_manager import ResourceManager
+
+
+class FakeGL:
+    def __init__(self):
+        self.ids = itertools.count(1)
+        self.live = set()
+
+    def glGenTextures(self, count):
+        id = next(self.ids)
+        self.live.add(id)
+        return id
+
+    def glDeleteTextures(self, count, ids):
+        for id in ids:
+            self.live.discard(int(id))
+
+    def noop(self, *args):
+        pass
+
+
+@pytest.fixture
+def gl(monkeypatch):
+    fake = FakeGL()
+    monkeypatch.setattr(texture2d, "glGenTextures", fake.glGenTextures)
+    monkeypatch.setattr(resource_manager, "glDeleteTextures", fake.glDeleteTextures)
+    monkeypatch.setattr(texture2d, "glDeleteTextures", fake.glDeleteTextures)
+    monkeypatch.setattr(resource_manager, "glGetIntegerv", lambda name: 2048)
+    for name in ("glBindTexture", "glPixelStorei", "glTexImage2D", "glTexImage3D", "glTexSubImage3D", "glTexParameteri"):
+        monkeypatch.setattr(texture2d, name, fake.noop)
+    yield fake
+    ResourceManager.texture_arrays = False
+    ResourceManager.max_array_layers = 64
+    ResourceManager.arrays.clear()
+    ResourceManager.palettes.clear()
+    ResourceManager.palette_rows.clear()
+    ResourceManager.set_budget(None)
+    ResourceManager.textures.clear()
+    ResourceManager.references.clear()
+    ResourceManager.dependencies.clear()
+    ResourceManager.lru.clear()
+    ResourceManager.texture_sources.clear()
+    ResourceManager.sizes.clear()
+    for category in ResourceManager.usage:
+        ResourceManager.usage[category] = 0
+
+
+# writes a size x size RGBA image (size * size * 4 bytes once uploaded)
+def image(tmp_path, name, size=8):
+    path = tmp_path / f"{name}.png"
+    Image.new("RGBA", (size, size)).save(path)
+    return str(path)
+
+
+def test_memory_usage_tracks_loads_and_evictions(gl, tmp_path):
+    ResourceManager.load_texture(image(tmp_path, "a"), True, "a")
+    ResourceManager.load_texture(image(tmp_path, "b"), True, "b")
+    assert ResourceManager.memory_usage()["textures"] == 2 * 256
+
+    ResourceManager.set_budget(256)
+    assert ResourceManager.memory_usage()["textures"] == 256
+    assert ResourceManager.textures["a"].id == 0
+
+
+def test_least_recently_used_is_evicted_first(gl, tmp_path):
+    for name in ("a", "b", "c"):
+        ResourceManager.load_texture(image(tmp_path, name), True, name)
+    ResourceManager.get_texture("a")
+
+    ResourceManager.set_budget(2 * 256)
+    assert ResourceManager.textures["b"].id == 0
+    assert ResourceManager.textures["a"].id != 0
+    assert ResourceManager.textures["c"].id != 0
+
+
+def test_referenced_resources_are_never_evicted(gl, tmp_path):
+    for name in ("a", "b", "c"):
+        ResourceManager.load_texture(image(tmp_path, name), True, name)
+    handle = ResourceManager.acquire("textures", "a")
+
+    ResourceManager.set_budget(256)
+    assert ResourceManager.textures["a"].id != 0
+    assert ResourceManager.textures["b"].id == 0
+    assert ResourceManager.textures["c"].id == 0
+
+    # once released, "a" is the least recently used texture again
+    handle.release()
+    ResourceManager.load_texture(image(tmp_path, "d"), True, "d")
+    assert ResourceManager.textures["a"].id == 0
+    assert ResourceManager.memory_usage()["textures"] == 256
+
+
+def test_evicted_texture_reloads_on_access(gl, tmp_path):
+    ResourceManager.load_texture(image(tmp_path, "a"), True, "a")
+    ResourceManager.load_texture(image(tmp_path, "b"), True, "b")
+    ResourceManager.set_budget(256)
+    assert ResourceManager.textures["a"].id == 0
+
+    texture = ResourceManager.get_texture("a")
+    assert texture.id in gl.live
+    # reloading "a" pushed "b" out instead
+    assert ResourceManager.textures["b"].id == 0
+    assert ResourceManager.memory_usage()["textures"] == 256
+
+
+def test_failed_reload_keeps_texture_evicted(gl, tmp_path):
+    path = image(tmp_path, "a")
+    ResourceManager.load_texture(path, True, "a")
+    ResourceManager.load_texture(image(tmp_path, "b"), True, "b")
+    ResourceManager.set_budget(256)
+
+    (tmp_path / "a.png").unlink()
+    live = set(gl.live)
+    texture = ResourceManager.get_texture("a")
+    assert texture.id == 0
+    assert gl.live == live
+    assert ResourceManager.memory_usage()["textures"] == 256
+
+
+def test_same_sized_textures_are_grouped_into_arrays(gl, tmp_path):
+    ResourceManager.texture_arrays = True
+    ResourceManager.max_array_layers = 4
+    ResourceManager.load_texture(image(tmp_path, "a"), True, "a")
+    # alone of its size so far
+    assert ResourceManager.textures["a"].array is None
+
+    for name in ("b", "c"):
+        ResourceManager.load_texture(image(tmp_path, name), True, name)
+    ResourceManager.load_texture(image(tmp_path, "big", 16), True, "big")
+    array = ResourceManager.textures["a"].array
+    assert array is not None and array.capacity == 4
+    assert [texture.layer for texture in array.textures] == [0, 1, 2]
+    assert all(ResourceManager.textures[name].id == 0 for name in ("a", "b", "c"))
+    assert ResourceManager.textures["big"].array is None
+    assert ResourceManager.memory_usage()["textures"] == 3 * 256 + 1024
+    # arrays that grew were released
+    assert gl.live == {array.id, ResourceManager.textures["big"].id}
+
+    # past the biggest array, a new one is started with the textures left on their own
+    for name in ("d", "e"):
+        ResourceManager.load_texture(image(tmp_path, name), True, name)
+    assert ResourceManager.textures["d"].array is array
+    assert ResourceManager.textures["e"].array is None
+    ResourceManager.load_texture(image(tmp_path, "f"), True, "f")
+    assert ResourceManager.textures["f"].array is ResourceManager.textures["e"].array is not None
+
+    # bound on its own, a grouped texture gets its own storage back
+    ResourceManager.textures["a"].bind()
+    assert ResourceManager.textures["a"].id != 0
+    assert ResourceManager.get_texture("b").id == 0
+
+
+# a 4 * 2 sheet of three colors, and the same sheet recolored
+def sheets(tmp_path):
+    red, green, clear = (255, 0, 0, 255), (0, 255, 0, 255), (0, 0, 0, 0)
+    pixels = np.array([[red, green, clear, red], [green, green, red, clear]], dtype=np.uint8)
+    Image.fromarray(pixels, "RGBA").save(tmp_path / "sheet.png")
+    recolor = pixels.copy()
+    recolor[(pixels == red).all(axis=2)] = (0, 0, 255, 255)
+    Image.fromarray(recolor, "RGBA").save(tmp_path / "blue.png")
+    # red becomes two colors: not a recolor
+    recolor[0, 0] = (9, 9, 9, 255)
+    Image.fromarray(recolor, "RGBA").save(tmp_path / "broken.png")
+    return pixels
+
+
+def test_indexed_textures_hold_indices_and_recolors_are_palette_rows(gl, tmp_path):
+    pixels = sheets(tmp_path)
+    texture = ResourceManager.load_texture(str(tmp_path / "sheet.png"), True, "sheet", indexed=True)
+    assert texture.internal_format == resource_manager.GL_R8
+    assert texture.filter_min == resource_manager.GL_NEAREST
+    assert texture.palette == 0 and texture.palette_texture is ResourceManager.palettes
+    # a quarter of the memory of the RGBA texture
+    assert ResourceManager.memory_usage()["textures"] == 8
+
+    row = ResourceManager.load_palette_from_file("sheet", str(tmp_path / "blue.png"), "blue")
+    assert row == 1 and ResourceManager.get_palette("blue") == 1
+    indices = ResourceManager.texture_pixels(texture, str(tmp_path / "sheet.png"), True)
+    assert np.array_equal(ResourceManager.palettes.get(0)[indices], pixels)
+    blue = ResourceManager.palettes.get(1)[indices]
+    assert blue[0, 0].tolist() == [0, 0, 255, 255] and blue[0, 1].tolist() == [0, 255, 0, 255]
+
+    assert ResourceManager.load_palette_from_file("sheet", str(tmp_path / "broken.png"), "broken") is None
+    ResourceManager.load_texture(str(tmp_path / "sheet.png"), True, "plain")
+    assert ResourceManager.load_palette("plain", np.zeros((3, 4)), "nothing") is None
+
+
+def test_evicted_indexed_textures_reload_the_same_indices(gl, tmp_path):
+    sheets(tmp_path)
+    texture = ResourceManager.load_texture(str(tmp_path / "sheet.png"), True, "sheet", indexed=True)
+    uploads = []
+    texture.generate = lambda data: uploads.append(data)
+    ResourceManager.set_budget(0)
+    assert texture.id == 0
+    ResourceManager.set_budget(None)
+    ResourceManager.get_texture("sheet")
+    assert uploads[0].dtype == np.uint8 and uploads[0].shape == (2, 4)
+    assert np.array_equal(ResourceManager.palettes.get(0)[uploads[0]][0, 0], (255, 0, 0, 255))
@@ -0,0 +1,152 @@
+import time
+from elyria.scheduler import Scheduler, wait, until, next_frame, wait_signal
+
+
+def test_generator_script_sleeps_in_game_time():
+    scheduler = Scheduler()
+    steps = []
+
+    def script():
+        steps.append("start")
+        yield wait(0.5)
+        steps.append("woke")
+
+    scheduler.start(script())
+    scheduler.update(0.125)
+    assert steps == ["start"]
+    assert len(scheduler.sleeping) == 1
+    for _ in range(3):
+        scheduler.update(0.125)
+    assert steps == ["start"]
+    scheduler.update(0.125)
+    assert steps == ["start", "woke"]
+    assert scheduler.running == 0
+
+
+def test_sleepers_wake_in_order_of_wake_up_time():
+    scheduler = Scheduler()
+    woke = []
+
+    def sleeper(name, seconds):
+        yield wait(seconds)
+        woke.append(name)
+
+    scheduler.start(sleeper("late", 0.3))
+    scheduler.start(sleeper("early", 0.1))
+    scheduler.start(sleeper("also_late", 0.3))
+    scheduler.update(0.0)
+    scheduler.update(0.5)
+    assert woke == ["early", "late", "also_late"]
+
+
+def test_async_script_awaits_conditions_and_signals():
+    scheduler = Scheduler()
+    state = {"open": False}
+    steps = []
+
+    async def script():
+        await until(lambda: state["open"])
+        steps.append("open")
+        choice = await wait_signal("dialogue_closed")
+        steps.append(choice)
+        return "finished"
+
+    handle = scheduler.start(script())
+    scheduler.update(0.016)
+    scheduler.update(0.016)
+    assert steps == []
+    state["open"] = True
+    scheduler.update(0.016)
+    assert steps == ["open"]
+    assert scheduler.signal("dialogue_closed", "yes") == 1
+    scheduler.update(0.016)
+    assert steps == ["open", "yes"]
+    assert handle.state == "done" and handle.result == "finished"
+
+
+def test_script_joins_another_one_for_its_result():
+    scheduler = Scheduler()
+    results = []
+
+    def child():
+        yield next_frame()
+        yield
+        return 42
+
+    def parent():
+        results.append((yield scheduler.start(child())))
+
+    scheduler.start(parent())
+    for _ in range(4):
+        scheduler.update(0.016)
+    assert results == [42]
+
+
+def test_budget_defers_scripts_to_the_next_frame():
+    scheduler = Scheduler(budget=0.001)
+    ran = []
+
+    def slow(index):
+        time.sleep(0.002)
+        ran.append(index)
+        yield
+
+    for index in range(3):
+        scheduler.start(slow(index))
+    scheduler.update(0.016)
+    # one script always runs, the others wait for the next frames, first in line
+    assert ran == [0]
+    assert scheduler.last_deferred == 2
+    scheduler.update(0.016)
+    assert ran == [0, 1]
+    scheduler.update(0.016)
+    assert ran == [0, 1, 2]
+    assert scheduler.frames_over_budget >= 2
+
+    unlimited = Scheduler(budget=None)
+    for index in range(3):
+        unlimited.start(slow(index))
+    unlimited.update(0.016)
+    assert ran[3:] == [0, 1, 2]
+
+
+def test_failing_and_cancelled_scripts_are_reported(capsys):
+    scheduler = Scheduler()
+    closed = []
+
+    def broken():
+        yield
+        raise RuntimeError("broken script")
+
+    def looping():
+        try:
+            while True:
+                yield
+        finally:
+            closed.append(True)
+
+    failed = scheduler.start(broken(), "broken")
+    endless = scheduler.start(looping(), "looping")
+    scheduler.update(0.016)
+    scheduler.update(0.016)
+    assert failed.state == "failed"
+    assert "ERROR::SCHEDULER: script broken failed" in capsys.readouterr().out
+    scheduler.cancel(endless)
+    assert endless.state == "cancelled" and closed == [True]
+    assert scheduler.running == 0
+
+    names = [name for name, steps, cpu_time, longest in scheduler.report()]
+    assert sorted(names) == ["broken", "looping"]
+
+
+def test_script_can_cancel_itself():
+    scheduler = Scheduler()
+
+    def script():
+        scheduler.cancel(handle)
+        yield wait(1.0)
+
+    handle = scheduler.start(script())
+    scheduler.update(0.016)
+    assert handle.state == "cancelled"
+    assert scheduler.running == 0 and not scheduler.sleeping
@@ -0,0 +1,98 @@
+import os
+import random
+import glm
+import pytest
+from PIL import Image
+from elyria import Game, GameObject, ResourceManager, SimulationJob, SimulationRunner
+from elyria.simulation import simulate
+
+SMALL_RPG_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "small_rpg"))
+
+
+# a world of one object drifting randomly, nothing to load
+class DriftGame(Game):
+    def __init__(self):
+        super().__init__(800, 600)
+
+    def init(self):
+        super().init()
+        self.walker = GameObject(glm.vec2(0.0, 0.0))
+
+    def update(self, dt):
+        self.walker.position += glm.vec2(random.random(), random.random()) * dt
+
+
+# input scripts making a job fail, or take its whole worker down
+def raising_script(frame, rng):
+    raise RuntimeError("broken script")
+
+
+def exiting_script(frame, rng):
+    os._exit(3)
+
+
+@pytest.fixture
+def headless():
+    ResourceManager.headless = True
+    yield
+    ResourceManager.headless = False
+    ResourceManager.clear()
+
+
+def test_same_seed_gives_same_checksum(headless):
+    first = simulate(DriftGame(), SimulationJob(7, frames=100))
+    second = simulate(DriftGame(), SimulationJob(7, frames=100))
+    other = simulate(DriftGame(), SimulationJob(8, frames=100))
+    assert first[0] == 100
+    assert first[2] == second[2]
+    assert first[2] != other[2]
+
+
+def test_small_rpg_runs_without_gl_context(headless, monkeypatch):
+    monkeypatch.chdir(SMALL_RPG_DIR)
+    monkeypatch.syspath_prepend(SMALL_RPG_DIR)
+    from game import SmallRPG
+    from simulate import RandomWalk
+
+    game = SmallRPG()
+    steps, elapsed, checksum = simulate(game, SimulationJob(3, frames=600, script=RandomWalk()))
+    assert steps == 600
+    assert game.renderer is None
+    texture = ResourceManager.get_texture("characters")
+    assert texture.id == 0
+    # only the size of the image was read
+    assert (texture.width, texture.height) == Image.open("textures/characters.png").size
+    # the scripted input went through: the player faces its last direction
+    direction = game.metrics()["direction"]
+    assert game.player.animation is ResourceManager.get_animation(f"character_{direction.lower()}")
+
+
+def test_runner_returns_results_in_job_order():
+    runner = SimulationRunner(DriftGame, workers=2, poll_interval=0.1)
+    results = runner.run([SimulationJob(seed, frames=50) for seed in range(4)])
+    assert [result.seed for result in results] == [0, 1, 2, 3]
+    assert runner.steps == 200
+    assert not runner.errors
+
+    # same seed, same world, whichever worker ran it
+    again = SimulationRunner(DriftGame, workers=1).run([SimulationJob(2, frames=50)])
+    assert again[0].checksum == results[2].checksum
+
+
+def test_runner_reports_failed_and_lost_jobs():
+    jobs = [
+        SimulationJob(0, frames=50),
+        SimulationJob(1, frames=50, script=raising_script),
+        SimulationJob(2, frames=50, script=exiting_script),
+        SimulationJob(3, frames=50)
+    ]
+    runner = SimulationRunner(DriftGame, workers=1, poll_interval=0.1)
+    results = runner.run(jobs)
+
+    failed = dict(runner.errors)
+    assert "broken script" in failed[1]
+    assert "exited with code 3" in failed[2]
+    # the only worker died, so the last job never ran
+    assert "never ran" in failed[3]
+    assert results[0] is not None
+    assert results[1:] == [None, None, None]
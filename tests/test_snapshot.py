@@ -0,0 +1,124 @@
+import glm
+import pytest
+from elyria import GameObject, BallObject, Animation, Texture2D, ResourceManager
+from elyria.snapshot import Snapshot, SnapshotRing, SnapshotWriter, save_snapshot, load_snapshot, HEADER
+
+
+@pytest.fixture
+def animation():
+    texture = Texture2D(64, 64)
+    animation = Animation(texture, row=1, frames=4, width=16, height=16, animation_speed=5)
+    ResourceManager.textures["sheet"] = texture
+    ResourceManager.animations["walk"] = animation
+    yield animation
+    del ResourceManager.textures["sheet"]
+    del ResourceManager.animations["walk"]
+
+
+def make_objects(animation):
+    walker = GameObject(glm.vec2(10.0, 20.0), 45.0, glm.vec2(16.0, 24.0), animation=animation, velocity=glm.vec2(1.0, -2.0))
+    ball = BallObject(glm.vec2(5.0, 6.0), 7.5, glm.vec2(100.0, -350.0), stuck=False, sticky=True)
+    wall = GameObject(glm.vec2(0.0, 0.0), texture=animation.texture, color=glm.vec3(0.5, 0.25, 1.0), is_solid=True)
+    return [walker, ball, wall]
+
+
+def scramble(objects):
+    for o in objects:
+        o.position = glm.vec2(-1.0)
+        o.velocity = glm.vec2(-1.0)
+        o.rotation = -1.0
+        o.texture = None
+        o.animation = None
+        o.destroyed = True
+    objects[1].stuck = True
+    objects[1].sticky = False
+    objects[1].radius = 1.0
+
+
+def check(objects, animation):
+    walker, ball, wall = objects
+    assert walker.position == glm.vec2(10.0, 20.0)
+    assert walker.rotation == 45.0
+    assert walker.velocity == glm.vec2(1.0, -2.0)
+    assert walker.animation is animation
+    assert animation.frame == 2.5
+    assert not walker.destroyed
+    assert ball.radius == 7.5
+    assert (ball.stuck, ball.sticky, ball.pass_through) == (False, True, False)
+    assert wall.texture is animation.texture
+    assert wall.is_solid
+    assert wall.color == glm.vec3(0.5, 0.25, 1.0)
+
+
+def test_capture_and_restore(animation):
+    objects = make_objects(animation)
+    animation.frame = 2.5
+    snapshot = Snapshot.capture(objects, frame=42)
+
+    scramble(objects)
+    animation.frame = 0.0
+    snapshot.restore(objects)
+    check(objects, animation)
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_file_round_trip(animation, tmp_path, compress):
+    objects = make_objects(animation)
+    animation.frame = 2.5
+    path = str(tmp_path / "world.snap")
+    save_snapshot(Snapshot.capture(objects, frame=42), path, compress)
+
+    scramble(objects)
+    snapshot = load_snapshot(path)
+    assert snapshot.frame == 42
+    snapshot.restore(objects)
+    check(objects, animation)
+
+
+def test_background_writer(animation, tmp_path):
+    objects = make_objects(animation)
+    snapshot = Snapshot.capture(objects, frame=7)
+    writer = SnapshotWriter()
+    future = writer.save(snapshot, str(tmp_path / "world.snap"))
+    # the records were copied, the snapshot can be overwritten at once
+    snapshot.entities["rotation"] = 0.0
+    future.result()
+    writer.close()
+    assert load_snapshot(str(tmp_path / "world.snap")).entities["rotation"][0] == 45.0
+
+
+def test_unknown_version_is_rejected(animation):
+    data = bytearray(Snapshot.capture(make_objects(animation)).to_bytes())
+    data[4:6] = (99).to_bytes(2, "little")
+    with pytest.raises(ValueError):
+        Snapshot.from_bytes(bytes(data))
+    with pytest.raises(ValueError):
+        Snapshot.from_bytes(b"NOPE" + bytes(HEADER.size))
+
+
+def test_restore_into_other_objects_is_rejected(animation):
+    snapshot = Snapshot.capture(make_objects(animation))
+    with pytest.raises(ValueError):
+        snapshot.restore([GameObject()])
+
+
+def test_ring_rollback_reuses_storage():
+    objects = [GameObject(glm.vec2(0.0, 0.0))]
+    ring = SnapshotRing(capacity=3)
+    for frame in range(5):
+        objects[0].position = glm.vec2(float(frame), 0.0)
+        ring.capture(objects, frame)
+    assert len(ring) == 3
+    assert ring.at(1) is None
+    assert ring.at(3).entities["position"][0][0] == 3.0
+
+    # rolling back to frame 3 restores it and drops frame 4
+    assert ring.rollback(objects, 3) == 3
+    assert objects[0].position.x == 3.0
+    assert len(ring) == 2
+    assert ring.rollback(objects, 0) is None
+
+    # a full ring captures into the storage of its oldest snapshot
+    ring = SnapshotRing(capacity=1)
+    first = ring.capture(objects, 0)
+    assert ring.capture(objects, 1).entities is first.entities
@@ -0,0 +1,113 @@
+import glm
+import numpy as np
+import pytest
+import elyria.sprite_batch as sprite_batch
+from elyria.sprite_batch import SpriteBatch, sprite_vertices
+from elyria.texture2d import Texture2D, TextureArray
+from elyria.palette import PaletteTexture
+
+
+class FakeStream:
+    id = 1
+
+    def __init__(self):
+        self.vertices = []
+
+    def allocate(self, data, alignment):
+        self.vertices.append(data)
+        return 0
+
+
+class FakeShader:
+    def use(self):
+        pass
+
+
+@pytest.fixture
+def batch(monkeypatch):
+    stream = FakeStream()
+    monkeypatch.setattr(sprite_batch.StreamingBuffers, "vertex_buffer", staticmethod(lambda: stream))
+    draws = []
+    monkeypatch.setattr(sprite_batch, "glDrawArrays", lambda mode, first, count: draws.append(count))
+    for name in ("glGenVertexArrays", "glBindVertexArray", "glBindBuffer", "glEnableVertexAttribArray", "glVertexAttribPointer", "glActiveTexture", "glBindTexture"):
+        monkeypatch.setattr(sprite_batch, name, lambda *args: 1)
+    monkeypatch.setattr(Texture2D, "bind", lambda self: None)
+    monkeypatch.setattr(TextureArray, "bind", lambda self: None)
+    monkeypatch.setattr(PaletteTexture, "bind", lambda self: None)
+    batch = SpriteBatch(FakeShader(), capacity=2)
+    batch.draws = draws
+    batch.stream_data = stream.vertices
+    return batch
+
+
+# a texture stored in the layer of an array, without any GL call
+def layered(array):
+    texture = Texture2D(array.width, array.height)
+    array.textures.append(texture)
+    texture.array, texture.layer = array, len(array.textures) - 1
+    return texture
+
+
+def test_vertices_match_the_sprite_renderer_transform():
+    position, size, rotate = glm.vec2(10.0, 20.0), glm.vec2(16.0, 8.0), 30.0
+    record = np.array([[position.x, position.y, size.x, size.y, rotate, 1.0, 0.5, 0.25, 0.1, 0.2, 0.3, 0.4, 2.0, 5.0]], dtype=np.float32)
+    vertices = sprite_vertices(record)
+
+    model = glm.mat4(1.0)
+    model = glm.translate(model, glm.vec3(position, 0.0))
+    model = glm.translate(model, glm.vec3(0.5 * size.x, 0.5 * size.y, 0.0))
+    model = glm.rotate(model, glm.radians(rotate), glm.vec3(0.0, 0.0, 1.0))
+    model = glm.translate(model, glm.vec3(-0.5 * size.x, -0.5 * size.y, 0.0))
+    model = glm.scale(model, glm.vec3(size, 1.0))
+    corners = [(0.0, 1.0), (1.0, 0.0), (0.0, 0.0), (0.0, 1.0), (1.0, 1.0), (1.0, 0.0)]
+    expected = [tuple(model * glm.vec4(x, y, 0.0, 1.0))[:2] for x, y in corners]
+    assert np.allclose(vertices[:, :2], expected, atol=1e-4)
+    # same texture coordinates as SpriteRenderer's quad
+    assert np.allclose(vertices[:, 2:4], [(0.1, 0.4), (0.3, 0.2), (0.1, 0.2), (0.1, 0.4), (0.3, 0.4), (0.3, 0.2)])
+    assert np.allclose(vertices[:, 4:], [(1.0, 0.5, 0.25, 2.0, 5.0)] * 6)
+
+
+def test_sheets_of_one_array_share_a_draw(batch):
+    array = TextureArray(64, 64, 4)
+    first, second = layered(array), layered(array)
+    single = Texture2D(32, 32)
+
+    # both sheets of the array and one texture of its own: a single batch
+    batch.draw_sprite(first, glm.vec2(0.0, 0.0))
+    batch.draw_subsprite(second, glm.vec2(0.0, 0.0), tex_coords=(32, 0, 32, 32))
+    batch.draw_sprite(single, glm.vec2(0.0, 0.0))
+    batch.draw_sprite(first, glm.vec2(0.0, 0.0))
+    batch.flush()
+    assert batch.draws == [24]
+    layers = batch.stream_data[0][::6, 7]
+    assert layers.tolist() == [0.0, 1.0, -1.0, 0.0]
+    assert batch.stream_data[0][6, 2:4].tolist() == [0.5, 0.5]
+
+
+def test_another_texture_ends_the_batch(batch):
+    array, other_array = TextureArray(64, 64, 2), TextureArray(64, 64, 2)
+    a, b = Texture2D(8, 8), Texture2D(8, 8)
+    batch.draw_sprite(a, glm.vec2(0.0, 0.0))
+    batch.draw_sprite(b, glm.vec2(0.0, 0.0))
+    batch.draw_sprite(layered(array), glm.vec2(0.0, 0.0))
+    batch.draw_sprite(layered(other_array), glm.vec2(0.0, 0.0))
+    batch.flush()
+    # nothing left to draw
+    batch.flush()
+    assert batch.draws == [6, 12, 6]
+    assert (batch.sprites, batch.batches) == (4, 3)
+
+
+def test_sprites_carry_their_palette_row(batch):
+    palettes = PaletteTexture()
+    indexed = Texture2D(16, 16)
+    indexed.palette, indexed.palette_texture = 3, palettes
+    batch.draw_sprite(indexed, glm.vec2(0.0, 0.0))
+    batch.draw_sprite(indexed, glm.vec2(0.0, 0.0), palette=7)
+    assert batch.palettes is palettes
+    # a texture of colors ignores the palette
+    batch.draw_sprite(Texture2D(16, 16), glm.vec2(0.0, 0.0), palette=7)
+    batch.flush()
+    assert batch.draws == [6 * 2, 6]
+    assert batch.stream_data[0][::6, 8].tolist() == [3.0, 7.0]
+    assert batch.stream_data[1][::6, 8].tolist() == [-1.0]
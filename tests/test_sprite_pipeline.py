@@ -0,0 +1,52 @@
+import os
+import numpy as np
+import pytest
+from PIL import Image
+from utils.sprite_pipeline import PipelineSettings, build_sheet, run_pipeline
+
+TEXTURES = os.path.join(os.path.dirname(__file__), "..", "small_rpg", "textures")
+
+
+def test_builds_the_game_character_sheet():
+    with Image.open(os.path.join(TEXTURES, "original_characters.png")) as image:
+        pixels = np.asarray(image.convert("RGBA"))
+    with Image.open(os.path.join(TEXTURES, "characters.png")) as image:
+        expected = np.asarray(image.convert("RGBA"))
+    assert np.array_equal(build_sheet(pixels, PipelineSettings()), expected)
+
+
+def test_frames_follow_the_pattern():
+    # 2 columns * 6 rows of 1 * 1 sprites, each pixel tells its column and row
+    pixels = np.zeros((6, 2, 4), dtype=np.uint8)
+    pixels[..., 0] = np.arange(2)[None, :]
+    pixels[..., 1] = np.arange(6)[:, None]
+    sheet = build_sheet(pixels, PipelineSettings(1, 1, first=0, stride=3, pattern=(0, 2)))
+    # cycles at rows 0 and 3, then columns
+    assert sheet[..., 0].tolist() == [[0, 0], [1, 1], [0, 0], [1, 1]]
+    assert sheet[..., 1].tolist() == [[0, 2], [0, 2], [3, 5], [3, 5]]
+    with pytest.raises(ValueError):
+        build_sheet(pixels, PipelineSettings(1, 1, first=5))
+
+
+def test_manifest_skips_unchanged_sheets(tmp_path):
+    pack = tmp_path / "pack"
+    pack.mkdir()
+    rng = np.random.default_rng(0)
+    for name in ("a", "b"):
+        Image.fromarray(rng.integers(0, 255, (48, 32, 4), dtype=np.uint8)).save(pack / f"{name}.png")
+    output = str(tmp_path / "out")
+    settings = PipelineSettings(16, 12)
+
+    assert run_pipeline([str(pack)], output, settings, jobs=1) == {"built": 2, "skipped": 0, "failed": 0}
+    assert Image.open(os.path.join(output, "a.png")).size == (64, 2 * 12)
+    assert run_pipeline([str(pack)], output, settings, jobs=1) == {"built": 0, "skipped": 2, "failed": 0}
+
+    # an edited sheet or new settings rebuild
+    Image.fromarray(rng.integers(0, 255, (48, 32, 4), dtype=np.uint8)).save(pack / "b.png")
+    assert run_pipeline([str(pack)], output, settings, jobs=1)["built"] == 1
+    assert run_pipeline([str(pack)], output, PipelineSettings(16, 12, pattern=(0, 1)), jobs=1)["built"] == 2
+
+    # a broken sheet is reported and retried on the next run
+    (pack / "c.png").write_bytes(b"not a png")
+    assert run_pipeline([str(pack)], output, settings, jobs=1)["failed"] == 1
+    assert run_pipeline([str(pack)], output, settings, jobs=1)["failed"] == 1
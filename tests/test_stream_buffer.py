@@ -0,0 +1,127 @@
+import ctypes
+import numpy as np
+import pytest
+import elyria.stream_buffer as stream_buffer
+from elyria.stream_buffer import StreamBuffer
+
+
+class FakeGL:
+    def __init__(self):
+        self.memory = None
+        self.orphans = 0
+        self.fences = []
+        self.signaled = set()
+        # status glClientWaitSync returns for unsignaled fences when waiting
+        self.wait_status = stream_buffer.GL_CONDITION_SATISFIED
+
+    def glGenBuffers(self, count):
+        return 1
+
+    def glBufferData(self, target, size, data, usage):
+        if self.memory is not None:
+            self.orphans += 1
+        self.memory = ctypes.create_string_buffer(size)
+
+    def glBufferStorage(self, target, size, data, flags):
+        self.memory = ctypes.create_string_buffer(size)
+
+    def glMapBufferRange(self, target, offset, length, access):
+        return ctypes.addressof(self.memory) + offset
+
+    def glFenceSync(self, condition, flags):
+        self.fences.append(len(self.fences))
+        return self.fences[-1]
+
+    def glClientWaitSync(self, fence, flags, timeout):
+        if fence in self.signaled:
+            return stream_buffer.GL_ALREADY_SIGNALED
+        if timeout == 0:
+            return stream_buffer.GL_TIMEOUT_EXPIRED
+        return self.wait_status
+
+    def noop(self, *args):
+        pass
+
+
+@pytest.fixture
+def gl(monkeypatch):
+    fake = FakeGL()
+    for name in ("glGenBuffers", "glBufferData", "glBufferStorage", "glMapBufferRange", "glFenceSync", "glClientWaitSync"):
+        monkeypatch.setattr(stream_buffer, name, getattr(fake, name))
+    for name in ("glBindBuffer", "glUnmapBuffer", "glDeleteSync", "glDeleteBuffers"):
+        monkeypatch.setattr(stream_buffer, name, fake.noop)
+    return fake
+
+
+def data(nbytes, value=1):
+    return np.full(nbytes, value, dtype=np.uint8)
+
+
+@pytest.mark.parametrize("persistent", [False, True])
+def test_allocations_are_aligned_and_written(gl, persistent):
+    buffer = StreamBuffer(256, persistent)
+    assert buffer.allocate(data(10, 1), 16) == 0
+    assert buffer.allocate(data(10, 2), 16) == 16
+    assert buffer.allocate(data(4, 3), 4) == 28
+    assert gl.memory.raw[16:26] == bytes([2] * 10)
+    assert gl.memory.raw[28:32] == bytes([3] * 4)
+
+
+def test_allocation_larger_than_buffer_is_rejected(gl):
+    buffer = StreamBuffer(64, False)
+    with pytest.raises(ValueError):
+        buffer.allocate(data(65))
+
+
+def test_orphaned_buffer_wraps_to_fresh_storage(gl):
+    buffer = StreamBuffer(64, False)
+    buffer.allocate(data(40))
+    # does not fit before the end: wraps to offset 0 of new storage
+    assert buffer.allocate(data(40)) == 0
+    assert buffer.generation == 1
+    assert gl.orphans == 1
+    assert buffer.allocate(data(8)) == 40
+    assert gl.orphans == 1
+
+
+def test_persistent_wrap_waits_for_older_frame(gl):
+    buffer = StreamBuffer(64, True)
+    buffer.allocate(data(40))
+    buffer.end_frame()
+    assert len(buffer.fences) == 1
+
+    # overwriting the previous frame's bytes waits on its fence
+    assert buffer.allocate(data(40)) == 0
+    assert buffer.stalls == 1
+    assert buffer.failed_stalls == 0
+    assert not buffer.fences
+
+
+def test_persistent_wrap_skips_wait_for_signaled_fence(gl):
+    buffer = StreamBuffer(64, True)
+    buffer.allocate(data(40))
+    buffer.end_frame()
+    gl.signaled.add(0)
+    buffer.allocate(data(40))
+    assert buffer.stalls == 0
+
+
+def test_persistent_wrap_within_a_frame_fences_its_own_data(gl):
+    buffer = StreamBuffer(64, True)
+    buffer.allocate(data(40))
+    # same frame: the first allocation is fenced before being overwritten
+    assert buffer.allocate(data(40)) == 0
+    assert gl.fences == [0]
+    assert buffer.stalls == 1
+    assert buffer.frame_start == 40
+
+
+def test_timed_out_wait_counts_as_failed_stall(gl):
+    gl.wait_status = stream_buffer.GL_TIMEOUT_EXPIRED
+    buffer = StreamBuffer(64, True)
+    buffer.allocate(data(40))
+    buffer.end_frame()
+    buffer.allocate(data(40))
+    assert buffer.stalls == 1
+    assert buffer.failed_stalls == 1
+    assert buffer.stats()["failed_stalls"] == 1
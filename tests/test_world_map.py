@@ -0,0 +1,133 @@
+import os
+import json
+import zlib
+import base64
+import glm
+import numpy as np
+import pytest
+from elyria.world_map import WorldMap, WorldStreamer, write_world_map, convert_tiled
+
+
+def make_world(path, width=70, height=40, chunk_size=16):
+    rng = np.random.default_rng(4)
+    tiles = rng.integers(0, 5, size=(2, height, width), dtype=np.uint16)
+    collision = rng.random((height, width)) < 0.2
+    spawns = [("slime", 1, 10.0, 20.0), ("chest", 2, 600.0, 300.0), ("slime", 3, 1100.0, 620.0)]
+    write_world_map(str(path), tiles, collision, spawns, 16, chunk_size, ["ground", "decor"])
+    return tiles, collision
+
+
+def test_chunks_read_back_what_was_written(tmp_path):
+    tiles, collision = make_world(tmp_path / "world.map")
+    world = WorldMap(str(tmp_path / "world.map"))
+    assert (world.chunks_wide, world.chunks_high) == (5, 3)
+    assert world.layers == ["ground", "decor"]
+    assert world.entity_types == ["chest", "slime"]
+
+    chunk = world.read_chunk(2, 1)
+    assert np.array_equal(chunk.tiles, tiles[:, 16:32, 32:48])
+    assert np.array_equal(chunk.collision, collision[16:32, 32:48])
+    assert chunk.spawns.tolist() == [(0, 2, 600.0, 300.0)]
+
+    # the last chunks are padded
+    edge = world.read_chunk(4, 2)
+    assert np.array_equal(edge.tiles[:, :8, :6], tiles[:, 32:, 64:])
+    assert not edge.tiles[:, 8:, :].any() and not edge.tiles[:, :, 6:].any()
+    assert [world.entity_types[spawn["type"]] for spawn in edge.spawns] == ["slime"]
+    world.close()
+
+
+def test_tiled_maps_are_converted(tmp_path):
+    ground = [1, 2, 3, 0x80000000 | 4] * 4
+    walls = np.zeros(16, dtype="<u4")
+    walls[6] = 7
+    tileset = {"name": "terrain", "image": "terrain.png", "tilecount": 8, "columns": 4, "tilewidth": 16, "tileheight": 16, "tiles": [{"id": 1, "properties": [{"name": "collides", "type": "bool", "value": True}]}]}
+    (tmp_path / "terrain.tsj").write_text(json.dumps(tileset))
+    tiled = {
+        "orientation": "orthogonal", "width": 4, "height": 4, "tilewidth": 16, "tileheight": 16, "infinite": False,
+        "tilesets": [{"firstgid": 1, "source": "terrain.tsj"}],
+        "layers": [
+            {"type": "tilelayer", "name": "ground", "data": ground},
+            {"type": "group", "name": "walls", "layers": [
+                {"type": "tilelayer", "name": "collision", "encoding": "base64", "compression": "zlib", "data": base64.b64encode(zlib.compress(walls.tobytes())).decode()}
+            ]},
+            {"type": "objectgroup", "name": "entities", "objects": [{"id": 9, "type": "npc", "name": "Bob", "x": 40.0, "y": 8.0}]}
+        ]
+    }
+    (tmp_path / "level.tmj").write_text(json.dumps(tiled))
+    os.mkdir(tmp_path / "out")
+
+    world = convert_tiled(str(tmp_path / "level.tmj"), str(tmp_path / "out" / "level.map"), chunk_size=8)
+    assert world.layers == ["ground"]
+    assert world.tilesets[0]["image"] == os.path.join("..", "terrain.png")
+    chunk = world.read_chunk(0, 0)
+    # flip flags dropped
+    assert chunk.tiles[0, 0, :4].tolist() == [1, 2, 3, 4]
+    # the collision layer, and the tiles marked "collides" (gid 2)
+    assert np.argwhere(chunk.collision).tolist() == [[0, 1], [1, 1], [1, 2], [2, 1], [3, 1]]
+    assert world.entity_types == ["npc"]
+    assert chunk.spawns.tolist() == [(0, 9, 40.0, 8.0)]
+    assert world.tile_rects[6].tolist() == [16, 16, 16, 16]
+    world.close()
+
+
+def test_infinite_tiled_maps_start_at_their_first_chunk(tmp_path):
+    tiled = {
+        "orientation": "orthogonal", "tilewidth": 8, "tileheight": 8, "infinite": True, "tilesets": [],
+        "layers": [{"type": "tilelayer", "name": "ground", "chunks": [
+            {"x": -16, "y": 0, "width": 16, "height": 16, "data": [1] * 256},
+            {"x": 16, "y": 16, "width": 16, "height": 16, "data": [2] * 256}
+        ]}]
+    }
+    (tmp_path / "infinite.tmj").write_text(json.dumps(tiled))
+    world = convert_tiled(str(tmp_path / "infinite.tmj"), str(tmp_path / "infinite.map"), chunk_size=16)
+    assert (world.width, world.height) == (48, 32)
+    assert world.metadata["origin"] == [-16, 0]
+    assert world.read_chunk(0, 0).tiles.min() == 1
+    assert not world.read_chunk(1, 0).tiles.any()
+    assert world.read_chunk(2, 1).tiles.max() == 2
+    world.close()
+
+
+def test_streamer_keeps_chunks_until_past_the_unload_radius(tmp_path):
+    width = 16 * 10
+    tiles = np.ones((1, width, width), dtype=np.uint16)
+    collision = np.zeros((width, width), dtype=bool)
+    collision[5, 3] = True
+    write_world_map(str(tmp_path / "big.map"), tiles, collision, [], 16, 16)
+    world = WorldMap(str(tmp_path / "big.map"))
+    loaded, unloaded = [], []
+    streamer = WorldStreamer(world, 1, 2, lambda chunk: loaded.append((chunk.x, chunk.y)), lambda chunk: unloaded.append((chunk.x, chunk.y)))
+    span = 16 * 16
+
+    # the world's corner: only the chunks inside it
+    streamer.load_now(glm.vec2(10.0, 10.0))
+    assert sorted(streamer.loaded) == [(0, 0), (0, 1), (1, 0), (1, 1)]
+    assert streamer.is_solid(3, 5) and not streamer.is_solid(4, 5)
+    assert streamer.tile(0, 20, 20) == 1
+    # outside of what is loaded
+    assert streamer.is_solid(100, 100) and streamer.tile(0, 100, 100) == 0
+
+    # one chunk right: the left column stays, within the unload radius
+    streamer.load_now(glm.vec2(span + 10.0, 10.0))
+    assert not unloaded
+    assert len(streamer.loaded) == 6
+    # back and forth over the border loads nothing again
+    loads = streamer.loads
+    streamer.load_now(glm.vec2(span - 10.0, 10.0))
+    streamer.load_now(glm.vec2(span + 10.0, 10.0))
+    assert streamer.loads == loads
+
+    # far away: everything else goes
+    streamer.load_now(glm.vec2(6 * span + 10.0, 6 * span + 10.0))
+    assert sorted(unloaded) == [(0, 0), (0, 1), (1, 0), (1, 1), (2, 0), (2, 1)]
+    assert len(streamer.loaded) == 9
+    assert len(loaded) - len(unloaded) == len(streamer.loaded)
+    streamer.close()
+    world.close()
+
+
+def test_load_radius_cannot_exceed_unload_radius(tmp_path):
+    make_world(tmp_path / "world.map")
+    with pytest.raises(ValueError):
+        WorldStreamer(WorldMap(str(tmp_path / "world.map")), 3, 2)
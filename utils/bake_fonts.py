@@ -0,0 +1,38 @@
+import os
+import sys
+import time
+import argparse
+
+# We dynamically add Elyria to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from elyria import base_dir
+from elyria.font_cache import FontCache
+from elyria.text_renderer import ASCII, TextRenderer
+
+# Bakes the glyphs of fonts into the font cache during the asset build, so
+# that the game loads them without FreeType from its first run (see
+# TextRenderer.load). Fonts already baked with the same settings are skipped.
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bake font glyphs into the font cache")
+    parser.add_argument("fonts", nargs="*", default=[os.path.join(base_dir, "fonts", "ocraext.ttf")], help="font files to bake")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[24], help="pixel sizes to bake")
+    parser.add_argument("--sdf", action="store_true", help="bake distance fields (at --sizes, e.g. 48)")
+    parser.add_argument("--spread", type=int, default=6, help="distance field spread, in pixels")
+    parser.add_argument("--charset", help="text file of the characters the game loads besides ASCII (its TextRenderer.charset)")
+    parser.add_argument("--output", default=TextRenderer.font_cache.directory, help="cache directory")
+    args = parser.parse_args()
+
+    charset = ASCII
+    if args.charset:
+        with open(args.charset, encoding="utf-8") as file:
+            charset += "".join(c for c in file.read() if c.isprintable())
+    cache = FontCache(args.output)
+    for font in args.fonts:
+        for size in args.sizes:
+            start = time.perf_counter()
+            baked = cache.bake(font, size, charset, args.sdf, args.spread)
+            path = cache.path(font, size, charset, args.sdf, args.spread)
+            status = f"baked in {(time.perf_counter() - start) * 1000.0:.1f} ms" if baked else "up to date"
+            print(f"{os.path.basename(font)} {size}px{' sdf' if args.sdf else ''}: {os.path.basename(path)}, {status}")
@@ -0,0 +1,46 @@
+import sys
+import os
+import time
+import argparse
+
+# We dynamically add Elyria to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from elyria.crowd import Crowd
+
+
+def make_crowd(count, size, obstacles, rng):
+    crowd = Crowd(count)
+    for x, y in rng.random((count, 2)) * size:
+        crowd.add((x, y), target=tuple(rng.random(2) * size))
+    crowd.set_obstacles(rng.random((obstacles, 2)) * size, rng.uniform(10.0, 40.0, obstacles))
+    return crowd
+
+
+def benchmark(count, frames, obstacles, rng):
+    # townsfolk density: about one agent per 40 * 40 pixels
+    size = np.sqrt(count) * 40.0
+    crowd = make_crowd(count, size, obstacles, rng)
+    timings = []
+    for frame in range(frames):
+        # a few agents pick a new destination every frame
+        for index in rng.integers(count, size=count // 100):
+            crowd.set_target(int(index), tuple(rng.random(2) * size))
+        start = time.perf_counter()
+        crowd.update(1.0 / 60.0)
+        timings.append(time.perf_counter() - start)
+    timings = np.array(timings) * 1000.0
+    print(f"{count} agents, {obstacles} obstacles: mean {timings.mean():.2f} ms, median {np.median(timings):.2f} ms, worst {timings.max():.2f} ms per update")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure crowd steering update times")
+    parser.add_argument("--counts", type=int, nargs="+", default=[1000, 5000, 20000], help="agent counts to measure")
+    parser.add_argument("--frames", type=int, default=300, help="updates per measure")
+    parser.add_argument("--obstacles", type=int, default=32, help="circular obstacles in the world")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    for count in args.counts:
+        benchmark(count, args.frames, args.obstacles, rng)
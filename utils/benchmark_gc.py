@@ -0,0 +1,74 @@
+import sys
+import os
+import gc
+import time
+import argparse
+
+# We dynamically add Elyria to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from elyria.gc_policy import GCPolicy, HitchDetector
+
+
+# stands for what a game keeps for its whole run: tile maps, entity
+# definitions, dialogues... many small container objects tracked by the GC
+def load_assets(count: int) -> list:
+    return [{"id": i, "tags": [i, str(i)], "next": None} for i in range(count)]
+
+
+# a frame of a game: some work, and short-lived objects of which a few
+# form reference cycles (event handlers holding their owner, parent links...)
+def frame(work: float, allocations: int) -> None:
+    deadline = time.perf_counter() + work
+    garbage = []
+    for i in range(allocations):
+        node = {"value": i, "children": []}
+        if i % 8 == 0:
+            node["children"].append(node)
+        garbage.append(node)
+    while time.perf_counter() < deadline:
+        pass
+
+
+def run(name, policy, assets, frames, work, allocations, budget):
+    detector = HitchDetector(budget, log=False)
+    if policy is not None:
+        policy.start()
+    detector.start()
+    timings = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        frame(work, allocations)
+        work_time = time.perf_counter() - start
+        if policy is not None:
+            policy.end_frame(work_time)
+        frame_time = time.perf_counter() - start
+        timings.append(frame_time)
+        detector.end_frame(frame_time)
+        # wait for the next frame, as vsync would
+        while time.perf_counter() - start < budget:
+            pass
+    detector.stop()
+    if policy is not None:
+        policy.stop()
+    timings = np.array(timings) * 1000.0
+    print(f"{name}: frame mean {timings.mean():.2f} ms, p99 {np.percentile(timings, 99):.2f} ms, worst {timings.max():.2f} ms")
+    print(f"  {detector.summary()}")
+    worst = sorted(detector.hitches, key=lambda hitch: hitch.frame_time, reverse=True)[:3]
+    for hitch in worst:
+        print(f"  {hitch}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the default garbage collector with GCPolicy")
+    parser.add_argument("--assets", type=int, default=300000, help="long-lived objects loaded before the game starts")
+    parser.add_argument("--frames", type=int, default=600, help="frames to run")
+    parser.add_argument("--work", type=float, default=8.0, help="work of a frame, in milliseconds")
+    parser.add_argument("--allocations", type=int, default=2000, help="short-lived objects per frame")
+    args = parser.parse_args()
+
+    budget = 1.0 / 60.0
+    assets = load_assets(args.assets)
+    run("default GC", None, assets, args.frames, args.work / 1000.0, args.allocations, budget)
+    run("GCPolicy", GCPolicy(budget), assets, args.frames, args.work / 1000.0, args.allocations, budget)
@@ -0,0 +1,55 @@
+import sys
+import os
+import time
+import argparse
+
+# We dynamically add Elyria to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from elyria.physics import PhysicsWorld
+
+
+def make_world(count, size, walls, rng):
+    # top-down: no gravity, bodies slow down on the ground
+    world = PhysicsWorld(count, damping=2.0)
+    world.add_bounds(size, size)
+    for x, y in rng.random((walls, 2)) * size:
+        world.add_static((x, y), (rng.uniform(32.0, 256.0), 8.0) if rng.random() < 0.5 else (8.0, rng.uniform(32.0, 256.0)))
+    for i, (x, y) in enumerate(rng.random((count, 2)) * (size - 16.0)):
+        # crates and balls, some thrown fast enough to cross a wall in a frame
+        radius = 8.0 if i % 2 else 0.0
+        world.add((x, y), (16.0, 16.0), tuple(rng.normal(0.0, 300.0, 2)), radius=radius, restitution=0.5)
+    return world
+
+
+def benchmark(count, frames, walls, rng):
+    # about one body per 64 * 64 pixels
+    size = float(np.sqrt(count) * 64.0)
+    world = make_world(count, size, walls, rng)
+    timings = []
+    awake = []
+    for frame in range(frames):
+        # now and then something gets kicked
+        for index in rng.integers(count, size=count // 500):
+            world.apply_impulse(int(index), tuple(rng.normal(0.0, 600.0, 2)))
+        start = time.perf_counter()
+        world.step(1.0 / 60.0)
+        timings.append(time.perf_counter() - start)
+        awake.append(int(world.awake[:count].sum()))
+    timings = np.array(timings) * 1000.0
+    escaped = int((~((world.positions[:count] >= 0.0) & (world.positions[:count] <= size)).all(axis=1)).sum())
+    print(f"{count} bodies, {walls} walls: first second {timings[:60].mean():.2f} ms, last second {timings[-60:].mean():.2f} ms per step, "
+          f"{awake[-1]} awake at the end, {escaped} out of bounds")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure physics step times")
+    parser.add_argument("--counts", type=int, nargs="+", default=[500, 2000, 5000], help="body counts to measure")
+    parser.add_argument("--frames", type=int, default=600, help="steps per measure")
+    parser.add_argument("--walls", type=int, default=32, help="static walls in the world")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    for count in args.counts:
+        benchmark(count, args.frames, args.walls, rng)
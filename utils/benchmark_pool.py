@@ -0,0 +1,103 @@
+import sys
+import os
+import gc
+import time
+import argparse
+
+# We dynamically add Elyria to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import glm
+import numpy as np
+from elyria.game_object import GameObject
+from elyria.pool import ObjectPool, AllocationTracker
+
+
+# a short-lived entity moving in a straight line, written the pool's way:
+# its vectors are updated in place
+class Projectile(GameObject):
+    def __init__(self):
+        super().__init__(size=glm.vec2(4.0, 4.0))
+        self.life = 0.0
+
+    def reset(self, position: glm.vec2, velocity: glm.vec2, life: float) -> None:
+        super().reset(position, velocity)
+        self.life = life
+
+    def update(self, dt: float) -> None:
+        self.position.x += self.velocity.x * dt
+        self.position.y += self.velocity.y * dt
+        self.life -= dt
+        if self.life <= 0.0:
+            self.destroyed = True
+
+
+class Allocating:
+    def __init__(self):
+        self.active: list[Projectile] = []
+
+    def spawn(self, position: glm.vec2, velocity: glm.vec2, life: float) -> None:
+        projectile = Projectile()
+        projectile.position = glm.vec2(position)
+        projectile.velocity = glm.vec2(velocity)
+        projectile.life = life
+        self.active.append(projectile)
+
+    def update(self, dt: float) -> None:
+        for projectile in self.active:
+            projectile.update(dt)
+        self.active = [projectile for projectile in self.active if not projectile.destroyed]
+
+
+class Pooled:
+    def __init__(self, capacity: int):
+        self.pool = ObjectPool(Projectile, capacity)
+
+    def spawn(self, position: glm.vec2, velocity: glm.vec2, life: float) -> None:
+        self.pool.acquire(position, velocity, life)
+
+    def update(self, dt: float) -> None:
+        self.pool.update(dt)
+        self.pool.collect()
+
+
+def run(system, frames, spawns, life, tracker=None):
+    origin = glm.vec2(400.0, 300.0)
+    velocities = [glm.vec2(np.cos(a) * 300.0, np.sin(a) * 300.0) for a in np.linspace(0.0, 2.0 * np.pi, spawns)]
+    timings = []
+    for frame in range(frames):
+        start = time.perf_counter()
+        for velocity in velocities:
+            system.spawn(origin, velocity, life)
+        system.update(1.0 / 60.0)
+        timings.append(time.perf_counter() - start)
+        if tracker is not None:
+            tracker.end_frame()
+    return np.array(timings) * 1000.0
+
+
+def benchmark(name, make, frames, spawns, life):
+    system = make()
+    # warm up until as many entities die as are spawned every frame
+    run(system, int(life * 60.0) + 10, spawns, life)
+    collections = sum(stats["collections"] for stats in gc.get_stats())
+    timings = run(system, frames, spawns, life)
+    collections = sum(stats["collections"] for stats in gc.get_stats()) - collections
+    tracker = AllocationTracker(top=3)
+    tracker.start()
+    run(system, 60, spawns, life, tracker)
+    tracker.stop()
+    print(f"{name}: mean {timings.mean():.3f} ms, worst {timings.max():.3f} ms per frame, {collections} GC collections")
+    print("  " + tracker.summary().replace("\n", "\n  "))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare pooled and allocated transient entities")
+    parser.add_argument("--frames", type=int, default=1200, help="frames to measure")
+    parser.add_argument("--spawns", type=int, default=100, help="entities spawned per frame")
+    parser.add_argument("--life", type=float, default=0.5, help="lifetime of an entity in seconds")
+    args = parser.parse_args()
+
+    capacity = int(args.spawns * (args.life * 60.0 + 2))
+    benchmark("allocated", Allocating, args.frames, args.spawns, args.life)
+    benchmark("pooled", lambda: Pooled(capacity), args.frames, args.spawns, args.life)
@@ -0,0 +1,74 @@
+import sys
+import os
+import time
+import pickle
+import tempfile
+import argparse
+
+# We dynamically add Elyria to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import glm
+from elyria import GameObject, BallObject
+from elyria.snapshot import Snapshot, SnapshotWriter, save_snapshot, load_snapshot
+
+
+def make_objects(count):
+    objects = []
+    for i in range(count):
+        position = glm.vec2(i % 800, i // 800)
+        if i % 10 == 0:
+            objects.append(BallObject(position, 12.5, glm.vec2(100.0, -350.0)))
+        else:
+            objects.append(GameObject(position, 0.0, glm.vec2(16.0, 24.0), velocity=glm.vec2(1.0, 2.0)))
+    return objects
+
+
+# best time of a few runs, in milliseconds
+def measure(function, runs):
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000.0
+
+
+def benchmark(count, runs, directory):
+    objects = make_objects(count)
+    snapshot = Snapshot.capture(objects)
+    path = os.path.join(directory, f"snapshot_{count}.bin")
+    writer = SnapshotWriter()
+    pickled = pickle.dumps(objects, pickle.HIGHEST_PROTOCOL)
+
+    results = {
+        "capture": measure(lambda: Snapshot.capture(objects, out=snapshot.entities), runs),
+        "restore": measure(lambda: snapshot.restore(objects), runs),
+        "save": measure(lambda: save_snapshot(snapshot, path, compress=False), runs),
+        "save (zlib)": measure(lambda: save_snapshot(snapshot, path), runs),
+        # time the frame loses when the compressed write happens in the background
+        "save (background)": measure(lambda: writer.save(snapshot, path + ".background"), runs),
+        "load": measure(lambda: load_snapshot(path), runs),
+        # for reference, what pickling the objects themselves costs
+        "pickle": measure(lambda: pickle.dumps(objects, pickle.HIGHEST_PROTOCOL), runs),
+        "unpickle": measure(lambda: pickle.loads(pickled), runs)
+    }
+    writer.close()
+    size = os.path.getsize(path)
+    save_snapshot(snapshot, path, compress=False)
+    raw_size = os.path.getsize(path)
+
+    print(f"{count} entities: {raw_size / 1024:.0f} KiB raw, {size / 1024:.0f} KiB compressed, {len(pickled) / 1024:.0f} KiB pickled")
+    for name, ms in results.items():
+        print(f"  {name:<18} {ms:9.3f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure world-state snapshot save and restore times")
+    parser.add_argument("--counts", type=int, nargs="+", default=[1000, 10000, 100000], help="entity counts to measure")
+    parser.add_argument("--runs", type=int, default=5, help="runs per measure, the best one is reported")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for count in args.counts:
+            benchmark(count, args.runs, directory)
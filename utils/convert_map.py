@@ -0,0 +1,23 @@
+import sys
+import os
+import argparse
+
+# We dynamically add Elyria to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from elyria.world_map import convert_tiled
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert a Tiled JSON map to a chunked world map")
+    parser.add_argument("map", help="Tiled map, saved as JSON (.tmj/.json)")
+    parser.add_argument("output", help="world map file to write")
+    parser.add_argument("--chunk-size", type=int, default=32, help="chunk width and height, in tiles (a multiple of 8)")
+    parser.add_argument("--collision-layer", default="collision", help="tile layer whose tiles are the collision")
+    args = parser.parse_args()
+
+    world = convert_tiled(args.map, args.output, args.chunk_size, args.collision_layer)
+    print(f"{args.output}: {world.width}x{world.height} tiles of {world.tile_size}px, {len(world.layers)} layers ({', '.join(world.layers)})")
+    print(f"  {world.chunks_wide}x{world.chunks_high} chunks of {world.chunk_size} tiles, {world.chunks.itemsize} bytes each, {os.path.getsize(args.output)} bytes")
+    print(f"  {len(world.tilesets)} tilesets, entity types: {', '.join(world.entity_types) or 'none'}")
+    world.close()
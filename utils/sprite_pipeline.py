@@ -0,0 +1,180 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import numpy as np
+from PIL import Image
+from concurrent.futures import ProcessPoolExecutor
+
+# Turns character spritesheets (a grid of sprite_width * sprite_height frames,
+# one character per column) into the engine's animation sheets: for every
+# character and every walk cycle, one row of frames side by side.
+#
+# From row `first`, every `stride` rows start a walk cycle, whose frames are
+# the rows at the `pattern` offsets. The defaults match the character pack
+# of small_rpg: cycles of 3 rows after a skipped one, played 0 1 2 1.
+# Rows are ordered by cycle, then by character.
+#
+# Sheets are sliced in memory and encoded on a process pool; a manifest
+# keyed by the content hash of each input skips the sheets that did not
+# change since the last run.
+
+MANIFEST = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+class PipelineSettings:
+    def __init__(self, sprite_width: int = 16, sprite_height: int = 24, first: int = 1, stride: int = 4, pattern: tuple[int, ...] = (0, 1, 2, 1)):
+        self.sprite_width = sprite_width
+        self.sprite_height = sprite_height
+        self.first = first
+        self.stride = stride
+        self.pattern = tuple(pattern)
+
+    # part of the content hash: changing a setting rebuilds every sheet
+    def key(self) -> str:
+        return json.dumps([MANIFEST_VERSION, self.sprite_width, self.sprite_height, self.first, self.stride, self.pattern])
+
+
+# animation sheet of a spritesheet, as an (height, width, 4) RGBA array
+def build_sheet(pixels: np.ndarray, settings: PipelineSettings) -> np.ndarray:
+    w, h = settings.sprite_width, settings.sprite_height
+    rows, columns = pixels.shape[0] // h, pixels.shape[1] // w
+    # (row, y, column, x, rgba) view of the whole sprites
+    grid = pixels[:rows * h, :columns * w].reshape(rows, h, columns, w, 4)
+
+    # sprite rows of each frame of each cycle: (cycles, frames)
+    starts = np.arange(settings.first, rows - max(settings.pattern), settings.stride)
+    if len(starts) == 0:
+        raise ValueError(f"{rows} sprite rows, too few for a single cycle")
+    frames = starts[:, None] + np.array(settings.pattern)[None, :]
+
+    # (cycle, frame, y, column, x, rgba) -> (cycle, column, y, frame, x, rgba)
+    cycles = grid[frames].transpose(0, 3, 2, 1, 4, 5)
+    return np.ascontiguousarray(cycles).reshape(len(starts) * columns * h, len(settings.pattern) * w, 4)
+
+
+# slices and encodes one spritesheet, runs in the worker processes
+def process_sheet(source: str, destination: str, settings: PipelineSettings) -> tuple[int, int]:
+    with Image.open(source) as image:
+        pixels = np.asarray(image.convert("RGBA"))
+    sheet = build_sheet(pixels, settings)
+    os.makedirs(os.path.dirname(destination) or ".", exist_ok=True)
+    # the previous sheet stays whole until the new one is written
+    temporary = destination + ".tmp"
+    Image.fromarray(sheet, "RGBA").save(temporary, format="PNG")
+    os.replace(temporary, destination)
+    return sheet.shape[1], sheet.shape[0]
+
+
+def content_hash(path: str, settings: PipelineSettings) -> str:
+    digest = hashlib.sha256(settings.key().encode())
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest(path: str) -> dict:
+    try:
+        with open(path) as file:
+            manifest = json.load(file)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"ERROR::SPRITE_PIPELINE: Failed to read manifest {path}, rebuilding everything: {e}")
+        return {}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest.get("sheets", {})
+
+
+def save_manifest(path: str, sheets: dict) -> None:
+    temporary = path + ".tmp"
+    with open(temporary, "w") as file:
+        json.dump({"version": MANIFEST_VERSION, "sheets": sheets}, file, indent=2, sort_keys=True)
+    os.replace(temporary, path)
+
+
+# (input, output) pairs: each input file, or each png of an input directory
+# with its layout mirrored under the output directory
+def collect_inputs(inputs: list[str], output_folder: str) -> list[tuple[str, str]]:
+    pairs = []
+    for path in inputs:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                for name in sorted(files):
+                    if name.lower().endswith(".png"):
+                        source = os.path.join(root, name)
+                        pairs.append((source, os.path.join(output_folder, os.path.relpath(source, path))))
+        else:
+            pairs.append((path, os.path.join(output_folder, os.path.basename(path))))
+    return pairs
+
+
+def run_pipeline(inputs: list[str], output_folder: str, settings: PipelineSettings, jobs: int = 0, force: bool = False) -> dict[str, int]:
+    os.makedirs(output_folder, exist_ok=True)
+    manifest_path = os.path.join(output_folder, MANIFEST)
+    sheets = load_manifest(manifest_path)
+
+    pending = []
+    stats = {"built": 0, "skipped": 0, "failed": 0}
+    for source, destination in collect_inputs(inputs, output_folder):
+        digest = content_hash(source, settings)
+        entry = sheets.get(source)
+        if not force and entry and entry["hash"] == digest and entry["output"] == destination and os.path.exists(destination):
+            stats["skipped"] += 1
+            continue
+        pending.append((source, destination, digest))
+
+    def finished(source, destination, digest, size):
+        sheets[source] = {"hash": digest, "output": destination, "size": list(size)}
+        stats["built"] += 1
+
+    def failed(source, error):
+        # a failed sheet is rebuilt on the next run
+        sheets.pop(source, None)
+        stats["failed"] += 1
+        print(f"ERROR::SPRITE_PIPELINE: Failed to process {source}: {error}")
+
+    # a pool only pays for itself with several sheets to encode
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(pending) <= 1:
+        for source, destination, digest in pending:
+            try:
+                finished(source, destination, digest, process_sheet(source, destination, settings))
+            except Exception as e:
+                failed(source, e)
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(pending))) as pool:
+            futures = [(pool.submit(process_sheet, source, destination, settings), source, destination, digest) for source, destination, digest in pending]
+            for future, source, destination, digest in futures:
+                try:
+                    finished(source, destination, digest, future.result())
+                except Exception as e:
+                    failed(source, e)
+
+    save_manifest(manifest_path, sheets)
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build animation sheets from character spritesheets")
+    parser.add_argument("inputs", nargs="+", help="spritesheets, or directories of spritesheets")
+    parser.add_argument("-o", "--output", default="animation_sheets", help="output directory, holds the manifest too")
+    parser.add_argument("--sprite-width", type=int, default=16, help="width of a sprite in pixels")
+    parser.add_argument("--sprite-height", type=int, default=24, help="height of a sprite in pixels")
+    parser.add_argument("--first", type=int, default=1, help="sprite row of the first cycle")
+    parser.add_argument("--stride", type=int, default=4, help="sprite rows between two cycles")
+    parser.add_argument("--pattern", type=int, nargs="+", default=[0, 1, 2, 1], help="row offsets of the frames of a cycle")
+    parser.add_argument("-j", "--jobs", type=int, default=0, help="encoding processes, 0 for one per CPU")
+    parser.add_argument("--force", action="store_true", help="rebuild every sheet, ignoring the manifest")
+    args = parser.parse_args()
+
+    settings = PipelineSettings(args.sprite_width, args.sprite_height, args.first, args.stride, args.pattern)
+    start = time.perf_counter()
+    stats = run_pipeline(args.inputs, args.output, settings, args.jobs, args.force)
+    print(f"{stats['built']} built, {stats['skipped']} unchanged, {stats['failed']} failed in {time.perf_counter() - start:.2f} s")
+    sys.exit(1 if stats["failed"] else 0)